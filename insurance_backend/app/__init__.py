@@ -6,6 +6,7 @@ from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import timedelta, datetime
 import os
 from dotenv import load_dotenv
@@ -50,7 +51,59 @@ def create_app(config_class=None):
         
         # File upload configuration
         app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
-        app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+        app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
+        # Larger files go through the chunked upload API, one chunk per request
+        app.config['UPLOAD_CHUNK_SIZE'] = int(os.getenv('UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+        app.config['UPLOAD_MAX_SIZE'] = int(os.getenv('UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+        # Unfinished uploads idle this long are deleted with their partial files
+        app.config['UPLOAD_EXPIRY_HOURS'] = float(os.getenv('UPLOAD_EXPIRY_HOURS', 24))
+        # Image derivatives are generated in a background process pool
+        app.config['THUMBNAIL_WIDTHS'] = (160, 480, 1280)
+        app.config['THUMBNAIL_WORKERS'] = int(os.getenv('THUMBNAIL_WORKERS', 2))
+        # Let the front proxy stream downloads: 'x-accel' (nginx) or 'x-sendfile'
+        app.config['SENDFILE_MODE'] = os.getenv('SENDFILE_MODE', '').lower() or None
+        app.config['SENDFILE_ACCEL_PREFIX'] = os.getenv('SENDFILE_ACCEL_PREFIX', '/protected-uploads/')
+        app.config['USE_X_SENDFILE'] = app.config['SENDFILE_MODE'] == 'x-sendfile'
+
+        # Fraud risk scoring: new accidents are scored in the background and
+        # pending ones at or above the threshold are flagged
+        app.config['RISK_MODEL_PATH'] = os.getenv('RISK_MODEL_PATH', os.path.join(app.instance_path, 'risk_model.joblib'))
+        app.config['RISK_FLAG_THRESHOLD'] = float(os.getenv('RISK_FLAG_THRESHOLD', 0.7))
+        app.config['RISK_SCORING_MODE'] = os.getenv('RISK_SCORING_MODE', 'thread')
+        # Reports of the same vehicle this close in time and place, or with
+        # photos this many hash bits apart, are marked as possible duplicates
+        app.config['DUPLICATE_WINDOW_HOURS'] = float(os.getenv('DUPLICATE_WINDOW_HOURS', 6))
+        app.config['DUPLICATE_RADIUS_KM'] = float(os.getenv('DUPLICATE_RADIUS_KM', 1.0))
+        app.config['DUPLICATE_IMAGE_DISTANCE'] = int(os.getenv('DUPLICATE_IMAGE_DISTANCE', 3))
+        # Password hashing: 'bcrypt' or 'pbkdf2_sha256' and its cost. Stored hashes
+        # made with other settings are upgraded on the next successful login.
+        # At most PASSWORD_HASH_CONCURRENCY hashes run at once per process.
+        app.config['PASSWORD_HASH_SCHEME'] = os.getenv('PASSWORD_HASH_SCHEME', 'bcrypt')
+        app.config['PASSWORD_BCRYPT_ROUNDS'] = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', 12))
+        app.config['PASSWORD_PBKDF2_ITERATIONS'] = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 600000))
+        app.config['PASSWORD_HASH_CONCURRENCY'] = int(os.getenv('PASSWORD_HASH_CONCURRENCY', 0)) or os.cpu_count()
+        app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+        # Revoked tokens are checked in memory; revocations made by other
+        # processes are picked up every TOKEN_BLOCKLIST_REFRESH seconds
+        app.config['TOKEN_BLOCKLIST_REFRESH'] = float(os.getenv('TOKEN_BLOCKLIST_REFRESH', 5))
+        # How long a token issued without an expiry stays revoked after logout
+        app.config['TOKEN_BLOCKLIST_MAX_LIFETIME'] = float(os.getenv('TOKEN_BLOCKLIST_MAX_LIFETIME', 30 * 86400))
+        # Login attempts allowed in any LOGIN_THROTTLE_WINDOW seconds per client address,
+        # and failed logins per account; 'redis' storage shares the counts between workers
+        app.config['LOGIN_THROTTLE_STORAGE'] = os.getenv('LOGIN_THROTTLE_STORAGE', 'memory')
+        app.config['REDIS_URL'] = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        app.config['LOGIN_THROTTLE_WINDOW'] = int(os.getenv('LOGIN_THROTTLE_WINDOW', 300))
+        app.config['LOGIN_THROTTLE_IP_LIMIT'] = int(os.getenv('LOGIN_THROTTLE_IP_LIMIT', 100))
+        app.config['LOGIN_THROTTLE_ACCOUNT_LIMIT'] = int(os.getenv('LOGIN_THROTTLE_ACCOUNT_LIMIT', 10))
+        # Reverse proxies (e.g. nginx) in front of the app whose X-Forwarded-For
+        # and X-Forwarded-Proto are trusted; 0 when clients connect directly
+        app.config['TRUSTED_PROXIES'] = int(os.getenv('TRUSTED_PROXIES', 0))
+
+    # Client address and scheme as forwarded by the trusted proxies, so the
+    # login throttle counts per client and not per proxy
+    trusted_proxies = app.config.get('TRUSTED_PROXIES', 0)
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
 
     # Initialize extensions with app
     db.init_app(app)
@@ -64,15 +117,49 @@ def create_app(config_class=None):
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
 
+    from app.utils import user_cache
+    user_cache.init_app(app)
+
+    from app.services import login_throttle, passwords, token_blocklist
+    passwords.init_app(app)
+    token_blocklist.init_app(app)
+    login_throttle.init_app(app)
+
+    from app.services import geo_service, media_store, thumbnails
+    geo_service.init_app(app)
+    media_store.init_app(app)
+    thumbnails.init_app(app)
+
+    from app import scoring
+    scoring.init_app(app)
+
+    from app import cli
+    cli.init_app(app)
+
     # Add template context processor
     @app.context_processor
     def inject_datetime():
         return {'datetime': datetime}
 
-    # Register only the main blueprint for UI preview
+    # Register the main blueprint (UI preview) and the implemented API blueprints
     from app.routes.main import bp as main_bp
     app.register_blueprint(main_bp)
 
+    from app.routes.auth import bp as auth_bp
+    app.register_blueprint(auth_bp)
+    csrf.exempt(auth_bp)
+
+    from app.routes.accidents import bp as accidents_bp
+    app.register_blueprint(accidents_bp)
+    csrf.exempt(accidents_bp)
+
+    from app.routes.uploads import bp as uploads_bp
+    app.register_blueprint(uploads_bp)
+    csrf.exempt(uploads_bp)
+
+    from app.routes.media import bp as media_bp
+    app.register_blueprint(media_bp)
+
     # Create upload directory if it doesn't exist
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
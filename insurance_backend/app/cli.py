@@ -1,5 +1,13 @@
 import click
+import time
+from flask import current_app
 from flask.cli import with_appcontext
+from app import db
+from app.models import Accident
+from app.scoring import DuplicateDetector, RiskModel, extract_features, risk_worker
+from app.scoring.batch import DEFAULT_CHUNK_SIZE, Rescorer, iter_id_chunks
+from app.services.media_store import MediaStore
+from app.services.upload_service import UploadService
 from app.utils.seed_data import seed_database
 
 @click.command('seed-db')
@@ -10,6 +18,95 @@ def seed_db_command():
     seed_database()
     click.echo('Database seeding completed.')
 
+@click.command('rescore-accidents')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True, help='Accidents scored per chunk.')
+@click.option('--workers', default=0, show_default=True, help='Processes to score chunks in (0 = this process).')
+@click.option('--restart', is_flag=True, help='Start over instead of resuming an interrupted run.')
+@click.option('--flag/--no-flag', default=True, show_default=True,
+              help='Flag pending accidents at or above RISK_FLAG_THRESHOLD.')
+@with_appcontext
+def rescore_accidents_command(chunk_size, workers, restart, flag):
+    """Re-score every accident with the current fraud rules and model."""
+    def report(run, rate):
+        click.echo(f'  up to accident {run.last_accident_id}: {run.rows_scored} scored, {rate:,.0f} rows/s')
+
+    started = time.monotonic()
+    run = Rescorer(chunk_size=chunk_size, workers=workers, flag=flag, progress=report).run(restart=restart)
+    elapsed = time.monotonic() - started
+    click.echo(f'Re-scored {run.rows_scored} accident(s) in {elapsed:.1f}s '
+               f'({run.rows_scored / elapsed if elapsed else 0:,.0f} rows/s overall).')
+
+@click.command('index-duplicates')
+@click.option('--batch-size', default=500, show_default=True, help='Accidents indexed per transaction.')
+@with_appcontext
+def index_duplicates_command(batch_size):
+    """Add stored accidents to the duplicate report index (new ones are indexed when scored)."""
+    detector = DuplicateDetector.from_config(current_app.config)
+    indexed = matched = 0
+    for accident_ids in iter_id_chunks(0, batch_size):
+        try:
+            matched += sum(detector.check(accident_ids).values())
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+        indexed += len(accident_ids)
+    click.echo(f'Indexed {indexed} accident(s); recorded {matched} new possible duplicate(s). '
+               f'Run `flask rescore-accidents` to update their risk scores.')
+
+@click.command('migrate-media-store')
+@click.option('--batch-size', default=100, show_default=True, help='Rows to commit at a time.')
+@with_appcontext
+def migrate_media_store_command(batch_size):
+    """Move uploaded files into the content-addressed media store."""
+    click.echo('Migrating media files...')
+    stats = MediaStore.migrate_existing(batch_size=batch_size)
+    click.echo(f"Migrated {stats['migrated']} file(s), {stats['duplicates']} duplicate(s), "
+               f"{stats['missing']} missing.")
+    click.echo(f"Reclaimed {stats['bytes_reclaimed'] / (1024 * 1024):.1f} MB ({stats['bytes_reclaimed']} bytes).")
+
+@click.command('expire-uploads')
+@with_appcontext
+def expire_uploads_command():
+    """Delete unfinished uploads idle for more than UPLOAD_EXPIRY_HOURS."""
+    click.echo(f'Deleted {UploadService.expire_uploads()} expired upload(s).')
+
+@click.command('risk-worker')
+@click.option('--once', is_flag=True, help='Score what is pending and exit.')
+@with_appcontext
+def risk_worker_command(once):
+    """Score unscored accidents (use with RISK_SCORING_MODE=off in the web workers)."""
+    if once:
+        click.echo(f'Scored {risk_worker.drain()} accident(s).')
+        return
+    click.echo('Scoring new accidents, press Ctrl+C to stop...')
+    try:
+        risk_worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+@click.command('train-risk-model')
+@click.option('--output', default=None, help='Model file (defaults to RISK_MODEL_PATH).')
+@with_appcontext
+def train_risk_model_command(output):
+    """Train the fraud model on reviewer verdicts (fraud_label), never on automatic flags."""
+    labelled = db.session.query(Accident.id, Accident.fraud_label).filter(Accident.fraud_label.isnot(None)).all()
+    labels = {accident_id: int(fraud_label) for accident_id, fraud_label in labelled}
+    if len(set(labels.values())) < 2:
+        raise click.ClickException('Need accidents reviewed as fraudulent and as genuine to train on.')
+
+    features = extract_features(list(labels))
+    model = RiskModel.train(features, [labels[accident_id] for accident_id in features.index])
+    path = output or current_app.config['RISK_MODEL_PATH']
+    model.save(path)
+    click.echo(f'Trained on {len(features)} accident(s); model saved to {path}.')
+
 def init_app(app):
     """Register CLI commands with the Flask application."""
-    app.cli.add_command(seed_db_command) 
\ No newline at end of file
+    app.cli.add_command(seed_db_command)
+    app.cli.add_command(rescore_accidents_command)
+    app.cli.add_command(index_duplicates_command)
+    app.cli.add_command(migrate_media_store_command)
+    app.cli.add_command(expire_uploads_command)
+    app.cli.add_command(risk_worker_command)
+    app.cli.add_command(train_risk_model_command) 
\ No newline at end of file
@@ -4,7 +4,12 @@ from .accident import (
     Accident, AccidentStatus, Vehicle, Person, 
     EnvironmentalConditions, MediaFile, ReviewNote
 )
+from .abstract import Abstract
 from .insurance import InsuranceClaim
+from .upload import UploadSession, UploadStatus
+from .media import MediaBlob
+from .scoring import ScoringRun, DuplicateKey, DuplicateMatch
+from .token import RevokedToken
 
 __all__ = [
     'db',
@@ -17,5 +22,13 @@ __all__ = [
     'EnvironmentalConditions',
     'MediaFile',
     'ReviewNote',
-    'InsuranceClaim'
+    'Abstract',
+    'InsuranceClaim',
+    'UploadSession',
+    'UploadStatus',
+    'MediaBlob',
+    'ScoringRun',
+    'DuplicateKey',
+    'DuplicateMatch',
+    'RevokedToken'
 ] 
\ No newline at end of file
@@ -9,6 +9,7 @@ class Abstract(db.Model):
     file_path = db.Column(db.String(255), nullable=False)
     file_type = db.Column(db.String(10), nullable=False)  # 'pdf' or 'image'
     file_size = db.Column(db.Integer, nullable=False)  # Size in bytes
+    sha256 = db.Column(db.String(64), nullable=True)  # Hex digest of the file contents
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
@@ -19,6 +20,7 @@ class Abstract(db.Model):
             'file_path': self.file_path,
             'file_type': self.file_type,
             'file_size': self.file_size,
+            'sha256': self.sha256,
             'uploaded_at': self.uploaded_at.isoformat(),
             'uploaded_by': self.uploaded_by
         }
@@ -1,6 +1,8 @@
 from app import db
+from app.utils.registration import normalize_registration
 from datetime import datetime
 from enum import Enum
+from sqlalchemy.orm import validates
 
 class AccidentStatus(Enum):
     PENDING = 'pending'
@@ -60,10 +62,16 @@ class Person(db.Model):
 
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
+    __table_args__ = (
+        db.Index('ix_vehicles_registration_number_accident_id', 'registration_number', 'accident_id'),
+        db.Index('ix_vehicles_normalized_registration_accident_id', 'normalized_registration', 'accident_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False)
+    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False, index=True)
     registration_number = db.Column(db.String(20), nullable=False)
+    # Upper-cased, whitespace/punctuation-free copy of registration_number for lookups
+    normalized_registration = db.Column(db.String(20), nullable=True)
     make = db.Column(db.String(50), nullable=False)
     model = db.Column(db.String(50), nullable=False)
     color = db.Column(db.String(30), nullable=False)
@@ -74,6 +82,11 @@ class Vehicle(db.Model):
     # Relationships
     damage_images = db.relationship('MediaFile', backref='vehicle', lazy=True)
     
+    @validates('registration_number')
+    def _set_normalized_registration(self, key, value):
+        self.normalized_registration = normalize_registration(value)
+        return value
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -102,6 +115,14 @@ accident_witnesses = db.Table('accident_witnesses',
 
 class Accident(db.Model):
     __tablename__ = 'accidents'
+    __table_args__ = (
+        # Keyset pagination over (created_at, id), optionally narrowed by status or officer
+        db.Index('ix_accidents_created_at_id', 'created_at', 'id'),
+        db.Index('ix_accidents_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_accidents_officer_id_created_at_id', 'officer_id', 'created_at', 'id'),
+        # Client-generated keys make resubmissions from the offline queue idempotent
+        db.UniqueConstraint('officer_id', 'idempotency_key', name='uq_accidents_officer_id_idempotency_key'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     report_number = db.Column(db.String(20), unique=True, nullable=False)
@@ -109,10 +130,15 @@ class Accident(db.Model):
     location = db.Column(db.String(200), nullable=False)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True, index=True)  # Kept in step with the coordinates by geo_service
     accident_date = db.Column(db.DateTime, nullable=False)
     description = db.Column(db.Text, nullable=True)
     status = db.Column(db.Enum(AccidentStatus), default=AccidentStatus.PENDING)
     risk_score = db.Column(db.Float, nullable=True)
+    # A reviewer's verdict (True = fraudulent), the model's only training label; None until reviewed
+    fraud_label = db.Column(db.Boolean, nullable=True)
+    reviewed_by = db.Column(db.Integer, db.ForeignKey('users.id', name='fk_accidents_reviewed_by_users'), nullable=True)
+    idempotency_key = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -131,10 +157,13 @@ class Accident(db.Model):
             'location': self.location,
             'latitude': self.latitude,
             'longitude': self.longitude,
+            'geohash': self.geohash,
             'accident_date': self.accident_date.isoformat(),
             'description': self.description,
             'status': self.status.value,
             'risk_score': self.risk_score,
+            'fraud_label': self.fraud_label,
+            'reviewed_by': self.reviewed_by,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'vehicles': [v.to_dict() for v in self.vehicles],
@@ -152,9 +181,14 @@ class MediaFile(db.Model):
     __tablename__ = 'media_files'
     
     id = db.Column(db.Integer, primary_key=True)
-    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False)
+    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False, index=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=True)
     file_type = db.Column(db.String(10), nullable=False)  # 'image' or 'video'
     file_path = db.Column(db.String(255), nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=True)  # Size in bytes
+    sha256 = db.Column(db.String(64), nullable=True)  # Hex digest of the file contents
+    variants = db.Column(db.JSON, nullable=True)  # WebP derivatives by width; None until generated
+    phash = db.Column(db.String(16), nullable=True)  # 64-bit difference hash (hex) of images, for near-duplicate search
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -163,6 +197,9 @@ class MediaFile(db.Model):
             'accident_id': self.accident_id,
             'file_type': self.file_type,
             'file_path': self.file_path,
+            'file_size': self.file_size,
+            'sha256': self.sha256,
+            'variant_widths': sorted(variant['width'] for variant in (self.variants or {}).values()),
             'uploaded_at': self.uploaded_at.isoformat()
         }
 
@@ -171,7 +208,7 @@ class ReviewNote(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # None for automated checks
     comment = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -180,7 +217,7 @@ class ReviewNote(db.Model):
             'id': self.id,
             'accident_id': self.accident_id,
             'user_id': self.user_id,
-            'user_name': self.user.name,
+            'user_name': self.user.name if self.user else 'Automated check',
             'comment': self.comment,
             'created_at': self.created_at.isoformat()
         } 
\ No newline at end of file
@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime
+
+class InsuranceClaim(db.Model):
+    __tablename__ = 'insurance_claims'
+
+    id = db.Column(db.Integer, primary_key=True)
+    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False)
+    agent_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    claim_number = db.Column(db.String(50), unique=True, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, under_review, approved, rejected
+    amount_claimed = db.Column(db.Float)
+    amount_approved = db.Column(db.Float)
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Additional fields for claim details
+    policy_number = db.Column(db.String(50))
+    claimant_name = db.Column(db.String(100))
+    claimant_contact = db.Column(db.String(100))
+    vehicle_details = db.Column(db.JSON)  # Store vehicle information
+    damage_assessment = db.Column(db.Text)
+    supporting_documents = db.Column(db.JSON)  # Store document paths/URLs
+    notes = db.Column(db.Text)
+
+    def generate_claim_number(self):
+        """Generate a unique claim number"""
+        timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        return f'CLM-{timestamp}-{self.id}'
+
+    def __repr__(self):
+        return f'<InsuranceClaim {self.claim_number}>'
\ No newline at end of file
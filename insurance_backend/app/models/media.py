@@ -0,0 +1,30 @@
+from app import db
+from datetime import datetime
+
+class MediaBlob(db.Model):
+    """
+    One stored file, addressed by the SHA-256 of its contents.
+
+    MediaFile and Abstract rows point at blobs through their sha256 column;
+    ref_count is the number of such rows and is maintained by
+    app.services.media_store. A blob is deleted when it drops to zero.
+    """
+    __tablename__ = 'media_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)  # Size in bytes
+    path = db.Column(db.String(255), nullable=False)  # Relative to UPLOAD_FOLDER
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'sha256': self.sha256,
+            'size': self.size,
+            'path': self.path,
+            'ref_count': self.ref_count,
+            'created_at': self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<MediaBlob {self.sha256[:12]} x{self.ref_count}>'
\ No newline at end of file
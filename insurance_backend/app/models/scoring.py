@@ -0,0 +1,85 @@
+from app import db
+from datetime import datetime
+
+class ScoringRun(db.Model):
+    """
+    Progress of a `flask rescore-accidents` run over the accident history.
+
+    last_accident_id is advanced in the same transaction as each chunk's
+    score updates, so an interrupted run resumes after the last chunk that
+    was actually committed.
+    """
+    __tablename__ = 'scoring_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    last_accident_id = db.Column(db.Integer, nullable=False, default=0)
+    rows_scored = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'chunk_size': self.chunk_size,
+            'last_accident_id': self.last_accident_id,
+            'rows_scored': self.rows_scored,
+            'started_at': self.started_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<ScoringRun {self.id} at {self.last_accident_id}>'
+
+class DuplicateKey(db.Model):
+    """
+    Lookup key for finding candidate duplicates of an accident.
+
+    Vehicle keys combine the normalized registration number, a time bucket
+    and a geo cell; image keys are one band of a photo's perceptual hash
+    (the full hash is kept in phash). Candidates are found with an indexed
+    IN lookup on key, so the cost does not grow with the accidents table.
+    """
+    __tablename__ = 'duplicate_keys'
+    __table_args__ = (
+        db.UniqueConstraint('accident_id', 'key', name='uq_duplicate_keys_accident_id_key'),
+        db.Index('ix_duplicate_keys_key_accident_id', 'key', 'accident_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    phash = db.Column(db.String(16), nullable=True)  # Image keys only
+
+    def __repr__(self):
+        return f'<DuplicateKey {self.key} -> {self.accident_id}>'
+
+class DuplicateMatch(db.Model):
+    """An earlier accident that looks like the same incident reported again."""
+    __tablename__ = 'duplicate_matches'
+    __table_args__ = (
+        db.UniqueConstraint('accident_id', 'duplicate_of_id', 'reason',
+                            name='uq_duplicate_matches_accident_id_duplicate_of_id_reason'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False, index=True)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False, index=True)
+    reason = db.Column(db.String(20), nullable=False)  # 'vehicle' or 'image'
+    detail = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'accident_id': self.accident_id,
+            'duplicate_of_id': self.duplicate_of_id,
+            'reason': self.reason,
+            'detail': self.detail,
+            'created_at': self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<DuplicateMatch {self.accident_id} ~ {self.duplicate_of_id} ({self.reason})>'
\ No newline at end of file
@@ -0,0 +1,20 @@
+from app import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """
+    A JWT revoked before it expired, keyed by its `jti` claim.
+
+    Rows are only needed until expires_at: after that the token is rejected
+    as expired anyway, so they are pruned (see TokenBlocklist.prune).
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    token_type = db.Column(db.String(10), nullable=False)  # 'access' or 'refresh'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti} ({self.token_type})>'
\ No newline at end of file
@@ -0,0 +1,45 @@
+from app import db
+from datetime import datetime
+from enum import Enum
+
+class UploadStatus(Enum):
+    IN_PROGRESS = 'in_progress'
+    COMPLETED = 'completed'
+
+class UploadSession(db.Model):
+    """A chunked upload of a media file or abstract, resumable from `received_bytes`."""
+    __tablename__ = 'upload_sessions'
+
+    id = db.Column(db.String(32), primary_key=True)  # Opaque token handed to the client
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    accident_id = db.Column(db.Integer, db.ForeignKey('accidents.id'), nullable=False)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=True)
+    target = db.Column(db.String(10), nullable=False)  # 'media' or 'abstract'
+    file_type = db.Column(db.String(10), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+    received_bytes = db.Column(db.BigInteger, nullable=False, default=0)
+    sha256 = db.Column(db.String(64), nullable=True)  # Set once the upload is complete
+    status = db.Column(db.Enum(UploadStatus), nullable=False, default=UploadStatus.IN_PROGRESS)
+    result_id = db.Column(db.Integer, nullable=True)  # MediaFile or Abstract created on completion
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'upload_id': self.id,
+            'accident_id': self.accident_id,
+            'target': self.target,
+            'file_type': self.file_type,
+            'filename': self.filename,
+            'total_size': self.total_size,
+            'chunk_size': self.chunk_size,
+            'received_bytes': self.received_bytes,
+            'sha256': self.sha256,
+            'status': self.status.value,
+            'result_id': self.result_id
+        }
+
+    def __repr__(self):
+        return f'<UploadSession {self.id} - {self.received_bytes}/{self.total_size}>'
\ No newline at end of file
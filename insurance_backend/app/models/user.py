@@ -1,6 +1,6 @@
 from app import db
+from app.services.passwords import password_hasher
 from datetime import datetime
-import bcrypt
 from enum import Enum
 
 class UserRole(Enum):
@@ -32,16 +32,16 @@ class User(db.Model):
         self.company_id = company_id
     
     def set_password(self, password):
-        """Hash and set the user's password."""
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash and set the user's password with the configured scheme and cost."""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Check if the provided password matches the hash."""
-        return bcrypt.checkpw(
-            password.encode('utf-8'),
-            self.password_hash.encode('utf-8')
-        )
+        return password_hasher.verify(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        """Whether the stored hash was made with an older scheme or cost."""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         """Convert user object to dictionary."""
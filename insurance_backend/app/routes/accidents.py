@@ -1,21 +1,235 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
 from app import db
-from app.models import Accident
-from app.utils import role_required
+from app.models import Accident, AccidentStatus, Abstract
+from app.services.accident_service import AccidentService, DEFAULT_PAGE_SIZE
+from app.services.geo_service import (
+    GeoService, DEFAULT_HOTSPOT_LIMIT, DEFAULT_HOTSPOT_PRECISION, DEFAULT_NEARBY_LIMIT, DEFAULT_NEARBY_RADIUS_KM
+)
+from app.utils import role_required, get_current_user_snapshot
+from app.utils.file_serving import send_stored_file
 
 bp = Blueprint('accidents', __name__, url_prefix='/api/accidents')
 
+DEFAULT_INGEST_MAX_BATCH = 100
+
+ABSTRACT_TYPES = {'pdf': 'application/pdf', 'image': 'image/jpeg'}
+
+class PersonSchema(Schema):
+    name = fields.Str(required=True, validate=validate.Length(min=1, max=100))
+    phone_number = fields.Str(allow_none=True, validate=validate.Length(max=20))
+    email = fields.Email(allow_none=True)
+    address = fields.Str(allow_none=True, validate=validate.Length(max=200))
+    license_number = fields.Str(allow_none=True, validate=validate.Length(max=50))
+    id_number = fields.Str(allow_none=True, validate=validate.Length(max=50))
+
+class VehicleSchema(Schema):
+    registration_number = fields.Str(required=True, validate=validate.Length(min=1, max=20))
+    make = fields.Str(required=True, validate=validate.Length(min=1, max=50))
+    model = fields.Str(required=True, validate=validate.Length(min=1, max=50))
+    color = fields.Str(required=True, validate=validate.Length(min=1, max=30))
+    damage_description = fields.Str(allow_none=True)
+    driver = fields.Nested(PersonSchema, allow_none=True)
+    passengers = fields.List(fields.Nested(PersonSchema), load_default=list)
+
+class EnvironmentalConditionsSchema(Schema):
+    weather_conditions = fields.Str(allow_none=True, validate=validate.Length(max=100))
+    road_conditions = fields.Str(allow_none=True, validate=validate.Length(max=100))
+    visibility = fields.Str(allow_none=True, validate=validate.Length(max=100))
+
+class MediaSchema(Schema):
+    """A file already in the media store: a completed upload of the officer's, or a blob's digest."""
+    file_type = fields.Str(required=True, validate=validate.OneOf(['image', 'video']))
+    upload_id = fields.Str(validate=validate.Length(min=1, max=32))
+    sha256 = fields.Str(validate=validate.Regexp(r'^[0-9a-fA-F]{64}$', error='Not a SHA-256 hex digest.'))
+    vehicle_index = fields.Int(allow_none=True, validate=validate.Range(min=0))
+
+    @validates_schema
+    def validate_reference(self, data, **kwargs):
+        if bool(data.get('upload_id')) == bool(data.get('sha256')):
+            raise ValidationError('Give either upload_id or sha256.', 'upload_id')
+
+class AccidentReportSchema(Schema):
+    idempotency_key = fields.Str(required=True, validate=validate.Length(min=1, max=64))
+    report_number = fields.Str(allow_none=True, validate=validate.Length(min=1, max=20))
+    location = fields.Str(required=True, validate=validate.Length(min=1, max=200))
+    latitude = fields.Float(allow_none=True, validate=validate.Range(min=-90, max=90))
+    longitude = fields.Float(allow_none=True, validate=validate.Range(min=-180, max=180))
+    accident_date = fields.DateTime(required=True)
+    description = fields.Str(allow_none=True)
+    vehicles = fields.List(fields.Nested(VehicleSchema), load_default=list)
+    witnesses = fields.List(fields.Nested(PersonSchema), load_default=list)
+    environmental_conditions = fields.Nested(EnvironmentalConditionsSchema, allow_none=True)
+    media = fields.List(fields.Nested(MediaSchema), load_default=list)
+
+    @validates_schema
+    def validate_vehicle_index(self, data, **kwargs):
+        for media_file in data.get('media', []):
+            index = media_file.get('vehicle_index')
+            if index is not None and index >= len(data.get('vehicles', [])):
+                raise ValidationError('vehicle_index does not refer to a vehicle in this report', 'media')
+
+class ReviewSchema(Schema):
+    fraudulent = fields.Bool(required=True)
+    comment = fields.Str(allow_none=True, validate=validate.Length(max=2000))
+
 @bp.route('/', methods=['GET'])
 @jwt_required()
-@role_required(['admin', 'insurance_agent', 'police'])
+@role_required(['admin', 'insurance_officer', 'police'])
 def get_accidents():
-    """Get all accidents (filtered by role)"""
-    return jsonify({'message': 'Accidents endpoint - to be implemented'}), 200
+    """
+    List accidents, newest first, one page at a time.
+
+    Query parameters: cursor, limit, status, officer_id, date_from, date_to
+    (ISO 8601) and registration_number. Pass the returned next_cursor to get
+    the following page; it is null on the last page.
+    """
+    try:
+        status = request.args.get('status')
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+
+        accidents, next_cursor = AccidentService.list_accidents(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            status=AccidentStatus(status) if status else None,
+            officer_id=request.args.get('officer_id', type=int),
+            date_from=datetime.fromisoformat(date_from) if date_from else None,
+            date_to=datetime.fromisoformat(date_to) if date_to else None,
+            registration_number=request.args.get('registration_number')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'accidents': accidents,
+        'next_cursor': next_cursor
+    }), 200
+
+@bp.route('/nearby', methods=['GET'])
+@jwt_required()
+@role_required(['admin', 'insurance_officer', 'police'])
+def get_nearby_accidents():
+    """
+    Accidents within a radius of a point, nearest first, as map markers.
+
+    Query parameters: lat, lon (required), radius in km (default 1, at most
+    50), limit, date_from and date_to (ISO 8601, on the accident date).
+    """
+    latitude = request.args.get('lat', type=float)
+    longitude = request.args.get('lon', type=float)
+    if latitude is None or longitude is None:
+        return jsonify({'error': 'lat and lon are required numbers'}), 400
+
+    try:
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        accidents = GeoService.nearby(
+            latitude,
+            longitude,
+            radius_km=request.args.get('radius', DEFAULT_NEARBY_RADIUS_KM, type=float),
+            limit=request.args.get('limit', DEFAULT_NEARBY_LIMIT, type=int),
+            date_from=datetime.fromisoformat(date_from) if date_from else None,
+            date_to=datetime.fromisoformat(date_to) if date_to else None
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'accidents': accidents}), 200
+
+@bp.route('/hotspots', methods=['GET'])
+@jwt_required()
+@role_required(['admin', 'insurance_officer', 'police'])
+def get_hotspots():
+    """
+    Geohash cells with the most accidents, busiest first.
+
+    Query parameters: precision (geohash length, default 6), date_from and
+    date_to (ISO 8601; defaults to the last 30 days), bbox
+    (south,west,north,east), min_count and limit.
+    """
+    try:
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        bbox = request.args.get('bbox')
+        bounds = tuple(float(value) for value in bbox.split(',')) if bbox else None
+        if bounds is not None and len(bounds) != 4:
+            raise ValueError('bbox must be south,west,north,east')
+
+        hotspots = GeoService.hotspots(
+            precision=request.args.get('precision', DEFAULT_HOTSPOT_PRECISION, type=int),
+            date_from=datetime.fromisoformat(date_from) if date_from else datetime.utcnow() - timedelta(days=30),
+            date_to=datetime.fromisoformat(date_to) if date_to else None,
+            bounds=bounds,
+            min_count=request.args.get('min_count', 1, type=int),
+            limit=request.args.get('limit', DEFAULT_HOTSPOT_LIMIT, type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'hotspots': hotspots}), 200
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+@role_required(['police'])
+def ingest_accidents():
+    """
+    Create several accident reports at once, as sent by the mobile offline queue.
+
+    The body is a JSON array of reports (or {"accidents": [...]}), each with a
+    client-generated idempotency_key. Media must already be in the media
+    store, named by a completed upload_id or by sha256; a report naming
+    anything else is invalid. Valid reports are stored in a single
+    transaction; resending a key that was already stored returns the
+    existing accident instead of creating another. The response lists one
+    result per report, in request order.
+    """
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('accidents')
+    if not isinstance(payload, list) or not payload:
+        return jsonify({'error': 'Expected a non-empty array of accident reports'}), 400
+
+    max_batch = current_app.config.get('INGEST_MAX_BATCH', DEFAULT_INGEST_MAX_BATCH)
+    if len(payload) > max_batch:
+        return jsonify({'error': f'At most {max_batch} accident reports per batch'}), 413
+
+    schema = AccidentReportSchema()
+    results = [None] * len(payload)
+    valid_indexes, valid_items = [], []
+    for index, item in enumerate(payload):
+        try:
+            valid_items.append(schema.load(item if isinstance(item, dict) else {}))
+            valid_indexes.append(index)
+        except ValidationError as e:
+            results[index] = {
+                'index': index,
+                'idempotency_key': item.get('idempotency_key') if isinstance(item, dict) else None,
+                'status': 'invalid',
+                'errors': e.messages
+            }
+
+    try:
+        ingested = AccidentService.ingest_batch(get_current_user_snapshot().id, valid_items)
+    except SQLAlchemyError:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to store accident reports, retry the batch'}), 500
+
+    for index, result in zip(valid_indexes, ingested):
+        results[index] = dict(result, index=index)
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    return jsonify({
+        'created': created,
+        'results': results
+    }), 201 if created else 200
 
 @bp.route('/<int:accident_id>', methods=['GET'])
 @jwt_required()
-@role_required(['admin', 'insurance_agent', 'police'])
+@role_required(['admin', 'insurance_officer', 'police'])
 def get_accident(accident_id):
     """Get a specific accident by ID"""
     return jsonify({'message': f'Get accident {accident_id} - to be implemented'}), 200
@@ -32,4 +246,44 @@ def create_accident():
 @role_required(['admin', 'police'])
 def update_accident(accident_id):
     """Update an existing accident report"""
-    return jsonify({'message': f'Update accident {accident_id} - to be implemented'}), 200 
\ No newline at end of file
+    return jsonify({'message': f'Update accident {accident_id} - to be implemented'}), 200
+
+@bp.route('/<int:accident_id>/review', methods=['PUT'])
+@jwt_required()
+@role_required(['admin', 'insurance_officer'])
+def review_accident(accident_id):
+    """Record whether a reviewed accident report is fraudulent; the verdict trains the risk model"""
+    try:
+        data = ReviewSchema().load(request.get_json() or {})
+    except ValidationError as err:
+        return jsonify({'error': err.messages}), 400
+
+    accident = AccidentService.record_review(accident_id, get_current_user_snapshot().id, **data)
+    if accident is None:
+        return jsonify({'error': 'Accident not found'}), 404
+    return jsonify({'id': accident.id, 'status': accident.status.value, 'fraud_label': accident.fraud_label}), 200
+
+@bp.route('/<int:accident_id>/abstract', methods=['GET'])
+@jwt_required()
+@role_required(['admin', 'insurance_officer', 'police'])
+def download_abstract(accident_id):
+    """Police abstract of an accident; supports Range and conditional requests (?download=1 to save)"""
+    abstract = Abstract.query.filter_by(accident_id=accident_id).first()
+    if abstract is None:
+        return jsonify({'error': 'Abstract not found'}), 404
+    return send_stored_file(abstract.file_path, f'abstract-{accident_id}',
+                            as_attachment=request.args.get('download', type=int) == 1,
+                            mimetype=ABSTRACT_TYPES.get(abstract.file_type))
+
+@bp.route('/<int:accident_id>', methods=['DELETE'])
+@jwt_required()
+@role_required(['admin'])
+def delete_accident(accident_id):
+    """Delete an accident report and release its stored files"""
+    try:
+        deleted = AccidentService.delete_accident(accident_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    if not deleted:
+        return jsonify({'error': 'Accident not found'}), 404
+    return jsonify({'message': 'Accident deleted'}), 200
\ No newline at end of file
@@ -3,13 +3,18 @@ from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
     jwt_required,
-    get_jwt_identity,
     get_jwt
 )
 from datetime import datetime
+import math
 from app.models import User, UserRole
 from app import db
 from app.services.auth_service import AuthService
+from app.services.login_throttle import LoginThrottled, login_throttle
+from app.services.passwords import HasherBusy
+from app.services.token_blocklist import revoke_current_token
+from app.utils import get_current_user, get_current_user_snapshot
+from app.utils.auth_middleware import admin_required
 from marshmallow import Schema, fields, validate, ValidationError
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -34,10 +39,14 @@ def login():
         schema = LoginSchema()
         data = schema.load(request.get_json())
         
-        # Authenticate user
+        # Turn away bursts before any password is hashed
+        login_throttle.check(data['email'], request.remote_addr)
+        
+        # Authenticate user; a wrong password keeps its slot of the account limit
         user = AuthService.authenticate_user(data['email'], data['password'])
         if not user:
             return jsonify({'error': 'Invalid email or password'}), 401
+        login_throttle.release(data['email'])
         
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 403
@@ -58,6 +67,15 @@ def login():
         
     except ValidationError as err:
         return jsonify({'error': err.messages}), 400
+    except LoginThrottled as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+        return response, 429
+    except HasherBusy:
+        login_throttle.release(data['email'])
+        response = jsonify({'error': 'Too many sign-ins right now, please try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -66,37 +84,42 @@ def login():
 def refresh():
     """Refresh the access token using a refresh token."""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user_snapshot()
         
         if not user or not user.is_active:
             return jsonify({'error': 'Invalid or inactive user'}), 401
         
-        access_token = create_access_token(identity=current_user_id)
+        access_token = create_access_token(identity=user.id)
         return jsonify({'access_token': access_token}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/logout', methods=['POST'])
-@jwt_required()
+@jwt_required(verify_type=False)
 def logout():
-    """Handle user logout."""
+    """Revoke the token the request was made with; send the refresh token too to end the session."""
     try:
-        # In a real application, you might want to blacklist the token
-        # For now, we'll just return a success message
+        revoke_current_token()
+        db.session.commit()
         return jsonify({'message': 'Successfully logged out'}), 200
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/throttle-stats', methods=['GET'])
+@admin_required
+def throttle_stats():
+    """Login attempts counted and refused per address and per account by this worker."""
+    return jsonify(login_throttle.stats()), 200
+
 @bp.route('/register', methods=['POST'])
 @jwt_required()
 def register():
     """Register a new user (admin only)."""
     try:
         # Check if current user is admin
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
+        current_user = get_current_user_snapshot()
         
         if not current_user or current_user.role != UserRole.ADMIN:
             return jsonify({'error': 'Unauthorized'}), 403
@@ -134,11 +157,10 @@ def register():
 
 @bp.route('/me', methods=['GET'])
 @jwt_required()
-def get_current_user():
+def me():
     """Get current user's information."""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -0,0 +1,56 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models import MediaFile
+from app.services.thumbnails import best_variant, DEFAULT_WIDTHS
+from app.utils import role_required
+from app.utils.file_serving import send_stored_file
+
+bp = Blueprint('media', __name__, url_prefix='/api/media')
+
+# Derivatives are named after the content hash, so they never change
+VARIANT_MAX_AGE = 365 * 24 * 3600
+
+# Stored blobs have no extension; fall back to a generic type per media kind
+MEDIA_TYPES = {'image': 'image/jpeg', 'video': 'video/mp4'}
+
+@bp.route('/<int:media_id>/image', methods=['GET'])
+@jwt_required()
+@role_required(['admin', 'insurance_officer', 'police'])
+def get_image(media_id):
+    """
+    Serve the smallest WebP derivative at least `width` pixels wide.
+
+    Galleries should use this rather than the original, which is only
+    available from the download endpoint.
+    """
+    media = db.session.get(MediaFile, media_id)
+    if media is None or media.file_type != 'image':
+        return jsonify({'error': 'Image not found'}), 404
+
+    variant = best_variant(media, request.args.get('width', DEFAULT_WIDTHS[0], type=int))
+    if variant is None:
+        response = jsonify({'error': 'Preview not available yet' if media.variants is None else 'No preview for this image'})
+        if media.variants is None:
+            response.headers['Retry-After'] = '5'
+        return response, 404
+
+    return send_stored_file(variant['path'], f"media-{media.id}-{variant['width']}.webp",
+                            mimetype='image/webp', max_age=VARIANT_MAX_AGE)
+
+@bp.route('/<int:media_id>/download', methods=['GET'])
+@jwt_required()
+@role_required(['admin', 'insurance_officer', 'police'])
+def download(media_id):
+    """
+    Download the original file.
+
+    Supports Range requests, so videos can be played and seeked in place
+    (pass ?inline=1 to display rather than save).
+    """
+    media = db.session.get(MediaFile, media_id)
+    if media is None:
+        return jsonify({'error': 'Media file not found'}), 404
+    return send_stored_file(media.file_path, f'media-{media.id}',
+                            as_attachment=request.args.get('inline', type=int) != 1,
+                            mimetype=MEDIA_TYPES.get(media.file_type))
\ No newline at end of file
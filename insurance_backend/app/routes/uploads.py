@@ -0,0 +1,111 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from marshmallow import Schema, fields, validate, ValidationError
+from app import db
+from app.models import UploadSession
+from app.services.upload_service import UploadService, UploadError, FILE_TYPES
+from app.utils import role_required, get_current_user_snapshot
+
+bp = Blueprint('uploads', __name__, url_prefix='/api/uploads')
+
+class CreateUploadSchema(Schema):
+    accident_id = fields.Int(required=True)
+    vehicle_id = fields.Int(allow_none=True)
+    target = fields.Str(required=True, validate=validate.OneOf(list(FILE_TYPES)))
+    file_type = fields.Str(required=True)
+    filename = fields.Str(required=True, validate=validate.Length(min=1, max=255))
+    total_size = fields.Int(required=True)
+
+class CompleteUploadSchema(Schema):
+    sha256 = fields.Str(allow_none=True, validate=validate.Regexp(r'^[0-9a-fA-F]{64}$'))
+
+def _own_upload(upload_id):
+    """The upload with this id if it belongs to the current user, else None."""
+    upload = db.session.get(UploadSession, upload_id)
+    if upload is None or upload.user_id != get_current_user_snapshot().id:
+        return None
+    return upload
+
+def _upload_response(upload, status_code=200):
+    response = jsonify(upload.to_dict())
+    response.headers['Upload-Offset'] = str(upload.received_bytes)
+    return response, status_code
+
+@bp.route('/', methods=['POST'])
+@jwt_required()
+@role_required(['admin', 'police'])
+def create_upload():
+    """
+    Start a chunked upload of an accident photo, video or abstract.
+
+    Send the file with PUT /api/uploads/<upload_id> in chunks of at most
+    chunk_size bytes, each with an Upload-Offset header, then POST
+    /api/uploads/<upload_id>/complete.
+    """
+    try:
+        data = CreateUploadSchema().load(request.get_json() or {})
+        upload = UploadService.create_upload(user_id=get_current_user_snapshot().id, **data)
+    except ValidationError as err:
+        return jsonify({'error': err.messages}), 400
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+    return _upload_response(upload, 201)
+
+@bp.route('/<upload_id>', methods=['GET', 'HEAD'])
+@jwt_required()
+@role_required(['admin', 'police'])
+def get_upload(upload_id):
+    """Progress of an upload; resume by sending the chunk at received_bytes."""
+    upload = _own_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+    return _upload_response(upload)
+
+@bp.route('/<upload_id>', methods=['PUT', 'PATCH'])
+@jwt_required()
+@role_required(['admin', 'police'])
+def append_chunk(upload_id):
+    """
+    Append the raw request body at the byte offset given by the Upload-Offset header.
+
+    A 409 response carries the offset the server expects next.
+    """
+    upload = _own_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None or request.content_length is None:
+        return jsonify({'error': 'Upload-Offset and Content-Length headers are required'}), 400
+
+    try:
+        upload = UploadService.append_chunk(upload, offset, request.stream, request.content_length)
+    except UploadError as e:
+        response = jsonify({'error': str(e), 'received_bytes': upload.received_bytes})
+        response.headers['Upload-Offset'] = str(upload.received_bytes)
+        return response, e.status_code
+
+    return _upload_response(upload)
+
+@bp.route('/<upload_id>/complete', methods=['POST'])
+@jwt_required()
+@role_required(['admin', 'police'])
+def complete_upload(upload_id):
+    """Verify the received file and create its MediaFile or Abstract record."""
+    upload = _own_upload(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    try:
+        data = CompleteUploadSchema().load(request.get_json(silent=True) or {})
+        upload, record = UploadService.complete_upload(upload, data.get('sha256'))
+    except ValidationError as err:
+        return jsonify({'error': err.messages}), 400
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+    return jsonify({
+        'upload': upload.to_dict(),
+        upload.target: record.to_dict()
+    }), 200
\ No newline at end of file
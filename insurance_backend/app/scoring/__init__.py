@@ -0,0 +1,24 @@
+from app.scoring.duplicates import DuplicateDetector
+from app.scoring.features import FEATURE_COLUMNS, extract_features
+from app.scoring.model import RiskModel
+from app.scoring.rules import Rule, RuleEngine, DEFAULT_RULES
+from app.scoring.scorer import RiskScorer, score_accidents, write_scores
+from app.scoring.batch import Rescorer
+from app.scoring.worker import RiskScoringWorker, risk_worker, init_app
+
+__all__ = [
+    'DuplicateDetector',
+    'FEATURE_COLUMNS',
+    'extract_features',
+    'RiskModel',
+    'Rule',
+    'RuleEngine',
+    'DEFAULT_RULES',
+    'RiskScorer',
+    'score_accidents',
+    'write_scores',
+    'Rescorer',
+    'RiskScoringWorker',
+    'risk_worker',
+    'init_app'
+]
\ No newline at end of file
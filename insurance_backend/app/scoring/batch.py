@@ -0,0 +1,139 @@
+from app import db
+from app.models import Accident, ScoringRun
+from app.scoring.features import extract_features
+from app.scoring.scorer import DEFAULT_FLAG_THRESHOLD, RiskScorer, write_scores
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import current_app
+from typing import Callable, Iterator, List, Optional, Tuple
+import time
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Per worker process: the app context and scorer built once by _init_worker
+_worker_state = {}
+
+def iter_id_chunks(after_id: int, chunk_size: int) -> Iterator[List[int]]:
+    """
+    Stream accident ids above `after_id`, in id order, one chunk at a time.
+
+    On server databases the ids come from a single server-side cursor
+    (yield_per), read on its own connection so chunks can be committed
+    meanwhile. SQLite cannot commit while another connection holds a read
+    cursor open, so there each chunk is fetched with a keyset query instead.
+    """
+    query = db.select(Accident.id).where(Accident.id > after_id).order_by(Accident.id)
+    if db.engine.dialect.name != 'sqlite':
+        with db.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+            for partition in result.partitions():
+                yield [accident_id for (accident_id,) in partition]
+        return
+
+    while True:
+        ids = list(db.session.execute(query.where(Accident.id > after_id).limit(chunk_size)).scalars())
+        if not ids:
+            return
+        yield ids
+        after_id = ids[-1]
+
+def score_chunk(accident_ids: List[int], scorer: RiskScorer) -> Tuple[np.ndarray, np.ndarray]:
+    """Features and scores for one chunk: one frame, one model call. Returns (ids, scores)."""
+    features = extract_features(accident_ids)
+    scores = scorer.score(features)
+    return scores.index.to_numpy(dtype='int64'), scores.to_numpy(dtype='float64')
+
+def _init_worker(config: dict) -> None:
+    from app import create_app
+    app = create_app(type('RescoreConfig', (), config))
+    context = app.app_context()
+    context.push()
+    _worker_state.update(app=app, context=context, scorer=RiskScorer.from_config(app.config))
+
+def _score_chunk_in_worker(accident_ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    try:
+        return score_chunk(accident_ids, _worker_state['scorer'])
+    finally:
+        db.session.remove()
+
+def _worker_config() -> dict:
+    """The parts of the app config a worker process needs to rebuild the app."""
+    return {key: value for key, value in current_app.config.items()
+            if key.isupper() and isinstance(value, (str, int, float, bool, type(None), tuple, list))}
+
+class Rescorer:
+    """
+    Re-scores the whole accident history in chunks, resumable after a crash.
+
+    Chunks are scored in id order, either in this process or spread across
+    a process pool; results are always written here, in order, each chunk
+    with its checkpoint in one transaction.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 0, flag: bool = True,
+                 progress: Optional[Callable[[ScoringRun, float], None]] = None):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.flag = flag
+        self.progress = progress
+
+    def current_run(self, restart: bool = False) -> ScoringRun:
+        """The unfinished run to resume, or a new one."""
+        run = None if restart else ScoringRun.query.filter(
+            ScoringRun.finished_at.is_(None)
+        ).order_by(ScoringRun.id.desc()).first()
+        if run is None:
+            run = ScoringRun(chunk_size=self.chunk_size, last_accident_id=0, rows_scored=0)
+            db.session.add(run)
+            db.session.commit()
+        return run
+
+    def run(self, restart: bool = False) -> ScoringRun:
+        run = self.current_run(restart)
+        started = time.monotonic()
+        rows_at_start = run.rows_scored
+        chunks = iter_id_chunks(run.last_accident_id, self.chunk_size)
+
+        for ids, scores in self._scored_chunks(chunks):
+            self._commit_chunk(run, ids, scores)
+            if self.progress:
+                elapsed = time.monotonic() - started
+                self.progress(run, (run.rows_scored - rows_at_start) / elapsed if elapsed else 0.0)
+
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+        return run
+
+    def _scored_chunks(self, chunks: Iterator[List[int]]):
+        if self.workers <= 1:
+            scorer = RiskScorer.from_config(current_app.config)
+            for accident_ids in chunks:
+                yield accident_ids, score_chunk(accident_ids, scorer)
+            return
+
+        # A bounded window of chunks in flight, collected in submission order
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(_worker_config(),)) as pool:
+            pending = deque()
+            for accident_ids in chunks:
+                pending.append((accident_ids, pool.submit(_score_chunk_in_worker, accident_ids)))
+                if len(pending) >= 2 * self.workers:
+                    accident_ids, future = pending.popleft()
+                    yield accident_ids, future.result()
+            while pending:
+                accident_ids, future = pending.popleft()
+                yield accident_ids, future.result()
+
+    def _commit_chunk(self, run: ScoringRun, accident_ids: List[int], result) -> None:
+        ids, scores = result
+        threshold = current_app.config.get('RISK_FLAG_THRESHOLD', DEFAULT_FLAG_THRESHOLD) if self.flag else np.inf
+        try:
+            write_scores(dict(zip(ids.tolist(), scores.tolist())), threshold)
+            run.last_accident_id = accident_ids[-1]
+            run.rows_scored += len(ids)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
\ No newline at end of file
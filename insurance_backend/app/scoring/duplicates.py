@@ -0,0 +1,232 @@
+from app import db
+from app.models import Accident, DuplicateKey, DuplicateMatch, MediaFile, ReviewNote, Vehicle
+from app.utils.geo import KM_PER_DEGREE, distance_km
+from app.utils.registration import normalize_registration
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from sqlalchemy import insert
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+
+DEFAULT_WINDOW_HOURS = 6.0  # The same vehicle reported this close in time...
+DEFAULT_RADIUS_KM = 1.0  # ...and place is taken to be the same incident
+DEFAULT_IMAGE_DISTANCE = 3  # Differing bits allowed between two photo hashes
+
+# Index granularity. Keys do not depend on the settings above: lookups probe
+# as many neighbouring buckets and cells as the window and radius need
+TIME_BUCKET_HOURS = 6
+GEO_CELL_DEGREES = 0.01  # About 1.1 km of latitude
+IMAGE_BANDS = 4  # 16-bit bands; hashes up to 3 bits apart share at least one band exactly
+
+_EPOCH = datetime(1970, 1, 1)
+
+# An indexed accident that shares a probed key with the one being checked
+Candidate = namedtuple('Candidate', ['accident_id', 'report_number', 'accident_date', 'latitude', 'longitude', 'phash'])
+
+def time_bucket(when: datetime) -> int:
+    return int((when - _EPOCH).total_seconds() // (TIME_BUCKET_HOURS * 3600))
+
+def geo_cell(latitude: Optional[float], longitude: Optional[float]) -> Optional[Tuple[int, int]]:
+    if latitude is None or longitude is None:
+        return None
+    return math.floor(latitude / GEO_CELL_DEGREES), math.floor(longitude / GEO_CELL_DEGREES)
+
+def vehicle_key(plate: str, bucket: int, cell: Optional[Tuple[int, int]]) -> str:
+    # Reports without coordinates only meet other reports without coordinates
+    return f'v:{plate}:{bucket}:{"-" if cell is None else "%d:%d" % cell}'
+
+def image_keys(phash: str) -> List[str]:
+    width = 16 // IMAGE_BANDS
+    return [f'i{band}:{phash[band * width:(band + 1) * width]}' for band in range(IMAGE_BANDS)]
+
+def hamming_distance(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+class DuplicateDetector:
+    """
+    Finds other reports of the same incident through the duplicate_keys index.
+
+    A report matches another one when they share a vehicle (by normalized
+    registration number) within window_hours and radius_km of each other,
+    or when one of its photos is within image_distance bits of a photo on
+    the other report. Every new match is stored as a DuplicateMatch and
+    explained in an automated ReviewNote; the `duplicate_reports` feature
+    then raises the risk score.
+    """
+
+    def __init__(self, window_hours: float = DEFAULT_WINDOW_HOURS, radius_km: float = DEFAULT_RADIUS_KM,
+                 image_distance: int = DEFAULT_IMAGE_DISTANCE):
+        self.window_hours = window_hours
+        self.radius_km = radius_km
+        self.image_distance = image_distance
+
+    @classmethod
+    def from_config(cls, config) -> 'DuplicateDetector':
+        return cls(
+            window_hours=config.get('DUPLICATE_WINDOW_HOURS', DEFAULT_WINDOW_HOURS),
+            radius_km=config.get('DUPLICATE_RADIUS_KM', DEFAULT_RADIUS_KM),
+            image_distance=config.get('DUPLICATE_IMAGE_DISTANCE', DEFAULT_IMAGE_DISTANCE)
+        )
+
+    def probe_keys(self, plate: str, when: datetime, cell: Optional[Tuple[int, int]]) -> List[str]:
+        """Every vehicle key an accident within the window and radius could have been indexed under."""
+        span = math.ceil(self.window_hours / TIME_BUCKET_HOURS)
+        bucket = time_bucket(when)
+        buckets = range(bucket - span, bucket + span + 1)
+        if cell is None:
+            return [vehicle_key(plate, b, None) for b in buckets]
+
+        cell_km = GEO_CELL_DEGREES * KM_PER_DEGREE
+        lat_span = math.ceil(self.radius_km / cell_km)
+        cos_lat = max(math.cos(math.radians((cell[0] + 0.5) * GEO_CELL_DEGREES)), 0.01)
+        lon_span = math.ceil(self.radius_km / (cell_km * cos_lat))
+        return [
+            vehicle_key(plate, b, (cell[0] + i, cell[1] + j))
+            for b in buckets
+            for i in range(-lat_span, lat_span + 1)
+            for j in range(-lon_span, lon_span + 1)
+        ]
+
+    def check(self, accident_ids: Sequence[int]) -> Dict[int, int]:
+        """
+        Index a batch of accidents and record their matches against everything indexed so far.
+
+        Safe to run again on the same accidents: keys and matches already
+        stored are skipped. The number of queries does not depend on the
+        batch size, and each lookup is an index probe on duplicate_keys.key.
+        The caller commits.
+
+        Args:
+            accident_ids (Sequence[int]): Accidents to index and check
+
+        Returns:
+            Dict[int, int]: Number of new matches per accident that has any
+        """
+        accident_ids = list(accident_ids)
+        accidents = {row.id: row for row in db.session.query(
+            Accident.id, Accident.accident_date, Accident.latitude, Accident.longitude
+        ).filter(Accident.id.in_(accident_ids))}
+        if not accidents:
+            return {}
+
+        # key -> phash for the index, and (probe key, kind, plate or phash) to look up, per accident
+        own_keys = defaultdict(dict)
+        probes = defaultdict(list)
+        vehicles = db.session.query(Vehicle.accident_id, Vehicle.registration_number).filter(
+            Vehicle.accident_id.in_(list(accidents))
+        ).distinct()
+        for accident_id, registration_number in vehicles:
+            plate = normalize_registration(registration_number)
+            accident = accidents[accident_id]
+            if not plate or accident.accident_date is None:
+                continue
+            cell = geo_cell(accident.latitude, accident.longitude)
+            own_keys[accident_id][vehicle_key(plate, time_bucket(accident.accident_date), cell)] = None
+            probes[accident_id].extend(
+                (key, 'vehicle', plate) for key in self.probe_keys(plate, accident.accident_date, cell)
+            )
+
+        photos = db.session.query(MediaFile.accident_id, MediaFile.phash).filter(
+            MediaFile.accident_id.in_(list(accidents)), MediaFile.phash.isnot(None)
+        ).distinct()
+        for accident_id, phash in photos:
+            for key in image_keys(phash):
+                own_keys[accident_id][key] = phash
+                probes[accident_id].append((key, 'image', phash))
+
+        if not probes:
+            return {}
+        self._index(own_keys)
+        candidates = self._candidates({key for accident_probes in probes.values() for key, _, _ in accident_probes})
+
+        found = {}
+        for accident_id, accident_probes in probes.items():
+            accident = accidents[accident_id]
+            for key, kind, value in accident_probes:
+                for candidate in candidates.get(key, ()):
+                    if candidate.accident_id == accident_id or (accident_id, candidate.accident_id, kind) in found:
+                        continue
+                    detail = self._compare(accident, candidate, kind, value)
+                    if detail:
+                        found[(accident_id, candidate.accident_id, kind)] = (candidate.report_number, detail)
+
+        return self._record(found)
+
+    def _compare(self, accident, candidate: Candidate, kind: str, value: str) -> Optional[str]:
+        """Why the candidate is a duplicate, or None when it is only a key collision."""
+        if kind == 'image':
+            distance = hamming_distance(value, candidate.phash)
+            if distance > self.image_distance:
+                return None
+            return 'identical photo' if distance == 0 else f'similar photo ({distance} of 64 hash bits differ)'
+
+        hours = abs((accident.accident_date - candidate.accident_date).total_seconds()) / 3600
+        if hours > self.window_hours:
+            return None
+        detail = f'vehicle {value}, {hours:.1f} h apart'
+        if accident.latitude is not None and candidate.latitude is not None:
+            km = distance_km(accident.latitude, accident.longitude, candidate.latitude, candidate.longitude)
+            if km > self.radius_km:
+                return None
+            detail += f', {km:.2f} km apart'
+        return detail
+
+    @staticmethod
+    def _index(own_keys: Dict[int, Dict[str, Optional[str]]]) -> None:
+        existing = set(db.session.query(DuplicateKey.accident_id, DuplicateKey.key).filter(
+            DuplicateKey.accident_id.in_(list(own_keys))
+        ))
+        rows = [
+            {'accident_id': accident_id, 'key': key, 'phash': phash}
+            for accident_id, keys in own_keys.items()
+            for key, phash in keys.items()
+            if (accident_id, key) not in existing
+        ]
+        if rows:
+            # Vehicle keys have no phash; rendering the NULL keeps every row in one executemany
+            db.session.execute(insert(DuplicateKey), rows, execution_options={'render_nulls': True})
+
+    @staticmethod
+    def _candidates(keys: Iterable[str]) -> Dict[str, List[Candidate]]:
+        rows = db.session.query(
+            DuplicateKey.key,
+            DuplicateKey.accident_id,
+            Accident.report_number,
+            Accident.accident_date,
+            Accident.latitude,
+            Accident.longitude,
+            DuplicateKey.phash
+        ).join(Accident, Accident.id == DuplicateKey.accident_id).filter(DuplicateKey.key.in_(list(keys)))
+
+        candidates = defaultdict(list)
+        for key, *candidate in rows:
+            candidates[key].append(Candidate(*candidate))
+        return candidates
+
+    @staticmethod
+    def _record(found: Dict[Tuple[int, int, str], Tuple[str, str]]) -> Dict[int, int]:
+        if not found:
+            return {}
+        existing = set(db.session.query(
+            DuplicateMatch.accident_id, DuplicateMatch.duplicate_of_id, DuplicateMatch.reason
+        ).filter(DuplicateMatch.accident_id.in_(list({accident_id for accident_id, _, _ in found}))))
+        new = {match: info for match, info in found.items() if match not in existing}
+        if not new:
+            return {}
+
+        now = datetime.utcnow()
+        db.session.execute(insert(DuplicateMatch), [
+            {'accident_id': accident_id, 'duplicate_of_id': other_id, 'reason': reason,
+             'detail': detail[:200], 'created_at': now}
+            for (accident_id, other_id, reason), (_, detail) in new.items()
+        ])
+        db.session.execute(insert(ReviewNote), [
+            {'accident_id': accident_id, 'user_id': None, 'created_at': now,
+             'comment': f'Possible duplicate of report {report_number}: {detail}.'}
+            for (accident_id, _, _), (report_number, detail) in new.items()
+        ])
+
+        counts = defaultdict(int)
+        for accident_id, _, _ in new:
+            counts[accident_id] += 1
+        return dict(counts)
\ No newline at end of file
@@ -0,0 +1,120 @@
+from app import db
+from app.models import Accident, Vehicle, Person, MediaFile, Abstract, EnvironmentalConditions, DuplicateMatch
+from app.models.accident import vehicle_passengers, accident_witnesses
+from sqlalchemy import and_, func
+from sqlalchemy.orm import aliased
+from typing import Sequence
+import numpy as np
+import pandas as pd
+
+# Model input columns, in the order the persisted model was trained on
+FEATURE_COLUMNS = [
+    'vehicle_count',
+    'driver_count',
+    'unlicensed_driver_count',
+    'passenger_count',
+    'passengers_per_vehicle',
+    'witness_count',
+    'media_count',
+    'has_abstract',
+    'has_environment',
+    'has_coordinates',
+    'description_length',
+    'hour',
+    'is_night',
+    'weekday',
+    'is_weekend',
+    'report_delay_hours',
+    'prior_vehicle_accidents',
+    'duplicate_reports'
+]
+
+def _counts(query, accident_ids: Sequence[int]) -> pd.Series:
+    """Run a (accident_id, value) query and return the values indexed by accident id."""
+    rows = query.all()
+    series = pd.Series({accident_id: value for accident_id, value in rows}, dtype='float64')
+    return series.reindex(accident_ids, fill_value=0).fillna(0)
+
+def extract_features(accident_ids: Sequence[int]) -> pd.DataFrame:
+    """
+    Build the feature frame for a batch of accidents.
+
+    Each related table is aggregated for the whole batch in one grouped
+    query, so the number of queries does not depend on the batch size.
+    Accidents that do not exist are left out.
+
+    Args:
+        accident_ids (Sequence[int]): Accidents to describe
+
+    Returns:
+        pd.DataFrame: One row per accident, indexed by id, with FEATURE_COLUMNS
+    """
+    accident_ids = list(accident_ids)
+    base = db.session.query(
+        Accident.id,
+        Accident.accident_date,
+        Accident.created_at,
+        Accident.latitude,
+        Accident.longitude,
+        func.coalesce(func.length(Accident.description), 0).label('description_length')
+    ).filter(Accident.id.in_(accident_ids)).all()
+    if not base:
+        return pd.DataFrame(columns=FEATURE_COLUMNS, dtype='float64')
+
+    frame = pd.DataFrame(base, columns=['id', 'accident_date', 'created_at', 'latitude', 'longitude',
+                                        'description_length']).set_index('id')
+    ids = list(frame.index)
+
+    frame['vehicle_count'] = _counts(db.session.query(Vehicle.accident_id, func.count(Vehicle.id)).filter(
+        Vehicle.accident_id.in_(ids)).group_by(Vehicle.accident_id), ids)
+    frame['driver_count'] = _counts(db.session.query(Vehicle.accident_id, func.count(Vehicle.driver_id)).filter(
+        Vehicle.accident_id.in_(ids)).group_by(Vehicle.accident_id), ids)
+    frame['unlicensed_driver_count'] = _counts(db.session.query(Vehicle.accident_id, func.count(Person.id)).join(
+        Person, Person.id == Vehicle.driver_id
+    ).filter(
+        Vehicle.accident_id.in_(ids), func.coalesce(Person.license_number, '') == ''
+    ).group_by(Vehicle.accident_id), ids)
+    frame['passenger_count'] = _counts(db.session.query(
+        Vehicle.accident_id, func.count(vehicle_passengers.c.person_id)
+    ).join(
+        vehicle_passengers, vehicle_passengers.c.vehicle_id == Vehicle.id
+    ).filter(Vehicle.accident_id.in_(ids)).group_by(Vehicle.accident_id), ids)
+    frame['witness_count'] = _counts(db.session.query(
+        accident_witnesses.c.accident_id, func.count(accident_witnesses.c.person_id)
+    ).filter(accident_witnesses.c.accident_id.in_(ids)).group_by(accident_witnesses.c.accident_id), ids)
+    frame['media_count'] = _counts(db.session.query(MediaFile.accident_id, func.count(MediaFile.id)).filter(
+        MediaFile.accident_id.in_(ids)).group_by(MediaFile.accident_id), ids)
+    frame['has_abstract'] = _counts(db.session.query(Abstract.accident_id, func.count(Abstract.id)).filter(
+        Abstract.accident_id.in_(ids)).group_by(Abstract.accident_id), ids).clip(upper=1)
+    frame['has_environment'] = _counts(db.session.query(
+        EnvironmentalConditions.accident_id, func.count(EnvironmentalConditions.id)
+    ).filter(EnvironmentalConditions.accident_id.in_(ids)).group_by(EnvironmentalConditions.accident_id), ids).clip(upper=1)
+
+    # Other accidents involving any of the same vehicles, through the registration index
+    other = aliased(Vehicle)
+    frame['prior_vehicle_accidents'] = _counts(db.session.query(
+        Vehicle.accident_id, func.count(func.distinct(other.accident_id))
+    ).join(
+        other, and_(other.registration_number == Vehicle.registration_number, other.accident_id != Vehicle.accident_id)
+    ).filter(Vehicle.accident_id.in_(ids)).group_by(Vehicle.accident_id), ids)
+    # Other reports found to describe the same incident (see DuplicateDetector)
+    frame['duplicate_reports'] = _counts(db.session.query(
+        DuplicateMatch.accident_id, func.count(func.distinct(DuplicateMatch.duplicate_of_id))
+    ).filter(DuplicateMatch.accident_id.in_(ids)).group_by(DuplicateMatch.accident_id), ids)
+
+    return build_frame(frame)
+
+def build_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Derive the timing and location features and return FEATURE_COLUMNS as floats."""
+    accident_date = pd.to_datetime(frame['accident_date'])
+    created_at = pd.to_datetime(frame['created_at']).fillna(accident_date)
+    frame['hour'] = accident_date.dt.hour
+    frame['is_night'] = ((frame['hour'] >= 22) | (frame['hour'] < 5)).astype(int)
+    frame['weekday'] = accident_date.dt.weekday
+    frame['is_weekend'] = (frame['weekday'] >= 5).astype(int)
+    frame['report_delay_hours'] = ((created_at - accident_date).dt.total_seconds() / 3600).clip(lower=0)
+    frame['has_coordinates'] = (frame['latitude'].notna() & frame['longitude'].notna()).astype(int)
+    frame['passengers_per_vehicle'] = np.where(
+        frame['vehicle_count'] > 0, frame['passenger_count'] / frame['vehicle_count'].where(frame['vehicle_count'] > 0, 1), 0
+    )
+    return frame[FEATURE_COLUMNS].astype('float64')
\ No newline at end of file
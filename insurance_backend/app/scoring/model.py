@@ -0,0 +1,72 @@
+from app.scoring.features import FEATURE_COLUMNS
+from threading import Lock
+from typing import Optional
+import logging
+import os
+import joblib
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Loaded models per path, kept for the life of the worker process
+_models = {}
+_models_lock = Lock()
+
+class RiskModel:
+    """A persisted classifier predicting the probability that an accident report is fraudulent."""
+
+    def __init__(self, estimator, feature_columns=None):
+        self.estimator = estimator
+        self.feature_columns = list(feature_columns or FEATURE_COLUMNS)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Optional['RiskModel']:
+        """
+        Load a model saved by save(), once per process.
+
+        The file is re-read only when its modification time changes, so a
+        retrained model is picked up without restarting workers.
+
+        Returns:
+            Optional[RiskModel]: The model, or None if no model file is configured or present
+        """
+        if not path or not os.path.exists(path):
+            return None
+        mtime = os.path.getmtime(path)
+        with _models_lock:
+            cached = _models.get(path)
+            if cached is None or cached[0] != mtime:
+                payload = joblib.load(path)
+                cached = (mtime, cls(payload['estimator'], payload['feature_columns']))
+                _models[path] = cached
+                logger.info('Loaded risk model from %s', path)
+            return cached[1]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump({'estimator': self.estimator, 'feature_columns': self.feature_columns}, path)
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        """Fraud probability for every row, from a single predict_proba call."""
+        if features.empty:
+            return np.empty(0)
+        matrix = features.reindex(columns=self.feature_columns, fill_value=0.0).to_numpy(dtype='float64')
+        return self.estimator.predict_proba(matrix)[:, 1]
+
+    @classmethod
+    def train(cls, features: pd.DataFrame, labels) -> 'RiskModel':
+        """
+        Fit a scaled logistic regression on labelled accidents.
+
+        Args:
+            features (pd.DataFrame): Frame from extract_features()
+            labels: 1 for fraudulent, 0 for genuine, aligned with `features`
+        """
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        estimator = make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, class_weight='balanced'))
+        estimator.fit(features[FEATURE_COLUMNS].to_numpy(dtype='float64'), np.asarray(labels))
+        return cls(estimator, FEATURE_COLUMNS)
\ No newline at end of file
@@ -0,0 +1,45 @@
+from collections import namedtuple
+from typing import List
+import numpy as np
+import pandas as pd
+
+# `test` takes the whole feature frame and returns a boolean Series, so every
+# rule is evaluated once per batch rather than once per accident
+Rule = namedtuple('Rule', ['name', 'weight', 'test'])
+
+DEFAULT_RULES: List[Rule] = [
+    Rule('duplicate_report', 0.40, lambda f: f['duplicate_reports'] > 0),
+    Rule('repeat_vehicle', 0.30, lambda f: f['prior_vehicle_accidents'] >= 2),
+    Rule('late_report', 0.20, lambda f: f['report_delay_hours'] > 72),
+    Rule('no_independent_witness', 0.15, lambda f: (f['vehicle_count'] >= 2) & (f['witness_count'] == 0)),
+    Rule('no_evidence', 0.15, lambda f: (f['media_count'] == 0) & (f['has_abstract'] == 0)),
+    Rule('unlicensed_driver', 0.15, lambda f: f['unlicensed_driver_count'] > 0),
+    Rule('crowded_vehicles', 0.15, lambda f: f['passengers_per_vehicle'] > 4),
+    Rule('night_single_vehicle', 0.10, lambda f: (f['is_night'] == 1) & (f['vehicle_count'] == 1)),
+    Rule('no_coordinates', 0.05, lambda f: f['has_coordinates'] == 0)
+]
+
+class RuleEngine:
+    """Weighted red-flag rules; the score is the sum of the fired weights, capped at 1."""
+
+    def __init__(self, rules: List[Rule] = None):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+
+    def evaluate(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Boolean frame with one column per rule, indexed like `features`."""
+        return pd.DataFrame(
+            {rule.name: rule.test(features).astype(bool) for rule in self.rules},
+            index=features.index
+        )
+
+    def score(self, features: pd.DataFrame) -> pd.Series:
+        if features.empty:
+            return pd.Series(dtype='float64')
+        fired = self.evaluate(features)
+        weights = np.array([rule.weight for rule in self.rules])
+        return pd.Series(np.minimum(fired.to_numpy() @ weights, 1.0), index=features.index)
+
+    def reasons(self, features: pd.DataFrame) -> pd.Series:
+        """Names of the rules fired for each accident."""
+        fired = self.evaluate(features)
+        return fired.apply(lambda row: [name for name, hit in row.items() if hit], axis=1)
\ No newline at end of file
@@ -0,0 +1,83 @@
+from app import db
+from app.models import Accident, AccidentStatus
+from app.scoring.duplicates import DuplicateDetector
+from app.scoring.features import extract_features
+from app.scoring.model import RiskModel
+from app.scoring.rules import RuleEngine
+from flask import current_app
+from sqlalchemy import update
+from typing import Dict, Sequence
+import pandas as pd
+
+DEFAULT_FLAG_THRESHOLD = 0.7
+DEFAULT_MODEL_WEIGHT = 0.7
+
+class RiskScorer:
+    """
+    Combines the rule engine with the persisted model, when one is configured.
+
+    The score is model_weight * model probability + (1 - model_weight) *
+    rule score; without a model it is the rule score alone.
+    """
+
+    def __init__(self, rules: RuleEngine = None, model: RiskModel = None, model_weight: float = DEFAULT_MODEL_WEIGHT):
+        self.rules = rules or RuleEngine()
+        self.model = model
+        self.model_weight = model_weight
+
+    @classmethod
+    def from_config(cls, config) -> 'RiskScorer':
+        return cls(
+            model=RiskModel.load(config.get('RISK_MODEL_PATH')),
+            model_weight=config.get('RISK_MODEL_WEIGHT', DEFAULT_MODEL_WEIGHT)
+        )
+
+    def score(self, features: pd.DataFrame) -> pd.Series:
+        """Risk scores in [0, 1] indexed like `features`."""
+        scores = self.rules.score(features)
+        if self.model is not None and not features.empty:
+            probabilities = pd.Series(self.model.predict(features), index=features.index)
+            scores = self.model_weight * probabilities + (1 - self.model_weight) * scores
+        return scores.clip(0.0, 1.0).round(4)
+
+def write_scores(scores: Dict[int, float], threshold: float) -> int:
+    """
+    Store risk scores with executemany UPDATEs and flag pending accidents above `threshold`.
+
+    The caller commits.
+
+    Returns:
+        int: Number of accidents flagged
+    """
+    if not scores:
+        return 0
+    db.session.execute(update(Accident), [
+        {'id': accident_id, 'risk_score': score} for accident_id, score in scores.items()
+    ])
+    flagged = [accident_id for accident_id, score in scores.items() if score >= threshold]
+    if not flagged:
+        return 0
+    return db.session.execute(
+        update(Accident).where(
+            Accident.id.in_(flagged), Accident.status == AccidentStatus.PENDING
+        ).values(status=AccidentStatus.FLAGGED).execution_options(synchronize_session=False)
+    ).rowcount
+
+def score_accidents(accident_ids: Sequence[int], scorer: RiskScorer = None) -> Dict[int, float]:
+    """
+    Check a batch of accidents for duplicates, score them and store the results (commits).
+
+    Returns:
+        Dict[int, float]: Score per accident id
+    """
+    scorer = scorer or RiskScorer.from_config(current_app.config)
+    try:
+        DuplicateDetector.from_config(current_app.config).check(accident_ids)
+        scores = scorer.score(extract_features(accident_ids))
+        result = {int(accident_id): float(score) for accident_id, score in scores.items()}
+        write_scores(result, current_app.config.get('RISK_FLAG_THRESHOLD', DEFAULT_FLAG_THRESHOLD))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise e
+    return result
\ No newline at end of file
@@ -0,0 +1,133 @@
+from app import db
+from app.models import Accident
+from app.scoring.scorer import RiskScorer, score_accidents
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from threading import Event, Lock, Thread
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_INTERVAL = 5.0  # seconds between polls when nothing new was committed
+
+# Set when the current transaction inserted accidents; the worker is woken on commit
+_PENDING_KEY = 'risk_scoring_new_accidents'
+
+class RiskScoringWorker:
+    """
+    Scores unscored accidents in micro-batches on a background thread.
+
+    Each batch is the oldest accidents with no risk_score, scored with one
+    feature extraction and one model call. The thread is started on the
+    first commit that inserts accidents and then also polls every
+    RISK_SCORING_INTERVAL seconds, so rows left over from a restart are
+    picked up too. Polling the table rather than queueing ids means
+    accidents inserted in bulk, without ORM objects, are never missed.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.interval = DEFAULT_INTERVAL
+        self.enabled = True
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config.get('RISK_SCORING_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.interval = app.config.get('RISK_SCORING_INTERVAL', DEFAULT_INTERVAL)
+        # 'thread' scores in this process; 'off' leaves it to `flask risk-worker` or tests
+        self.enabled = app.config.get('RISK_SCORING_MODE', 'thread') == 'thread'
+
+    def notify(self) -> None:
+        """Wake the worker (starting it if needed) because new accidents were committed."""
+        if not self.enabled or self.app is None:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = Thread(target=self.run_forever, name='risk-scoring', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self, scorer: RiskScorer = None) -> int:
+        """
+        Score one micro-batch of unscored accidents. Needs an app context.
+
+        Returns:
+            int: Number of accidents scored
+        """
+        query = db.session.query(Accident.id).filter(Accident.risk_score.is_(None)).order_by(Accident.id)
+        if db.session.get_bind().dialect.name != 'sqlite':
+            # Lets several worker processes take different batches
+            query = query.with_for_update(skip_locked=True)
+        accident_ids = [accident_id for (accident_id,) in query.limit(self.batch_size)]
+        if not accident_ids:
+            db.session.rollback()
+            return 0
+        return len(score_accidents(accident_ids, scorer))
+
+    def drain(self, scorer: RiskScorer = None) -> int:
+        """Score batches until none are left. Needs an app context."""
+        total = 0
+        while True:
+            scored = self.run_once(scorer)
+            total += scored
+            if scored < self.batch_size:
+                return total
+
+    def run_forever(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            with self.app.app_context():
+                try:
+                    # One scorer per pass; the model itself stays loaded across passes
+                    self.drain(RiskScorer.from_config(self.app.config))
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Risk scoring batch failed')
+                finally:
+                    db.session.remove()
+
+risk_worker = RiskScoringWorker()
+
+def _after_flush(session, flush_context):
+    if any(isinstance(obj, Accident) for obj in session.new):
+        session.info[_PENDING_KEY] = True
+
+def _do_orm_execute(orm_execute_state):
+    # Bulk INSERTs (e.g. the batch ingest endpoint) do not go through the flush
+    if orm_execute_state.is_insert and orm_execute_state.bind_mapper is not None \
+            and orm_execute_state.bind_mapper.class_ is Accident:
+        orm_execute_state.session.info[_PENDING_KEY] = True
+
+def _after_commit(session):
+    if session.info.pop(_PENDING_KEY, False):
+        risk_worker.notify()
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """Score new accidents in the background after they are committed."""
+    risk_worker.init_app(app)
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
\ No newline at end of file
@@ -0,0 +1,549 @@
+from app import db
+from app.models import (
+    Accident, AccidentStatus, Vehicle, Person, EnvironmentalConditions, MediaFile, MediaBlob, ReviewNote,
+    UploadSession, UploadStatus, InsuranceClaim, DuplicateKey, DuplicateMatch
+)
+from app.models.accident import vehicle_passengers, accident_witnesses
+from app.services import thumbnails
+from app.services.upload_service import discard_partial_files
+from app.utils.geo import encode_geohash
+from app.utils.registration import normalize_registration
+from sqlalchemy import bindparam, insert, or_, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+import uuid
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+PERSON_COLUMNS = ('name', 'phone_number', 'email', 'address', 'license_number', 'id_number')
+CONDITION_COLUMNS = ('weather_conditions', 'road_conditions', 'visibility')
+
+def encode_cursor(created_at: datetime, accident_id: int) -> str:
+    """Encode the (created_at, id) position of the last row on a page."""
+    payload = json.dumps({'c': created_at.isoformat(), 'i': accident_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(payload['c']), int(payload['i'])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError('Invalid cursor') from e
+
+class AccidentService:
+    @staticmethod
+    def full_graph_options() -> list:
+        """
+        Loader options that fetch everything Accident.to_dict() touches.
+
+        Collections use selectinload (one extra SELECT ... WHERE id IN (...)
+        per relationship, regardless of how many accidents are loaded) so the
+        parent rows are not multiplied by a JOIN. Scalar relationships
+        (abstract, environmental conditions, a vehicle's driver, a review
+        note's author) are joined onto the query that already loads their
+        parent.
+
+        Returns:
+            list: SQLAlchemy loader options for Accident queries
+        """
+        return [
+            joinedload(Accident.abstract),
+            joinedload(Accident.environmental_conditions),
+            selectinload(Accident.vehicles).joinedload(Vehicle.driver),
+            selectinload(Accident.vehicles).selectinload(Vehicle.passengers),
+            selectinload(Accident.vehicles).selectinload(Vehicle.damage_images),
+            selectinload(Accident.media_files),
+            selectinload(Accident.witnesses),
+            selectinload(Accident.review_notes).joinedload(ReviewNote.user),
+        ]
+
+    @staticmethod
+    def load_accidents(query=None, accident_ids: Optional[Iterable[int]] = None) -> List[Accident]:
+        """
+        Load a list of accidents together with their full object graph.
+
+        Args:
+            query: Optional Accident query (filters, ordering, limit) to load from
+            accident_ids (Optional[Iterable[int]]): IDs to load when no query is given
+
+        Returns:
+            List[Accident]: Accidents with every relationship used by to_dict() populated
+        """
+        if query is not None:
+            return query.options(*AccidentService.full_graph_options()).all()
+
+        query = Accident.query.options(*AccidentService.full_graph_options())
+        if accident_ids is None:
+            return query.order_by(Accident.id).all()
+
+        ids = list(accident_ids)
+        if not ids:
+            return []
+        # IN (...) does not preserve order, so restore the caller's ordering
+        by_id = {accident.id: accident for accident in query.filter(Accident.id.in_(ids)).all()}
+        return [by_id[accident_id] for accident_id in ids if accident_id in by_id]
+
+    @staticmethod
+    def serialize_accidents(query=None, accident_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Serialize many accidents in a fixed number of queries.
+
+        The result is identical to calling to_dict() on each accident, but the
+        relationships are loaded in bulk instead of lazily per row.
+
+        Args:
+            query: Optional Accident query (filters, ordering, limit) to load from
+            accident_ids (Optional[Iterable[int]]): IDs to load when no query is given
+
+        Returns:
+            List[dict]: Serialized accidents, in query order
+        """
+        accidents = AccidentService.load_accidents(query=query, accident_ids=accident_ids)
+        return [accident.to_dict() for accident in accidents]
+
+    @staticmethod
+    def delete_accident(accident_id: int) -> bool:
+        """
+        Delete an accident report with its vehicles, conditions, notes and files.
+
+        Media files and the abstract are deleted through the ORM so the media
+        store releases their blobs; a blob's file is only removed once no
+        other row references it. Unfinished uploads go with their partial
+        files, and the accident leaves the duplicate index on either side
+        of a match. People involved are kept.
+
+        Args:
+            accident_id (int): ID of the accident to delete
+
+        Returns:
+            bool: True if the accident existed and was deleted
+
+        Raises:
+            ValueError: If insurance claims have been filed against the accident
+        """
+        accident = AccidentService.load_accidents(accident_ids=[accident_id])
+        if not accident:
+            return False
+        accident = accident[0]
+        if db.session.query(InsuranceClaim.query.filter_by(accident_id=accident_id).exists()).scalar():
+            raise ValueError('Accident has insurance claims; resolve or remove them first')
+
+        try:
+            for vehicle in accident.vehicles:
+                vehicle.passengers = []
+                for media_file in vehicle.damage_images:
+                    media_file.vehicle_id = None
+            accident.witnesses = []
+            for child in [*accident.media_files, *accident.vehicles, *accident.review_notes,
+                          accident.abstract, accident.environmental_conditions]:
+                if child is not None:
+                    db.session.delete(child)
+            upload_ids = [row.id for row in UploadSession.query.with_entities(UploadSession.id).filter_by(
+                accident_id=accident_id
+            )]
+            UploadSession.query.filter_by(accident_id=accident_id).delete()
+            DuplicateKey.query.filter_by(accident_id=accident_id).delete()
+            DuplicateMatch.query.filter(or_(
+                DuplicateMatch.accident_id == accident_id, DuplicateMatch.duplicate_of_id == accident_id
+            )).delete()
+            db.session.delete(accident)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+        discard_partial_files(upload_ids)
+        return True
+
+    @staticmethod
+    def record_review(accident_id: int, reviewer_id: int, fraudulent: bool,
+                      comment: Optional[str] = None) -> Optional[Accident]:
+        """
+        Record a reviewer's verdict on an accident.
+
+        The verdict sets the status (flagged or verified), adds a review
+        note and becomes the accident's fraud_label, which is what the risk
+        model is trained on. Flags set automatically by the scorer are not
+        labels.
+
+        Args:
+            accident_id (int): ID of the reviewed accident
+            reviewer_id (int): ID of the reviewing user
+            fraudulent (bool): Whether the report was found to be fraudulent
+            comment (Optional[str]): Reviewer's reasoning
+
+        Returns:
+            Optional[Accident]: The updated accident, or None if it does not exist
+        """
+        accident = db.session.get(Accident, accident_id)
+        if accident is None:
+            return None
+
+        try:
+            accident.fraud_label = fraudulent
+            accident.reviewed_by = reviewer_id
+            accident.status = AccidentStatus.FLAGGED if fraudulent else AccidentStatus.VERIFIED
+            db.session.add(ReviewNote(
+                accident_id=accident_id,
+                user_id=reviewer_id,
+                comment=comment or ('Reviewed: fraudulent' if fraudulent else 'Reviewed: genuine')
+            ))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+        return accident
+
+    @staticmethod
+    def list_accidents(
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        status: Optional[AccidentStatus] = None,
+        officer_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        registration_number: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Return one page of accidents, newest first, using keyset pagination.
+
+        Pages are addressed by the (created_at, id) of the last row already
+        seen rather than by OFFSET, so every page is an index range scan of
+        the same cost no matter how deep the caller has paged.
+
+        Args:
+            cursor (Optional[str]): next_cursor from the previous page
+            limit (int): Page size, capped at MAX_PAGE_SIZE
+            status (Optional[AccidentStatus]): Only accidents with this status
+            officer_id (Optional[int]): Only accidents reported by this officer
+            date_from (Optional[datetime]): Only accidents reported at or after this time
+            date_to (Optional[datetime]): Only accidents reported before this time
+            registration_number (Optional[str]): Only accidents involving this vehicle, however it is spaced or cased
+
+        Returns:
+            Tuple[List[dict], Optional[str]]: (Serialized accidents, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        query = Accident.query
+
+        if status is not None:
+            query = query.filter(Accident.status == status)
+        if officer_id is not None:
+            query = query.filter(Accident.officer_id == officer_id)
+        if date_from is not None:
+            query = query.filter(Accident.created_at >= date_from)
+        if date_to is not None:
+            query = query.filter(Accident.created_at < date_to)
+        if registration_number:
+            query = query.filter(Accident.vehicles.any(
+                Vehicle.normalized_registration == normalize_registration(registration_number)
+            ))
+        if cursor:
+            created_at, accident_id = decode_cursor(cursor)
+            query = query.filter(tuple_(Accident.created_at, Accident.id) < tuple_(created_at, accident_id))
+
+        # Fetch one extra row to learn whether another page exists
+        query = query.order_by(Accident.created_at.desc(), Accident.id.desc()).limit(limit + 1)
+        accidents = AccidentService.load_accidents(query=query)
+
+        next_cursor = None
+        if len(accidents) > limit:
+            accidents = accidents[:limit]
+            last = accidents[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        return [accident.to_dict() for accident in accidents], next_cursor
+
+    @staticmethod
+    def _bulk_insert_returning_ids(model, rows: List[dict]) -> List[int]:
+        """Insert rows with one multi-row INSERT ... RETURNING id; ids come back in row order."""
+        if not rows:
+            return []
+        # render_nulls keeps None values in the statement; otherwise rows are
+        # grouped into a separate INSERT for every distinct set of non-null keys
+        options = {'render_nulls': True}
+        if db.session.get_bind().dialect.name == 'sqlite':
+            # SQLite has no sentinel for ordered RETURNING, so SQLAlchemy would fall
+            # back to one INSERT per row. Writers are serialized and rowids of a
+            # multi-row INSERT are assigned in VALUES order, so sorting restores it.
+            result = db.session.execute(insert(model).returning(model.id), rows, execution_options=options)
+            return sorted(row.id for row in result)
+        result = db.session.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows,
+            execution_options=options
+        )
+        return [row.id for row in result]
+
+    @staticmethod
+    def _existing_keys(officer_id: int, keys: List[str]) -> Dict[str, Tuple[int, str]]:
+        """Accidents this officer already submitted under the given idempotency keys."""
+        if not keys:
+            return {}
+        rows = db.session.query(Accident.idempotency_key, Accident.id, Accident.report_number).filter(
+            Accident.officer_id == officer_id,
+            Accident.idempotency_key.in_(keys)
+        ).all()
+        return {key: (accident_id, report_number) for key, accident_id, report_number in rows}
+
+    @staticmethod
+    def ingest_batch(officer_id: int, items: List[dict]) -> List[dict]:
+        """
+        Insert a batch of validated accident reports in a single transaction.
+
+        Every table in the report graph is written with one multi-row INSERT
+        for the whole batch rather than per report. Items whose
+        idempotency_key was already stored for this officer (a resend after
+        a dropped connection) are reported as duplicates and not inserted
+        again; so are repeats of a key within the batch. Media must name a
+        completed upload of the officer's or a blob in the media store;
+        reports naming anything else are returned as 'invalid'.
+
+        Args:
+            officer_id (int): ID of the submitting police officer
+            items (List[dict]): Reports as loaded by the batch request schema
+
+        Returns:
+            List[dict]: One result per item, in order, with status 'created',
+                'duplicate', 'conflict' or 'invalid' and the accident id when known
+        """
+        results = [None] * len(items)
+        keys = [item['idempotency_key'] for item in items]
+        existing = AccidentService._existing_keys(officer_id, keys)
+        blobs, media_errors = AccidentService._resolve_media(officer_id, items)
+
+        report_numbers = [item['report_number'] for item in items if item.get('report_number')]
+        taken_numbers = set()
+        if report_numbers:
+            taken_numbers = {number for (number,) in db.session.query(Accident.report_number).filter(
+                Accident.report_number.in_(report_numbers)
+            )}
+
+        pending = []
+        seen_keys = {}
+        for index, item in enumerate(items):
+            key = item['idempotency_key']
+            if key in existing:
+                accident_id, report_number = existing[key]
+                results[index] = {'status': 'duplicate', 'accident_id': accident_id, 'report_number': report_number}
+            elif key in seen_keys:
+                results[index] = {'status': 'duplicate', 'duplicate_of': seen_keys[key]}
+            elif item.get('report_number') in taken_numbers:
+                results[index] = {'status': 'conflict', 'errors': {'report_number': ['Already exists.']}}
+            elif index in media_errors:
+                results[index] = {'status': 'invalid', 'errors': {'media': media_errors[index]}}
+            else:
+                seen_keys[key] = index
+                if item.get('report_number'):
+                    taken_numbers.add(item['report_number'])
+                pending.append(index)
+
+        try:
+            created = AccidentService._insert_reports(officer_id, [items[index] for index in pending], blobs)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent resend of the same keys won the race; report those as duplicates
+            db.session.rollback()
+            existing = AccidentService._existing_keys(officer_id, keys)
+            if not any(items[index]['idempotency_key'] in existing for index in pending):
+                raise
+            return AccidentService.ingest_batch(officer_id, items)
+
+        for index, (accident_id, report_number) in zip(pending, created):
+            results[index] = {'status': 'created', 'accident_id': accident_id, 'report_number': report_number}
+        for index, result in enumerate(results):
+            if 'duplicate_of' in result:
+                result.update(
+                    accident_id=results[result['duplicate_of']].get('accident_id'),
+                    report_number=results[result['duplicate_of']].get('report_number')
+                )
+                del result['duplicate_of']
+            result['idempotency_key'] = keys[index]
+        return results
+
+    @staticmethod
+    def _resolve_media(officer_id: int, items: List[dict]) -> Tuple[Dict[str, MediaBlob], Dict[int, dict]]:
+        """
+        Find the stored blob of every media file in a batch.
+
+        A media file names a completed media upload of this officer's
+        (upload_id) or a blob already in the media store (sha256). Each
+        resolved file gets the blob's digest as its 'sha256'. The blobs are
+        locked until commit, so they cannot lose their last reference and
+        be deleted before the new rows count.
+
+        Returns:
+            Tuple[Dict[str, MediaBlob], Dict[int, dict]]: Blobs by digest, and
+                errors by item index for media naming nothing stored
+        """
+        upload_ids = {m['upload_id'] for item in items for m in item.get('media', []) if m.get('upload_id')}
+        uploads = {}
+        if upload_ids:
+            uploads = dict(db.session.query(UploadSession.id, UploadSession.sha256).filter(
+                UploadSession.id.in_(upload_ids),
+                UploadSession.user_id == officer_id,
+                UploadSession.target == 'media',
+                UploadSession.status == UploadStatus.COMPLETED
+            ))
+        digests = {m['sha256'].lower() for item in items for m in item.get('media', []) if m.get('sha256')}
+        digests.update(uploads.values())
+        blobs = {}
+        if digests:
+            blobs = {blob.sha256: blob for blob in MediaBlob.query.filter(
+                MediaBlob.sha256.in_(digests)
+            ).with_for_update()}
+
+        errors = {}
+        for index, item in enumerate(items):
+            for media_index, media_file in enumerate(item.get('media', [])):
+                if media_file.get('upload_id'):
+                    media_file['sha256'] = uploads.get(media_file['upload_id'])
+                    if media_file['sha256'] is None:
+                        errors.setdefault(index, {})[media_index] = {
+                            'upload_id': ['Not a completed media upload of yours.']
+                        }
+                        continue
+                media_file['sha256'] = media_file['sha256'].lower()
+                if media_file['sha256'] not in blobs:
+                    errors.setdefault(index, {})[media_index] = {'sha256': ['Not in the media store.']}
+        return blobs, errors
+
+    @staticmethod
+    def _insert_reports(
+        officer_id: int, items: List[dict], blobs: Dict[str, MediaBlob]
+    ) -> List[Tuple[int, str]]:
+        """Write the accidents and their object graphs; caller commits."""
+        if not items:
+            return []
+
+        now = datetime.utcnow()
+        report_numbers = [
+            item.get('report_number') or f"ACC-{now:%y%m%d}-{uuid.uuid4().hex[:8].upper()}"
+            for item in items
+        ]
+        accident_ids = AccidentService._bulk_insert_returning_ids(Accident, [{
+            'report_number': report_number,
+            'officer_id': officer_id,
+            'idempotency_key': item['idempotency_key'],
+            'location': item['location'],
+            'latitude': item.get('latitude'),
+            'longitude': item.get('longitude'),
+            'geohash': encode_geohash(item.get('latitude'), item.get('longitude')),
+            'accident_date': item['accident_date'],
+            'description': item.get('description'),
+            'status': AccidentStatus.PENDING
+        } for item, report_number in zip(items, report_numbers)])
+
+        # Every person in the batch (drivers, passengers, witnesses) in one INSERT
+        people = []
+        for item in items:
+            for vehicle in item.get('vehicles', []):
+                if vehicle.get('driver'):
+                    people.append(vehicle['driver'])
+                people.extend(vehicle.get('passengers', []))
+            people.extend(item.get('witnesses', []))
+        persons = [{column: person.get(column) for column in PERSON_COLUMNS} for person in people]
+        person_ids = iter(AccidentService._bulk_insert_returning_ids(Person, persons))
+
+        vehicle_rows, passenger_ids, witness_links = [], [], []
+        for item, accident_id in zip(items, accident_ids):
+            for vehicle in item.get('vehicles', []):
+                driver_id = next(person_ids) if vehicle.get('driver') else None
+                passenger_ids.append([next(person_ids) for _ in vehicle.get('passengers', [])])
+                vehicle_rows.append({
+                    'accident_id': accident_id,
+                    'registration_number': vehicle['registration_number'].strip().upper(),
+                    'normalized_registration': normalize_registration(vehicle['registration_number']),
+                    'make': vehicle['make'],
+                    'model': vehicle['model'],
+                    'color': vehicle['color'],
+                    'driver_id': driver_id,
+                    'damage_description': vehicle.get('damage_description')
+                })
+            witness_links.extend(
+                {'accident_id': accident_id, 'person_id': next(person_ids)} for _ in item.get('witnesses', [])
+            )
+        vehicle_ids = AccidentService._bulk_insert_returning_ids(Vehicle, vehicle_rows)
+
+        passenger_links = [
+            {'vehicle_id': vehicle_id, 'person_id': person_id}
+            for vehicle_id, person_ids_for_vehicle in zip(vehicle_ids, passenger_ids)
+            for person_id in person_ids_for_vehicle
+        ]
+        if passenger_links:
+            db.session.execute(vehicle_passengers.insert(), passenger_links)
+        if witness_links:
+            db.session.execute(accident_witnesses.insert(), witness_links)
+
+        conditions, media = [], []
+        vehicle_ids = iter(vehicle_ids)
+        for item, accident_id in zip(items, accident_ids):
+            item_vehicle_ids = [next(vehicle_ids) for _ in item.get('vehicles', [])]
+            if item.get('environmental_conditions'):
+                conditions.append(dict(
+                    {column: item['environmental_conditions'].get(column) for column in CONDITION_COLUMNS},
+                    accident_id=accident_id
+                ))
+            for media_file in item.get('media', []):
+                vehicle_index = media_file.get('vehicle_index')
+                blob = blobs[media_file['sha256']]
+                media.append({
+                    'accident_id': accident_id,
+                    'vehicle_id': item_vehicle_ids[vehicle_index] if vehicle_index is not None else None,
+                    'file_type': media_file['file_type'],
+                    'file_path': blob.path,
+                    'file_size': blob.size,
+                    'sha256': blob.sha256
+                })
+        if conditions:
+            db.session.execute(insert(EnvironmentalConditions), conditions, execution_options={'render_nulls': True})
+        if media:
+            AccidentService._insert_media(media)
+
+        return list(zip(accident_ids, report_numbers))
+
+    @staticmethod
+    def _insert_media(media: List[dict]) -> None:
+        """
+        Insert MediaFile rows for stored blobs, doing what the ORM flush hooks would.
+
+        The blobs' ref_count goes up by the rows added, and images take the
+        thumbnails and perceptual hash of earlier rows with the same
+        contents, or are queued for them once the transaction commits.
+        """
+        processed = {}
+        earlier = db.session.query(MediaFile.sha256, MediaFile.variants, MediaFile.phash).filter(
+            MediaFile.sha256.in_({row['sha256'] for row in media})
+        )
+        for sha256, variants, phash in earlier:
+            if variants is not None:
+                processed[sha256] = (variants, phash)
+        for row in media:
+            row['variants'], row['phash'] = processed.get(row['sha256'], (None, None))
+            if row['file_type'] == 'image' and row['sha256'] not in processed:
+                thumbnails.schedule(row['sha256'], row['file_path'])
+        db.session.execute(insert(MediaFile), media, execution_options={'render_nulls': True})
+
+        table = MediaBlob.__table__
+        db.session.execute(
+            update(table).where(table.c.sha256 == bindparam('blob_sha256')).values(
+                ref_count=table.c.ref_count + bindparam('added')
+            ),
+            [{'blob_sha256': sha256, 'added': added}
+             for sha256, added in Counter(row['sha256'] for row in media).items()]
+        )
\ No newline at end of file
@@ -1,5 +1,6 @@
 from app.models import User, UserRole
 from app import db
+from app.utils.user_cache import invalidate_user
 from typing import Optional, Tuple
 from datetime import datetime
 
@@ -9,15 +10,23 @@ class AuthService:
         """
         Authenticate a user with email and password.
         
+        A hash made with an older scheme or cost is replaced on the user
+        (not committed; the caller commits along with last_login).
+        
         Args:
             email (str): User's email address
             password (str): User's password
             
         Returns:
             Optional[User]: User object if authentication successful, None otherwise
+            
+        Raises:
+            HasherBusy: If every password hashing slot stayed busy
         """
         user = User.query.filter_by(email=email.lower()).first()
         if user and user.check_password(password):
+            if user.password_needs_rehash():
+                user.set_password(password)
             return user
         return None
     
@@ -84,6 +93,7 @@ class AuthService:
                     setattr(user, key, value)
             
             db.session.commit()
+            invalidate_user(user_id)
             return user, True
             
         except Exception as e:
@@ -108,6 +118,7 @@ class AuthService:
             
             user.is_active = False
             db.session.commit()
+            invalidate_user(user_id)
             return True
             
         except Exception as e:
@@ -132,6 +143,7 @@ class AuthService:
             
             user.is_active = True
             db.session.commit()
+            invalidate_user(user_id)
             return True
             
         except Exception as e:
@@ -0,0 +1,201 @@
+from app import db
+from app.models import Accident, AccidentStatus
+from app.utils.geo import (
+    PREFIX_END, cell_keys, covering_cells, covering_cells_for_bounds, distances_km,
+    encode_geohash, geohash_bounds, key_geohash
+)
+from datetime import datetime
+from sqlalchemy import and_, event, or_
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+DEFAULT_NEARBY_RADIUS_KM = 1.0
+MAX_NEARBY_RADIUS_KM = 50.0
+DEFAULT_NEARBY_LIMIT = 100
+MAX_NEARBY_LIMIT = 500
+
+DEFAULT_HOTSPOT_PRECISION = 6  # Cells of about 1.2 km x 0.6 km
+MAX_HOTSPOT_PRECISION = 8
+DEFAULT_HOTSPOT_LIMIT = 100
+MAX_HOTSPOT_LIMIT = 1000
+
+def _set_geohash(mapper, connection, target):
+    target.geohash = encode_geohash(target.latitude, target.longitude)
+
+def init_app(app):
+    """
+    Keep Accident.geohash in step with the coordinates of ORM-written accidents.
+
+    Bulk inserts (the batch ingest endpoint) compute the geohash themselves.
+    """
+    for name in ('before_insert', 'before_update'):
+        if not event.contains(Accident, name, _set_geohash):
+            event.listen(Accident, name, _set_geohash)
+
+def _in_cells(prefixes: Sequence[str]):
+    """Accidents whose geohash starts with any of the prefixes, as index range scans."""
+    return or_(*(and_(Accident.geohash >= prefix, Accident.geohash < prefix + PREFIX_END) for prefix in prefixes))
+
+def _check_point(latitude: float, longitude: float) -> None:
+    if not -90.0 <= latitude <= 90.0 or not -180.0 <= longitude <= 180.0:
+        raise ValueError('lat must be within [-90, 90] and lon within [-180, 180]')
+
+class GeoService:
+    @staticmethod
+    def nearby(
+        latitude: float,
+        longitude: float,
+        radius_km: float = DEFAULT_NEARBY_RADIUS_KM,
+        limit: int = DEFAULT_NEARBY_LIMIT,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> List[dict]:
+        """
+        Accidents within radius_km of a point, nearest first.
+
+        Candidates are read through the geohash index, one range scan per
+        cell of a small covering of the circle; exact haversine distances
+        are then computed for all of them at once with NumPy.
+
+        Args:
+            latitude (float): Centre latitude
+            longitude (float): Centre longitude
+            radius_km (float): Search radius, at most MAX_NEARBY_RADIUS_KM
+            limit (int): Maximum number of accidents, capped at MAX_NEARBY_LIMIT
+            date_from (Optional[datetime]): Only accidents that happened at or after this time
+            date_to (Optional[datetime]): Only accidents that happened before this time
+
+        Returns:
+            List[dict]: Map markers with a distance_km each
+
+        Raises:
+            ValueError: If the point or radius is out of range
+        """
+        _check_point(latitude, longitude)
+        if not 0 < radius_km <= MAX_NEARBY_RADIUS_KM:
+            raise ValueError(f'radius must be greater than 0 and at most {MAX_NEARBY_RADIUS_KM:g} km')
+        limit = max(1, min(limit, MAX_NEARBY_LIMIT))
+
+        query = db.session.query(
+            Accident.id,
+            Accident.report_number,
+            Accident.latitude,
+            Accident.longitude,
+            Accident.status,
+            Accident.accident_date,
+            Accident.risk_score
+        ).filter(_in_cells(covering_cells(latitude, longitude, radius_km)))
+        if date_from is not None:
+            query = query.filter(Accident.accident_date >= date_from)
+        if date_to is not None:
+            query = query.filter(Accident.accident_date < date_to)
+        rows = query.all()
+        if not rows:
+            return []
+
+        distances = distances_km(
+            latitude, longitude,
+            np.fromiter((row.latitude for row in rows), dtype='float64', count=len(rows)),
+            np.fromiter((row.longitude for row in rows), dtype='float64', count=len(rows))
+        )
+        inside = np.flatnonzero(distances <= radius_km)
+        nearest = inside[np.argsort(distances[inside], kind='stable')][:limit]
+
+        return [{
+            'id': rows[i].id,
+            'report_number': rows[i].report_number,
+            'latitude': rows[i].latitude,
+            'longitude': rows[i].longitude,
+            'status': rows[i].status.value,
+            'accident_date': rows[i].accident_date.isoformat(),
+            'risk_score': rows[i].risk_score,
+            'distance_km': round(float(distances[i]), 3)
+        } for i in nearest]
+
+    @staticmethod
+    def hotspots(
+        precision: int = DEFAULT_HOTSPOT_PRECISION,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        bounds: Optional[Tuple[float, float, float, float]] = None,
+        min_count: int = 1,
+        limit: int = DEFAULT_HOTSPOT_LIMIT
+    ) -> List[dict]:
+        """
+        Geohash cells with the most accidents.
+
+        Only the coordinates, scores and statuses are fetched; grouping by
+        cell, counting and the per-cell sums are vectorized with NumPy
+        (np.unique + np.bincount), so the cost is one pass over the rows.
+
+        Args:
+            precision (int): Geohash length of the cells, 1 to MAX_HOTSPOT_PRECISION
+            date_from (Optional[datetime]): Only accidents that happened at or after this time
+            date_to (Optional[datetime]): Only accidents that happened before this time
+            bounds (Optional[Tuple[float, float, float, float]]): (south, west, north, east) to look in
+            min_count (int): Leave out cells with fewer accidents
+            limit (int): Maximum number of cells, capped at MAX_HOTSPOT_LIMIT
+
+        Returns:
+            List[dict]: Cells, busiest first, with centroid, bounds, counts and average risk score
+
+        Raises:
+            ValueError: If the precision or bounds are out of range
+        """
+        if not 1 <= precision <= MAX_HOTSPOT_PRECISION:
+            raise ValueError(f'precision must be between 1 and {MAX_HOTSPOT_PRECISION}')
+        limit = max(1, min(limit, MAX_HOTSPOT_LIMIT))
+
+        query = db.session.query(
+            Accident.latitude, Accident.longitude, Accident.risk_score, Accident.status
+        ).filter(Accident.geohash.isnot(None))
+        if bounds is not None:
+            south, west, north, east = bounds
+            _check_point(south, west)
+            _check_point(north, east)
+            if south > north or west > east:
+                raise ValueError('bbox must be south,west,north,east')
+            query = query.filter(
+                _in_cells(covering_cells_for_bounds(south, west, north, east)),
+                Accident.latitude.between(south, north),
+                Accident.longitude.between(west, east)
+            )
+        if date_from is not None:
+            query = query.filter(Accident.accident_date >= date_from)
+        if date_to is not None:
+            query = query.filter(Accident.accident_date < date_to)
+        rows = query.all()
+        if not rows:
+            return []
+
+        latitudes = np.fromiter((row[0] for row in rows), dtype='float64', count=len(rows))
+        longitudes = np.fromiter((row[1] for row in rows), dtype='float64', count=len(rows))
+        scores = np.fromiter((np.nan if row[2] is None else row[2] for row in rows), dtype='float64', count=len(rows))
+        flagged = np.fromiter((row[3] == AccidentStatus.FLAGGED for row in rows), dtype='float64', count=len(rows))
+
+        cells, inverse, counts = np.unique(cell_keys(latitudes, longitudes, precision),
+                                           return_inverse=True, return_counts=True)
+        scored = ~np.isnan(scores)
+        latitude_sums = np.bincount(inverse, weights=latitudes)
+        longitude_sums = np.bincount(inverse, weights=longitudes)
+        score_sums = np.bincount(inverse, weights=np.where(scored, scores, 0.0))
+        scored_counts = np.bincount(inverse, weights=scored)
+        flagged_counts = np.bincount(inverse, weights=flagged)
+
+        keep = np.flatnonzero(counts >= min_count)
+        busiest = keep[np.lexsort((cells[keep], -counts[keep]))][:limit]
+
+        hotspots = []
+        for i in busiest:
+            geohash = key_geohash(cells[i], precision)
+            south, west, north, east = geohash_bounds(geohash)
+            hotspots.append({
+                'geohash': geohash,
+                'count': int(counts[i]),
+                'flagged': int(flagged_counts[i]),
+                'latitude': round(float(latitude_sums[i] / counts[i]), 6),
+                'longitude': round(float(longitude_sums[i] / counts[i]), 6),
+                'bounds': {'south': south, 'west': west, 'north': north, 'east': east},
+                'avg_risk_score': round(float(score_sums[i] / scored_counts[i]), 4) if scored_counts[i] else None
+            })
+        return hotspots
\ No newline at end of file
@@ -0,0 +1,247 @@
+import logging
+import math
+from threading import Lock
+from typing import Dict, Optional, Tuple
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 300  # seconds
+DEFAULT_ACCOUNT_LIMIT = 10  # login attempts per account in any window
+DEFAULT_IP_LIMIT = 100  # login attempts per client address in any window
+SWEEP_INTERVAL = 60.0  # seconds between dropping expired in-memory counters
+
+class LoginThrottled(Exception):
+    """Too many login attempts for the account or client address."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f'Too many login attempts for this {scope}')
+        self.scope = scope
+        self.retry_after = retry_after
+
+class MemoryStorage:
+    """Counters in this process's memory; every worker process counts on its own."""
+
+    def __init__(self):
+        self._counters: Dict[str, Tuple[int, float]] = {}  # key -> (count, expires at)
+        self._lock = Lock()
+        self._next_sweep = 0.0
+
+    def incr(self, key: str, expiry: float) -> int:
+        """Add one to `key`, which is forgotten `expiry` seconds after it was created."""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+                self._next_sweep = now + SWEEP_INTERVAL
+            count, expires_at = self._counters.get(key, (0, now + expiry))
+            if expires_at <= now:
+                count, expires_at = 0, now + expiry
+            self._counters[key] = (count + 1, expires_at)
+            return count + 1
+
+    def decr(self, key: str) -> None:
+        """Take one off `key` while it is still counting."""
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._counters.get(key, (0, 0.0))
+            if count and expires_at > now:
+                self._counters[key] = (count - 1, expires_at)
+
+    def get(self, key: str) -> int:
+        count, expires_at = self._counters.get(key, (0, 0.0))
+        return count if expires_at > time.monotonic() else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+# DECR on a missing key would recreate it without an expiry
+_DECR_SCRIPT = """
+if tonumber(redis.call('get', KEYS[1]) or '0') > 0 then
+    return redis.call('decr', KEYS[1])
+end
+return 0
+"""
+
+class RedisStorage:
+    """Counters in Redis, shared by every worker process."""
+
+    def __init__(self, client, prefix: str = 'login-throttle:'):
+        self.client = client
+        self.prefix = prefix
+
+    def incr(self, key: str, expiry: float) -> int:
+        pipe = self.client.pipeline()
+        pipe.incr(self.prefix + key)
+        pipe.expire(self.prefix + key, math.ceil(expiry))
+        return pipe.execute()[0]
+
+    def decr(self, key: str) -> None:
+        self.client.eval(_DECR_SCRIPT, 1, self.prefix + key)
+
+    def get(self, key: str) -> int:
+        value = self.client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+class SlidingWindowLimiter:
+    """
+    Allows `limit` hits per key in any `window` seconds.
+
+    Keeps two counters per key, for the current and the previous fixed
+    window, and weighs the previous one by how much of it still overlaps
+    the sliding window. Hits over the limit are counted too, so a client
+    that keeps retrying stays blocked, unless the caller refunds them.
+    """
+
+    def __init__(self, storage, limit: int, window: float = DEFAULT_WINDOW):
+        self.storage = storage
+        self.limit = limit
+        self.window = window
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Count a hit on `key`.
+
+        Returns:
+            float: 0 if the hit is within the limit, else seconds until one would be
+        """
+        if not self.limit:
+            return 0.0
+        now = time.time() if now is None else now
+        number, elapsed = divmod(now, self.window)
+        current = self.storage.incr(f'{key}:{int(number)}', self.window * 2)
+        return self._retry_after(current, self.storage.get(f'{key}:{int(number) - 1}'), elapsed)
+
+    def refund(self, key: str, now: Optional[float] = None) -> None:
+        """
+        Take back a hit on `key` that should not count.
+
+        Only the current fixed window is refunded; a hit counted just
+        before a window boundary stays in the previous one.
+        """
+        if not self.limit:
+            return
+        now = time.time() if now is None else now
+        self.storage.decr(f'{key}:{int(now // self.window)}')
+
+    def _retry_after(self, current: int, previous: int, elapsed: float) -> float:
+        overlap = 1 - elapsed / self.window
+        if previous * overlap + current <= self.limit:
+            return 0.0
+        if current > self.limit:
+            return self.window - elapsed
+        # The previous window's share has to fade until the estimate is back under the limit
+        return max(self.window * (1 - (self.limit - current) / previous) - elapsed, 1.0)
+
+class LoginThrottle:
+    """
+    Limits login attempts per client address and failed logins per account.
+
+    Checked before the password is hashed, so a credential-stuffing burst
+    is turned away without costing a hash per attempt. Every attempt
+    counts against its address, refused ones too. Against the account,
+    an attempt takes a slot before its password is hashed, so concurrent
+    guesses cannot all slip in under the limit, and release() gives the
+    slot back when the password was right. Attempts refused by either
+    limit are not counted against the account. Anyone who knows an email
+    can still lock that account for up to a window by failing its
+    password `account limit` times; that is the cost of capping guesses
+    per account (LOGIN_THROTTLE_ACCOUNT_LIMIT=0 turns it off).
+
+    The address is request.remote_addr, so behind a reverse proxy set
+    TRUSTED_PROXIES for it to be the client's rather than the proxy's.
+    """
+
+    def __init__(self):
+        self.ip_limiter = SlidingWindowLimiter(MemoryStorage(), DEFAULT_IP_LIMIT)
+        self.account_limiter = SlidingWindowLimiter(self.ip_limiter.storage, DEFAULT_ACCOUNT_LIMIT)
+        self._counts = {'ip_hits': 0, 'ip_rejected': 0, 'account_hits': 0, 'account_rejected': 0}
+        self._lock = Lock()
+
+    def configure(self, config) -> None:
+        storage = create_storage(config)
+        window = config.get('LOGIN_THROTTLE_WINDOW', DEFAULT_WINDOW)
+        self.ip_limiter = SlidingWindowLimiter(storage, config.get('LOGIN_THROTTLE_IP_LIMIT', DEFAULT_IP_LIMIT), window)
+        self.account_limiter = SlidingWindowLimiter(
+            storage, config.get('LOGIN_THROTTLE_ACCOUNT_LIMIT', DEFAULT_ACCOUNT_LIMIT), window
+        )
+        with self._lock:
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def _hit(self, scope: str, key: str) -> float:
+        limiter = self.account_limiter if scope == 'account' else self.ip_limiter
+        try:
+            retry_after = limiter.hit(f'{scope}:{key}')
+        except Exception as e:
+            # A storage outage must not lock everyone out
+            logger.warning('Login throttle storage failed: %s', e)
+            return 0.0
+        with self._lock:
+            self._counts[f'{scope}_hits'] += 1
+        return retry_after
+
+    def _reject(self, scope: str, retry_after: float) -> None:
+        with self._lock:
+            self._counts[f'{scope}_rejected'] += 1
+        raise LoginThrottled('account' if scope == 'account' else 'address', retry_after)
+
+    def check(self, email: str, remote_addr: Optional[str]) -> None:
+        """
+        Count a login attempt against the address and take a slot of the account.
+
+        Raises:
+            LoginThrottled: If the address or the account is over its limit
+        """
+        retry_after = self._hit('ip', remote_addr or 'unknown')
+        if retry_after:
+            self._reject('ip', retry_after)
+        retry_after = self._hit('account', email.strip().lower())
+        if retry_after:
+            self.release(email)
+            self._reject('account', retry_after)
+
+    def release(self, email: str) -> None:
+        """Give back the account slot of an attempt that was not a wrong password."""
+        try:
+            self.account_limiter.refund(f'account:{email.strip().lower()}')
+        except Exception as e:
+            logger.warning('Login throttle storage failed: %s', e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        counts.update({
+            'window': self.ip_limiter.window,
+            'ip_limit': self.ip_limiter.limit,
+            'account_limit': self.account_limiter.limit
+        })
+        return counts
+
+def create_storage(config):
+    """
+    Build the counter storage selected by LOGIN_THROTTLE_STORAGE.
+
+    'memory' (default) counts per worker process, so the effective limit
+    is multiplied by the number of workers; 'redis' shares the counters
+    through REDIS_URL and requires the redis package.
+    """
+    backend = config.get('LOGIN_THROTTLE_STORAGE', 'memory')
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('LOGIN_THROTTLE_STORAGE=redis requires the redis package') from e
+        return RedisStorage(redis.Redis.from_url(config.get('REDIS_URL', 'redis://localhost:6379/0')))
+    if backend == 'memory':
+        return MemoryStorage()
+    raise ValueError(f'Unknown LOGIN_THROTTLE_STORAGE: {backend}')
+
+login_throttle = LoginThrottle()
+
+def init_app(app):
+    login_throttle.configure(app.config)
\ No newline at end of file
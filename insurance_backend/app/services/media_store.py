@@ -0,0 +1,222 @@
+from app import db
+from app.models import MediaBlob, MediaFile, Abstract
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import event, select, update, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from typing import Dict, Optional
+import glob
+import hashlib
+import os
+import shutil
+import uuid
+
+BLOB_DIR = 'blobs'
+HASH_BUFFER_SIZE = 64 * 1024
+
+# Models whose sha256 column references a blob
+REFERENCING_MODELS = (MediaFile, Abstract)
+
+# Blob files whose rows were deleted in the current transaction, unlinked on commit
+_PENDING_KEY = 'media_blobs_to_unlink'
+
+def blob_path(sha256: str) -> str:
+    """Location of a blob relative to UPLOAD_FOLDER, fanned out by hash prefix."""
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+def hash_file(path: str) -> str:
+    """SHA-256 hex digest of a file, read in fixed-size blocks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BUFFER_SIZE), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def _collect_deltas(session) -> Dict[str, int]:
+    """Per-blob reference changes implied by the rows in this flush."""
+    deltas = defaultdict(int)
+    for obj in session.new:
+        if isinstance(obj, REFERENCING_MODELS) and obj.sha256:
+            deltas[obj.sha256] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, REFERENCING_MODELS):
+            continue
+        history = get_history(obj, 'sha256')
+        if not history.has_changes():
+            continue
+        for sha256 in history.deleted:
+            if sha256:
+                deltas[sha256] -= 1
+        for sha256 in history.added:
+            if sha256:
+                deltas[sha256] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, REFERENCING_MODELS) and obj.sha256:
+            deltas[obj.sha256] -= 1
+
+    return {sha256: delta for sha256, delta in deltas.items() if delta}
+
+def _after_flush(session, flush_context):
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+
+    connection = session.connection()
+    table = MediaBlob.__table__
+    for sha256, delta in deltas.items():
+        connection.execute(update(table).where(table.c.sha256 == sha256).values(
+            ref_count=table.c.ref_count + delta
+        ))
+
+    released = [sha256 for sha256, delta in deltas.items() if delta < 0]
+    if released:
+        unreferenced = connection.execute(select(table.c.sha256, table.c.path).where(
+            table.c.sha256.in_(released), table.c.ref_count <= 0
+        )).all()
+        if unreferenced:
+            connection.execute(delete(table).where(table.c.sha256.in_([row.sha256 for row in unreferenced])))
+            session.info.setdefault(_PENDING_KEY, set()).update(row.path for row in unreferenced)
+
+def _after_commit(session):
+    paths = session.info.pop(_PENDING_KEY, ())
+    if not paths:
+        return
+    root = current_app.config['UPLOAD_FOLDER']
+    for path in paths:
+        # Derivatives such as thumbnails are stored as '<blob>.<suffix>' and go with it
+        for file in [os.path.join(root, path), *glob.glob(glob.escape(os.path.join(root, path)) + '.*')]:
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """
+    Keep media_blobs.ref_count in step with the MediaFile and Abstract rows.
+
+    Counts are adjusted in the same transaction as the flush that adds,
+    repoints or deletes a referencing row; a blob that drops to zero
+    references loses its row in that transaction and its file after commit.
+    """
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+class MediaStore:
+    @staticmethod
+    def put_file(path: str, sha256: Optional[str] = None) -> MediaBlob:
+        """
+        Add a file to the store, or find the blob that already holds its contents.
+
+        New contents are hard-linked into place (copied if the store is on
+        another filesystem); known contents cost no disk write. The source
+        file is left alone; callers remove it once their transaction has
+        committed. The blob row is added to the session with the rows that
+        reference it.
+
+        Args:
+            path (str): File to store
+            sha256 (Optional[str]): Its digest, if already computed while receiving it
+
+        Returns:
+            MediaBlob: The blob holding the contents
+        """
+        sha256 = sha256 or hash_file(path)
+        blob = db.session.get(MediaBlob, sha256)
+        if blob is not None:
+            return blob
+
+        relative_path = blob_path(sha256)
+        target = os.path.join(current_app.config['UPLOAD_FOLDER'], relative_path)
+        # A file without a row is left over from a rolled-back transaction and can be reused
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temp = f'{target}.{uuid.uuid4().hex}.tmp'
+            try:
+                os.link(path, temp)
+            except OSError:
+                shutil.copyfile(path, temp)
+            os.replace(temp, target)
+
+        blob = MediaBlob(sha256=sha256, size=os.path.getsize(target), path=relative_path, ref_count=0)
+        db.session.add(blob)
+        return blob
+
+    @staticmethod
+    def absolute_path(blob_or_path) -> str:
+        """Filesystem path of a blob or of a path relative to UPLOAD_FOLDER."""
+        relative = blob_or_path.path if isinstance(blob_or_path, MediaBlob) else blob_or_path
+        return os.path.join(current_app.config['UPLOAD_FOLDER'], relative)
+
+    @staticmethod
+    def migrate_existing(batch_size: int = 100) -> dict:
+        """
+        Move files referenced by MediaFile and Abstract rows into the store.
+
+        Rows already pointing into the store are skipped. Each original file
+        is removed once its rows point at the blob, so duplicates collapse to
+        one copy.
+
+        Args:
+            batch_size (int): Rows to commit at a time
+
+        Returns:
+            dict: files migrated, duplicates found, missing files and bytes reclaimed
+        """
+        stats = {'migrated': 0, 'duplicates': 0, 'missing': 0, 'bytes_reclaimed': 0}
+        root = current_app.config['UPLOAD_FOLDER']
+
+        for model in REFERENCING_MODELS:
+            last_id = 0
+            while True:
+                rows = model.query.filter(
+                    model.id > last_id,
+                    ~model.file_path.startswith(BLOB_DIR + os.sep)
+                ).order_by(model.id).limit(batch_size).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                # Bytes freed by removing each source: all of it if its contents were already stored
+                sources = {}
+                try:
+                    for row in rows:
+                        source = os.path.join(root, row.file_path)
+                        if not os.path.isfile(source):
+                            stats['missing'] += 1
+                            continue
+                        size = os.path.getsize(source)
+                        sha256 = hash_file(source)
+                        if source not in sources:
+                            known = db.session.get(MediaBlob, sha256) is not None
+                            sources[source] = size if known else 0
+                            stats['duplicates'] += int(known)
+                        blob = MediaStore.put_file(source, sha256)
+                        db.session.flush()
+
+                        if row.sha256 == blob.sha256:
+                            # Digest recorded before the store existed; no change for the flush hook to count
+                            db.session.execute(update(MediaBlob).where(MediaBlob.sha256 == blob.sha256).values(
+                                ref_count=MediaBlob.ref_count + 1
+                            ))
+                        row.file_path = blob.path
+                        row.sha256 = blob.sha256
+                        row.file_size = size
+                        stats['migrated'] += 1
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    raise e
+
+                for source, reclaimed in sources.items():
+                    os.remove(source)
+                    stats['bytes_reclaimed'] += reclaimed
+
+        return stats
\ No newline at end of file
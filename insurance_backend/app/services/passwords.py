@@ -0,0 +1,119 @@
+from threading import BoundedSemaphore
+from typing import Optional
+import base64
+import hashlib
+import hmac
+import os
+import bcrypt
+
+SCHEMES = ('bcrypt', 'pbkdf2_sha256')
+DEFAULT_SCHEME = 'bcrypt'
+DEFAULT_BCRYPT_ROUNDS = 12
+DEFAULT_PBKDF2_ITERATIONS = 600000
+DEFAULT_QUEUE_TIMEOUT = 5.0  # seconds a login may wait for a hashing slot
+
+class HasherBusy(Exception):
+    """Every hashing slot stayed taken for the whole queue timeout."""
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords with the configured scheme and cost.
+
+    Stored hashes carry their own scheme and cost, so hashes made under an
+    older configuration still verify; needs_rehash() tells when one should
+    be replaced. At most `max_concurrency` hashes are computed at once in
+    this process (None for no limit): during a login burst the rest wait
+    for a slot, up to `queue_timeout` seconds, instead of all competing for
+    the CPU and every one of them getting slow.
+    """
+
+    def __init__(
+        self,
+        scheme: str = DEFAULT_SCHEME,
+        bcrypt_rounds: int = DEFAULT_BCRYPT_ROUNDS,
+        pbkdf2_iterations: int = DEFAULT_PBKDF2_ITERATIONS,
+        max_concurrency: Optional[int] = None,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT
+    ):
+        if scheme not in SCHEMES:
+            raise ValueError(f'Unknown password hash scheme: {scheme}')
+        self.scheme = scheme
+        self.bcrypt_rounds = bcrypt_rounds
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.queue_timeout = queue_timeout
+        self._slots = BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+    def configure(self, config) -> None:
+        """Take the scheme, cost and concurrency limit from the application configuration."""
+        self.__init__(
+            scheme=config.get('PASSWORD_HASH_SCHEME', DEFAULT_SCHEME),
+            bcrypt_rounds=config.get('PASSWORD_BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS),
+            pbkdf2_iterations=config.get('PASSWORD_PBKDF2_ITERATIONS', DEFAULT_PBKDF2_ITERATIONS),
+            max_concurrency=config.get('PASSWORD_HASH_CONCURRENCY'),
+            queue_timeout=config.get('PASSWORD_HASH_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+        )
+
+    def _acquire(self) -> None:
+        if self._slots is not None and not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusy('Too many password checks in progress')
+
+    def _release(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured scheme and cost.
+
+        Raises:
+            HasherBusy: If no hashing slot became free in time
+        """
+        self._acquire()
+        try:
+            if self.scheme == 'bcrypt':
+                salt = bcrypt.gensalt(rounds=self.bcrypt_rounds)
+                return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+            salt = os.urandom(16)
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, self.pbkdf2_iterations)
+            return f'pbkdf2_sha256${self.pbkdf2_iterations}${_b64(salt)}${_b64(digest)}'
+        finally:
+            self._release()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """
+        Check a password against a stored hash of either scheme.
+
+        Raises:
+            HasherBusy: If no hashing slot became free in time
+        """
+        self._acquire()
+        try:
+            if hashed.startswith('pbkdf2_sha256$'):
+                _, iterations, salt, digest = hashed.split('$')
+                candidate = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _unb64(salt), int(iterations))
+                return hmac.compare_digest(candidate, _unb64(digest))
+            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        finally:
+            self._release()
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a stored hash was made with another scheme or cost than the configured one."""
+        if self.scheme == 'pbkdf2_sha256':
+            parts = hashed.split('$')
+            return parts[0] != 'pbkdf2_sha256' or parts[1] != str(self.pbkdf2_iterations)
+        # bcrypt hashes look like $2b$12$<salt and digest>
+        parts = hashed.split('$')
+        return len(parts) < 4 or not parts[1].startswith('2') or parts[2] != f'{self.bcrypt_rounds:02d}'
+
+# Reconfigured in place by init_app(), so modules may import it directly
+password_hasher = PasswordHasher()
+
+def init_app(app):
+    """Configure password hashing from PASSWORD_HASH_SCHEME and the cost settings."""
+    password_hasher.configure(app.config)
\ No newline at end of file
@@ -0,0 +1,216 @@
+from app import db
+from app.models import Accident, MediaFile
+from app.scoring.worker import risk_worker
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 480, 1280)  # Thumbnail, then mid-size previews
+DEFAULT_WORKERS = 2
+WEBP_QUALITY = 80
+
+# New image MediaFiles in the current transaction, handed to the worker on commit
+_PENDING_KEY = 'thumbnail_jobs'
+
+def variant_path(blob_path: str, width: int) -> str:
+    """Derivative of a stored blob, kept next to it so it shares the blob's lifetime."""
+    return f'{blob_path}.{width}.webp'
+
+def perceptual_hash(image) -> str:
+    """
+    64-bit difference hash of a Pillow image, as 16 hex digits.
+
+    Each bit says whether a pixel of the 9x8 grayscale thumbnail is brighter
+    than its right-hand neighbour, so re-encoding, resizing or small edits
+    only flip a few bits; compare hashes by Hamming distance.
+    """
+    from PIL import Image
+
+    pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            left = pixels[row * 9 + column]
+            value = (value << 1) | int(left > pixels[row * 9 + column + 1])
+    return f'{value:016x}'
+
+def process_image(upload_folder: str, blob_path: str, widths: Iterable[int]) -> Tuple[Dict[str, dict], str]:
+    """
+    Write WebP derivatives of an image at each width narrower than the original.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    Existing derivatives (the same bytes stored for another media row) are
+    reused. The original is always represented by at least its smallest
+    requested width, capped at the original size. The perceptual hash is
+    computed from the same decoded image.
+
+    Returns:
+        Tuple[Dict[str, dict], str]: {width: {'path', 'width', 'height', 'size'}} keyed by
+            str(width), and the image's perceptual hash
+    """
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(os.path.join(upload_folder, blob_path)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGB')
+
+        widths = sorted(set(widths))
+        targets = [w for w in widths if w < image.width] or [min(widths[0], image.width)]
+        for width in targets:
+            relative_path = variant_path(blob_path, width)
+            path = os.path.join(upload_folder, relative_path)
+            height = max(1, round(image.height * width / image.width))
+            if not os.path.exists(path):
+                resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+                temp = f'{path}.{os.getpid()}.tmp'
+                resized.save(temp, 'WEBP', quality=WEBP_QUALITY, method=4)
+                os.replace(temp, path)
+            variants[str(width)] = {
+                'path': relative_path,
+                'width': width,
+                'height': height,
+                'size': os.path.getsize(path)
+            }
+        return variants, perceptual_hash(image)
+
+def render_variants(upload_folder: str, blob_path: str, widths: Iterable[int]) -> Dict[str, dict]:
+    """WebP derivatives of an image only; see process_image()."""
+    return process_image(upload_folder, blob_path, widths)[0]
+
+class ThumbnailWorker:
+    """
+    Generates image derivatives off the request thread.
+
+    Jobs run in a process pool by default (Pillow resizing is CPU bound);
+    THUMBNAIL_EXECUTOR='thread' uses threads instead and 'sync' runs jobs
+    inline, which is meant for tests. Results are written to every
+    MediaFile row that shares the image's contents, and their accidents are
+    queued for re-scoring so the photos are checked for duplicates.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.widths = DEFAULT_WIDTHS
+        self.mode = 'process'
+        self.max_workers = DEFAULT_WORKERS
+        self._executor = None
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.widths = tuple(app.config.get('THUMBNAIL_WIDTHS', DEFAULT_WIDTHS))
+        self.mode = app.config.get('THUMBNAIL_EXECUTOR', 'process')
+        self.max_workers = app.config.get('THUMBNAIL_WORKERS', DEFAULT_WORKERS)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                pool = ProcessPoolExecutor if self.mode == 'process' else ThreadPoolExecutor
+                self._executor = pool(max_workers=self.max_workers)
+            return self._executor
+
+    def submit(self, sha256: str, blob_path: str) -> Optional[Future]:
+        """Queue derivative generation for a stored image."""
+        args = (self.app.config['UPLOAD_FOLDER'], blob_path, self.widths)
+        if self.mode == 'sync':
+            self._record(sha256, self._run_inline(*args))
+            return None
+        future = self._get_executor().submit(process_image, *args)
+        future.add_done_callback(lambda f: self._record(sha256, self._result(f)))
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    @staticmethod
+    def _run_inline(*args) -> Optional[Tuple[Dict[str, dict], str]]:
+        try:
+            return process_image(*args)
+        except Exception:
+            logger.exception('Thumbnail generation failed for %s', args[1])
+            return None
+
+    @staticmethod
+    def _result(future: Future) -> Optional[Tuple[Dict[str, dict], str]]:
+        try:
+            return future.result()
+        except Exception:
+            logger.exception('Thumbnail generation failed')
+            return None
+
+    def _record(self, sha256: str, result: Optional[Tuple[Dict[str, dict], str]]) -> None:
+        # An empty dict marks the image as processed, so a failure is not retried forever
+        variants, phash = result or ({}, None)
+        with self.app.app_context():
+            try:
+                MediaFile.query.filter_by(sha256=sha256).update(
+                    {'variants': variants, 'phash': phash}, synchronize_session=False
+                )
+                if phash:
+                    # Clearing the score hands the accidents back to the risk worker,
+                    # which also looks for earlier reports with a similar photo
+                    accident_ids = db.session.query(MediaFile.accident_id).filter_by(sha256=sha256)
+                    Accident.query.filter(Accident.id.in_(accident_ids)).update(
+                        {'risk_score': None}, synchronize_session=False
+                    )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception('Could not record thumbnails for %s', sha256)
+                return
+            finally:
+                db.session.remove()
+        if phash:
+            risk_worker.notify()
+
+thumbnail_worker = ThumbnailWorker()
+
+def _after_flush(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, MediaFile) and obj.file_type == 'image' and obj.sha256 and obj.variants is None:
+            session.info.setdefault(_PENDING_KEY, {})[obj.sha256] = obj.file_path
+
+def _after_commit(session):
+    for sha256, blob_path in session.info.pop(_PENDING_KEY, {}).items():
+        thumbnail_worker.submit(sha256, blob_path)
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def schedule(sha256: str, blob_path: str) -> None:
+    """Thumbnail a stored image once the current transaction commits; for rows inserted without the ORM."""
+    db.session.info.setdefault(_PENDING_KEY, {})[sha256] = blob_path
+
+def init_app(app):
+    """
+    Generate thumbnails for every image MediaFile once its row is committed.
+
+    Widths come from THUMBNAIL_WIDTHS; see ThumbnailWorker for the executor
+    settings.
+    """
+    thumbnail_worker.init_app(app)
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+def best_variant(media: MediaFile, width: int) -> Optional[dict]:
+    """The smallest derivative at least `width` pixels wide, else the largest one."""
+    variants = sorted((media.variants or {}).values(), key=lambda v: v['width'])
+    if not variants:
+        return None
+    for variant in variants:
+        if variant['width'] >= width:
+            return variant
+    return variants[-1]
\ No newline at end of file
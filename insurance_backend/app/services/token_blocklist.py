@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Optional
+import time
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import delete
+from app import db, jwt
+from app.models import RevokedToken
+
+DEFAULT_REFRESH = 5.0  # seconds between picking up revocations made by other processes
+DEFAULT_PRUNE_INTERVAL = 3600.0  # seconds between deleting expired rows
+DEFAULT_MAX_LIFETIME = 30 * 86400.0  # seconds a token without an expiry stays revoked
+# Rows are re-read this far behind the watermark, for transactions that
+# committed after a later one was already seen
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+class TokenBlocklist:
+    """
+    Process-wide set of revoked JWT ids, backed by the revoked_tokens table.
+
+    Checking a token is a dict lookup: the table is read once when the
+    first token is checked, and afterwards only for rows revoked since the
+    last read, at most once every `refresh` seconds. A token revoked in
+    this process is blocked here straight away; other processes block it
+    within `refresh` seconds. Entries are dropped from memory, and rows
+    from the table, once the token has expired.
+    """
+
+    def __init__(self, refresh: float = DEFAULT_REFRESH, prune_interval: float = DEFAULT_PRUNE_INTERVAL,
+                 max_lifetime: float = DEFAULT_MAX_LIFETIME):
+        self.refresh = refresh
+        self.prune_interval = prune_interval
+        self.max_lifetime = max_lifetime
+        self._revoked: Dict[str, datetime] = {}  # jti -> expires_at
+        self._watermark: Optional[datetime] = None  # Latest revoked_at read from the table
+        self._next_refresh = 0.0
+        self._next_prune = 0.0
+        self._lock = Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        """Whether the token with this `jti` was revoked. Needs an app context."""
+        if time.monotonic() >= self._next_refresh:
+            self.sync()
+        return jti in self._revoked
+
+    def sync(self) -> None:
+        """Read revocations made since the last sync and forget expired ones."""
+        now = datetime.utcnow()
+        query = db.session.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).filter(
+            RevokedToken.expires_at > now
+        )
+        watermark = self._watermark
+        if watermark is not None:
+            query = query.filter(RevokedToken.revoked_at >= watermark - REFRESH_OVERLAP)
+        rows = query.all()
+
+        with self._lock:
+            for jti, expires_at, revoked_at in rows:
+                self._revoked[jti] = expires_at
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            if self._watermark is None:
+                self._watermark = now
+            expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+            for jti in expired:
+                del self._revoked[jti]
+            self._next_refresh = time.monotonic() + self.refresh
+
+    def revoke(self, jti: str, token_type: str, user_id: Optional[int], expires_at: datetime) -> RevokedToken:
+        """
+        Revoke a token until it expires.
+
+        The row is added to the session (the caller commits) and the token
+        is blocked in this process at once. Expired rows are deleted in the
+        same transaction, at most once every `prune_interval` seconds.
+
+        Args:
+            jti (str): The token's `jti` claim
+            token_type (str): 'access' or 'refresh'
+            user_id (Optional[int]): The token's identity
+            expires_at (datetime): When the token expires (UTC)
+
+        Returns:
+            RevokedToken: The new row
+        """
+        token = RevokedToken(jti=jti, token_type=token_type, user_id=user_id, expires_at=expires_at)
+        db.session.add(token)
+        with self._lock:
+            self._revoked[jti] = expires_at
+        if time.monotonic() >= self._next_prune:
+            self.prune()
+        return token
+
+    def prune(self) -> int:
+        """Delete rows of tokens that have expired (the caller commits)."""
+        self._next_prune = time.monotonic() + self.prune_interval
+        result = db.session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()),
+            execution_options={'synchronize_session': False}
+        )
+        return result.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._watermark = None
+            self._next_refresh = 0.0
+            self._next_prune = 0.0
+
+    def stats(self) -> dict:
+        return {
+            'revoked': len(self._revoked),
+            'watermark': self._watermark.isoformat() if self._watermark else None
+        }
+
+    def __len__(self):
+        return len(self._revoked)
+
+token_blocklist = TokenBlocklist()
+
+def _token_in_blocklist(jwt_header, jwt_payload) -> bool:
+    return token_blocklist.is_revoked(jwt_payload['jti'])
+
+def init_app(app):
+    """Reject revoked tokens in every jwt_required() view."""
+    token_blocklist.clear()
+    token_blocklist.refresh = app.config.get('TOKEN_BLOCKLIST_REFRESH', DEFAULT_REFRESH)
+    token_blocklist.prune_interval = app.config.get('TOKEN_BLOCKLIST_PRUNE_INTERVAL', DEFAULT_PRUNE_INTERVAL)
+    token_blocklist.max_lifetime = app.config.get('TOKEN_BLOCKLIST_MAX_LIFETIME', DEFAULT_MAX_LIFETIME)
+    jwt.token_in_blocklist_loader(_token_in_blocklist)
+
+def revoke_current_token() -> RevokedToken:
+    """
+    Revoke the token the current request was made with (the caller commits). Requires verify_jwt_in_request().
+
+    A token issued without an expiry (JWT_*_TOKEN_EXPIRES=False) is kept
+    revoked for TOKEN_BLOCKLIST_MAX_LIFETIME seconds.
+    """
+    payload = get_jwt()
+    identity = get_jwt_identity()
+    if 'exp' in payload:
+        expires_at = datetime.utcfromtimestamp(payload['exp'])
+    else:
+        expires_at = datetime.utcnow() + timedelta(seconds=token_blocklist.max_lifetime)
+    return token_blocklist.revoke(
+        payload['jti'],
+        payload['type'],
+        int(identity) if identity is not None else None,
+        expires_at
+    )
\ No newline at end of file
@@ -0,0 +1,314 @@
+from app import db
+from app.models import Accident, Vehicle, MediaFile, Abstract, UploadSession, UploadStatus
+from app.services.media_store import MediaStore
+from flask import current_app
+from werkzeug.utils import secure_filename
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import BinaryIO, Optional, Tuple
+import hashlib
+import os
+import time
+import uuid
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # Well under MAX_CONTENT_LENGTH, so each chunk is one request
+DEFAULT_MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024
+COPY_BUFFER_SIZE = 64 * 1024
+DEFAULT_EXPIRY_HOURS = 24  # an unfinished upload idle this long is deleted
+SWEEP_INTERVAL = 3600.0  # seconds between sweeps of expired uploads started by create_upload()
+
+FILE_TYPES = {
+    'media': ('image', 'video'),
+    'abstract': ('pdf', 'image')
+}
+
+class UploadError(ValueError):
+    """An upload request that cannot be applied; carries the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+# Running SHA-256 per upload as (hashed up to offset, hash object). Rebuilt from
+# the partial file when missing, e.g. after a restart or on another worker.
+_hashers = {}
+_hashers_lock = Lock()
+_next_sweep = 0.0
+
+def _upload_root() -> str:
+    return current_app.config['UPLOAD_FOLDER']
+
+def _partial_path(upload: UploadSession) -> str:
+    return _partial_file(upload.id)
+
+def _partial_file(upload_id: str) -> str:
+    return os.path.join(_upload_root(), 'partial', f'{upload_id}.part')
+
+def _expiry_cutoff() -> datetime:
+    """Unfinished uploads last touched before this time have expired."""
+    hours = current_app.config.get('UPLOAD_EXPIRY_HOURS', DEFAULT_EXPIRY_HOURS)
+    return datetime.utcnow() - timedelta(hours=hours)
+
+def _check_not_expired(upload: UploadSession) -> None:
+    if upload.updated_at is not None and upload.updated_at < _expiry_cutoff():
+        raise UploadError('Upload has expired; start a new one', 410)
+
+def discard_partial_files(upload_ids) -> None:
+    """Remove the partial files and running hashes of uploads whose rows have been deleted."""
+    for upload_id in upload_ids:
+        try:
+            os.remove(_partial_file(upload_id))
+        except FileNotFoundError:
+            pass
+        with _hashers_lock:
+            _hashers.pop(upload_id, None)
+
+def _sweep_if_due() -> None:
+    global _next_sweep
+    now = time.monotonic()
+    with _hashers_lock:
+        if now < _next_sweep:
+            return
+        _next_sweep = now + SWEEP_INTERVAL
+    UploadService.expire_uploads()
+
+def _running_hash(upload: UploadSession):
+    """Hash of the first received_bytes of the upload, rebuilt from disk if needed."""
+    with _hashers_lock:
+        entry = _hashers.get(upload.id)
+    if entry is not None and entry[0] == upload.received_bytes:
+        return entry[1]
+
+    hasher = hashlib.sha256()
+    remaining = upload.received_bytes
+    with open(_partial_path(upload), 'rb') as f:
+        while remaining:
+            block = f.read(min(COPY_BUFFER_SIZE, remaining))
+            if not block:
+                raise UploadError('Partial upload is shorter than acknowledged', 500)
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+class UploadService:
+    @staticmethod
+    def create_upload(user_id: int, accident_id: int, target: str, file_type: str, filename: str,
+                      total_size: int, vehicle_id: Optional[int] = None) -> UploadSession:
+        """
+        Start a chunked upload for an accident.
+
+        Also deletes expired uploads, at most once every SWEEP_INTERVAL
+        seconds per process.
+
+        Args:
+            user_id (int): ID of the uploading user
+            accident_id (int): Accident the file belongs to
+            target (str): 'media' for a MediaFile, 'abstract' for the police abstract
+            file_type (str): 'image'/'video' for media, 'pdf'/'image' for abstracts
+            filename (str): Original file name
+            total_size (int): Size of the whole file in bytes
+            vehicle_id (Optional[int]): Vehicle shown in a media file
+
+        Returns:
+            UploadSession: The new session, with received_bytes = 0
+        """
+        _sweep_if_due()
+        if file_type not in FILE_TYPES.get(target, ()):
+            raise UploadError(f'Invalid file_type {file_type!r} for {target!r}')
+        max_size = current_app.config.get('UPLOAD_MAX_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+        if total_size <= 0 or total_size > max_size:
+            raise UploadError(f'total_size must be between 1 and {max_size} bytes', 413 if total_size > 0 else 400)
+        if db.session.get(Accident, accident_id) is None:
+            raise UploadError('Accident not found', 404)
+        if vehicle_id is not None:
+            vehicle = db.session.get(Vehicle, vehicle_id)
+            if vehicle is None or vehicle.accident_id != accident_id:
+                raise UploadError('Vehicle not found in this accident', 404)
+        if target == 'abstract' and Abstract.query.filter_by(accident_id=accident_id).first():
+            raise UploadError('Accident already has an abstract', 409)
+
+        upload = UploadSession(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            accident_id=accident_id,
+            vehicle_id=vehicle_id if target == 'media' else None,
+            target=target,
+            file_type=file_type,
+            filename=secure_filename(filename) or 'upload',
+            total_size=total_size,
+            chunk_size=current_app.config.get('UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+            received_bytes=0
+        )
+        path = _partial_path(upload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+
+        try:
+            db.session.add(upload)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            os.remove(path)
+            raise e
+        return upload
+
+    @staticmethod
+    def append_chunk(upload: UploadSession, offset: int, stream: BinaryIO, length: int) -> UploadSession:
+        """
+        Stream one chunk from `stream` to the partial file at `offset`.
+
+        The chunk is copied in small blocks and hashed as it is written, so
+        memory use does not depend on the chunk or file size. Only a chunk
+        starting at received_bytes is accepted; resending a chunk that was
+        already stored (its acknowledgement was lost) is a no-op.
+
+        Args:
+            upload (UploadSession): The upload to append to
+            offset (int): Byte offset of the chunk in the file
+            stream (BinaryIO): Request body
+            length (int): Chunk size in bytes (the request's Content-Length)
+
+        Returns:
+            UploadSession: The upload with received_bytes advanced
+        """
+        if upload.status != UploadStatus.IN_PROGRESS:
+            raise UploadError('Upload is already complete', 409)
+        _check_not_expired(upload)
+        if length <= 0 or offset < 0 or offset + length > upload.total_size:
+            raise UploadError('Chunk lies outside the file')
+        if offset + length <= upload.received_bytes:
+            return upload
+        if offset != upload.received_bytes:
+            raise UploadError(f'Expected a chunk at offset {upload.received_bytes}', 409)
+
+        hasher = _running_hash(upload).copy()
+        written = 0
+        with open(_partial_path(upload), 'r+b') as f:
+            # Drop whatever an interrupted earlier attempt left past the acknowledged offset
+            f.seek(offset)
+            f.truncate()
+            while written < length:
+                block = stream.read(min(COPY_BUFFER_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                hasher.update(block)
+                written += len(block)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if written != length:
+            raise UploadError(f'Chunk ended after {written} of {length} bytes; resend it')
+
+        # Conditional update, so a concurrent retry of the same chunk cannot be counted twice
+        updated = UploadSession.query.filter_by(id=upload.id, received_bytes=offset).update(
+            {'received_bytes': offset + length}, synchronize_session=False
+        )
+        db.session.commit()
+        db.session.refresh(upload)
+        if updated:
+            with _hashers_lock:
+                _hashers[upload.id] = (upload.received_bytes, hasher)
+        return upload
+
+    @staticmethod
+    def complete_upload(upload: UploadSession, sha256: Optional[str] = None) -> Tuple[UploadSession, object]:
+        """
+        Finish an upload: add the file to the media store and create its MediaFile or Abstract.
+
+        Completing an already completed upload returns the existing record.
+
+        Args:
+            upload (UploadSession): The upload to finish
+            sha256 (Optional[str]): Client-side hex digest to check the file against
+
+        Returns:
+            Tuple[UploadSession, object]: (upload, created MediaFile or Abstract)
+        """
+        model = MediaFile if upload.target == 'media' else Abstract
+        if upload.status == UploadStatus.COMPLETED:
+            return upload, db.session.get(model, upload.result_id)
+        _check_not_expired(upload)
+        if upload.received_bytes != upload.total_size:
+            raise UploadError(f'Upload is incomplete: {upload.received_bytes} of {upload.total_size} bytes', 409)
+
+        digest = _running_hash(upload).hexdigest()
+        if sha256 and sha256.lower() != digest:
+            raise UploadError('Checksum mismatch', 422)
+
+        partial_path = _partial_path(upload)
+        try:
+            blob = MediaStore.put_file(partial_path, digest)
+            if upload.target == 'media':
+                record = MediaFile(
+                    accident_id=upload.accident_id,
+                    vehicle_id=upload.vehicle_id,
+                    file_type=upload.file_type,
+                    file_path=blob.path,
+                    file_size=upload.total_size,
+                    sha256=digest
+                )
+            else:
+                record = Abstract(
+                    accident_id=upload.accident_id,
+                    file_path=blob.path,
+                    file_type=upload.file_type,
+                    file_size=upload.total_size,
+                    uploaded_by=upload.user_id,
+                    sha256=digest
+                )
+            db.session.add(record)
+            db.session.flush()
+            upload.status = UploadStatus.COMPLETED
+            upload.sha256 = digest
+            upload.result_id = record.id
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+        # The store holds its own link (or already had these bytes), so the partial file can go
+        os.remove(partial_path)
+        with _hashers_lock:
+            _hashers.pop(upload.id, None)
+        return upload, record
+
+    @staticmethod
+    def expire_uploads(batch_size: int = 100) -> int:
+        """
+        Delete unfinished uploads idle for more than UPLOAD_EXPIRY_HOURS, with their partial files.
+
+        Each row is deleted only if it is still idle, so a chunk that
+        arrives during the sweep keeps its upload alive.
+
+        Args:
+            batch_size (int): Uploads to delete per transaction
+
+        Returns:
+            int: Number of uploads deleted
+        """
+        cutoff = _expiry_cutoff()
+        stale = UploadSession.query.filter(
+            UploadSession.status == UploadStatus.IN_PROGRESS, UploadSession.updated_at < cutoff
+        )
+        expired = 0
+        while True:
+            upload_ids = [row.id for row in stale.with_entities(UploadSession.id).limit(batch_size)]
+            if not upload_ids:
+                break
+
+            deleted = []
+            try:
+                for upload_id in upload_ids:
+                    if stale.filter(UploadSession.id == upload_id).delete(synchronize_session=False):
+                        deleted.append(upload_id)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                raise e
+
+            discard_partial_files(deleted)
+            expired += len(deleted)
+            if len(upload_ids) < batch_size:
+                break
+        return expired
\ No newline at end of file
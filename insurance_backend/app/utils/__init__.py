@@ -1,3 +1,4 @@
 from app.utils.auth_middleware import role_required
+from app.utils.user_cache import get_current_user, get_current_user_snapshot, invalidate_user
 
-__all__ = ['role_required'] 
\ No newline at end of file
+__all__ = ['role_required', 'get_current_user', 'get_current_user_snapshot', 'invalidate_user']
\ No newline at end of file
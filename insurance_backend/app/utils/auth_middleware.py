@@ -1,7 +1,8 @@
 from functools import wraps
 from flask import jsonify, request
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from app.models import User, UserRole
+from flask_jwt_extended import verify_jwt_in_request
+from app.models import UserRole
+from app.utils.user_cache import get_current_user_snapshot
 
 def role_required(roles):
     """
@@ -17,18 +18,15 @@ def role_required(roles):
         @wraps(fn)
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = get_current_user_snapshot()
             
             if not user or not user.is_active:
                 return jsonify({'error': 'Invalid or inactive user'}), 401
             
-            if isinstance(roles, list):
-                if user.role.value not in [role.value for role in roles]:
-                    return jsonify({'error': 'Insufficient permissions'}), 403
-            else:
-                if user.role != roles:
-                    return jsonify({'error': 'Insufficient permissions'}), 403
+            # Roles may be given as UserRole members or their string values
+            allowed = roles if isinstance(roles, (list, tuple, set)) else [roles]
+            if user.role.value not in [getattr(role, 'value', role) for role in allowed]:
+                return jsonify({'error': 'Insufficient permissions'}), 403
             
             return fn(*args, **kwargs)
         return wrapper
@@ -46,8 +44,7 @@ def company_required():
         @wraps(fn)
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = get_current_user_snapshot()
             
             if not user or not user.is_active:
                 return jsonify({'error': 'Invalid or inactive user'}), 401
@@ -80,8 +77,7 @@ def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user_snapshot()
         
         if not user or not user.is_active:
             return jsonify({'error': 'Invalid or inactive user'}), 401
@@ -102,8 +98,7 @@ def police_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = get_current_user_snapshot()
         
         if not user or not user.is_active:
             return jsonify({'error': 'Invalid or inactive user'}), 401
@@ -0,0 +1,50 @@
+from flask import current_app, send_file
+from typing import Optional
+from urllib.parse import quote
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+import mimetypes
+import os
+
+def send_stored_file(relative_path: str, download_name: str, as_attachment: bool = False,
+                     mimetype: Optional[str] = None, max_age: int = 0):
+    """
+    Respond with a file stored under UPLOAD_FOLDER.
+
+    Range requests, ETag/If-None-Match and If-Modified-Since are answered
+    by werkzeug from the file's size and mtime, and the body goes through
+    wsgi.file_wrapper (sendfile() under gunicorn). With SENDFILE_MODE set to
+    'x-accel' (nginx) or 'x-sendfile' (Apache, lighttpd) only headers are
+    returned and the front proxy streams the file.
+
+    Args:
+        relative_path (str): Path relative to UPLOAD_FOLDER
+        download_name (str): File name offered to the client
+        as_attachment (bool): Ask the browser to save rather than display the file
+        mimetype (Optional[str]): Content type, guessed from download_name if omitted
+        max_age (int): Private cache lifetime in seconds
+
+    Returns:
+        Response: The file response
+    """
+    path = safe_join(current_app.config['UPLOAD_FOLDER'], relative_path)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+    mimetype = mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+    if current_app.config.get('SENDFILE_MODE') == 'x-accel':
+        response = current_app.response_class(mimetype=mimetype)
+        prefix = current_app.config.get('SENDFILE_ACCEL_PREFIX', '/protected-uploads/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative_path)
+        if as_attachment:
+            response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    else:
+        # send_file emits X-Sendfile when USE_X_SENDFILE is on (SENDFILE_MODE='x-sendfile')
+        response = send_file(path, mimetype=mimetype, as_attachment=as_attachment,
+                             download_name=download_name, conditional=True, etag=True)
+        response.accept_ranges = 'bytes'
+
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    return response
\ No newline at end of file
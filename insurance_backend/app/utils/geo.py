@@ -0,0 +1,117 @@
+from typing import List, Optional, Tuple
+import math
+import numpy as np
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9  # Stored cells are about 4.8 m x 4.8 m
+MAX_COVERING_CELLS = 16
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.195
+
+# Sorts after every geohash character, so [prefix, prefix + '{') is a prefix range
+PREFIX_END = '{'
+
+def _bits(precision: int) -> Tuple[int, int]:
+    """(latitude bits, longitude bits) of a geohash; longitude gets the odd bit."""
+    bits = 5 * precision
+    return bits // 2, (bits + 1) // 2
+
+def _index(value, low: float, span: float, bits: int):
+    """Cell index of a coordinate along one axis (works on scalars and arrays)."""
+    cells = 1 << bits
+    index = np.floor((np.asarray(value, dtype='float64') - low) / span * cells).astype('int64')
+    return np.clip(index, 0, cells - 1)
+
+def cell_indexes(latitude, longitude, precision: int):
+    """Row and column of the geohash cell containing each point, at `precision` characters."""
+    lat_bits, lon_bits = _bits(precision)
+    return _index(latitude, -90.0, 180.0, lat_bits), _index(longitude, -180.0, 360.0, lon_bits)
+
+def cell_geohash(lat_index: int, lon_index: int, precision: int) -> str:
+    """Geohash of the cell at (row, column); bits alternate longitude, latitude."""
+    lat_bits, lon_bits = _bits(precision)
+    value = 0
+    for bit in range(5 * precision):
+        if bit % 2 == 0:
+            lon_bits -= 1
+            value = (value << 1) | ((int(lon_index) >> lon_bits) & 1)
+        else:
+            lat_bits -= 1
+            value = (value << 1) | ((int(lat_index) >> lat_bits) & 1)
+    return ''.join(BASE32[(value >> (5 * (precision - 1 - i))) & 31] for i in range(precision))
+
+def encode_geohash(latitude: Optional[float], longitude: Optional[float], precision: int = GEOHASH_PRECISION) -> Optional[str]:
+    """Geohash of a point, or None when either coordinate is missing."""
+    if latitude is None or longitude is None:
+        return None
+    lat_index, lon_index = cell_indexes(latitude, longitude, precision)
+    return cell_geohash(lat_index, lon_index, precision)
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) edges of a geohash cell."""
+    value = 0
+    for char in geohash:
+        value = (value << 5) | BASE32.index(char)
+    lat_bits, lon_bits = _bits(len(geohash))
+    lat_index = lon_index = 0
+    for bit in range(5 * len(geohash)):
+        set_bit = (value >> (5 * len(geohash) - 1 - bit)) & 1
+        if bit % 2 == 0:
+            lon_index = (lon_index << 1) | set_bit
+        else:
+            lat_index = (lat_index << 1) | set_bit
+    height, width = 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+    south, west = -90.0 + lat_index * height, -180.0 + lon_index * width
+    return south, west, south + height, west + width
+
+def cell_keys(latitude, longitude, precision: int) -> np.ndarray:
+    """Geohash cells of arrays of points as integers (the geohash bits), for grouping with NumPy."""
+    rows, cols = cell_indexes(latitude, longitude, precision)
+    return (rows << _bits(precision)[1]) | cols
+
+def key_geohash(key: int, precision: int) -> str:
+    """Geohash of a cell key returned by cell_keys()."""
+    lon_bits = _bits(precision)[1]
+    return cell_geohash(int(key) >> lon_bits, int(key) & ((1 << lon_bits) - 1), precision)
+
+def covering_cells_for_bounds(south: float, west: float, north: float, east: float,
+                              max_cells: int = MAX_COVERING_CELLS) -> List[str]:
+    """
+    Geohash prefixes whose cells together cover a bounding box.
+
+    Uses the longest prefix length at which the box spans at most
+    `max_cells` cells, so each prefix is one index range scan and little
+    beyond the box is read.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        rows, cols = cell_indexes([south, north], [west, east], precision)
+        if (rows[1] - rows[0] + 1) * (cols[1] - cols[0] + 1) <= max_cells or precision == 1:
+            return [
+                cell_geohash(row, col, precision)
+                for row in range(rows[0], rows[1] + 1)
+                for col in range(cols[0], cols[1] + 1)
+            ]
+
+def covering_cells(latitude: float, longitude: float, radius_km: float,
+                   max_cells: int = MAX_COVERING_CELLS) -> List[str]:
+    """Geohash prefixes covering a circle; boxes crossing the antimeridian are clipped at it."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return covering_cells_for_bounds(
+        max(latitude - lat_delta, -90.0), max(longitude - lon_delta, -180.0),
+        min(latitude + lat_delta, 90.0), min(longitude + lon_delta, 180.0),
+        max_cells
+    )
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance between two points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+def distances_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Haversine distances from one point to arrays of points."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
\ No newline at end of file
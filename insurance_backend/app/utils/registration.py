@@ -0,0 +1,8 @@
+import re
+from typing import Optional
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+
+def normalize_registration(registration_number: Optional[str]) -> str:
+    """'kbx 123a', 'KBX-123A' and 'KBX123A' all become 'KBX123A'."""
+    return _NON_ALNUM.sub('', (registration_number or '').upper())
\ No newline at end of file
@@ -0,0 +1,115 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Optional
+import time
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from app import db
+from app.models import User
+
+# The fields the authorization decorators need; cheap to cache and to load
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'role', 'is_active', 'company_id'])
+
+DEFAULT_TTL = 60  # seconds
+DEFAULT_MAX_SIZE = 1024
+
+class UserSnapshotCache:
+    """
+    Bounded, process-wide LRU cache of user snapshots with a time-to-live.
+
+    Entries are dropped explicitly when a user changes (see invalidate) and
+    expire after `ttl` seconds regardless, which bounds how stale another
+    worker process can be, since invalidation is local to this process.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, user_id: int) -> Optional[UserSnapshot]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            snapshot, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return snapshot
+
+    def set(self, snapshot: UserSnapshot) -> None:
+        with self._lock:
+            self._entries[snapshot.id] = (snapshot, time.monotonic() + self.ttl)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+user_cache = UserSnapshotCache()
+
+def init_app(app):
+    """Configure the process-wide cache from USER_CACHE_TTL and USER_CACHE_MAX_SIZE."""
+    user_cache.ttl = app.config.get('USER_CACHE_TTL', DEFAULT_TTL)
+    user_cache.max_size = app.config.get('USER_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+def _current_user_id() -> Optional[int]:
+    identity = get_jwt_identity()
+    return int(identity) if identity is not None else None
+
+def get_current_user_snapshot() -> Optional[UserSnapshot]:
+    """
+    Return the role/status snapshot of the user behind the current JWT.
+
+    Resolved at most once per request (memoized on flask.g) and served from
+    the process-wide cache when possible, so it usually costs no query.
+    Requires verify_jwt_in_request() to have run.
+    """
+    if 'user_snapshot' in g:
+        return g.user_snapshot
+
+    user_id = _current_user_id()
+    snapshot = user_cache.get(user_id) if user_id is not None else None
+    if snapshot is None and user_id is not None:
+        if 'current_user' in g and g.current_user is not None:
+            user = g.current_user
+            row = (user.id, user.role, user.is_active, user.company_id)
+        else:
+            row = db.session.query(User.id, User.role, User.is_active, User.company_id).filter(
+                User.id == user_id
+            ).first()
+        if row is not None:
+            snapshot = UserSnapshot(*row)
+            user_cache.set(snapshot)
+
+    g.user_snapshot = snapshot
+    return snapshot
+
+def get_current_user() -> Optional[User]:
+    """
+    Return the full User behind the current JWT, loaded once per request.
+
+    Requires verify_jwt_in_request() to have run.
+    """
+    if 'current_user' not in g:
+        user_id = _current_user_id()
+        g.current_user = db.session.get(User, user_id) if user_id is not None else None
+    return g.current_user
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user's cached snapshot after their role, status or company changes."""
+    user_cache.invalidate(user_id)
+    if 'user_snapshot' in g and g.user_snapshot is not None and g.user_snapshot.id == user_id:
+        g.pop('user_snapshot')
\ No newline at end of file
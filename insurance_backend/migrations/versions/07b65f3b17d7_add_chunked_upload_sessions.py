@@ -0,0 +1,58 @@
+"""add chunked upload sessions
+
+Revision ID: 07b65f3b17d7
+Revises: 87c3cac7b8a3
+Create Date: 2026-10-18 17:18:37.501151
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '07b65f3b17d7'
+down_revision = '87c3cac7b8a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_sessions',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('accident_id', sa.Integer(), nullable=False),
+        sa.Column('vehicle_id', sa.Integer(), nullable=True),
+        sa.Column('target', sa.String(length=10), nullable=False),
+        sa.Column('file_type', sa.String(length=10), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('total_size', sa.BigInteger(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('received_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.Enum('IN_PROGRESS', 'COMPLETED', name='uploadstatus'), nullable=False),
+        sa.Column('result_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['accident_id'], ['accidents.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    with op.batch_alter_table('media_files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('file_size', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+
+    with op.batch_alter_table('abstracts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('abstracts', schema=None) as batch_op:
+        batch_op.drop_column('sha256')
+
+    with op.batch_alter_table('media_files', schema=None) as batch_op:
+        batch_op.drop_column('sha256')
+        batch_op.drop_column('file_size')
+
+    op.drop_table('upload_sessions')
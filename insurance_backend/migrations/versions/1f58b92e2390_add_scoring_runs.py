@@ -0,0 +1,33 @@
+"""add scoring runs
+
+Revision ID: 1f58b92e2390
+Revises: 679bdb5f7abc
+Create Date: 2026-10-18 17:29:21.221960
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f58b92e2390'
+down_revision = '679bdb5f7abc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scoring_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('last_accident_id', sa.Integer(), nullable=False),
+        sa.Column('rows_scored', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('scoring_runs')
@@ -0,0 +1,79 @@
+"""add duplicate report index
+
+Revision ID: 5daa13947e65
+Revises: 1f58b92e2390
+Create Date: 2026-10-18 17:33:28.618609
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5daa13947e65'
+down_revision = '1f58b92e2390'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('duplicate_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('accident_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('phash', sa.String(length=16), nullable=True),
+        sa.ForeignKeyConstraint(['accident_id'], ['accidents.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('accident_id', 'key', name='uq_duplicate_keys_accident_id_key')
+    )
+    with op.batch_alter_table('duplicate_keys', schema=None) as batch_op:
+        batch_op.create_index('ix_duplicate_keys_key_accident_id', ['key', 'accident_id'], unique=False)
+
+    op.create_table('duplicate_matches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('accident_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_of_id', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=20), nullable=False),
+        sa.Column('detail', sa.String(length=200), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['accident_id'], ['accidents.id'], ),
+        sa.ForeignKeyConstraint(['duplicate_of_id'], ['accidents.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('accident_id', 'duplicate_of_id', 'reason',
+                            name='uq_duplicate_matches_accident_id_duplicate_of_id_reason')
+    )
+    with op.batch_alter_table('duplicate_matches', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_duplicate_matches_accident_id'), ['accident_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_duplicate_matches_duplicate_of_id'), ['duplicate_of_id'], unique=False)
+
+    with op.batch_alter_table('media_files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('phash', sa.String(length=16), nullable=True))
+        batch_op.create_index(batch_op.f('ix_media_files_accident_id'), ['accident_id'], unique=False)
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicles_accident_id'), ['accident_id'], unique=False)
+
+    with op.batch_alter_table('review_notes', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('review_notes', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicles_accident_id'))
+
+    with op.batch_alter_table('media_files', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_files_accident_id'))
+        batch_op.drop_column('phash')
+
+    with op.batch_alter_table('duplicate_matches', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_duplicate_matches_duplicate_of_id'))
+        batch_op.drop_index(batch_op.f('ix_duplicate_matches_accident_id'))
+
+    op.drop_table('duplicate_matches')
+    with op.batch_alter_table('duplicate_keys', schema=None) as batch_op:
+        batch_op.drop_index('ix_duplicate_keys_key_accident_id')
+
+    op.drop_table('duplicate_keys')
\ No newline at end of file
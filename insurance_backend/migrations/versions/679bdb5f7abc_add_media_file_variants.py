@@ -0,0 +1,26 @@
+"""add media file variants
+
+Revision ID: 679bdb5f7abc
+Revises: b52d3d226de6
+Create Date: 2026-10-18 17:23:18.349590
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '679bdb5f7abc'
+down_revision = 'b52d3d226de6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('media_files', schema=None) as batch_op:
+        batch_op.drop_column('variants')
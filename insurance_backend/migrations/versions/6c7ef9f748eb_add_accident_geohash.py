@@ -0,0 +1,43 @@
+"""add accident geohash
+
+Revision ID: 6c7ef9f748eb
+Revises: 5daa13947e65
+Create Date: 2026-10-18 17:44:00.431983
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.geo import encode_geohash
+
+
+# revision identifiers, used by Alembic.
+revision = '6c7ef9f748eb'
+down_revision = '5daa13947e65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+        batch_op.create_index(batch_op.f('ix_accidents_geohash'), ['geohash'], unique=False)
+
+    # Backfill accidents that already have coordinates
+    accidents = sa.table('accidents', sa.column('id', sa.Integer), sa.column('latitude', sa.Float),
+                         sa.column('longitude', sa.Float), sa.column('geohash', sa.String))
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(accidents.c.id, accidents.c.latitude, accidents.c.longitude).where(
+        accidents.c.latitude.isnot(None), accidents.c.longitude.isnot(None)
+    )).all()
+    if rows:
+        connection.execute(
+            accidents.update().where(accidents.c.id == sa.bindparam('accident_id')).values(geohash=sa.bindparam('cell')),
+            [{'accident_id': row.id, 'cell': encode_geohash(row.latitude, row.longitude)} for row in rows]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_accidents_geohash'))
+        batch_op.drop_column('geohash')
\ No newline at end of file
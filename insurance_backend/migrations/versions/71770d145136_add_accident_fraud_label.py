@@ -0,0 +1,31 @@
+"""add accident fraud label
+
+Revision ID: 71770d145136
+Revises: 317b492114cb
+Create Date: 2026-10-18 18:21:54.728979
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71770d145136'
+down_revision = '317b492114cb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing flags were set by the scorer, not by reviewers, so nothing is labelled yet
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fraud_label', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('reviewed_by', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_accidents_reviewed_by_users', 'users', ['reviewed_by'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_accidents_reviewed_by_users', type_='foreignkey')
+        batch_op.drop_column('reviewed_by')
+        batch_op.drop_column('fraud_label')
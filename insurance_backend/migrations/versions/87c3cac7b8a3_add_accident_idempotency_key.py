@@ -0,0 +1,28 @@
+"""add accident idempotency key
+
+Revision ID: 87c3cac7b8a3
+Revises: 943f046daed7
+Create Date: 2026-10-18 17:14:56.323323
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '87c3cac7b8a3'
+down_revision = '943f046daed7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_accidents_officer_id_idempotency_key', ['officer_id', 'idempotency_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_accidents_officer_id_idempotency_key', type_='unique')
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,36 @@
+"""add accident listing indexes
+
+Revision ID: 943f046daed7
+Revises: 
+Create Date: 2026-10-18 17:06:25.801955
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '943f046daed7'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.create_index('ix_accidents_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_accidents_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_accidents_officer_id_created_at_id', ['officer_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.create_index('ix_vehicles_registration_number_accident_id', ['registration_number', 'accident_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index('ix_vehicles_registration_number_accident_id')
+
+    with op.batch_alter_table('accidents', schema=None) as batch_op:
+        batch_op.drop_index('ix_accidents_officer_id_created_at_id')
+        batch_op.drop_index('ix_accidents_status_created_at_id')
+        batch_op.drop_index('ix_accidents_created_at_id')
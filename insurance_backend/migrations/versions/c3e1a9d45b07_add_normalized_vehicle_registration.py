@@ -0,0 +1,44 @@
+"""add normalized vehicle registration
+
+Revision ID: c3e1a9d45b07
+Revises: 71770d145136
+Create Date: 2026-10-18 21:04:37.512318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e1a9d45b07'
+down_revision = '71770d145136'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('normalized_registration', sa.String(length=20), nullable=True))
+
+    # Backfill with the same rule as app.utils.registration.normalize_registration
+    vehicles = sa.table('vehicles',
+        sa.column('registration_number', sa.String),
+        sa.column('normalized_registration', sa.String)
+    )
+    connection = op.get_bind()
+    for (registration_number,) in connection.execute(sa.select(vehicles.c.registration_number).distinct()).fetchall():
+        connection.execute(
+            vehicles.update()
+            .where(vehicles.c.registration_number == registration_number)
+            .values(normalized_registration=re.sub(r'[^A-Z0-9]', '', registration_number.upper()))
+        )
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.create_index('ix_vehicles_normalized_registration_accident_id', ['normalized_registration', 'accident_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_index('ix_vehicles_normalized_registration_accident_id')
+        batch_op.drop_column('normalized_registration')
@@ -0,0 +1,138 @@
+"""
+Duplicate lookup latency as the accidents table grows.
+
+Fills a throwaway SQLite database with synthetic accidents (one vehicle
+each, a photo hash on every fourth) and, at each size, times
+DuplicateDetector.check() for a single new report against a scan that
+compares normalized registration numbers row by row.
+
+    python tests/benchmark_duplicates.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import func, insert, text
+from app import create_app, db
+from app.models import User, UserRole, Accident, Vehicle, DuplicateKey
+from app.scoring.duplicates import DuplicateDetector, geo_cell, image_keys, normalize_registration, time_bucket, vehicle_key
+
+START = datetime(2023, 1, 1)
+INSERT_CHUNK = 20000
+
+def random_plate(rng):
+    letters = 'ABCDEFGHJKLMNPQRSTUVWXYZ'
+    return f'K{rng.choice(letters)}{rng.choice(letters)} {rng.randint(0, 999):03d}{rng.choice(letters)}'
+
+def random_accident(rng, number, officer_id):
+    return {
+        'report_number': f'ACC-B{number:09d}',
+        'officer_id': officer_id,
+        'location': 'Nairobi',
+        'latitude': -1.29 + rng.uniform(-0.3, 0.3),
+        'longitude': 36.82 + rng.uniform(-0.3, 0.3),
+        'accident_date': START + timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+        'created_at': datetime.utcnow(),
+        'risk_score': 0.0
+    }
+
+def grow(rng, officer_id, start, stop):
+    """Insert accidents start..stop-1 with their vehicles and duplicate keys, bypassing the ORM."""
+    for chunk_start in range(start, stop, INSERT_CHUNK):
+        numbers = range(chunk_start, min(chunk_start + INSERT_CHUNK, stop))
+        accidents = [random_accident(rng, number, officer_id) for number in numbers]
+        ids = list(db.session.execute(
+            insert(Accident).returning(Accident.id), accidents
+        ).scalars())
+        vehicles, keys = [], []
+        for accident_id, accident in zip(sorted(ids), accidents):
+            plate = random_plate(rng)
+            vehicles.append({'accident_id': accident_id, 'registration_number': plate, 'make': 'Toyota',
+                             'model': 'Axio', 'color': 'White'})
+            cell = geo_cell(accident['latitude'], accident['longitude'])
+            keys.append({'accident_id': accident_id, 'phash': None,
+                         'key': vehicle_key(normalize_registration(plate), time_bucket(accident['accident_date']), cell)})
+            if accident_id % 4 == 0:
+                phash = f'{rng.getrandbits(64):016x}'
+                keys.extend({'accident_id': accident_id, 'key': key, 'phash': phash} for key in image_keys(phash))
+        db.session.execute(insert(Vehicle), vehicles)
+        db.session.execute(insert(DuplicateKey), keys, execution_options={'render_nulls': True})
+        db.session.commit()
+
+def time_lookups(rng, officer_id, rounds):
+    """Median and p95 milliseconds of check() and of a plate scan for one new report."""
+    detector = DuplicateDetector()
+    indexed, scanned = [], []
+    for round_number in range(rounds):
+        accident = Accident(**random_accident(rng, 900000000 + round_number, officer_id))
+        db.session.add(accident)
+        db.session.flush()
+        plate = random_plate(rng)
+        db.session.add(Vehicle(accident_id=accident.id, registration_number=plate, make='Toyota',
+                               model='Axio', color='White'))
+        db.session.flush()
+
+        started = time.perf_counter()
+        detector.check([accident.id])
+        indexed.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        db.session.query(Vehicle.accident_id).filter(
+            func.upper(func.replace(func.replace(Vehicle.registration_number, ' ', ''), '-', ''))
+            == normalize_registration(plate)
+        ).all()
+        scanned.append((time.perf_counter() - started) * 1000)
+        db.session.rollback()
+
+    def summary(samples):
+        samples = sorted(samples)
+        return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+    return summary(indexed), summary(scanned)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        config = type('BenchmarkConfig', (), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(folder, "benchmark.db")}',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'SECRET_KEY': 'benchmark',
+            'JWT_SECRET_KEY': 'benchmark',
+            'UPLOAD_FOLDER': folder,
+            'RISK_SCORING_MODE': 'off',
+            'THUMBNAIL_EXECUTOR': 'sync'
+        })
+        app = create_app(config)
+        rng = random.Random(args.seed)
+        with app.app_context():
+            db.create_all()
+            officer = User(email='bench@police.go.ke', password='Bench@123', name='Bench', role=UserRole.POLICE)
+            db.session.add(officer)
+            db.session.commit()
+            db.session.execute(text('ANALYZE'))
+
+            print(f'{"accidents":>10}  {"index p50":>10}  {"index p95":>10}  {"scan p50":>10}  {"scan p95":>10}')
+            size = 0
+            for target in sorted(args.sizes):
+                grow(rng, officer.id, size, target)
+                size = target
+                db.session.execute(text('ANALYZE'))
+                (index_p50, index_p95), (scan_p50, scan_p95) = time_lookups(rng, officer.id, args.rounds)
+                print(f'{size:>10}  {index_p50:>8.2f}ms  {index_p95:>8.2f}ms  {scan_p50:>8.2f}ms  {scan_p95:>8.2f}ms',
+                      flush=True)
+            db.session.remove()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
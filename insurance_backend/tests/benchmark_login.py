@@ -0,0 +1,97 @@
+"""
+Login throughput at each password hashing cost.
+
+For every level, times AuthService.authenticate_user() (user lookup plus
+hash check against a throwaway SQLite database) on one core, then runs
+hash checks on every core at once to show what each core sustains when
+a login burst keeps them all busy.
+
+    python tests/benchmark_login.py --levels bcrypt:10 bcrypt:12 pbkdf2_sha256:600000
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app, db
+from app.models import User, UserRole
+from app.services.auth_service import AuthService
+from app.services.passwords import PasswordHasher, password_hasher
+
+PASSWORD = 'Bench@123'
+DEFAULT_LEVELS = ['bcrypt:10', 'bcrypt:11', 'bcrypt:12', 'bcrypt:13',
+                  'pbkdf2_sha256:300000', 'pbkdf2_sha256:600000']
+
+def level_config(level):
+    scheme, cost = level.split(':')
+    if scheme == 'bcrypt':
+        return {'PASSWORD_HASH_SCHEME': scheme, 'PASSWORD_BCRYPT_ROUNDS': int(cost)}
+    return {'PASSWORD_HASH_SCHEME': scheme, 'PASSWORD_PBKDF2_ITERATIONS': int(cost)}
+
+def verify_for(args):
+    """Worker process: count hash checks completed within `seconds`."""
+    level, hashed, seconds = args
+    hasher = PasswordHasher()
+    hasher.configure(level_config(level))
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        hasher.verify(PASSWORD, hashed)
+        count += 1
+    return count
+
+def time_logins(email, rounds):
+    """Milliseconds per authenticate_user() call."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        assert AuthService.authenticate_user(email, PASSWORD) is not None
+        samples.append((time.perf_counter() - started) * 1000)
+        db.session.rollback()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--levels', nargs='+', default=DEFAULT_LEVELS, help='scheme:cost, e.g. bcrypt:12')
+    parser.add_argument('--rounds', type=int, default=20, help='single-core logins per level')
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration of the all-cores run')
+    parser.add_argument('--cores', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        config = type('BenchmarkConfig', (), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(folder, "benchmark.db")}',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'SECRET_KEY': 'benchmark',
+            'JWT_SECRET_KEY': 'benchmark',
+            'UPLOAD_FOLDER': folder,
+            'RISK_SCORING_MODE': 'off',
+            'THUMBNAIL_EXECUTOR': 'sync'
+        })
+        app = create_app(config)
+        with app.app_context(), multiprocessing.Pool(args.cores) as pool:
+            db.create_all()
+            print(f'{"level":<22}  {"login p50":>10}  {"login p95":>10}  {"1 core":>10}  '
+                  f'{"per core":>10}  {"all cores":>10}   ({args.cores} cores)')
+            for number, level in enumerate(args.levels):
+                password_hasher.configure(level_config(level))
+                email = f'bench{number}@police.go.ke'
+                user = User(email=email, password=PASSWORD, name='Bench', role=UserRole.POLICE)
+                db.session.add(user)
+                db.session.commit()
+
+                samples = sorted(time_logins(email, args.rounds))
+                p50, p95 = statistics.median(samples), samples[max(int(len(samples) * 0.95) - 1, 0)]
+                counts = pool.map(verify_for, [(level, user.password_hash, args.seconds)] * args.cores)
+                per_core = sum(counts) / args.cores / args.seconds
+                print(f'{level:<22}  {p50:>8.1f}ms  {p95:>8.1f}ms  {1000 / p50:>8.1f}/s  '
+                      f'{per_core:>8.1f}/s  {per_core * args.cores:>8.1f}/s', flush=True)
+            db.session.remove()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Per-request cost of checking tokens against the revocation list.
+
+Fills revoked_tokens in a throwaway SQLite database, then times the
+blocklist check on its own and verify_jwt_in_request() with and without
+it, for a token that was not revoked (the common case) and one that was.
+
+    python tests/benchmark_token_revocation.py --revoked 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask_jwt_extended import create_access_token, decode_token, verify_jwt_in_request
+from flask_jwt_extended.default_callbacks import default_blocklist_callback
+from app import create_app, db, jwt
+from app.models import RevokedToken
+from app.services.token_blocklist import _token_in_blocklist, token_blocklist
+
+def per_call(function, rounds):
+    """Microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--revoked', type=int, default=100000, help='rows in revoked_tokens')
+    parser.add_argument('--rounds', type=int, default=20000, help='checks per measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        config = type('BenchmarkConfig', (), {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(folder, "benchmark.db")}',
+            'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+            'SECRET_KEY': 'benchmark',
+            'JWT_SECRET_KEY': 'benchmark',
+            'UPLOAD_FOLDER': folder,
+            'RISK_SCORING_MODE': 'off',
+            'THUMBNAIL_EXECUTOR': 'sync'
+        })
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+            expires_at = datetime.utcnow() + timedelta(hours=1)
+            db.session.bulk_insert_mappings(RevokedToken, [
+                {'jti': str(uuid.uuid4()), 'token_type': 'access', 'expires_at': expires_at}
+                for _ in range(args.revoked)
+            ])
+            db.session.commit()
+
+            started = time.perf_counter()
+            token_blocklist.sync()
+            print(f'loaded {len(token_blocklist)} revoked tokens in {(time.perf_counter() - started) * 1000:.0f}ms')
+
+            valid = create_access_token(identity=1)
+            revoked = create_access_token(identity=1)
+            token_blocklist.revoke(decode_token(revoked)['jti'], 'access', 1, expires_at)
+            db.session.commit()
+
+            for name, token in (('not revoked', valid), ('revoked', revoked)):
+                payload = decode_token(token, allow_expired=True)
+                check = per_call(lambda: _token_in_blocklist({}, payload), args.rounds)
+
+                def verify():
+                    with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+                        try:
+                            verify_jwt_in_request()
+                        except Exception:
+                            pass
+
+                jwt._token_in_blocklist_callback = default_blocklist_callback
+                baseline = per_call(verify, args.rounds // 4)
+                jwt._token_in_blocklist_callback = _token_in_blocklist
+                with_check = per_call(verify, args.rounds // 4)
+                print(f'{name:<12} check {check:6.2f}us   verify_jwt_in_request {baseline:6.1f}us without, '
+                      f'{with_check:6.1f}us with the check')
+            db.session.remove()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
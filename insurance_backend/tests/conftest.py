@@ -0,0 +1,68 @@
+import tempfile
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.utils.user_cache import user_cache
+
+class TestConfig:
+    TESTING = True
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    WTF_CSRF_ENABLED = False
+    UPLOAD_FOLDER = tempfile.mkdtemp(prefix='raise-uploads-')
+    THUMBNAIL_EXECUTOR = 'sync'
+    RISK_SCORING_MODE = 'off'
+    # The cheapest bcrypt cost keeps user fixtures fast
+    PASSWORD_BCRYPT_ROUNDS = 4
+
+@pytest.fixture
+def app():
+    """Application with an empty in-memory database."""
+    app = create_app(TestConfig)
+    # Ids restart in every test database, so snapshots cached by an earlier test would be wrong
+    user_cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(app):
+    """Factory returning Authorization headers for a user."""
+    def make_headers(user):
+        return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+    return make_headers
+
+class QueryCounter:
+    """Counts SQL statements executed against an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+@pytest.fixture
+def count_queries(app):
+    """Factory returning a context manager that counts executed statements."""
+    return lambda: QueryCounter(db.engine)
\ No newline at end of file
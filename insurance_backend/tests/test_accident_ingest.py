@@ -0,0 +1,188 @@
+import hashlib
+import io
+import os
+import pytest
+from datetime import datetime
+from PIL import Image
+from app import db
+from app.models import User, UserRole, Accident, Vehicle, Person, MediaFile, MediaBlob, UploadSession, UploadStatus
+from app.services.accident_service import AccidentService
+from app.services.media_store import MediaStore
+
+def jpeg(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (320, 240), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+PHOTO = jpeg((200, 30, 30))
+PHOTO_SHA256 = hashlib.sha256(PHOTO).hexdigest()
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+@pytest.fixture(autouse=True)
+def photo(app):
+    """The photo every report refers to, already in the media store."""
+    path = os.path.join(app.config['UPLOAD_FOLDER'], 'photo.jpg')
+    with open(path, 'wb') as f:
+        f.write(PHOTO)
+    blob = MediaStore.put_file(path)
+    db.session.commit()
+    return blob
+
+def make_report(i, vehicles=2):
+    return {
+        'idempotency_key': f'device-7f3a-{i:04d}',
+        'location': f'Thika Road, exit {i}',
+        'latitude': -1.2195,
+        'longitude': 36.8869,
+        'accident_date': '2024-05-01T08:30:00',
+        'description': 'Rear-end collision in slow traffic',
+        'vehicles': [{
+            'registration_number': f'kca {i:03d}{chr(65 + v)}',
+            'make': 'Toyota',
+            'model': 'Probox',
+            'color': 'White',
+            'driver': {'name': f'Driver {i}-{v}', 'license_number': f'DL{i:04d}{v}'},
+            'passengers': [{'name': f'Passenger {i}-{v}'}]
+        } for v in range(vehicles)],
+        'witnesses': [{'name': f'Witness {i}'}],
+        'environmental_conditions': {'weather_conditions': 'Rain', 'road_conditions': 'Wet'},
+        'media': [{'file_type': 'image', 'sha256': PHOTO_SHA256, 'vehicle_index': 0}]
+    }
+
+def test_batch_creates_every_report(client, auth_headers, officer):
+    """Each report is stored with its vehicles, people, conditions and media."""
+    response = client.post('/api/accidents/batch', headers=auth_headers(officer),
+                           json=[make_report(i) for i in range(3)])
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['created'] == 3
+    assert [r['status'] for r in data['results']] == ['created'] * 3
+    assert [r['index'] for r in data['results']] == [0, 1, 2]
+
+    accident = db.session.get(Accident, data['results'][1]['accident_id'])
+    assert accident.officer_id == officer.id
+    assert accident.idempotency_key == 'device-7f3a-0001'
+    assert [v.registration_number for v in accident.vehicles] == ['KCA 001A', 'KCA 001B']
+    assert accident.vehicles[0].driver.name == 'Driver 1-0'
+    assert [p.name for p in accident.vehicles[1].passengers] == ['Passenger 1-1']
+    assert [w.name for w in accident.witnesses] == ['Witness 1']
+    assert accident.environmental_conditions.weather_conditions == 'Rain'
+    assert accident.media_files[0].vehicle_id == accident.vehicles[0].id
+    assert accident.vehicles[0].normalized_registration == 'KCA001A'
+
+def test_resend_is_idempotent(client, auth_headers, officer):
+    """Resending a batch after a dropped connection returns the stored accidents."""
+    headers = auth_headers(officer)
+    first = client.post('/api/accidents/batch', headers=headers, json=[make_report(i) for i in range(2)])
+    second = client.post('/api/accidents/batch', headers=headers,
+                         json=[make_report(0), make_report(1), make_report(2), make_report(2)])
+
+    assert second.status_code == 201
+    results = second.get_json()['results']
+    assert [r['status'] for r in results] == ['duplicate', 'duplicate', 'created', 'duplicate']
+    assert [r['accident_id'] for r in results[:2]] == [r['accident_id'] for r in first.get_json()['results']]
+    assert results[3]['accident_id'] == results[2]['accident_id']
+    assert Accident.query.count() == 3
+    assert Vehicle.query.count() == 6
+
+def test_invalid_report_does_not_block_the_batch(client, auth_headers, officer):
+    """Validation errors are reported per item; the other reports are stored."""
+    missing_location = make_report(1)
+    del missing_location['location']
+    bad_media = make_report(2)
+    bad_media['media'][0]['vehicle_index'] = 5
+
+    response = client.post('/api/accidents/batch', headers=auth_headers(officer),
+                           json=[make_report(0), missing_location, bad_media])
+
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['created', 'invalid', 'invalid']
+    assert set(results[1]['errors']) == {'location'}
+    assert set(results[2]['errors']) == {'media'}
+    assert Accident.query.count() == 1
+
+def test_batch_limits(app, client, auth_headers, officer):
+    headers = auth_headers(officer)
+    assert client.post('/api/accidents/batch', headers=headers, json=[]).status_code == 400
+    app.config['INGEST_MAX_BATCH'] = 2
+    assert client.post('/api/accidents/batch', headers=headers,
+                       json=[make_report(i) for i in range(3)]).status_code == 413
+
+@pytest.mark.parametrize('size', [5, 50])
+def test_insert_count_does_not_grow_with_batch_size(client, auth_headers, officer, count_queries, size):
+    """Each table is written with one statement, however many reports are sent."""
+    headers = auth_headers(officer)
+    with count_queries() as counter:
+        response = client.post('/api/accidents/batch', headers=headers,
+                               json=[make_report(i) for i in range(size)])
+
+    assert response.get_json()['created'] == size
+    inserts = [s for s in counter.statements if s.lstrip().upper().startswith('INSERT')]
+    assert len(inserts) == 7
+    assert Person.query.count() == size * 5
+    assert MediaFile.query.count() == size
+
+def test_media_refer_to_stored_files(client, auth_headers, officer, photo):
+    """Batch media point at the media store, count as references and get thumbnails."""
+    earlier = Accident(report_number='ACC-00001', officer_id=officer.id, location='Thika Road',
+                       accident_date=datetime(2024, 5, 1, 8, 30))
+    db.session.add(earlier)
+    db.session.flush()
+    db.session.add(UploadSession(id='a' * 32, user_id=officer.id, accident_id=earlier.id, target='media',
+                                 file_type='image', filename='photo.jpg', total_size=len(PHOTO), chunk_size=len(PHOTO),
+                                 received_bytes=len(PHOTO), sha256=PHOTO_SHA256, status=UploadStatus.COMPLETED))
+    db.session.commit()
+
+    by_upload = make_report(1)
+    by_upload['media'] = [{'file_type': 'image', 'upload_id': 'a' * 32}]
+    response = client.post('/api/accidents/batch', headers=auth_headers(officer), json=[make_report(0), by_upload])
+    assert response.get_json()['created'] == 2
+
+    media = MediaFile.query.order_by(MediaFile.id).all()
+    assert [m.file_path for m in media] == [photo.path, photo.path]
+    assert all(m.sha256 == PHOTO_SHA256 and m.file_size == len(PHOTO) for m in media)
+    assert db.session.get(MediaBlob, PHOTO_SHA256).ref_count == 2
+    # Thumbnailed once the batch committed
+    db.session.expire_all()
+    assert all(m.variants and m.phash for m in MediaFile.query)
+    assert client.get(f'/api/media/{media[0].id}/image', headers=auth_headers(officer)).status_code == 200
+
+    # The blob outlives one of the accidents referring to it
+    assert AccidentService.delete_accident(media[0].accident_id)
+    assert db.session.get(MediaBlob, PHOTO_SHA256).ref_count == 1
+    assert os.path.exists(MediaStore.absolute_path(photo))
+
+def test_media_must_be_stored(client, auth_headers, officer):
+    """A report naming a file the store does not hold is invalid; the others are stored."""
+    other = User(email='officer2@police.go.ke', password='Police@123', name='Jane Wanjiru', role=UserRole.POLICE)
+    db.session.add(other)
+    db.session.flush()
+    earlier = Accident(report_number='ACC-00001', officer_id=other.id, location='Thika Road',
+                       accident_date=datetime(2024, 5, 1, 8, 30))
+    db.session.add(earlier)
+    db.session.flush()
+    db.session.add(UploadSession(id='b' * 32, user_id=other.id, accident_id=earlier.id, target='media',
+                                 file_type='image', filename='photo.jpg', total_size=len(PHOTO), chunk_size=len(PHOTO),
+                                 received_bytes=len(PHOTO), sha256=PHOTO_SHA256, status=UploadStatus.COMPLETED))
+    db.session.commit()
+
+    reports = [make_report(i) for i in range(5)]
+    reports[1]['media'] = [{'file_type': 'image', 'file_path': 'uploads/1.jpg'}]
+    reports[2]['media'] = [{'file_type': 'image', 'sha256': hashlib.sha256(b'never uploaded').hexdigest()}]
+    reports[3]['media'] = [{'file_type': 'image', 'upload_id': 'b' * 32}]  # Another officer's upload
+    reports[4]['media'] = [{'file_type': 'image'}]
+    response = client.post('/api/accidents/batch', headers=auth_headers(officer), json=reports)
+
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['created', 'invalid', 'invalid', 'invalid', 'invalid']
+    assert results[2]['errors'] == {'media': {'0': {'sha256': ['Not in the media store.']}}}
+    assert results[3]['errors'] == {'media': {'0': {'upload_id': ['Not a completed media upload of yours.']}}}
+    assert Accident.query.count() == 2
+    assert MediaFile.query.count() == 1
\ No newline at end of file
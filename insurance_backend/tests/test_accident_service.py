@@ -0,0 +1,91 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models import (
+    User, UserRole, Accident, AccidentStatus, Vehicle, Person,
+    EnvironmentalConditions, MediaFile, ReviewNote, Abstract
+)
+from app.services.accident_service import AccidentService
+
+def create_accidents(count):
+    """Create accidents with every relationship used by Accident.to_dict() populated."""
+    officer = User(email='officer@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    reviewer = User(email='agent@insurer.co.ke', password='Agent@123', name='Jane Smith',
+                    role=UserRole.INSURANCE_OFFICER, company_id='INS001')
+    db.session.add_all([officer, reviewer])
+    db.session.flush()
+
+    for i in range(count):
+        accident = Accident(
+            report_number=f'ACC-{i:05d}',
+            officer_id=officer.id,
+            location=f'Junction {i}',
+            latitude=-1.28 + i / 1000,
+            longitude=36.82 + i / 1000,
+            accident_date=datetime(2024, 5, 1) + timedelta(hours=i),
+            status=AccidentStatus.PENDING
+        )
+        db.session.add(accident)
+        db.session.flush()
+
+        driver = Person(name=f'Driver {i}', license_number=f'DL{i}')
+        passenger = Person(name=f'Passenger {i}')
+        witness = Person(name=f'Witness {i}')
+        db.session.add_all([driver, passenger, witness])
+        db.session.flush()
+
+        vehicle = Vehicle(accident_id=accident.id, registration_number=f'KCA {i:03d}A', make='Toyota',
+                          model='Axio', color='White', driver_id=driver.id)
+        db.session.add(vehicle)
+        vehicle.passengers.append(passenger)
+        accident.witnesses.append(witness)
+        db.session.flush()
+
+        db.session.add_all([
+            MediaFile(accident_id=accident.id, vehicle_id=vehicle.id, file_type='image', file_path=f'{i}/front.jpg'),
+            MediaFile(accident_id=accident.id, file_type='video', file_path=f'{i}/scene.mp4'),
+            EnvironmentalConditions(accident_id=accident.id, weather_conditions='Clear', road_conditions='Dry'),
+            Abstract(accident_id=accident.id, file_path=f'{i}/abstract.pdf', file_type='pdf',
+                     file_size=1024, uploaded_by=officer.id),
+            ReviewNote(accident_id=accident.id, user_id=reviewer.id, comment='Checked'),
+        ])
+    db.session.commit()
+    db.session.expire_all()
+
+def lazy_serialize():
+    """Reference serialization through the per-row lazy loads."""
+    result = [accident.to_dict() for accident in Accident.query.order_by(Accident.id).all()]
+    db.session.expire_all()
+    return result
+
+@pytest.mark.parametrize('count', [5, 50])
+def test_serialize_accidents_uses_fixed_query_count(app, count_queries, count):
+    """Bulk serialization costs the same number of queries for any page size."""
+    create_accidents(count)
+
+    with count_queries() as counter:
+        data = AccidentService.serialize_accidents(Accident.query.order_by(Accident.id))
+
+    assert len(data) == count
+    # accidents (+ abstract, conditions), vehicles (+ driver), passengers,
+    # damage images, media files, witnesses, review notes (+ author)
+    assert counter.count == 7
+
+def test_serialize_accidents_matches_to_dict(app):
+    """The bulk path returns exactly the same JSON shape as to_dict()."""
+    create_accidents(3)
+    expected = lazy_serialize()
+
+    assert AccidentService.serialize_accidents() == expected
+    assert expected[0]['vehicles'][0]['driver']['name'] == 'Driver 0'
+    assert expected[0]['review_notes'][0]['user_name'] == 'Jane Smith'
+
+def test_serialize_accidents_by_ids_preserves_order(app):
+    """Serializing by ID keeps the caller's ordering and skips unknown IDs."""
+    create_accidents(3)
+    ids = [accident.id for accident in Accident.query.order_by(Accident.id.desc())]
+
+    data = AccidentService.serialize_accidents(accident_ids=ids + [9999])
+
+    assert [item['id'] for item in data] == ids
+    assert AccidentService.serialize_accidents(accident_ids=[]) == []
\ No newline at end of file
@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models import User, UserRole, Accident, AccidentStatus, Vehicle
+
+@pytest.fixture
+def users(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    other = User(email='officer2@police.go.ke', password='Police@123', name='Mary Wanjiku', role=UserRole.POLICE)
+    agent = User(email='john.doe@kenyainsurance.co.ke', password='Officer@123', name='John Doe',
+                 role=UserRole.INSURANCE_OFFICER, company_id='INS001')
+    db.session.add_all([officer, other, agent])
+    db.session.commit()
+    return {'officer': officer, 'other': other, 'agent': agent}
+
+@pytest.fixture
+def accidents(users):
+    """25 accidents, several sharing a created_at so the id tie-breaker matters."""
+    base = datetime(2024, 5, 1, 8, 0)
+    for i in range(25):
+        accident = Accident(
+            report_number=f'ACC-{i:05d}',
+            officer_id=users['officer'].id if i % 2 == 0 else users['other'].id,
+            location=f'Junction {i}',
+            accident_date=base + timedelta(hours=i),
+            status=AccidentStatus.FLAGGED if i % 5 == 0 else AccidentStatus.PENDING,
+            created_at=base + timedelta(hours=i // 3)
+        )
+        db.session.add(accident)
+        db.session.flush()
+        db.session.add(Vehicle(accident_id=accident.id, registration_number=f'KCA {i:03d}A',
+                               make='Toyota', model='Axio', color='White'))
+    db.session.commit()
+
+def fetch_all(client, headers, **params):
+    """Follow next_cursor until the last page and return every accident seen."""
+    seen, cursor = [], None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        response = client.get('/api/accidents/', headers=headers, query_string=query)
+        assert response.status_code == 200
+        data = response.get_json()
+        seen.extend(data['accidents'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            return seen
+
+def test_pages_cover_every_accident_once(client, auth_headers, users, accidents):
+    """Walking the cursors returns every row exactly once, newest first."""
+    seen = fetch_all(client, auth_headers(users['agent']), limit=4)
+
+    keys = [(item['created_at'], item['id']) for item in seen]
+    assert len(keys) == 25
+    assert len(set(keys)) == 25
+    assert keys == sorted(keys, reverse=True)
+
+def test_filters(client, auth_headers, users, accidents):
+    """Status, officer, date range and registration filters narrow the listing."""
+    headers = auth_headers(users['agent'])
+
+    flagged = fetch_all(client, headers, status='flagged', limit=2)
+    assert len(flagged) == 5
+    assert {item['status'] for item in flagged} == {'flagged'}
+
+    mine = fetch_all(client, headers, officer_id=users['officer'].id)
+    assert {item['officer_id'] for item in mine} == {users['officer'].id}
+    assert len(mine) == 13
+
+    window = fetch_all(client, headers, date_from='2024-05-01T09:00:00', date_to='2024-05-01T11:00:00')
+    assert len(window) == 6
+
+    for plate in (' kca 007a ', 'KCA007A', 'kca-007a'):
+        by_plate = fetch_all(client, headers, registration_number=plate)
+        assert [item['report_number'] for item in by_plate] == ['ACC-00007']
+
+def test_invalid_parameters_return_400(client, auth_headers, users, accidents):
+    headers = auth_headers(users['agent'])
+
+    assert client.get('/api/accidents/', headers=headers, query_string={'cursor': 'not-a-cursor'}).status_code == 400
+    assert client.get('/api/accidents/', headers=headers, query_string={'status': 'lost'}).status_code == 400
+    assert client.get('/api/accidents/', headers=headers, query_string={'date_from': 'yesterday'}).status_code == 400
+
+def test_requires_authentication(client, accidents):
+    assert client.get('/api/accidents/').status_code == 401
@@ -0,0 +1,59 @@
+import os
+import pytest
+from datetime import datetime
+from app import db
+from app.models import User, UserRole, Accident, Abstract
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+@pytest.fixture
+def abstract(app, officer):
+    accident = Accident(report_number='ACC-00001', officer_id=officer.id, location='Thika Road',
+                        accident_date=datetime(2024, 5, 1, 8, 30))
+    db.session.add(accident)
+    db.session.flush()
+    content = b'%PDF-1.4 ' + os.urandom(10000)
+    os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'abstracts'), exist_ok=True)
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'abstracts', 'acc-1.pdf'), 'wb') as f:
+        f.write(content)
+    abstract = Abstract(accident_id=accident.id, file_path='abstracts/acc-1.pdf', file_type='pdf',
+                        file_size=len(content), uploaded_by=officer.id)
+    db.session.add(abstract)
+    db.session.commit()
+    return abstract, content
+
+def test_range_and_conditional_requests(client, auth_headers, officer, abstract):
+    abstract, content = abstract
+    url = f'/api/accidents/{abstract.accident_id}/abstract'
+    headers = auth_headers(officer)
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.mimetype == 'application/pdf'
+    assert full.headers['Accept-Ranges'] == 'bytes'
+    assert 'private' in full.headers['Cache-Control']
+    assert full.data == content
+
+    partial = client.get(url, headers=dict(headers, Range='bytes=100-199'))
+    assert partial.status_code == 206
+    assert partial.headers['Content-Range'] == f'bytes 100-199/{len(content)}'
+    assert partial.data == content[100:200]
+
+    assert client.get(url, headers=dict(headers, **{'If-None-Match': full.headers['ETag']})).status_code == 304
+    assert client.get(url, headers=dict(headers, **{'If-Modified-Since': full.headers['Last-Modified']})).status_code == 304
+
+def test_proxy_handoff(app, client, auth_headers, officer, abstract):
+    abstract, _ = abstract
+    app.config['SENDFILE_MODE'] = 'x-accel'
+
+    response = client.get(f'/api/accidents/{abstract.accident_id}/abstract?download=1', headers=auth_headers(officer))
+
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/protected-uploads/abstracts/acc-1.pdf'
+    assert response.headers['Content-Disposition'].startswith('attachment')
+    assert response.data == b''
\ No newline at end of file
@@ -0,0 +1,139 @@
+import os
+import pytest
+from datetime import datetime, timedelta
+from PIL import Image
+from sqlalchemy import text
+from app import db
+from app.models import User, UserRole, Accident, Vehicle, MediaFile, ReviewNote, DuplicateKey, DuplicateMatch
+from app.scoring import DuplicateDetector, RuleEngine, extract_features, score_accidents
+from app.scoring.duplicates import hamming_distance
+from app.services.accident_service import AccidentService
+from app.services.media_store import MediaStore
+from app.services.thumbnails import perceptual_hash
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+def make_accident(officer, number, reg_no, when, latitude=-1.2995, longitude=36.8219, phash=None):
+    accident = Accident(report_number=f'ACC-{number:05d}', officer_id=officer.id, location='Mombasa Road',
+                        latitude=latitude, longitude=longitude, accident_date=when)
+    db.session.add(accident)
+    db.session.flush()
+    db.session.add(Vehicle(accident_id=accident.id, registration_number=reg_no, make='Toyota',
+                           model='Probox', color='White'))
+    if phash:
+        db.session.add(MediaFile(accident_id=accident.id, file_type='image', file_path=f'{number}.jpg', phash=phash))
+    db.session.commit()
+    return accident
+
+def test_same_vehicle_nearby_and_close_in_time(app, officer):
+    original = make_accident(officer, 1, 'KBX 123A', datetime(2024, 5, 1, 14, 0))
+    score_accidents([original.id])
+
+    # Different time bucket and geo cell, but within 6 h and 1 km
+    resubmitted = make_accident(officer, 2, 'kbx-123a', datetime(2024, 5, 1, 18, 30), latitude=-1.3020)
+    next_day = make_accident(officer, 3, 'KBX 123A', datetime(2024, 5, 2, 14, 0))
+    elsewhere = make_accident(officer, 4, 'KBX 123A', datetime(2024, 5, 1, 14, 0), latitude=-1.1000)
+    other_vehicle = make_accident(officer, 5, 'KCD 456B', datetime(2024, 5, 1, 14, 0))
+    score_accidents([resubmitted.id, next_day.id, elsewhere.id, other_vehicle.id])
+
+    match = DuplicateMatch.query.filter_by(accident_id=resubmitted.id).one()
+    assert (match.duplicate_of_id, match.reason) == (original.id, 'vehicle')
+    assert 'vehicle KBX123A, 4.5 h apart, 0.28 km apart' == match.detail
+    assert DuplicateMatch.query.count() == 1
+
+    note = ReviewNote.query.filter_by(accident_id=resubmitted.id).one()
+    assert note.comment.startswith('Possible duplicate of report ACC-00001')
+    assert note.to_dict()['user_name'] == 'Automated check'
+
+    features = extract_features([resubmitted.id, next_day.id])
+    assert features.loc[resubmitted.id, 'duplicate_reports'] == 1
+    assert features.loc[next_day.id, 'duplicate_reports'] == 0
+    reasons = RuleEngine().reasons(features)
+    assert 'duplicate_report' in reasons[resubmitted.id]
+    assert 'duplicate_report' not in reasons[next_day.id]
+
+    # Checking again does not add a second match or note
+    assert DuplicateDetector().check([resubmitted.id]) == {}
+    assert ReviewNote.query.count() == 1
+
+def test_similar_photos(app, officer):
+    when = datetime(2024, 5, 1, 14, 0)
+    original = make_accident(officer, 1, 'KBX 123A', when, phash='f0f0f0f0f0f0f0f0')
+    score_accidents([original.id])
+
+    retouched = make_accident(officer, 2, 'KCE 777C', when + timedelta(days=30), phash='f0f1f0f0f0f0f0f4')
+    unrelated = make_accident(officer, 3, 'KCF 888D', when, phash='0f0f0ff0f0f0f0f0')
+    score_accidents([retouched.id, unrelated.id])
+
+    match = DuplicateMatch.query.one()
+    assert (match.accident_id, match.duplicate_of_id, match.reason) == (retouched.id, original.id, 'image')
+    assert match.detail == 'similar photo (2 of 64 hash bits differ)'
+
+@pytest.fixture
+def foreign_keys(app):
+    """Enforce foreign keys, as PostgreSQL does; SQLite ignores them by default."""
+    db.session.execute(text('PRAGMA foreign_keys=ON'))
+    assert db.session.execute(text('PRAGMA foreign_keys')).scalar() == 1
+    yield
+    db.session.rollback()
+    db.session.execute(text('PRAGMA foreign_keys=OFF'))
+
+def test_deleting_matched_accidents_clears_the_index(app, officer, foreign_keys):
+    when = datetime(2024, 5, 1, 14, 0)
+    original = make_accident(officer, 1, 'KBX 123A', when, phash='f0f0f0f0f0f0f0f0')
+    score_accidents([original.id])
+    resubmitted = make_accident(officer, 2, 'KBX 123A', when + timedelta(hours=1), phash='f0f0f0f0f0f0f0f0')
+    score_accidents([resubmitted.id])
+    assert DuplicateMatch.query.count() == 2  # Same vehicle and same photo
+
+    # The earlier report goes first, so the matches pointing at it must go with it
+    assert AccidentService.delete_accident(original.id)
+    assert DuplicateMatch.query.count() == 0
+    assert DuplicateKey.query.filter_by(accident_id=original.id).count() == 0
+
+    assert AccidentService.delete_accident(resubmitted.id)
+    assert DuplicateKey.query.count() == 0
+    assert Accident.query.count() == 0
+
+def test_perceptual_hash_survives_reencoding(tmp_path):
+    image = Image.effect_mandelbrot((800, 600), (-2.0, -1.2, 1.0, 1.2), 60).convert('RGB')
+    image.resize((400, 300)).save(tmp_path / 'copy.jpg', 'JPEG', quality=50)
+    other = Image.effect_mandelbrot((800, 600), (-0.9, -0.4, -0.5, 0.0), 60).convert('RGB')
+
+    with Image.open(tmp_path / 'copy.jpg') as copy:
+        assert hamming_distance(perceptual_hash(image), perceptual_hash(copy)) <= 3
+    assert hamming_distance(perceptual_hash(image), perceptual_hash(other)) > 10
+
+def test_processed_photo_queues_accident_for_rescoring(app, officer):
+    accident = make_accident(officer, 1, 'KBX 123A', datetime(2024, 5, 1, 14, 0))
+    score_accidents([accident.id])
+
+    path = os.path.join(app.config['UPLOAD_FOLDER'], 'scene.jpg')
+    Image.effect_mandelbrot((640, 480), (-2.0, -1.2, 1.0, 1.2), 60).convert('RGB').save(path, 'JPEG')
+    blob = MediaStore.put_file(path)
+    media = MediaFile(accident_id=accident.id, file_type='image', file_path=blob.path, sha256=blob.sha256)
+    db.session.add(media)
+    db.session.commit()
+
+    db.session.expire_all()
+    assert len(db.session.get(MediaFile, media.id).phash) == 16
+    assert db.session.get(Accident, accident.id).risk_score is None
+
+def test_queries_do_not_depend_on_batch_size(app, officer, count_queries):
+    when = datetime(2024, 5, 1, 14, 0)
+    small = [make_accident(officer, i, f'KBA {i:03d}A', when, phash=f'{i:016x}') for i in range(2)]
+    large = [make_accident(officer, 100 + i, f'KBB {i:03d}B', when, phash=f'{i << 32:016x}') for i in range(20)]
+
+    small_ids, large_ids = [a.id for a in small], [a.id for a in large]
+
+    with count_queries() as counter:
+        DuplicateDetector().check(small_ids)
+    small_count = counter.count
+    with count_queries() as counter:
+        DuplicateDetector().check(large_ids)
+    assert counter.count == small_count
\ No newline at end of file
@@ -0,0 +1,116 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models import User, UserRole, Accident, AccidentStatus
+from app.services.accident_service import AccidentService
+from app.utils.geo import covering_cells, encode_geohash, geohash_bounds
+
+# Kenyatta Avenue / Moi Avenue junction, Nairobi
+CENTRE = (-1.2841, 36.8233)
+
+@pytest.fixture
+def users(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    agent = User(email='john.doe@kenyainsurance.co.ke', password='Officer@123', name='John Doe',
+                 role=UserRole.INSURANCE_OFFICER, company_id='INS001')
+    db.session.add_all([officer, agent])
+    db.session.commit()
+    return {'officer': officer, 'agent': agent}
+
+def add_accident(officer, number, north_km=0.0, east_km=0.0, days_ago=1, **fields):
+    accident = Accident(report_number=f'ACC-{number:05d}', officer_id=officer.id, location='Nairobi CBD',
+                        latitude=CENTRE[0] + north_km / 111.195, longitude=CENTRE[1] + east_km / 111.17,
+                        accident_date=datetime.utcnow() - timedelta(days=days_ago), **fields)
+    db.session.add(accident)
+    db.session.commit()
+    return accident
+
+def test_geohash_encoding():
+    assert encode_geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert encode_geohash(None, 36.8) is None
+    south, west, north, east = geohash_bounds('u4pruydqqvj')
+    assert south <= 57.64911 <= north and west <= 10.40744 <= east
+
+    # The covering contains the centre's cell and stays small
+    cells = covering_cells(*CENTRE, radius_km=2.0)
+    assert len(cells) <= 16
+    assert any(encode_geohash(*CENTRE).startswith(cell) for cell in cells)
+
+def test_geohash_follows_coordinates(users):
+    accident = add_accident(users['officer'], 1)
+    assert accident.geohash == encode_geohash(*CENTRE)
+
+    accident.latitude, accident.longitude = -4.0435, 39.6682  # Mombasa
+    db.session.commit()
+    assert accident.geohash == encode_geohash(-4.0435, 39.6682)
+
+    results = AccidentService.ingest_batch(users['officer'].id, [{
+        'idempotency_key': 'geo-1', 'location': 'Westlands', 'latitude': -1.2676, 'longitude': 36.8108,
+        'accident_date': datetime(2024, 5, 1, 8, 0), 'vehicles': []
+    }])
+    db.session.commit()
+    assert db.session.get(Accident, results[0]['accident_id']).geohash == encode_geohash(-1.2676, 36.8108)
+
+def test_nearby(client, auth_headers, users, count_queries):
+    officer = users['officer']
+    near = add_accident(officer, 1, north_km=0.4)
+    nearer = add_accident(officer, 2, east_km=-0.2)
+    add_accident(officer, 3, north_km=2.5)  # In a covering cell, outside the radius
+    add_accident(officer, 4, north_km=40)
+    add_accident(officer, 5, east_km=0.1, days_ago=90)
+    headers = auth_headers(users['agent'])
+
+    with count_queries() as counter:
+        response = client.get('/api/accidents/nearby', headers=headers, query_string={
+            'lat': CENTRE[0], 'lon': CENTRE[1], 'radius': 1,
+            'date_from': (datetime.utcnow() - timedelta(days=30)).isoformat()
+        })
+    assert response.status_code == 200
+    markers = response.get_json()['accidents']
+    assert [marker['id'] for marker in markers] == [nearer.id, near.id]
+    assert markers[0]['distance_km'] == pytest.approx(0.2, abs=0.01)
+    assert markers[1]['distance_km'] == pytest.approx(0.4, abs=0.01)
+    # Candidates come from geohash prefix ranges, not a scan of every row
+    assert any('accidents.geohash >=' in statement for statement in counter.statements)
+
+    response = client.get('/api/accidents/nearby', headers=headers,
+                          query_string={'lat': CENTRE[0], 'lon': CENTRE[1], 'radius': 3})
+    assert len(response.get_json()['accidents']) == 4
+
+def test_nearby_validation(client, auth_headers, users):
+    headers = auth_headers(users['agent'])
+    assert client.get('/api/accidents/nearby', headers=headers, query_string={'lat': 'x', 'lon': 1}).status_code == 400
+    assert client.get('/api/accidents/nearby', headers=headers, query_string={'lat': 95, 'lon': 1}).status_code == 400
+    assert client.get('/api/accidents/nearby', headers=headers,
+                      query_string={'lat': 0, 'lon': 0, 'radius': 500}).status_code == 400
+
+def test_hotspots(client, auth_headers, users):
+    officer = users['officer']
+    for i in range(4):
+        add_accident(officer, i, east_km=0.05 * i, risk_score=0.2 * i,
+                     status=AccidentStatus.FLAGGED if i == 0 else AccidentStatus.PENDING)
+    for i in range(2):
+        add_accident(officer, 10 + i, north_km=30)
+    add_accident(officer, 20, north_km=60, days_ago=45)
+    headers = auth_headers(users['agent'])
+
+    response = client.get('/api/accidents/hotspots', headers=headers, query_string={'precision': 5})
+    assert response.status_code == 200
+    hotspots = response.get_json()['hotspots']
+    assert [hotspot['count'] for hotspot in hotspots] == [4, 2]
+    busiest = hotspots[0]
+    assert busiest['geohash'] == encode_geohash(*CENTRE, precision=5)
+    assert busiest['flagged'] == 1
+    assert busiest['avg_risk_score'] == pytest.approx(0.3)
+    assert busiest['bounds']['south'] <= busiest['latitude'] <= busiest['bounds']['north']
+    assert hotspots[1]['avg_risk_score'] is None
+
+    response = client.get('/api/accidents/hotspots', headers=headers, query_string={
+        'precision': 5, 'bbox': f'{CENTRE[0] - 0.05},{CENTRE[1] - 0.05},{CENTRE[0] + 0.05},{CENTRE[1] + 0.05}'
+    })
+    assert [hotspot['count'] for hotspot in response.get_json()['hotspots']] == [4]
+
+    response = client.get('/api/accidents/hotspots', headers=headers, query_string={'precision': 5, 'min_count': 3})
+    assert len(response.get_json()['hotspots']) == 1
+    assert client.get('/api/accidents/hotspots', headers=headers, query_string={'precision': 12}).status_code == 400
+    assert client.get('/api/accidents/hotspots', headers=headers, query_string={'bbox': '1,2,3'}).status_code == 400
\ No newline at end of file
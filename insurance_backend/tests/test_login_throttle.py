@@ -0,0 +1,106 @@
+import pytest
+from conftest import TestConfig
+from app import create_app, db
+from app.models import User, UserRole
+from app.services.login_throttle import LoginThrottled, MemoryStorage, SlidingWindowLimiter, login_throttle
+from app.services.passwords import password_hasher
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+@pytest.fixture
+def hash_checks(monkeypatch):
+    """Counts password hash comparisons."""
+    calls = []
+    verify = password_hasher.verify
+    monkeypatch.setattr(password_hasher, 'verify', lambda *args: calls.append(args) or verify(*args))
+    return calls
+
+def login(client, password, email='officer1@police.go.ke', address='10.0.0.1'):
+    return client.post('/api/auth/login', json={'email': email, 'password': password},
+                       environ_base={'REMOTE_ADDR': address})
+
+def test_sliding_window():
+    limiter = SlidingWindowLimiter(MemoryStorage(), limit=4, window=60)
+    assert [limiter.hit('k', now=6000 + i) for i in range(4)] == [0, 0, 0, 0]
+    assert limiter.hit('k', now=6010) == 50  # Over the limit within the window
+
+    # Halfway into the next window half of the previous 5 hits still count
+    assert limiter.hit('k', now=6090) == 0
+    assert limiter.hit('k', now=6091) == pytest.approx(60 * (1 - 2 / 5) - 31)
+    assert limiter.hit('other', now=6091) == 0
+
+    # A refunded hit no longer counts
+    limiter.refund('k', now=6092)
+    assert limiter.hit('k', now=6092) == pytest.approx(60 * (1 - 2 / 5) - 32)
+    limiter.refund('missing', now=6092)
+    assert limiter.hit('missing', now=6092) == 0
+
+    assert SlidingWindowLimiter(MemoryStorage(), limit=0).hit('k') == 0  # Disabled
+
+def test_account_throttled_before_hashing(app, client, officer, hash_checks):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 3})
+    assert [login(client, 'Wrong@123').status_code for _ in range(3)] == [401, 401, 401]
+    assert len(hash_checks) == 3
+
+    response = login(client, 'Police@123', address='10.0.0.2')
+    assert response.status_code == 429
+    assert 0 < int(response.headers['Retry-After']) <= 300
+    assert len(hash_checks) == 3
+
+    # Other accounts are unaffected
+    assert login(client, 'Police@123', email='nobody@police.go.ke').status_code == 401
+
+    stats = login_throttle.stats()
+    assert stats['account_hits'] == 5 and stats['account_rejected'] == 1
+    assert stats['ip_hits'] == 5 and stats['ip_rejected'] == 0
+
+def test_address_throttled_without_locking_account(app, client, officer, hash_checks):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_IP_LIMIT': 2, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 3})
+    assert [login(client, 'Wrong@123').status_code for _ in range(5)] == [401, 401, 429, 429, 429]
+    assert len(hash_checks) == 2
+
+    # The refused attempts were not counted against the account
+    assert login(client, 'Police@123', address='10.0.0.2').status_code == 200
+    assert login_throttle.stats()['ip_rejected'] == 3
+
+def test_only_failed_logins_count_against_account(app, client, officer):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 3})
+    assert [login(client, 'Police@123').status_code for _ in range(5)] == [200] * 5
+    assert [login(client, 'Wrong@123').status_code for _ in range(3)] == [401, 401, 401]
+
+    # Refused attempts, right password or not, do not extend the lockout
+    assert login(client, 'Police@123', address='10.0.0.2').status_code == 429
+    assert login(client, 'Wrong@123').status_code == 429
+    assert login_throttle.stats()['account_rejected'] == 2
+
+def test_concurrent_guesses_cannot_exceed_account_limit(app):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 3})
+    # Three attempts still hashing their passwords hold every slot of the account
+    for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+        login_throttle.check('officer1@police.go.ke', address)
+    with pytest.raises(LoginThrottled):
+        login_throttle.check('Officer1@police.go.ke', '10.0.0.4')
+
+    # One of them had the right password
+    login_throttle.release('officer1@police.go.ke')
+    login_throttle.check('officer1@police.go.ke', '10.0.0.4')
+
+def test_address_forwarded_by_trusted_proxy(app):
+    proxied = create_app(type('ProxiedConfig', (TestConfig,), {'TRUSTED_PROXIES': 1}))
+    client = proxied.test_client()
+    login_throttle.configure({**proxied.config, 'LOGIN_THROTTLE_IP_LIMIT': 1})
+    with proxied.app_context():
+        db.create_all()
+
+        def attempt(forwarded_for):
+            return client.post('/api/auth/login', json={'email': 'nobody@police.go.ke', 'password': 'Wrong@123'},
+                               headers={'X-Forwarded-For': forwarded_for}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+        # Clients behind the same proxy are counted apart
+        assert [attempt(address).status_code for address in ('41.90.0.1', '41.90.0.2', '41.90.0.1')] == [401, 401, 429]
+        db.drop_all()
\ No newline at end of file
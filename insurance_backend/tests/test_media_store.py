@@ -0,0 +1,117 @@
+import io
+import os
+import pytest
+from datetime import datetime
+from app import db
+from app.models import User, UserRole, Accident, Vehicle, MediaFile, MediaBlob, InsuranceClaim, UploadSession
+from app.services.accident_service import AccidentService
+from app.services.media_store import MediaStore, hash_file
+from app.services.upload_service import UploadService, _hashers
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+def make_accident(officer, number):
+    accident = Accident(report_number=f'ACC-{number:05d}', officer_id=officer.id, location='Thika Road',
+                        accident_date=datetime(2024, 5, 1, 8, 30))
+    db.session.add(accident)
+    db.session.flush()
+    return accident
+
+def write_upload(app, name, content):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+def attach(accident, path, vehicle=None):
+    blob = MediaStore.put_file(path)
+    media = MediaFile(accident_id=accident.id, vehicle_id=vehicle.id if vehicle else None, file_type='image',
+                      file_path=blob.path, sha256=blob.sha256)
+    db.session.add(media)
+    return media
+
+def test_same_bytes_are_stored_once(app, officer):
+    accident = make_accident(officer, 1)
+    vehicles = [Vehicle(accident_id=accident.id, registration_number=f'KCA 00{i}A', make='Toyota',
+                        model='Axio', color='White') for i in range(2)]
+    db.session.add_all(vehicles)
+    db.session.flush()
+    photo = os.urandom(4096)
+
+    first = attach(accident, write_upload(app, 'a.jpg', photo), vehicles[0])
+    second = attach(accident, write_upload(app, 'b.jpg', photo), vehicles[1])
+    db.session.commit()
+
+    blob = MediaBlob.query.one()
+    assert blob.ref_count == 2
+    assert first.file_path == second.file_path == blob.path
+    with open(MediaStore.absolute_path(blob), 'rb') as f:
+        assert f.read() == photo
+
+def test_blob_removed_with_its_last_reference(app, officer):
+    photo = os.urandom(4096)
+    accidents = [make_accident(officer, i) for i in range(2)]
+    for i, accident in enumerate(accidents):
+        attach(accident, write_upload(app, f'{i}.jpg', photo))
+    db.session.commit()
+    blob_file = MediaStore.absolute_path(MediaBlob.query.one())
+
+    assert AccidentService.delete_accident(accidents[0].id)
+    assert MediaBlob.query.one().ref_count == 1
+    assert os.path.exists(blob_file)
+
+    assert AccidentService.delete_accident(accidents[1].id)
+    assert MediaBlob.query.count() == 0
+    assert not os.path.exists(blob_file)
+    assert MediaFile.query.count() == 0
+
+def test_delete_accident_discards_uploads_and_keeps_claims(app, client, auth_headers, officer):
+    accident = make_accident(officer, 1)
+    db.session.commit()
+    upload = UploadService.create_upload(officer.id, accident.id, 'media', 'video', 'dashcam.mp4', 4096)
+    UploadService.append_chunk(upload, 0, io.BytesIO(os.urandom(1024)), 1024)
+    partial = os.path.join(app.config['UPLOAD_FOLDER'], 'partial', f'{upload.id}.part')
+    upload_id = upload.id
+
+    admin = User(email='admin@raise.ke', password='Admin@123', name='System Administrator', role=UserRole.ADMIN)
+    claim = InsuranceClaim(accident_id=accident.id, agent_id=officer.id, claim_number='CLM-1')
+    db.session.add_all([admin, claim])
+    db.session.commit()
+    response = client.delete(f'/api/accidents/{accident.id}', headers=auth_headers(admin))
+    assert response.status_code == 409
+    assert db.session.get(Accident, accident.id) is not None
+
+    db.session.delete(claim)
+    db.session.commit()
+    assert AccidentService.delete_accident(accident.id)
+    assert db.session.get(UploadSession, upload_id) is None
+    assert not os.path.exists(partial)
+    assert upload_id not in _hashers
+
+def test_migrate_existing_files(app, officer):
+    accident = make_accident(officer, 1)
+    photo, video = os.urandom(2048), os.urandom(8192)
+    for name, content in [('legacy/1.jpg', photo), ('legacy/2.jpg', photo), ('legacy/3.mp4', video)]:
+        write_upload(app, name, content)
+        db.session.add(MediaFile(accident_id=accident.id, file_type='image', file_path=name))
+    db.session.add(MediaFile(accident_id=accident.id, file_type='image', file_path='legacy/gone.jpg'))
+    db.session.commit()
+
+    stats = MediaStore.migrate_existing(batch_size=2)
+
+    assert stats == {'migrated': 3, 'duplicates': 1, 'missing': 1, 'bytes_reclaimed': len(photo)}
+    blobs = {blob.sha256: blob.ref_count for blob in MediaBlob.query}
+    assert len(blobs) == 2
+    assert sorted(blobs.values()) == [1, 2]
+    assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], 'legacy', '1.jpg'))
+    for media in MediaFile.query.filter(MediaFile.sha256.isnot(None)):
+        assert hash_file(MediaStore.absolute_path(media.file_path)) == media.sha256
+
+    # Running it again finds nothing left to move
+    assert MediaStore.migrate_existing()['migrated'] == 0
\ No newline at end of file
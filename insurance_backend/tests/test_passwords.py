@@ -0,0 +1,75 @@
+import threading
+import pytest
+from app import db
+from app.models import User, UserRole
+from app.services.auth_service import AuthService
+from app.services.passwords import HasherBusy, PasswordHasher, password_hasher
+
+def test_schemes_and_costs():
+    bcrypt_hasher = PasswordHasher('bcrypt', bcrypt_rounds=5)
+    hashed = bcrypt_hasher.hash('Police@123')
+    assert hashed.startswith('$2b$05$')
+    assert bcrypt_hasher.verify('Police@123', hashed)
+    assert not bcrypt_hasher.verify('Police@124', hashed)
+    assert not bcrypt_hasher.needs_rehash(hashed)
+    assert PasswordHasher('bcrypt', bcrypt_rounds=6).needs_rehash(hashed)
+
+    pbkdf2_hasher = PasswordHasher('pbkdf2_sha256', pbkdf2_iterations=1000)
+    hashed = pbkdf2_hasher.hash('Police@123')
+    assert hashed.startswith('pbkdf2_sha256$1000$')
+    assert pbkdf2_hasher.verify('Police@123', hashed)
+    assert not pbkdf2_hasher.verify('Police@124', hashed)
+    assert not pbkdf2_hasher.needs_rehash(hashed)
+    assert PasswordHasher('pbkdf2_sha256', pbkdf2_iterations=2000).needs_rehash(hashed)
+
+    # Either hasher verifies the other scheme's hashes and wants them replaced
+    assert bcrypt_hasher.verify('Police@123', hashed)
+    assert bcrypt_hasher.needs_rehash(hashed)
+
+    with pytest.raises(ValueError):
+        PasswordHasher('md5')
+
+def test_stale_hash_upgraded_on_login(app):
+    assert password_hasher.bcrypt_rounds == 4  # Test profile
+    user = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(user)
+    db.session.commit()
+    assert user.password_hash.startswith('$2b$04$')
+
+    password_hasher.configure({'PASSWORD_HASH_SCHEME': 'pbkdf2_sha256', 'PASSWORD_PBKDF2_ITERATIONS': 1000})
+    try:
+        assert AuthService.authenticate_user('officer1@police.go.ke', 'Wrong@123') is None
+        assert user.password_hash.startswith('$2b$04$')
+
+        assert AuthService.authenticate_user('Officer1@police.go.ke', 'Police@123') is user
+        db.session.commit()
+        db.session.expire_all()
+        upgraded = db.session.get(User, user.id).password_hash
+        assert upgraded.startswith('pbkdf2_sha256$1000$')
+
+        # Already current: left alone
+        assert AuthService.authenticate_user('officer1@police.go.ke', 'Police@123') is not None
+        assert db.session.get(User, user.id).password_hash == upgraded
+    finally:
+        password_hasher.configure(app.config)
+
+def test_concurrency_limit():
+    hasher = PasswordHasher('bcrypt', bcrypt_rounds=4, max_concurrency=1, queue_timeout=0.05)
+    hashed = hasher.hash('Police@123')
+
+    hasher._slots.acquire()  # A login holding the only slot
+    try:
+        with pytest.raises(HasherBusy):
+            hasher.verify('Police@123', hashed)
+    finally:
+        hasher._slots.release()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher.verify('Police@123', hashed)))
+               for _ in range(4)]
+    hasher.queue_timeout = 5.0
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 4
\ No newline at end of file
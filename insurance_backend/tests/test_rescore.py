@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime
+from app import create_app, db
+from app.models import User, UserRole, Accident, AccidentStatus, ScoringRun
+from app.scoring import Rescorer
+from conftest import TestConfig
+
+def seed(count):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.flush()
+    db.session.add_all([Accident(report_number=f'ACC-{i:05d}', officer_id=officer.id, location='Thika Road',
+                                 accident_date=datetime(2024, 5, 1, 23 if i % 2 else 14, 0),
+                                 created_at=datetime(2024, 5, 9 if i % 2 else 1, 15, 0), risk_score=-1.0)
+                        for i in range(count)])
+    db.session.commit()
+
+def test_rescore_all_in_chunks(app):
+    seed(25)
+    progress = []
+    run = Rescorer(chunk_size=10, progress=lambda run, rate: progress.append(run.last_accident_id)).run()
+
+    assert run.rows_scored == 25 and run.finished_at is not None
+    assert len(progress) == 3
+    assert Accident.query.filter(Accident.risk_score < 0).count() == 0
+    assert Accident.query.filter_by(status=AccidentStatus.FLAGGED).count() == 0  # Rules alone stay below 0.7
+
+def test_resume_after_crash(app, monkeypatch):
+    seed(30)
+    rescorer = Rescorer(chunk_size=10)
+    commit_chunk = rescorer._commit_chunk
+    calls = []
+
+    def crash_on_second_chunk(run, ids, result):
+        calls.append(ids)
+        if len(calls) == 2:
+            raise RuntimeError('worker killed')
+        commit_chunk(run, ids, result)
+
+    monkeypatch.setattr(rescorer, '_commit_chunk', crash_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        rescorer.run()
+
+    interrupted = ScoringRun.query.one()
+    assert interrupted.rows_scored == 10 and interrupted.finished_at is None
+    assert Accident.query.filter(Accident.risk_score < 0).count() == 20
+
+    resumed = Rescorer(chunk_size=10).run()
+    assert resumed.id == interrupted.id
+    assert resumed.rows_scored == 30
+    assert Accident.query.filter(Accident.risk_score < 0).count() == 0
+
+def test_process_pool(tmp_path):
+    """Chunks scored in worker processes are written back in order."""
+    config = type('FileConfig', (TestConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/rescore.db'})
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        seed(45)
+        run = Rescorer(chunk_size=10, workers=2).run()
+        assert run.rows_scored == 45
+        assert run.last_accident_id == db.session.query(db.func.max(Accident.id)).scalar()
+        assert Accident.query.filter(Accident.risk_score < 0).count() == 0
+        db.session.remove()
\ No newline at end of file
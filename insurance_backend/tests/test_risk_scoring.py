@@ -0,0 +1,140 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.cli import train_risk_model_command
+from app.models import User, UserRole, Accident, AccidentStatus, Vehicle, Person, MediaFile, ReviewNote
+from app.scoring import RiskModel, RiskScorer, RuleEngine, extract_features, risk_worker
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+def make_accident(officer, number, reg_nos=('KCA 001A',), delay_hours=1, hour=14, licensed=True, media=True):
+    accident_date = datetime(2024, 5, 1, hour, 0)
+    accident = Accident(report_number=f'ACC-{number:05d}', officer_id=officer.id, location='Thika Road',
+                        latitude=-1.2, longitude=36.9, accident_date=accident_date,
+                        created_at=accident_date + timedelta(hours=delay_hours))
+    db.session.add(accident)
+    db.session.flush()
+    for reg_no in reg_nos:
+        driver = Person(name='Driver', license_number='DL1' if licensed else None)
+        db.session.add(driver)
+        db.session.flush()
+        db.session.add(Vehicle(accident_id=accident.id, registration_number=reg_no, make='Toyota',
+                               model='Axio', color='White', driver_id=driver.id))
+    if media:
+        db.session.add(MediaFile(accident_id=accident.id, file_type='image', file_path='x.jpg'))
+    db.session.flush()
+    return accident
+
+def test_features(officer):
+    clean = make_accident(officer, 1)
+    suspicious = make_accident(officer, 2, reg_nos=('KCA 001A', 'KBZ 900Z'), delay_hours=100, hour=23,
+                               licensed=False, media=False)
+    db.session.commit()
+
+    features = extract_features([clean.id, suspicious.id])
+
+    assert features.loc[suspicious.id, 'vehicle_count'] == 2
+    assert features.loc[suspicious.id, 'unlicensed_driver_count'] == 2
+    assert features.loc[suspicious.id, 'report_delay_hours'] == 100
+    assert features.loc[suspicious.id, 'is_night'] == 1
+    assert features.loc[suspicious.id, 'prior_vehicle_accidents'] == 1
+    assert features.loc[clean.id, 'media_count'] == 1
+    assert features.loc[clean.id, 'witness_count'] == 0
+
+def test_worker_scores_and_flags_in_micro_batches(app, officer, count_queries):
+    # Distinct vehicles, otherwise the clean reports would be duplicates of each other
+    clean = [make_accident(officer, i, reg_nos=(f'KDA {i:03d}D',)) for i in range(5)]
+    suspicious = [make_accident(officer, 100 + i, reg_nos=('KCA 001A', f'KBZ {i:03d}Z'), delay_hours=100,
+                                hour=23, licensed=False, media=False) for i in range(5)]
+    db.session.commit()
+    app.config['RISK_FLAG_THRESHOLD'] = 0.5
+
+    with count_queries() as counter:
+        assert risk_worker.drain(RiskScorer()) == 10
+    scored_once = counter.count
+
+    db.session.expire_all()
+    assert all(a.risk_score is not None and a.status == AccidentStatus.PENDING for a in clean)
+    assert all(a.risk_score >= 0.5 and a.status == AccidentStatus.FLAGGED for a in suspicious)
+    assert risk_worker.run_once(RiskScorer()) == 0
+
+    # Queries per batch do not depend on how many accidents are in it
+    more = [make_accident(officer, 200 + i) for i in range(40)]
+    db.session.commit()
+    with count_queries() as counter:
+        assert risk_worker.drain(RiskScorer()) == len(more)
+    assert counter.count <= scored_once
+
+def test_model_is_blended_and_loaded_once(app, officer, tmp_path):
+    accidents = [make_accident(officer, i, delay_hours=100 if i % 2 else 1, media=not i % 2) for i in range(20)]
+    db.session.commit()
+    features = extract_features([a.id for a in accidents])
+    labels = [int(features.loc[a.id, 'report_delay_hours'] > 72) for a in accidents]
+
+    path = str(tmp_path / 'risk_model.joblib')
+    RiskModel.train(features, labels).save(path)
+    model = RiskModel.load(path)
+    assert RiskModel.load(path) is model
+
+    blended = RiskScorer(model=model).score(features)
+    rules_only = RiskScorer(rules=RuleEngine()).score(features)
+    late = [a.id for a in accidents if features.loc[a.id, 'report_delay_hours'] > 72]
+    on_time = [a.id for a in accidents if a.id not in late]
+    assert blended[late].min() > blended[on_time].max()
+    assert not blended.equals(rules_only)
+
+def test_model_trains_on_reviewer_verdicts_only(app, client, auth_headers, officer, tmp_path):
+    reviewer = User(email='assessor@insure.co.ke', password='Assess@123', name='Grace Otieno',
+                    role=UserRole.INSURANCE_OFFICER)
+    db.session.add(reviewer)
+    accidents = [make_accident(officer, i, reg_nos=(f'KDA {i:03d}D',), delay_hours=100 if i % 2 else 1)
+                 for i in range(6)]
+    # Flagged by the scorer, not by a person
+    accidents[0].status = AccidentStatus.FLAGGED
+    db.session.commit()
+    path = str(tmp_path / 'risk_model.joblib')
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(train_risk_model_command, ['--output', path])
+    assert result.exit_code != 0 and 'reviewed as fraudulent and as genuine' in result.output
+
+    headers = auth_headers(reviewer)
+    for i, accident in enumerate(accidents[1:], start=1):
+        response = client.put(f'/api/accidents/{accident.id}/review', headers=headers,
+                               json={'fraudulent': bool(i % 2)})
+        assert response.status_code == 200
+    assert client.put('/api/accidents/999/review', headers=headers, json={'fraudulent': True}).status_code == 404
+
+    db.session.expire_all()
+    assert (accidents[1].fraud_label, accidents[1].status) == (True, AccidentStatus.FLAGGED)
+    assert (accidents[2].fraud_label, accidents[2].status) == (False, AccidentStatus.VERIFIED)
+    assert accidents[0].fraud_label is None and accidents[2].reviewed_by == reviewer.id
+    assert ReviewNote.query.filter_by(user_id=reviewer.id).count() == 5
+
+    result = runner.invoke(train_risk_model_command, ['--output', path])
+    assert result.exit_code == 0
+    assert 'Trained on 5 accident(s)' in result.output
+
+def test_commit_wakes_background_worker(app, officer):
+    """New accidents are scored off the request thread once committed."""
+    app.config['RISK_SCORING_MODE'] = 'thread'
+    risk_worker.init_app(app)
+    try:
+        accident = make_accident(officer, 1)
+        db.session.commit()
+        risk_worker._wakeup.set()
+        for _ in range(50):
+            db.session.expire_all()
+            if db.session.get(Accident, accident.id).risk_score is not None:
+                break
+            risk_worker._stopping.wait(0.1)
+        assert db.session.get(Accident, accident.id).risk_score is not None
+    finally:
+        risk_worker.stop()
+        app.config['RISK_SCORING_MODE'] = 'off'
+        risk_worker.init_app(app)
\ No newline at end of file
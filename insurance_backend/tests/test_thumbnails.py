@@ -0,0 +1,81 @@
+import io
+import os
+import pytest
+from datetime import datetime
+from PIL import Image
+from app import db
+from app.models import User, UserRole, Accident, MediaFile
+from app.services.media_store import MediaStore
+from app.services.thumbnails import ThumbnailWorker, render_variants
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+@pytest.fixture
+def accident(officer):
+    accident = Accident(report_number='ACC-00001', officer_id=officer.id, location='Thika Road',
+                        accident_date=datetime(2024, 5, 1, 8, 30))
+    db.session.add(accident)
+    db.session.commit()
+    return accident
+
+def store_photo(app, accident, width=2000, height=1500, name='photo.jpg'):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], name)
+    Image.new('RGB', (width, height), (200, 30, 30)).save(path, 'JPEG')
+    blob = MediaStore.put_file(path)
+    media = MediaFile(accident_id=accident.id, file_type='image', file_path=blob.path, sha256=blob.sha256)
+    db.session.add(media)
+    db.session.commit()
+    return media
+
+def test_variants_generated_after_commit(app, accident):
+    media = store_photo(app, accident)
+    db.session.refresh(media)
+
+    assert sorted(v['width'] for v in media.variants.values()) == [160, 480, 1280]
+    thumbnail = media.variants['160']
+    assert thumbnail['height'] == 120
+    with Image.open(MediaStore.absolute_path(thumbnail['path'])) as image:
+        assert image.format == 'WEBP'
+        assert image.size == (160, 120)
+
+def test_small_image_gets_one_variant_at_its_own_size(app, tmp_path):
+    Image.new('RGB', (100, 50)).save(tmp_path / 'small.png')
+    variants = render_variants(str(tmp_path), 'small.png', (160, 480))
+    assert list(variants) == ['100']
+    assert (variants['100']['width'], variants['100']['height']) == (100, 50)
+
+def test_process_pool_worker(app, accident):
+    """The default executor renders in another process and records the result."""
+    media = store_photo(app, accident, name='pooled.jpg')
+    MediaFile.query.update({'variants': None})
+    db.session.commit()
+
+    worker = ThumbnailWorker()
+    worker.init_app(app)
+    worker.mode = 'process'
+    worker.submit(media.sha256, media.file_path).result(timeout=30)
+    worker.shutdown()
+
+    db.session.expire_all()
+    assert len(db.session.get(MediaFile, media.id).variants) == 3
+
+def test_image_endpoint_serves_smallest_adequate_variant(app, client, auth_headers, officer, accident):
+    media = store_photo(app, accident)
+    headers = auth_headers(officer)
+
+    response = client.get(f'/api/media/{media.id}/image?width=300', headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'image/webp'
+    assert Image.open(io.BytesIO(response.data)).width == 480
+
+    largest = client.get(f'/api/media/{media.id}/image?width=5000', headers=headers)
+    assert Image.open(io.BytesIO(largest.data)).width == 1280
+
+    original = client.get(f'/api/media/{media.id}/download', headers=headers)
+    assert original.status_code == 200
+    assert Image.open(io.BytesIO(original.data)).size == (2000, 1500)
\ No newline at end of file
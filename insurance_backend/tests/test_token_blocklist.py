@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import RevokedToken, User, UserRole
+from app.services.token_blocklist import token_blocklist
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+def request(app, client, method, url, headers=None, json=None):
+    """Issue a request in its own app context, so it gets a fresh flask.g and session."""
+    with app.app_context():
+        return client.open(url, method=method, headers=headers, json=json)
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def test_logout_revokes_tokens(app, client, officer):
+    response = request(app, client, 'POST', '/api/auth/login',
+                       json={'email': 'officer1@police.go.ke', 'password': 'Police@123'})
+    assert response.status_code == 200
+    access, refresh = response.get_json()['access_token'], response.get_json()['refresh_token']
+    assert request(app, client, 'GET', '/api/auth/me', bearer(access)).status_code == 200
+
+    assert request(app, client, 'POST', '/api/auth/logout', bearer(access)).status_code == 200
+    assert request(app, client, 'GET', '/api/auth/me', bearer(access)).status_code == 401
+    assert request(app, client, 'POST', '/api/auth/refresh', bearer(refresh)).status_code == 200
+
+    assert request(app, client, 'POST', '/api/auth/logout', bearer(refresh)).status_code == 200
+    assert request(app, client, 'POST', '/api/auth/refresh', bearer(refresh)).status_code == 401
+    assert {row.token_type for row in RevokedToken.query.filter_by(user_id=officer.id)} == {'access', 'refresh'}
+
+def test_unrevoked_token_checked_without_query(app, client, auth_headers, count_queries, officer):
+    headers = auth_headers(officer)
+    assert request(app, client, 'GET', '/api/accidents/', headers).status_code == 200
+
+    with count_queries() as counter:
+        assert request(app, client, 'GET', '/api/accidents/', headers).status_code == 200
+    assert not [s for s in counter.statements if 'revoked_tokens' in s]
+
+def test_revocations_from_other_processes_and_pruning(app):
+    now = datetime.utcnow()
+    assert not token_blocklist.is_revoked('a')
+
+    # Rows written by another worker are picked up on the next sync
+    db.session.add_all([
+        RevokedToken(jti='a', token_type='access', expires_at=now + timedelta(hours=1)),
+        RevokedToken(jti='b', token_type='access', expires_at=now + timedelta(seconds=1))
+    ])
+    db.session.commit()
+    assert not token_blocklist.is_revoked('a')  # Within the refresh interval
+    token_blocklist.sync()
+    assert token_blocklist.is_revoked('a') and token_blocklist.is_revoked('b')
+
+    # Once a token has expired its entry and row are dropped; the first
+    # revocation prunes in its own transaction, then hourly
+    jti = str(uuid.uuid4())
+    token_blocklist.revoke(jti, 'access', None, now - timedelta(seconds=1))
+    db.session.commit()
+    assert db.session.get(RevokedToken, jti) is None
+    token_blocklist.sync()
+    assert not token_blocklist.is_revoked(jti)
+    db.session.get(RevokedToken, 'b').expires_at = now - timedelta(seconds=1)
+    token_blocklist.revoke(str(uuid.uuid4()), 'access', None, now + timedelta(hours=1))
+    db.session.commit()
+    assert RevokedToken.query.count() == 3
+    assert token_blocklist.prune() == 1
+    db.session.commit()
+    token_blocklist.sync()
+    assert RevokedToken.query.count() == 2
+    assert token_blocklist.is_revoked('a')
+
+def test_logout_of_token_without_expiry(app, client, officer):
+    """A token issued with JWT_ACCESS_TOKEN_EXPIRES=False stays revoked for the configured lifetime."""
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = False
+    token_blocklist.max_lifetime = 3600
+    response = request(app, client, 'POST', '/api/auth/login',
+                       json={'email': 'officer1@police.go.ke', 'password': 'Police@123'})
+    access = response.get_json()['access_token']
+
+    assert request(app, client, 'POST', '/api/auth/logout', bearer(access)).status_code == 200
+    assert request(app, client, 'GET', '/api/auth/me', bearer(access)).status_code == 401
+    row = RevokedToken.query.filter_by(user_id=officer.id).one()
+    assert timedelta(minutes=59) < row.expires_at - datetime.utcnow() <= timedelta(hours=1)
\ No newline at end of file
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import pytest
+from datetime import datetime
+from app import db
+from app.models import User, UserRole, Accident, MediaFile, Abstract, UploadSession
+from app.services import upload_service
+
+@pytest.fixture
+def officer(app):
+    officer = User(email='officer1@police.go.ke', password='Police@123', name='James Kamau', role=UserRole.POLICE)
+    db.session.add(officer)
+    db.session.commit()
+    return officer
+
+@pytest.fixture
+def accident(officer):
+    accident = Accident(report_number='ACC-00001', officer_id=officer.id, location='Thika Road',
+                        accident_date=datetime(2024, 5, 1, 8, 30))
+    db.session.add(accident)
+    db.session.commit()
+    return accident
+
+@pytest.fixture
+def video():
+    return os.urandom(300 * 1024 + 17)
+
+def start(client, headers, accident, data, target='media', file_type='video'):
+    response = client.post('/api/uploads/', headers=headers, json={
+        'accident_id': accident.id, 'target': target, 'file_type': file_type,
+        'filename': 'dashcam.MP4', 'total_size': len(data)
+    })
+    assert response.status_code == 201
+    return response.get_json()['upload_id']
+
+def send(client, headers, upload_id, data, offset, size):
+    return client.put(f'/api/uploads/{upload_id}', data=data[offset:offset + size],
+                      headers=dict(headers, **{'Upload-Offset': str(offset),
+                                               'Content-Type': 'application/octet-stream'}))
+
+def test_chunked_upload_creates_media_file(app, client, auth_headers, officer, accident, video):
+    headers = auth_headers(officer)
+    upload_id = start(client, headers, accident, video)
+
+    chunk = 100 * 1024
+    for offset in range(0, len(video), chunk):
+        response = send(client, headers, upload_id, video, offset, chunk)
+        assert response.status_code == 200
+        assert response.headers['Upload-Offset'] == str(min(offset + chunk, len(video)))
+
+    digest = hashlib.sha256(video).hexdigest()
+    response = client.post(f'/api/uploads/{upload_id}/complete', headers=headers, json={'sha256': digest})
+    assert response.status_code == 200
+    media = response.get_json()['media']
+    assert media['sha256'] == digest
+    assert media['file_size'] == len(video)
+    assert media['file_path'].endswith(digest)
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], media['file_path']), 'rb') as f:
+        assert f.read() == video
+    assert MediaFile.query.count() == 1
+
+    # Completing again (lost response) returns the same record
+    again = client.post(f'/api/uploads/{upload_id}/complete', headers=headers, json={})
+    assert again.get_json()['media']['id'] == media['id']
+    assert MediaFile.query.count() == 1
+
+def test_resume_after_interruption(app, client, auth_headers, officer, accident, video):
+    """A dropped chunk is resent from the last acknowledged offset, even after a restart."""
+    headers = auth_headers(officer)
+    upload_id = start(client, headers, accident, video, target='abstract', file_type='pdf')
+    chunk = 128 * 1024
+
+    assert send(client, headers, upload_id, video, 0, chunk).status_code == 200
+    # Out-of-order chunk is refused with the offset to resume from
+    response = send(client, headers, upload_id, video, 2 * chunk, chunk)
+    assert response.status_code == 409
+    assert response.headers['Upload-Offset'] == str(chunk)
+
+    # Running hashes are lost, as after a worker restart; the first chunk is resent
+    upload_service._hashers.clear()
+    status = client.get(f'/api/uploads/{upload_id}', headers=headers).get_json()
+    assert status['received_bytes'] == chunk
+    assert send(client, headers, upload_id, video, 0, chunk).status_code == 200
+    for offset in range(status['received_bytes'], len(video), chunk):
+        assert send(client, headers, upload_id, video, offset, chunk).status_code == 200
+
+    response = client.post(f'/api/uploads/{upload_id}/complete', headers=headers,
+                           json={'sha256': hashlib.sha256(video).hexdigest()})
+    assert response.status_code == 200
+    assert Abstract.query.one().uploaded_by == officer.id
+
+def test_incomplete_or_corrupt_upload_is_rejected(client, auth_headers, officer, accident, video):
+    headers = auth_headers(officer)
+    upload_id = start(client, headers, accident, video)
+
+    assert client.post(f'/api/uploads/{upload_id}/complete', headers=headers, json={}).status_code == 409
+    send(client, headers, upload_id, video, 0, len(video))
+    response = client.post(f'/api/uploads/{upload_id}/complete', headers=headers,
+                           json={'sha256': hashlib.sha256(b'other').hexdigest()})
+    assert response.status_code == 422
+    assert MediaFile.query.count() == 0
+
+def test_uploads_are_private_to_their_owner(app, client, auth_headers, officer, accident, video):
+    other = User(email='officer2@police.go.ke', password='Police@123', name='Mary Wanjiku', role=UserRole.POLICE)
+    db.session.add(other)
+    db.session.commit()
+    upload_id = start(client, auth_headers(officer), accident, video)
+
+    # Fresh app context so flask.g does not carry the first user's snapshot over
+    with app.app_context():
+        assert send(client, auth_headers(other), upload_id, video, 0, 1024).status_code == 404
+    assert db.session.get(UploadSession, upload_id).received_bytes == 0
+
+def test_idle_uploads_expire(app, client, auth_headers, officer, accident, video):
+    headers = auth_headers(officer)
+    idle_id = start(client, headers, accident, video)
+    active_id = start(client, headers, accident, video)
+    for upload_id in (idle_id, active_id):
+        assert send(client, headers, upload_id, video, 0, 1024).status_code == 200
+    UploadSession.query.filter_by(id=idle_id).update({'updated_at': datetime(2024, 1, 1)})
+    db.session.commit()
+
+    # Refused before the sweep gets to it
+    assert send(client, headers, idle_id, video, 1024, 1024).status_code == 410
+
+    assert upload_service.UploadService.expire_uploads() == 1
+    partial = os.path.join(app.config['UPLOAD_FOLDER'], 'partial')
+    assert not os.path.exists(os.path.join(partial, f'{idle_id}.part'))
+    assert idle_id not in upload_service._hashers
+    assert client.get(f'/api/uploads/{idle_id}', headers=headers).status_code == 404
+
+    assert os.path.exists(os.path.join(partial, f'{active_id}.part'))
+    assert send(client, headers, active_id, video, 1024, 1024).status_code == 200
\ No newline at end of file
@@ -0,0 +1,85 @@
+import pytest
+from flask import jsonify
+from app import db
+from app.models import User, UserRole
+from app.services.auth_service import AuthService
+from app.utils import role_required, get_current_user
+from app.utils.auth_middleware import admin_required
+from app.utils.user_cache import user_cache, UserSnapshotCache, UserSnapshot
+
+@pytest.fixture
+def admin(app):
+    user_cache.clear()
+    admin = User(email='admin@raise.ke', password='Admin@123', name='System Administrator', role=UserRole.ADMIN)
+    db.session.add(admin)
+    db.session.commit()
+
+    @app.route('/_test/stacked')
+    @role_required(['admin', 'police'])
+    @admin_required
+    def stacked():
+        return jsonify({'name': get_current_user().name})
+
+    yield admin
+    user_cache.clear()
+
+def request(app, client, url, headers):
+    """Issue a request in its own app context, so it gets a fresh flask.g and session."""
+    with app.app_context():
+        return client.get(url, headers=headers)
+
+def user_queries(counter):
+    return [s for s in counter.statements if 'FROM users' in s]
+
+def test_stacked_decorators_load_user_once(app, client, auth_headers, count_queries, admin):
+    """The first request loads the user once; later requests are served from the cache."""
+    headers = auth_headers(admin)
+
+    with count_queries() as counter:
+        response = request(app, client, '/_test/stacked', headers)
+    assert response.status_code == 200
+    assert response.get_json()['name'] == 'System Administrator'
+    # one snapshot lookup for the decorators, one full load for the view
+    assert len(user_queries(counter)) == 2
+
+    with count_queries() as counter:
+        assert request(app, client, '/_test/stacked', headers).status_code == 200
+    assert len(user_queries(counter)) == 1
+
+    with count_queries() as counter:
+        assert request(app, client, '/api/accidents/', headers).status_code == 200
+    assert len(user_queries(counter)) == 0
+
+def test_deactivation_invalidates_cache(app, client, auth_headers, admin):
+    headers = auth_headers(admin)
+    assert request(app, client, '/api/accidents/', headers).status_code == 200
+
+    AuthService.deactivate_user(admin.id)
+    assert request(app, client, '/api/accidents/', headers).status_code == 401
+
+    AuthService.reactivate_user(admin.id)
+    assert request(app, client, '/api/accidents/', headers).status_code == 200
+
+    AuthService.update_user(admin.id, role=UserRole.POLICE)
+    assert request(app, client, '/_test/stacked', headers).status_code == 403
+
+def test_snapshot_cache_is_bounded_and_expires(monkeypatch):
+    cache = UserSnapshotCache(ttl=10, max_size=2)
+    now = [1000.0]
+    monkeypatch.setattr('app.utils.user_cache.time.monotonic', lambda: now[0])
+
+    for user_id in (1, 2, 3):
+        cache.set(UserSnapshot(user_id, UserRole.POLICE, True, None))
+    assert len(cache) == 2
+    assert cache.get(1) is None
+    assert cache.get(3).id == 3
+
+    now[0] += 11
+    assert cache.get(3) is None
+
+def test_me_returns_cached_user(app, client, auth_headers, admin):
+    headers = auth_headers(admin)
+    for _ in range(2):
+        response = request(app, client, '/api/auth/me', headers)
+        assert response.status_code == 200
+        assert response.get_json()['email'] == 'admin@raise.ke'
\ No newline at end of file
@@ -5,6 +5,7 @@ from flask_mail import Mail
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import timedelta, datetime
 import os
 from dotenv import load_dotenv
@@ -42,6 +43,69 @@ def create_app(config_class=None):
     app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
     app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
     app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
+    app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@raiseinsurance.com')
+    
+    # Email is queued in outbound_emails and sent in batches by a background thread
+    # ('thread'), or only by `flask send-queued-mail` ('off'). At most
+    # MAIL_QUEUE_DOMAIN_RATE messages per minute go to any one recipient domain.
+    app.config['MAIL_QUEUE_MODE'] = os.getenv('MAIL_QUEUE_MODE', 'thread')
+    app.config['MAIL_QUEUE_BATCH_SIZE'] = int(os.getenv('MAIL_QUEUE_BATCH_SIZE', 50))
+    app.config['MAIL_QUEUE_MAX_ATTEMPTS'] = int(os.getenv('MAIL_QUEUE_MAX_ATTEMPTS', 5))
+    app.config['MAIL_QUEUE_RETRY_DELAY'] = float(os.getenv('MAIL_QUEUE_RETRY_DELAY', 60))
+    app.config['MAIL_QUEUE_DOMAIN_RATE'] = int(os.getenv('MAIL_QUEUE_DOMAIN_RATE', 60))
+    
+    # Report attachments (photos, videos, abstracts) are files under ATTACHMENT_FOLDER.
+    # ATTACHMENT_SENDFILE hands the transfer to the front proxy: 'x-accel' (nginx,
+    # served from an internal location at ATTACHMENT_ACCEL_PREFIX) or 'x-sendfile'.
+    app.config['ATTACHMENT_FOLDER'] = os.getenv(
+        'ATTACHMENT_FOLDER', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'instance', 'attachments'))
+    )
+    app.config['ATTACHMENT_SENDFILE'] = os.getenv('ATTACHMENT_SENDFILE', '').lower() or None
+    app.config['ATTACHMENT_ACCEL_PREFIX'] = os.getenv('ATTACHMENT_ACCEL_PREFIX', '/protected-attachments/')
+    app.config['USE_X_SENDFILE'] = app.config['ATTACHMENT_SENDFILE'] == 'x-sendfile'
+    
+    # Insurer notifications are pushed over server-sent events. NOTIFICATION_BROKER is
+    # 'local' (one process) or 'redis' (every gunicorn worker, through REDIS_URL).
+    # Streams close after NOTIFICATION_STREAM_TIMEOUT seconds and the browser reconnects.
+    app.config['NOTIFICATION_BROKER'] = os.getenv('NOTIFICATION_BROKER', 'local')
+    app.config['REDIS_URL'] = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    app.config['NOTIFICATION_QUEUE_SIZE'] = int(os.getenv('NOTIFICATION_QUEUE_SIZE', 100))
+    app.config['NOTIFICATION_HEARTBEAT'] = float(os.getenv('NOTIFICATION_HEARTBEAT', 15))
+    app.config['NOTIFICATION_STREAM_TIMEOUT'] = float(os.getenv('NOTIFICATION_STREAM_TIMEOUT', 300))
+    
+    # Vehicle history lookups are cached per process ('lru') or in Redis ('redis', shared
+    # through REDIS_URL). Writes invalidate the entry in the process that made them;
+    # other 'lru' workers pick the change up within CACHE_TTL seconds
+    app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'lru')
+    app.config['CACHE_TTL'] = int(os.getenv('CACHE_TTL', 60))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    
+    # New reports are routed to insurers through an in-memory plate -> company map;
+    # ownership changed by other processes is picked up every INSURER_ROUTING_REFRESH seconds
+    app.config['INSURER_ROUTING_REFRESH'] = float(os.getenv('INSURER_ROUTING_REFRESH', 30))
+    
+    # Password hashing: any Werkzeug method with its cost, e.g. 'scrypt:32768:8:1' or
+    # 'pbkdf2:sha256:600000' (a cheap 'pbkdf2:sha256:1000' for tests). Stored hashes made
+    # with other settings are upgraded on the next successful login. At most
+    # PASSWORD_HASH_CONCURRENCY hashes run at once per process.
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_CONCURRENCY'] = int(os.getenv('PASSWORD_HASH_CONCURRENCY', 0)) or os.cpu_count()
+    app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+    # Login attempts allowed in any LOGIN_THROTTLE_WINDOW seconds per client address, and
+    # failed logins per account; 'redis' storage shares the counts between workers through REDIS_URL
+    app.config['LOGIN_THROTTLE_STORAGE'] = os.getenv('LOGIN_THROTTLE_STORAGE', 'memory')
+    app.config['LOGIN_THROTTLE_WINDOW'] = int(os.getenv('LOGIN_THROTTLE_WINDOW', 300))
+    app.config['LOGIN_THROTTLE_IP_LIMIT'] = int(os.getenv('LOGIN_THROTTLE_IP_LIMIT', 100))
+    app.config['LOGIN_THROTTLE_ACCOUNT_LIMIT'] = int(os.getenv('LOGIN_THROTTLE_ACCOUNT_LIMIT', 10))
+    # Reverse proxies (e.g. nginx) in front of the app whose X-Forwarded-For and
+    # X-Forwarded-Proto are trusted, so the throttle counts per client; 0 when clients connect directly
+    app.config['TRUSTED_PROXIES'] = int(os.getenv('TRUSTED_PROXIES', 0))
+    if app.config['TRUSTED_PROXIES']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'],
+                                x_proto=app.config['TRUSTED_PROXIES'])
+    # Signed-in users (with their company) are cached between requests; a change in
+    # another worker process is picked up within USER_CACHE_TTL seconds
+    app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 30))
     
     # Initialize extensions with app
     db.init_app(app)
@@ -73,6 +137,35 @@ def create_app(config_class=None):
     from app.admin import bp as admin_bp
     app.register_blueprint(admin_bp, url_prefix='/admin')
     
+    from app.api import bp as api_bp
+    app.register_blueprint(api_bp, url_prefix='/api')
+    
+    # Register CLI commands and model event hooks
+    from app import cli
+    cli.init_app(app)
+    
+    from app.utils import password
+    password.init_app(app)
+    
+    from app.services import login_throttle, user_loader
+    login_throttle.init_app(app)
+    user_loader.init_app(app)
+    
+    from app.services import insurer_routing
+    insurer_routing.init_app(app)
+    
+    from app.services import report_counters
+    report_counters.init_app(app)
+    
+    from app.services import vehicle_history
+    vehicle_history.init_app(app)
+    
+    from app.services import notifications
+    notifications.init_app(app)
+    
+    from app.services import mail_queue
+    mail_queue.init_app(app)
+    
     # Create database tables if they don't exist
     with app.app_context():
         if not os.path.exists(db_path):
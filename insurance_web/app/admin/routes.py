@@ -4,8 +4,14 @@ from app import db
 from app.admin import bp
 from app.models.user import User
 from app.models.company import CompanyInfo
-from app.models.report import Report
+from app.models.owner import Owner
+from app.services.insurer_routing import router
+from app.services.listings import (
+    COMPANY_SORTS, REPORT_SORTS, REPORT_STATUSES, USER_SORTS, USER_STATUSES, ListingService
+)
+from app.services.stats_service import StatsService
 from app.utils.decorators import admin_required
+from app.utils.pagination import listing_args
 
 @bp.route('/')
 @login_required
@@ -15,11 +21,10 @@ def index():
     # Get statistics
     total_users = User.query.count()
     total_companies = CompanyInfo.query.count()
-    total_reports = Report.query.count()
-    pending_reports = Report.query.filter_by(status='pending').count()
+    summary = StatsService.report_summary()
     
     # Get recent reports
-    recent_reports = Report.query.order_by(Report.created_at.desc()).limit(5).all()
+    recent_reports = StatsService.recent_reports(limit=5)
     
     # Get recent users
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
@@ -27,8 +32,8 @@ def index():
     return render_template('admin/index.html',
                          total_users=total_users,
                          total_companies=total_companies,
-                         total_reports=total_reports,
-                         pending_reports=pending_reports,
+                         total_reports=summary['total'],
+                         pending_reports=summary['pending'],
                          recent_reports=recent_reports,
                          recent_users=recent_users)
 
@@ -36,25 +41,45 @@ def index():
 @login_required
 @admin_required
 def users():
-    """List all users."""
-    users = User.query.order_by(User.created_at.desc()).all()
-    return render_template('admin/users.html', users=users)
+    """List users, a page at a time."""
+    try:
+        page = ListingService.users(**listing_args(request.args))
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('admin.users'))
+    # Vehicle/accident counts for every owner on the page in one grouped query
+    owner_counts = Owner.counts_for(user.owner_id for user in page.items if user.owner_id)
+    return render_template('admin/users.html', page=page, users=page.items, owner_counts=owner_counts,
+                           sorts=USER_SORTS, statuses=USER_STATUSES)
 
 @bp.route('/companies')
 @login_required
 @admin_required
 def companies():
-    """List all companies."""
-    companies = CompanyInfo.query.order_by(CompanyInfo.created_at.desc()).all()
-    return render_template('admin/companies.html', companies=companies)
+    """List insurance companies, a page at a time."""
+    try:
+        args = listing_args(request.args)
+        args.pop('status')
+        page = ListingService.companies(**args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('admin.companies'))
+    return render_template('admin/companies.html', page=page, companies=page.items, sorts=COMPANY_SORTS)
 
 @bp.route('/reports')
 @login_required
 @admin_required
 def reports():
-    """List all reports."""
-    reports = Report.query.order_by(Report.created_at.desc()).all()
-    return render_template('admin/reports.html', reports=reports)
+    """List all reports, a page at a time."""
+    try:
+        page = ListingService.reports(vehicle_reg_no=request.args.get('vehicle'), **listing_args(request.args))
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('admin.reports'))
+    # Insurers of every vehicle on the page from the warm plate map
+    insurers = router.companies_for(db.session.connection(), {report.vehicle_reg_no for report in page.items})
+    return render_template('admin/reports.html', page=page, reports=page.items, insurers=insurers,
+                           sorts=REPORT_SORTS, statuses=REPORT_STATUSES)
 
 @bp.route('/user/<int:user_id>/toggle-status', methods=['POST'])
 @login_required
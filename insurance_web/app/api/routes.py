@@ -0,0 +1,84 @@
+from flask import Response, current_app, jsonify, request
+from flask_login import current_user, login_required
+from app.api import bp
+from app.services.insurer_routing import router
+from app.services.login_throttle import login_throttle
+from app.services.notifications import NotificationService
+from app.services import user_loader
+from app.services.vehicle_history import VehicleHistoryService
+from app.utils.decorators import admin_required
+
+# Public history may be cached by browsers and shared caches, but revalidated often
+HISTORY_MAX_AGE = 60
+
+@bp.route('/vehicles/<path:reg_no>/history')
+def vehicle_history(reg_no):
+    """Public accident history of a vehicle, looked up by registration number."""
+    document = VehicleHistoryService.cached_lookup(reg_no)
+    if document is None:
+        return jsonify({'error': 'Vehicle not found'}), 404
+    
+    etag = VehicleHistoryService.etag(document)
+    last_modified = document.pop('last_modified')
+    response = jsonify(document)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = HISTORY_MAX_AGE
+    # Answers If-None-Match / If-Modified-Since with 304 Not Modified
+    return response.make_conditional(request)
+
+@bp.route('/vehicles/cache-stats')
+@login_required
+@admin_required
+def vehicle_history_cache_stats():
+    """Hit, miss and eviction counters of the vehicle history cache."""
+    return jsonify(VehicleHistoryService.cache_stats())
+
+@bp.route('/users/cache-stats')
+@login_required
+@admin_required
+def user_cache_stats():
+    """Hit, miss and eviction counters of the signed-in user cache."""
+    return jsonify(user_loader.user_cache.stats())
+
+@bp.route('/insurer-routing/stats')
+@login_required
+@admin_required
+def insurer_routing_stats():
+    """Size, hit ratio and query count of this worker's plate -> insurer map."""
+    return jsonify(router.stats())
+
+@bp.route('/login-throttle/stats')
+@login_required
+@admin_required
+def login_throttle_stats():
+    """Login attempts counted and refused per address and per account by this worker."""
+    return jsonify(login_throttle.stats())
+
+@bp.route('/notifications/stream')
+@login_required
+def notification_stream():
+    """Server-sent events announcing new reports on vehicles the user's company insures."""
+    company_reg_no = current_user.company_reg_no
+    if company_reg_no is None:
+        return jsonify({'error': 'Notifications are only available to company users'}), 403
+    
+    stream = NotificationService.stream(
+        company_reg_no,
+        heartbeat=current_app.config['NOTIFICATION_HEARTBEAT'],
+        timeout=current_app.config['NOTIFICATION_STREAM_TIMEOUT']
+    )
+    response = Response(stream, mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/notifications/stats')
+@login_required
+@admin_required
+def notification_stats():
+    """Published event and open stream counts of this worker's notification broker."""
+    return jsonify(NotificationService.stats())
\ No newline at end of file
@@ -1,11 +1,14 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, make_response
 from flask_login import login_user, logout_user, current_user, login_required
-from app import db, mail
+from app import db
 from app.auth import bp
 from app.models.user import User
 from app.models.company import CompanyInfo
+from app.services.login_throttle import LoginThrottled, login_throttle
+from app.services.mail_queue import MailQueue
+from app.utils.password import HasherBusy, hash_password
 from datetime import datetime, timedelta
-from flask_mail import Message
+import math
 import secrets
 import string
 
@@ -15,16 +18,13 @@ def generate_reset_token():
     return ''.join(secrets.choice(alphabet) for _ in range(32))
 
 def send_reset_email(user, token):
-    """Send password reset email to user."""
-    msg = Message('Password Reset Request',
-                  sender='noreply@raiseinsurance.com',
-                  recipients=[user.email])
-    msg.body = f'''To reset your password, visit the following link:
+    """Queue a password reset email to user; it is sent once the session commits."""
+    body = f'''To reset your password, visit the following link:
 {url_for('auth.reset_password', token=token, _external=True)}
 
 If you did not make this request then simply ignore this email and no changes will be made.
 '''
-    mail.send(msg)
+    MailQueue.enqueue('Password Reset Request', [user.email], body)
 
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -36,15 +36,39 @@ def login():
         password = request.form.get('password')
         remember = request.form.get('remember', False)
         
-        user = User.query.filter_by(email=email).first()
-        if user is None or not user.verify_password(password):
-            flash('Invalid email or password', 'error')
-            return redirect(url_for('auth.login'))
+        # Turn away bursts before any password is hashed
+        try:
+            login_throttle.check(email or '', request.remote_addr)
+        except LoginThrottled as e:
+            flash('Too many sign-in attempts. Please wait a few minutes and try again.', 'error')
+            response = make_response(render_template('auth/login.html', title='Sign In'), 429)
+            response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+            return response
         
-        if not user.is_active:
-            flash('Your account has been deactivated. Please contact your administrator.', 'error')
-            return redirect(url_for('auth.login'))
+        user = User.query.filter_by(email=email).first()
+        try:
+            if user is None or not user.verify_password(password):
+                flash('Invalid email or password', 'error')
+                return redirect(url_for('auth.login'))
+            
+            if not user.is_active:
+                login_throttle.release(email)
+                flash('Your account has been deactivated. Please contact your administrator.', 'error')
+                return redirect(url_for('auth.login'))
+            
+            # Upgrade a hash made with an older method or cost; the password
+            # rules are not re-checked, the user already has this password
+            if user.password_needs_rehash():
+                user.password_hash = hash_password(password)
+        except HasherBusy:
+            login_throttle.release(email)
+            flash('Too many sign-ins right now, please try again in a moment.', 'error')
+            response = make_response(render_template('auth/login.html', title='Sign In'), 503)
+            response.headers['Retry-After'] = '1'
+            return response
         
+        # Only wrong passwords keep their slot of the account limit
+        login_throttle.release(email)
         login_user(user, remember=remember)
         user.last_login = datetime.utcnow()
         db.session.commit()
@@ -125,9 +149,9 @@ def reset_password_request():
             token = generate_reset_token()
             user.reset_token = token
             user.reset_token_expiry = datetime.utcnow() + timedelta(hours=1)
+            send_reset_email(user, token)
             db.session.commit()
             
-            send_reset_email(user, token)
             flash('An email has been sent with instructions to reset your password.', 'info')
             return redirect(url_for('auth.login'))
         
@@ -0,0 +1,60 @@
+import click
+from flask.cli import with_appcontext
+from app.services.mail_queue import MailQueue, mail_sender
+from app.services.report_counters import ReportCounterService
+from app.utils.smtp_sink import SMTPSink
+
+@click.command('rebuild-report-counters')
+@with_appcontext
+def rebuild_report_counters_command():
+    """Recompute the per-company report counters from scratch."""
+    click.echo('Rebuilding report counters...')
+    rows = ReportCounterService.rebuild()
+    click.echo(f'Report counters rebuilt ({rows} rows).')
+
+@click.command('check-report-counters')
+@with_appcontext
+def check_report_counters_command():
+    """Compare the report counters with a full recount."""
+    mismatches = ReportCounterService.check()
+    for (company_reg_no, status, day), counted, expected in mismatches:
+        click.echo(f'{company_reg_no} {status} {day}: counter={counted} recount={expected}')
+    if mismatches:
+        raise click.ClickException(f'{len(mismatches)} counter(s) out of date; run "flask rebuild-report-counters".')
+    click.echo('Report counters are consistent.')
+
+@click.command('send-queued-mail')
+@with_appcontext
+def send_queued_mail_command():
+    """Send every due message in the outbound mail queue, then exit."""
+    sent = mail_sender.drain()
+    stats = MailQueue.stats()
+    click.echo(f'Processed {sent} message(s); {stats["pending"]} pending, {stats["failed"]} failed.')
+
+@click.command('smtp-sink')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=1025, show_default=True)
+def smtp_sink_command(host, port):
+    """Run a local SMTP server that accepts and prints every message."""
+    sink = SMTPSink(host, port)
+    record = sink.record
+
+    def echo(mail_from, rcpt_tos, data):
+        record(mail_from, rcpt_tos, data)
+        click.echo(f'--- from {mail_from} to {", ".join(rcpt_tos)} ---')
+        click.echo(data.decode('utf-8', 'replace'))
+
+    sink.record = echo
+    click.echo(f'SMTP sink listening on {host}:{port}. Run the app with '
+               f'MAIL_SERVER={host} MAIL_PORT={port} MAIL_USE_TLS=false and no MAIL_USERNAME.')
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+def init_app(app):
+    """Register CLI commands with the Flask application."""
+    app.cli.add_command(rebuild_report_counters_command)
+    app.cli.add_command(check_report_counters_command)
+    app.cli.add_command(send_queued_mail_command)
+    app.cli.add_command(smtp_sink_command)
\ No newline at end of file
@@ -4,6 +4,8 @@ from app.models.vehicle import VehicleInfo, VehicleOwnership, VehicleAccidentHis
 from app.models.company import CompanyInfo, CompanyContact, AgentInfo
 from app.models.police import PoliceInfo, JurisdictionInfo, PoliceContact
 from app.models.report import Report, ReportAttachment
+from app.models.counters import CompanyReportCounter
+from app.models.mail import OutboundEmail
 
 __all__ = [
     'User',
@@ -18,5 +20,7 @@ __all__ = [
     'JurisdictionInfo',
     'PoliceContact',
     'Report',
-    'ReportAttachment'
+    'ReportAttachment',
+    'CompanyReportCounter',
+    'OutboundEmail'
 ] 
\ No newline at end of file
@@ -3,6 +3,11 @@ from app import db
 
 class CompanyInfo(db.Model):
     __tablename__ = 'company_info'
+    __table_args__ = (
+        # Keyset pagination of admin.companies
+        db.Index('ix_company_info_created_at_company_reg_no', 'created_at', 'company_reg_no'),
+        db.Index('ix_company_info_company_name_company_reg_no', 'company_name', 'company_reg_no'),
+    )
     
     company_reg_no = db.Column(db.String(20), primary_key=True)
     company_name = db.Column(db.String(100), nullable=False)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from app import db
+
+class CompanyReportCounter(db.Model):
+    """
+    Number of reports per company, status and creation day.
+
+    Maintained incrementally as reports are created or change status (see
+    app.services.report_counters), so dashboards can sum a handful of rows
+    instead of scanning reports_info.
+    """
+    __tablename__ = 'company_report_counters'
+    
+    company_reg_no = db.Column(db.String(20), db.ForeignKey('company_info.company_reg_no'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Counter {self.company_reg_no} {self.status} {self.day}: {self.count}>'
\ No newline at end of file
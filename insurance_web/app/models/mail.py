@@ -0,0 +1,34 @@
+from datetime import datetime
+from app import db
+
+class OutboundEmail(db.Model):
+    """
+    One message waiting in (or sent from) the outbound mail queue.
+
+    Request handlers only insert rows; app.services.mail_queue sends them
+    from a background thread, retrying failed deliveries with backoff.
+    Each row has a single recipient so delivery, retries and per-domain
+    rate limits apply per address.
+    """
+    __tablename__ = 'outbound_emails'
+    __table_args__ = (
+        # The sender's poll: due messages, oldest first
+        db.Index('ix_outbound_emails_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(120), nullable=False)
+    recipient = db.Column(db.String(120), nullable=False)
+    recipient_domain = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    html = db.Column(db.Text)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<OutboundEmail {self.id} to {self.recipient}: {self.status}>'
\ No newline at end of file
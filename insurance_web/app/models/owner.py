@@ -1,5 +1,8 @@
 from datetime import datetime
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import func
 from app import db
+from app.models.vehicle import VehicleOwnership, VehicleAccidentHistory
 
 class Owner(db.Model):
     __tablename__ = 'owners_info'
@@ -23,13 +26,56 @@ class Owner(db.Model):
     def full_name(self):
         return self.owner_name
     
+    @staticmethod
+    def counts_for(owner_ids: Iterable[int]) -> Dict[int, Tuple[int, int]]:
+        """
+        Vehicle and accident counts for many owners in one grouped query.
+        
+        Returns:
+            Dict[int, Tuple[int, int]]: owner_id -> (vehicle_count, total_accidents);
+                owners without vehicles map to (0, 0)
+        """
+        owner_ids = set(owner_ids)
+        counts = {owner_id: (0, 0) for owner_id in owner_ids}
+        if not owner_ids:
+            return counts
+        
+        rows = db.session.query(
+            VehicleOwnership.owner_id,
+            func.count(func.distinct(VehicleOwnership.vehicle_reg_no)),
+            func.count(func.distinct(VehicleAccidentHistory.entry_id))
+        ).outerjoin(
+            VehicleAccidentHistory, VehicleAccidentHistory.vehicle_reg_no == VehicleOwnership.vehicle_reg_no
+        ).filter(
+            VehicleOwnership.owner_id.in_(owner_ids)
+        ).group_by(VehicleOwnership.owner_id).all()
+        
+        for owner_id, vehicle_count, accident_count in rows:
+            counts[owner_id] = (vehicle_count, accident_count)
+        return counts
+    
+    @classmethod
+    def preload_counts(cls, owners):
+        """Attach vehicle/accident counts to a list of owners so rendering them costs no further queries."""
+        counts = cls.counts_for(owner.id for owner in owners)
+        for owner in owners:
+            owner._counts = counts[owner.id]
+        return owners
+    
+    def _get_counts(self) -> Tuple[int, int]:
+        # Memoized for the lifetime of this instance (normally one request)
+        counts = getattr(self, '_counts', None)
+        if counts is None:
+            counts = self._counts = self.counts_for([self.id])[self.id]
+        return counts
+    
     @property
     def vehicle_count(self):
-        return self.vehicle_ownerships.count()
+        return self._get_counts()[0]
     
     @property
     def total_accidents(self):
-        return sum(ownership.vehicle.accident_history.count() for ownership in self.vehicle_ownerships)
+        return self._get_counts()[1]
     
     def to_dict(self):
         return {
@@ -3,6 +3,13 @@ from app import db
 
 class Report(db.Model):
     __tablename__ = 'reports_info'
+    __table_args__ = (
+        # Keyset pagination of the report listings, per sort order and filter
+        db.Index('ix_reports_info_created_at_incident_no', 'created_at', 'incident_no'),
+        db.Index('ix_reports_info_incident_datetime_incident_no', 'incident_datetime', 'incident_no'),
+        db.Index('ix_reports_info_status_created_at', 'status', 'created_at', 'incident_no'),
+        db.Index('ix_reports_info_vehicle_reg_no_created_at', 'vehicle_reg_no', 'created_at'),
+    )
     
     incident_no = db.Column(db.String(20), primary_key=True)
     vehicle_reg_no = db.Column(db.String(20), db.ForeignKey('vehicle_info.vehicle_reg_no'), nullable=False)
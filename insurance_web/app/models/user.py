@@ -1,15 +1,17 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
-from app import db, login_manager
-from app.utils.password import validate_password
+from app import db
+from app.utils.password import check_password, hash_password, needs_rehash, validate_password
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),  # Keyset pagination of admin.users
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))
     first_name = db.Column(db.String(64), nullable=False)
     last_name = db.Column(db.String(64), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='agent')  # 'admin', 'agent', 'owner'
@@ -35,10 +37,14 @@ class User(UserMixin, db.Model):
         is_valid, errors = validate_password(password)
         if not is_valid:
             raise ValueError('\n'.join(errors))
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def verify_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return check_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Whether the stored hash was made with an older method or cost."""
+        return needs_rehash(self.password_hash)
     
     @property
     def full_name(self):
@@ -49,8 +55,4 @@ class User(UserMixin, db.Model):
         return self.role == 'admin'
     
     def __repr__(self):
-        return f'<User {self.email}>'
-
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id)) 
\ No newline at end of file
+        return f'<User {self.email}>'
\ No newline at end of file
@@ -1,10 +1,15 @@
 from datetime import datetime
+from sqlalchemy.orm import validates
 from app import db
+from app.models.report import Report
+from app.utils.registration import normalize_reg_no
 
 class VehicleInfo(db.Model):
     __tablename__ = 'vehicle_info'
     
     vehicle_reg_no = db.Column(db.String(20), primary_key=True)
+    # Upper-cased, whitespace/punctuation-free copy of vehicle_reg_no for lookups
+    normalized_reg_no = db.Column(db.String(20), unique=True, index=True)
     chassis_no = db.Column(db.String(50), unique=True, nullable=False)
     engine_no = db.Column(db.String(50), unique=True, nullable=False)
     make = db.Column(db.String(50), nullable=False)
@@ -20,6 +25,11 @@ class VehicleInfo(db.Model):
     accident_history = db.relationship('VehicleAccidentHistory', backref='vehicle', lazy='dynamic')
     reports = db.relationship('Report', backref='vehicle', lazy='dynamic')
     
+    @validates('vehicle_reg_no')
+    def _set_normalized_reg_no(self, key, value):
+        self.normalized_reg_no = normalize_reg_no(value)
+        return value
+    
     def __repr__(self):
         return f'<Vehicle {self.vehicle_reg_no}>'
     
@@ -53,12 +63,13 @@ class VehicleOwnership(db.Model):
     __tablename__ = 'vehicle_ownership'
     
     id = db.Column(db.Integer, primary_key=True)
-    vehicle_reg_no = db.Column(db.String(20), db.ForeignKey('vehicle_info.vehicle_reg_no'), nullable=False)
+    vehicle_reg_no = db.Column(db.String(20), db.ForeignKey('vehicle_info.vehicle_reg_no'), nullable=False, index=True)
     owner_id = db.Column(db.Integer, db.ForeignKey('owners_info.id'), nullable=True)
     company_reg_no = db.Column(db.String(20), db.ForeignKey('company_info.company_reg_no'), nullable=True)
     ownership_type = db.Column(db.String(20), nullable=False)  # 'individual' or 'company'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed for the insurer router's incremental refresh
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     def __repr__(self):
         return f'<Ownership for {self.vehicle_reg_no}>'
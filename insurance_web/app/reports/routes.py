@@ -1,25 +1,39 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_required, current_user
 from app import db
 from app.reports import bp
-from app.models.report import Report
+from app.models.report import Report, ReportAttachment
 from app.models.vehicle import VehicleInfo, VehicleOwnership
+from app.services.attachments import attachment_path, send_attachment
+from app.services.listings import REPORT_SORTS, REPORT_STATUSES, ListingService
+from app.utils.pagination import Page, listing_args
 from datetime import datetime, timedelta
 from sqlalchemy import and_
 
 @bp.route('/')
 @login_required
 def index():
-    """List all reports for the current user's company."""
-    # Join with vehicle ownership to get company-specific reports
-    reports = Report.query.join(
-        VehicleOwnership,
-        and_(
-            Report.vehicle_reg_no == VehicleOwnership.vehicle_reg_no,
-            VehicleOwnership.company_reg_no == current_user.company_reg_no
-        )
-    ).order_by(Report.created_at.desc()).all()
-    return render_template('reports/index.html', reports=reports)
+    """List the current user's company's reports, a page at a time."""
+    if current_user.company_reg_no is None:
+        # Only insurers have reports of their own
+        page = Page([], None, None, 0, False)
+    else:
+        try:
+            page = ListingService.reports(
+                current_user.company_reg_no, vehicle_reg_no=request.args.get('vehicle'), **listing_args(request.args)
+            )
+        except ValueError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('reports.index'))
+    return render_template('reports/index.html', page=page, reports=page.items,
+                           sorts=REPORT_SORTS, statuses=REPORT_STATUSES)
+
+def can_view_report(report):
+    """Whether the current user's company owns the vehicle in a report."""
+    return VehicleOwnership.query.filter_by(
+        vehicle_reg_no=report.vehicle_reg_no,
+        company_reg_no=current_user.company_reg_no
+    ).first() is not None
 
 @bp.route('/<incident_no>')
 @login_required
@@ -27,15 +41,24 @@ def view(incident_no):
     """View a specific report."""
     report = Report.query.get_or_404(incident_no)
     # Ensure user has access to this report through vehicle ownership
-    ownership = VehicleOwnership.query.filter_by(
-        vehicle_reg_no=report.vehicle_reg_no,
-        company_reg_no=current_user.company_reg_no
-    ).first()
-    if not ownership:
+    if not can_view_report(report):
         flash('You do not have permission to view this report.', 'error')
         return redirect(url_for('reports.index'))
     return render_template('reports/view.html', report=report)
 
+@bp.route('/<incident_no>/attachments/<int:attachment_id>/<kind>')
+@login_required
+def attachment(incident_no, attachment_id, kind):
+    """View or download (?download=1) a photo, video or abstract of a report."""
+    report = Report.query.get_or_404(incident_no)
+    if not can_view_report(report):
+        abort(403)
+    attachment = ReportAttachment.query.filter_by(id=attachment_id, incident_no=incident_no).first_or_404()
+    path = attachment_path(attachment, kind)
+    if path is None:
+        abort(404)
+    return send_attachment(path, as_attachment=request.args.get('download', type=int) == 1)
+
 @bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create():
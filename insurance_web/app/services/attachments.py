@@ -0,0 +1,63 @@
+import mimetypes
+import os
+from typing import Optional
+from urllib.parse import quote, urlparse
+from flask import current_app, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from app.models.report import ReportAttachment
+
+# Which ReportAttachment column holds each kind of file
+ATTACHMENT_COLUMNS = {
+    'photo': 'photo_url',
+    'video': 'video_url',
+    'abstract': 'abstract_url'
+}
+
+# Private: only the owning company may fetch them, so shared caches must not keep them
+ATTACHMENT_MAX_AGE = 300
+
+def attachment_path(attachment: ReportAttachment, kind: str) -> Optional[str]:
+    """Stored path of one file of an attachment, relative to ATTACHMENT_FOLDER, or None."""
+    column = ATTACHMENT_COLUMNS.get(kind)
+    value = getattr(attachment, column) if column else None
+    if not value:
+        return None
+    # Older rows may hold a URL to this app's own storage; only the path part is meaningful
+    return urlparse(value).path.lstrip('/') or None
+
+def send_attachment(relative_path: str, as_attachment: bool = False):
+    """
+    Respond with a stored attachment file.
+
+    Range requests (206), If-None-Match / If-Modified-Since (304) and
+    If-Range are answered from the file's size and mtime without reading
+    it. The body is sent through wsgi.file_wrapper, which gunicorn turns
+    into sendfile(). With ATTACHMENT_SENDFILE set to 'x-accel' (nginx) or
+    'x-sendfile' (Apache, lighttpd) only headers are returned and the
+    front proxy streams the file itself.
+    """
+    root = current_app.config['ATTACHMENT_FOLDER']
+    path = safe_join(root, relative_path)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    download_name = os.path.basename(path)
+    if current_app.config.get('ATTACHMENT_SENDFILE') == 'x-accel':
+        response = current_app.response_class()
+        response.headers['X-Accel-Redirect'] = current_app.config['ATTACHMENT_ACCEL_PREFIX'].rstrip('/') + '/' + quote(relative_path)
+        response.mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+        if as_attachment:
+            response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        response.cache_control.private = True
+        response.cache_control.max_age = ATTACHMENT_MAX_AGE
+        return response
+
+    # Honours USE_X_SENDFILE, which create_app sets for ATTACHMENT_SENDFILE='x-sendfile'
+    response = send_file(path, as_attachment=as_attachment, download_name=download_name,
+                         conditional=True, etag=True, max_age=ATTACHMENT_MAX_AGE)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    # Advertised on full responses too, so video players know they can seek
+    response.accept_ranges = 'bytes'
+    return response
\ No newline at end of file
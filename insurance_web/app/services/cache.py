@@ -0,0 +1,148 @@
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+DEFAULT_TTL = 60  # seconds; bounds how long another process can serve a stale entry
+
+class CacheBackend:
+    """
+    Minimal key/value cache interface used by the read-through caches.
+
+    Values are JSON-serializable objects. Backends count hits, misses and
+    evictions so they can be exposed for monitoring.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+        }
+
+class LRUCacheBackend(CacheBackend):
+    """In-process, thread-safe LRU cache bounded by entry count, with an optional TTL."""
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = None):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(size=len(self._entries), max_size=self.max_size)
+        return stats
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared between worker processes, stored in Redis.
+
+    Works with any client exposing the redis-py get/set/delete/scan_iter
+    methods. Eviction is done by Redis itself (maxmemory policy), so the
+    eviction count is read from the server's INFO stats when available.
+    """
+
+    def __init__(self, client, prefix: str = 'raise:', ttl: Optional[int] = None):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+    def stats(self) -> dict:
+        try:
+            self.evictions = int(self.client.info('stats').get('evicted_keys', 0))
+        except Exception:
+            pass
+        return super().stats()
+
+def create_backend(config: dict, prefix: str) -> CacheBackend:
+    """
+    Build the backend selected by the CACHE_BACKEND setting.
+
+    'lru' (default) keeps entries per process; 'redis' shares them through
+    REDIS_URL and requires the redis package. Entries expire after CACHE_TTL
+    seconds (DEFAULT_TTL when unset, never when 0).
+    """
+    backend = config.get('CACHE_BACKEND', 'lru')
+    ttl = config.get('CACHE_TTL', DEFAULT_TTL) or None
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package') from e
+        client = redis.Redis.from_url(config.get('REDIS_URL', 'redis://localhost:6379/0'))
+        return RedisCacheBackend(client, prefix=prefix, ttl=ttl)
+    if backend == 'lru':
+        return LRUCacheBackend(max_size=config.get('CACHE_MAX_ENTRIES', 10000), ttl=ttl)
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
\ No newline at end of file
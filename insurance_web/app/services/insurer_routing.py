@@ -0,0 +1,207 @@
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import get_history
+from app.models.vehicle import VehicleOwnership
+
+# Registration numbers whose ownership changed in the current transaction
+_PENDING_KEY = 'insurer_routing_invalidations'
+
+NO_COMPANIES: FrozenSet[str] = frozenset()
+
+class InsurerRouter:
+    """
+    Resolves vehicle registration numbers to the companies insuring them.
+
+    Keeps a plate -> companies map in memory, loaded in full on first use.
+    Plates it does not know are looked up for a whole batch in one
+    IN-query, and plates without an insurer are remembered too, so a warm
+    router answers a burst of new reports without touching the database.
+
+    The map follows ownership changes incrementally: rows written through
+    this process's sessions drop their plates as they are flushed, and
+    every `refresh_interval` seconds rows updated since the last refresh
+    (by any process) are dropped as well. Ownership rows deleted by another
+    process, or committed with an updated_at older than the last refresh,
+    stay cached until the next warm().
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = 30.0):
+        self.refresh_interval = refresh_interval
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self._companies: Dict[str, FrozenSet[str]] = {}
+        # One shared frozenset per distinct set of companies
+        self._interned: Dict[FrozenSet[str], FrozenSet[str]] = {NO_COMPANIES: NO_COMPANIES}
+        self._watermark = None
+        self._refreshed_at = None
+        self._lock = Lock()
+
+    def _intern(self, companies: Iterable[str]) -> FrozenSet[str]:
+        companies = frozenset(companies)
+        return self._interned.setdefault(companies, companies)
+
+    def warm(self, connection) -> int:
+        """
+        Load every insured plate in one query, replacing the map.
+
+        Returns:
+            int: Number of plates cached
+        """
+        rows = connection.execute(
+            select(VehicleOwnership.vehicle_reg_no, VehicleOwnership.company_reg_no).where(
+                VehicleOwnership.company_reg_no.isnot(None)
+            )
+        )
+        grouped = defaultdict(set)
+        for vehicle_reg_no, company_reg_no in rows:
+            grouped[vehicle_reg_no].add(company_reg_no)
+        watermark = connection.execute(select(func.max(VehicleOwnership.updated_at))).scalar()
+
+        with self._lock:
+            self.queries += 2
+            self._companies = {reg_no: self._intern(companies) for reg_no, companies in grouped.items()}
+            self._watermark = watermark
+            self._refreshed_at = time.monotonic()
+            return len(self._companies)
+
+    def refresh(self, connection) -> int:
+        """
+        Drop the plates of ownership rows updated since the last refresh.
+
+        Returns:
+            int: Number of plates dropped
+        """
+        query = select(VehicleOwnership.vehicle_reg_no, VehicleOwnership.updated_at)
+        if self._watermark is not None:
+            query = query.where(VehicleOwnership.updated_at > self._watermark)
+        rows = connection.execute(query).all()
+
+        with self._lock:
+            self.queries += 1
+            self._refreshed_at = time.monotonic()
+            for vehicle_reg_no, updated_at in rows:
+                self._companies.pop(vehicle_reg_no, None)
+                if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+        return len(rows)
+
+    def invalidate(self, vehicle_reg_nos: Iterable[str]) -> None:
+        with self._lock:
+            for vehicle_reg_no in vehicle_reg_nos:
+                self._companies.pop(vehicle_reg_no, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._companies.clear()
+            self._watermark = None
+            self._refreshed_at = None
+
+    def companies_for(self, connection, vehicle_reg_nos: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+        """
+        Companies insuring each of the given vehicles.
+
+        Args:
+            connection: Connection to read through, so rows flushed in the
+                current transaction are seen
+            vehicle_reg_nos (Iterable[str]): Registration numbers, exactly as stored
+
+        Returns:
+            Dict[str, FrozenSet[str]]: Every requested plate, mapped to its companies (possibly none)
+        """
+        vehicle_reg_nos = set(vehicle_reg_nos)
+        if self._refreshed_at is None:
+            self.warm(connection)
+        elif self.refresh_interval is not None and time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh(connection)
+
+        with self._lock:
+            resolved = {reg_no: self._companies[reg_no] for reg_no in vehicle_reg_nos if reg_no in self._companies}
+            missing = vehicle_reg_nos - resolved.keys()
+            self.hits += len(resolved)
+            self.misses += len(missing)
+        if not missing:
+            return resolved
+
+        grouped = defaultdict(set)
+        rows = connection.execute(
+            select(VehicleOwnership.vehicle_reg_no, VehicleOwnership.company_reg_no).where(
+                VehicleOwnership.vehicle_reg_no.in_(missing),
+                VehicleOwnership.company_reg_no.isnot(None)
+            )
+        )
+        for vehicle_reg_no, company_reg_no in rows:
+            grouped[vehicle_reg_no].add(company_reg_no)
+
+        with self._lock:
+            self.queries += 1
+            for reg_no in missing:
+                resolved[reg_no] = self._companies[reg_no] = self._intern(grouped.get(reg_no, ()))
+        return resolved
+
+    def route(self, connection, reports: Iterable) -> Dict[str, List]:
+        """
+        Group new reports into per-company work items.
+
+        Args:
+            connection: Connection to read ownership through
+            reports (Iterable): Report instances (or anything with a vehicle_reg_no)
+
+        Returns:
+            Dict[str, List]: company_reg_no -> the reports on vehicles it insures, in input order
+        """
+        reports = list(reports)
+        companies = self.companies_for(connection, {report.vehicle_reg_no for report in reports})
+        work = defaultdict(list)
+        for report in reports:
+            for company_reg_no in companies[report.vehicle_reg_no]:
+                work[company_reg_no].append(report)
+        return dict(work)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'plates': len(self._companies),
+            'hits': self.hits,
+            'misses': self.misses,
+            'queries': self.queries,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+        }
+
+# Shared by the report counter and notification hooks
+router = InsurerRouter()
+
+def _on_change(mapper, connection, target):
+    """Drop the cached companies of every plate an ownership row refers to, old and new."""
+    reg_nos = {target.vehicle_reg_no}
+    reg_nos.update(get_history(target, 'vehicle_reg_no').deleted or ())
+    router.invalidate(reg_nos)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).update(reg_nos)
+
+def _after_transaction(session):
+    # A lookup between the flush and the end of the transaction may have
+    # cached uncommitted (or rolled back) ownership, so drop it again
+    router.invalidate(session.info.pop(_PENDING_KEY, ()))
+
+def init_app(app):
+    """
+    Configure the insurer router and keep it in step with vehicle_ownership.
+
+    INSURER_ROUTING_REFRESH sets how often, in seconds, ownership rows
+    changed by other processes are picked up (None turns it off).
+    """
+    router.refresh_interval = app.config.get('INSURER_ROUTING_REFRESH', 30.0)
+    router.clear()
+
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        if not event.contains(VehicleOwnership, name, _on_change):
+            event.listen(VehicleOwnership, name, _on_change)
+    if not event.contains(Session, 'after_commit', _after_transaction):
+        event.listen(Session, 'after_commit', _after_transaction)
+        event.listen(Session, 'after_rollback', _after_transaction)
\ No newline at end of file
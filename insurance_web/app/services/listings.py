@@ -0,0 +1,154 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models.company import CompanyInfo
+from app.models.report import Report
+from app.models.user import User
+from app.models.vehicle import VehicleInfo
+from app.services.stats_service import StatsService
+from app.utils.pagination import DEFAULT_PAGE_SIZE, Page, paginate
+from app.utils.registration import normalize_reg_no
+
+# Sort orders offered by each listing, all backed by an index on (column, primary key)
+REPORT_SORTS = {'created_at': Report.created_at, 'incident_datetime': Report.incident_datetime}
+USER_SORTS = {'created_at': User.created_at, 'email': User.email}
+COMPANY_SORTS = {'created_at': CompanyInfo.created_at, 'company_name': CompanyInfo.company_name}
+
+REPORT_STATUSES = ('pending', 'approved', 'rejected')
+USER_STATUSES = ('active', 'inactive')
+
+def _sort_column(sorts: dict, sort: Optional[str]):
+    if sort is None:
+        return sorts['created_at']
+    if sort not in sorts:
+        raise ValueError(f'Unknown sort order: {sort}')
+    return sorts[sort]
+
+def _check_status(status: Optional[str], statuses: tuple) -> None:
+    if status is not None and status not in statuses:
+        raise ValueError(f'Unknown status: {status}')
+
+class ListingService:
+    @staticmethod
+    def reports(
+        company_reg_no: Optional[str] = None,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = True,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        vehicle_reg_no: Optional[str] = None
+    ) -> Page:
+        """
+        One page of reports, newest first unless sorted otherwise.
+
+        Args:
+            company_reg_no (Optional[str]): Only reports on vehicles this company insures; all when None
+            cursor (Optional[str]): next_cursor or prev_cursor of another page
+            sort (Optional[str]): A key of REPORT_SORTS, created_at by default
+            descending (bool): Largest values of the sort column first
+            per_page (int): Page size
+            status (Optional[str]): Only reports with this status
+            date_from (Optional[datetime]): Only reports filed at or after this time
+            date_to (Optional[datetime]): Only reports filed before this time
+            vehicle_reg_no (Optional[str]): Only reports on this vehicle, however it is spelled
+
+        Returns:
+            Page: The reports and the cursors of the neighbouring pages
+
+        Raises:
+            ValueError: If the sort order, status or cursor is invalid
+        """
+        sort_column = _sort_column(REPORT_SORTS, sort)
+        _check_status(status, REPORT_STATUSES)
+        query = StatsService.report_query(company_reg_no)
+        if status is not None:
+            query = query.filter(Report.status == status)
+        if date_from is not None:
+            query = query.filter(Report.created_at >= date_from)
+        if date_to is not None:
+            query = query.filter(Report.created_at < date_to)
+        if vehicle_reg_no:
+            # Through the normalized registration index, so "kca 123a" finds "KCA 123A"
+            query = query.filter(Report.vehicle_reg_no.in_(
+                db.session.query(VehicleInfo.vehicle_reg_no).filter(
+                    VehicleInfo.normalized_reg_no == normalize_reg_no(vehicle_reg_no)
+                )
+            ))
+        return paginate(query, sort_column, Report.incident_no, cursor, per_page, descending)
+
+    @staticmethod
+    def users(
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = True,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        status: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> Page:
+        """
+        One page of users, newest first unless sorted otherwise.
+
+        Args:
+            cursor (Optional[str]): next_cursor or prev_cursor of another page
+            sort (Optional[str]): A key of USER_SORTS, created_at by default
+            descending (bool): Largest values of the sort column first
+            per_page (int): Page size
+            status (Optional[str]): 'active' or 'inactive'
+            date_from (Optional[datetime]): Only users who joined at or after this time
+            date_to (Optional[datetime]): Only users who joined before this time
+
+        Returns:
+            Page: The users and the cursors of the neighbouring pages
+
+        Raises:
+            ValueError: If the sort order, status or cursor is invalid
+        """
+        sort_column = _sort_column(USER_SORTS, sort)
+        _check_status(status, USER_STATUSES)
+        query = User.query.options(joinedload(User.company))
+        if status is not None:
+            query = query.filter(User.is_active == (status == 'active'))
+        if date_from is not None:
+            query = query.filter(User.created_at >= date_from)
+        if date_to is not None:
+            query = query.filter(User.created_at < date_to)
+        return paginate(query, sort_column, User.id, cursor, per_page, descending)
+
+    @staticmethod
+    def companies(
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = True,
+        per_page: int = DEFAULT_PAGE_SIZE,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> Page:
+        """
+        One page of insurance companies, newest first unless sorted otherwise.
+
+        Args:
+            cursor (Optional[str]): next_cursor or prev_cursor of another page
+            sort (Optional[str]): A key of COMPANY_SORTS, created_at by default
+            descending (bool): Largest values of the sort column first
+            per_page (int): Page size
+            date_from (Optional[datetime]): Only companies registered at or after this time
+            date_to (Optional[datetime]): Only companies registered before this time
+
+        Returns:
+            Page: The companies and the cursors of the neighbouring pages
+
+        Raises:
+            ValueError: If the sort order or cursor is invalid
+        """
+        sort_column = _sort_column(COMPANY_SORTS, sort)
+        query = CompanyInfo.query.options(joinedload(CompanyInfo.contact))
+        if date_from is not None:
+            query = query.filter(CompanyInfo.created_at >= date_from)
+        if date_to is not None:
+            query = query.filter(CompanyInfo.created_at < date_to)
+        return paginate(query, sort_column, CompanyInfo.company_reg_no, cursor, per_page, descending)
\ No newline at end of file
@@ -0,0 +1,301 @@
+import logging
+import smtplib
+import time
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from flask_mail import BadHeaderError, Message
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import Session
+from app import db, mail
+from app.models.mail import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_INTERVAL = 30.0  # seconds between polls when nothing new was committed
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 60.0  # first retry; doubled on every further attempt
+MAX_RETRY_DELAY = 3600.0
+DEFAULT_DOMAIN_RATE = 60  # messages per minute to one recipient domain
+DEFAULT_LEASE = 300.0  # seconds a claimed message is reserved for its sender
+
+# Set when the current transaction queued messages; the sender is woken on commit
+_PENDING_KEY = 'mail_queue_new_messages'
+
+# SMTP failures that will not go away by trying again
+_PERMANENT_CODES = range(500, 600)
+
+class DomainRateLimiter:
+    """Token bucket per recipient domain, allowing `rate` messages per minute with bursts of that size."""
+
+    def __init__(self, rate: int = DEFAULT_DOMAIN_RATE):
+        self.rate = rate
+        self._buckets: Dict[str, list] = {}
+        self._lock = Lock()
+
+    def acquire(self, domain: str) -> float:
+        """
+        Take a token for `domain`.
+
+        Returns:
+            float: 0 if a message may be sent now, else seconds until one may
+        """
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        per_second = self.rate / 60.0
+        with self._lock:
+            bucket = self._buckets.setdefault(domain, [float(self.rate), now])
+            bucket[0] = min(float(self.rate), bucket[0] + (now - bucket[1]) * per_second)
+            bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return 0.0
+            return (1.0 - bucket[0]) / per_second
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, BadHeaderError):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code in _PERMANENT_CODES for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code in _PERMANENT_CODES
+    return False
+
+class MailSender:
+    """
+    Delivers queued messages in batches on a background thread.
+
+    Each pass claims up to `batch_size` due messages (leasing them so other
+    workers skip them), sends them over a single SMTP connection and then
+    records the outcome in one commit. No database transaction is open
+    while talking to the SMTP server. Temporary failures are retried with
+    exponential backoff up to `max_attempts` times; 5xx replies fail the
+    message straight away. A message whose sender crashed mid-batch is
+    picked up again once its lease expires, so delivery is at least once.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.interval = DEFAULT_INTERVAL
+        self.max_attempts = DEFAULT_MAX_ATTEMPTS
+        self.retry_delay = DEFAULT_RETRY_DELAY
+        self.lease = DEFAULT_LEASE
+        self.limiter = DomainRateLimiter()
+        self.enabled = True
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config.get('MAIL_QUEUE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.interval = app.config.get('MAIL_QUEUE_INTERVAL', DEFAULT_INTERVAL)
+        self.max_attempts = app.config.get('MAIL_QUEUE_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        self.retry_delay = app.config.get('MAIL_QUEUE_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+        self.limiter = DomainRateLimiter(app.config.get('MAIL_QUEUE_DOMAIN_RATE', DEFAULT_DOMAIN_RATE))
+        # 'thread' sends from this process; 'off' leaves it to `flask send-queued-mail` or tests
+        self.enabled = app.config.get('MAIL_QUEUE_MODE', 'thread') == 'thread'
+
+    def notify(self) -> None:
+        """Wake the sender (starting it if needed) because new messages were committed."""
+        if not self.enabled or self.app is None:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = Thread(target=self.run_forever, name='mail-sender', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.retry_delay * 2 ** max(attempts - 1, 0), MAX_RETRY_DELAY)
+
+    def _claim(self) -> List[OutboundEmail]:
+        """Lease a batch of due messages to this sender and commit the lease."""
+        now = datetime.utcnow()
+        due = (OutboundEmail.status.in_(('pending', 'sending')), OutboundEmail.next_attempt_at <= now)
+        query = db.session.query(OutboundEmail.id).filter(*due).order_by(OutboundEmail.next_attempt_at)
+        if db.session.get_bind().dialect.name != 'sqlite':
+            query = query.with_for_update(skip_locked=True)
+        ids = [message_id for (message_id,) in query.limit(self.batch_size)]
+        if not ids:
+            db.session.rollback()
+            return []
+
+        # A message still 'sending' after its lease ran out belongs to a sender that died
+        lease = now + timedelta(seconds=self.lease)
+        db.session.execute(
+            update(OutboundEmail).where(OutboundEmail.id.in_(ids), *due).values(status='sending', next_attempt_at=lease),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+        # The timestamp identifies this claim if another sender raced for the same rows
+        return OutboundEmail.query.filter(
+            OutboundEmail.id.in_(ids), OutboundEmail.status == 'sending', OutboundEmail.next_attempt_at == lease
+        ).order_by(OutboundEmail.id).all()
+
+    def _retry(self, message: OutboundEmail, error: Exception) -> None:
+        message.attempts += 1
+        message.last_error = f'{type(error).__name__}: {error}'[:500]
+        if message.attempts >= self.max_attempts or _is_permanent(error):
+            message.status = 'failed'
+            logger.warning('Giving up on email %s to %s: %s', message.id, message.recipient, message.last_error)
+        else:
+            message.status = 'pending'
+            message.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.backoff(message.attempts))
+
+    def run_once(self) -> int:
+        """
+        Send one batch of due messages. Needs an app context.
+
+        Returns:
+            int: Number of messages claimed (sent, retried, failed or deferred)
+        """
+        messages = self._claim()
+        if not messages:
+            return 0
+
+        to_send = []
+        for message in messages:
+            wait = self.limiter.acquire(message.recipient_domain)
+            if wait:
+                # Over the domain's rate: put it back without counting an attempt
+                message.status = 'pending'
+                message.next_attempt_at = datetime.utcnow() + timedelta(seconds=wait)
+            else:
+                to_send.append(message)
+
+        remaining = list(to_send)
+        if remaining:
+            try:
+                with mail.connect() as connection:
+                    while remaining:
+                        message = remaining[0]
+                        try:
+                            connection.send(Message(message.subject, sender=message.sender,
+                                                    recipients=[message.recipient],
+                                                    body=message.body, html=message.html))
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException, BadHeaderError) as e:
+                            # Refused by the server; anything else means the connection is gone
+                            self._retry(message, e)
+                        else:
+                            message.status = 'sent'
+                            message.attempts += 1
+                            message.sent_at = datetime.utcnow()
+                            message.last_error = None
+                        remaining.pop(0)
+            except Exception as e:
+                # Lost (or never got) the connection: retry the rest of the batch later
+                logger.warning('SMTP connection failed: %s', e)
+                for message in remaining:
+                    self._retry(message, e)
+        db.session.commit()
+        return len(messages)
+
+    def drain(self) -> int:
+        """Send batches until none are due. Needs an app context."""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            total += claimed
+            if claimed < self.batch_size:
+                return total
+
+    def run_forever(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            with self.app.app_context():
+                try:
+                    self.drain()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Sending queued email failed')
+                finally:
+                    db.session.remove()
+
+mail_sender = MailSender()
+
+def _after_flush(session, flush_context):
+    if any(isinstance(obj, OutboundEmail) for obj in session.new):
+        session.info[_PENDING_KEY] = True
+
+def _after_commit(session):
+    if session.info.pop(_PENDING_KEY, False):
+        mail_sender.notify()
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """Send queued email in the background after it is committed."""
+    mail_sender.init_app(app)
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+class MailQueue:
+    @staticmethod
+    def enqueue(
+        subject: str,
+        recipients: Iterable[str],
+        body: str,
+        html: Optional[str] = None,
+        sender: Optional[str] = None
+    ) -> List[OutboundEmail]:
+        """
+        Queue a message, one row per recipient.
+
+        The rows are only added to the session: they are sent after the
+        caller commits, so a rolled back request sends nothing and no
+        request ever waits on SMTP.
+
+        Args:
+            subject (str): Subject line
+            recipients (Iterable[str]): Email addresses
+            body (str): Plain text body
+            html (Optional[str]): HTML alternative
+            sender (Optional[str]): From address, MAIL_DEFAULT_SENDER by default
+
+        Returns:
+            List[OutboundEmail]: The queued messages
+        """
+        sender = sender or current_app.config['MAIL_DEFAULT_SENDER']
+        messages = [
+            OutboundEmail(sender=sender, recipient=recipient, recipient_domain=recipient.rsplit('@', 1)[-1].lower(),
+                          subject=subject, body=body, html=html, next_attempt_at=datetime.utcnow())
+            for recipient in recipients
+        ]
+        db.session.add_all(messages)
+        return messages
+
+    @staticmethod
+    def stats() -> dict:
+        """Queued message counts by status, and the age of the oldest pending one in seconds."""
+        counts = dict(db.session.query(OutboundEmail.status, func.count(OutboundEmail.id))
+                      .group_by(OutboundEmail.status).all())
+        oldest = db.session.query(func.min(OutboundEmail.created_at)).filter(
+            OutboundEmail.status.in_(('pending', 'sending'))
+        ).scalar()
+        return {
+            'pending': counts.get('pending', 0),
+            'sending': counts.get('sending', 0),
+            'sent': counts.get('sent', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_seconds': round((datetime.utcnow() - oldest).total_seconds()) if oldest else None
+        }
\ No newline at end of file
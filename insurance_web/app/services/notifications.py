@@ -0,0 +1,258 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from threading import Condition, Lock
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.report import Report
+from app.services.insurer_routing import router
+
+# Events raised by the current transaction, published once it commits
+_PENDING_KEY = 'pending_notifications'
+
+class Subscriber:
+    """
+    One open notification stream.
+
+    Events wait in a bounded queue; when a slow client lets it fill up the
+    oldest event is dropped (and counted) so a stalled connection never
+    holds more than `max_queue` events in memory.
+    """
+
+    def __init__(self, company_reg_no: str, max_queue: int = 100):
+        self.company_reg_no = company_reg_no
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque(maxlen=max_queue)
+        self._ready = Condition(Lock())
+
+    def put(self, event: dict) -> None:
+        with self._ready:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(event)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[dict]:
+        """Every queued event, waiting up to `timeout` seconds for the first one."""
+        with self._ready:
+            if not self._queue and not self.closed:
+                self._ready.wait(timeout)
+            events = list(self._queue)
+            self._queue.clear()
+            return events
+
+    def take_dropped(self) -> int:
+        """Number of events dropped since the last call."""
+        with self._ready:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+    def close(self) -> None:
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+class LocalBroker:
+    """In-process fan-out of events to the subscribers of each company."""
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self.published = 0
+        self._subscribers = defaultdict(set)
+        self._lock = Lock()
+
+    def subscribe(self, company_reg_no: str) -> Subscriber:
+        subscriber = Subscriber(company_reg_no, self.max_queue)
+        with self._lock:
+            self._subscribers[company_reg_no].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.company_reg_no)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.company_reg_no]
+
+    def publish(self, company_reg_no: str, event: dict) -> None:
+        self.published += 1
+        self._deliver(company_reg_no, event)
+
+    def _deliver(self, company_reg_no: str, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(company_reg_no, ()))
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = sum(len(s) for s in self._subscribers.values())
+            companies = len(self._subscribers)
+        return {
+            'broker': type(self).__name__,
+            'published': self.published,
+            'subscribers': subscribers,
+            'companies': companies
+        }
+
+class RedisBroker(LocalBroker):
+    """
+    Fan-out across worker processes through Redis pub/sub.
+
+    Events are published to one channel per company. Each process runs a
+    single listener thread, started with the first subscription, that
+    hands messages to its local subscribers.
+    """
+
+    def __init__(self, client, prefix: str = 'raise:notifications:', max_queue: int = 100):
+        super().__init__(max_queue)
+        self.client = client
+        self.prefix = prefix
+        self._listener = None
+
+    def subscribe(self, company_reg_no: str) -> Subscriber:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='notification-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe(company_reg_no)
+
+    def publish(self, company_reg_no: str, event: dict) -> None:
+        self.published += 1
+        self.client.publish(self.prefix + company_reg_no, json.dumps(event))
+
+    def _listen(self) -> None:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for message in pubsub.listen():
+            channel = message['channel']
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self._deliver(channel[len(self.prefix):], json.loads(message['data']))
+
+def create_broker(config: dict) -> LocalBroker:
+    """
+    Build the broker selected by the NOTIFICATION_BROKER setting.
+
+    'local' (default) only reaches streams served by the same process, so
+    it suits a single gunicorn worker; 'redis' reaches every worker through
+    REDIS_URL and requires the redis package.
+    """
+    backend = config.get('NOTIFICATION_BROKER', 'local')
+    max_queue = config.get('NOTIFICATION_QUEUE_SIZE', 100)
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('NOTIFICATION_BROKER=redis requires the redis package') from e
+        client = redis.Redis.from_url(config.get('REDIS_URL', 'redis://localhost:6379/0'))
+        return RedisBroker(client, max_queue=max_queue)
+    if backend == 'local':
+        return LocalBroker(max_queue=max_queue)
+    raise ValueError(f'Unknown NOTIFICATION_BROKER: {backend}')
+
+# Replaced by init_app() with the broker selected in the configuration
+broker = LocalBroker()
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _report_event(report: Report) -> dict:
+    return {
+        'type': 'report.created',
+        'incident_no': report.incident_no,
+        'vehicle_reg_no': report.vehicle_reg_no,
+        'location': report.location,
+        'incident_datetime': _isoformat(report.incident_datetime),
+        'status': report.status,
+        'created_at': _isoformat(report.created_at)
+    }
+
+def _after_flush(session, flush_context):
+    reports = [obj for obj in session.new if isinstance(obj, Report)]
+    if not reports:
+        return
+
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for company_reg_no, company_reports in router.route(session.connection(), reports).items():
+        pending.extend((company_reg_no, _report_event(report)) for report in company_reports)
+
+def _after_commit(session):
+    for company_reg_no, payload in session.info.pop(_PENDING_KEY, ()):
+        broker.publish(company_reg_no, payload)
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """
+    Configure the notification broker and the hooks that feed it.
+
+    When a Report is inserted for a vehicle owned by an insurance company,
+    a 'report.created' event is published to that company's streams once
+    the transaction commits. Rolled back inserts publish nothing.
+    """
+    global broker
+    broker = create_broker(app.config)
+
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+class NotificationService:
+    @staticmethod
+    def stream(company_reg_no: str, heartbeat: float = 15.0, timeout: Optional[float] = None,
+               retry_ms: int = 3000):
+        """
+        Server-sent events for a company, as a generator of text chunks.
+
+        The generator holds no database connection or request context, so
+        under a gevent (or gthread) gunicorn worker an open stream costs one
+        greenlet (or thread) rather than a whole worker. A comment line is
+        sent every `heartbeat` seconds to keep proxies from closing an idle
+        connection; after `timeout` seconds the stream ends and the browser
+        reconnects after `retry_ms` milliseconds.
+
+        Args:
+            company_reg_no (str): Company whose events to send
+            heartbeat (float): Seconds between keep-alive comments
+            timeout (Optional[float]): Seconds before the stream is closed, or None to keep it open
+            retry_ms (int): Reconnection delay advertised to the client
+
+        Returns:
+            Generator[str]: SSE-formatted chunks
+        """
+        def generate():
+            subscriber = broker.subscribe(company_reg_no)
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            try:
+                yield f'retry: {retry_ms}\n\n'
+                while True:
+                    events = subscriber.get(timeout=heartbeat)
+                    dropped = subscriber.take_dropped()
+                    if dropped:
+                        # The client missed events and should reload its view
+                        yield f'event: dropped\ndata: {json.dumps({"dropped": dropped})}\n\n'
+                    for item in events:
+                        yield f'id: {item["incident_no"]}\nevent: {item["type"]}\ndata: {json.dumps(item)}\n\n'
+                    if not events and not dropped:
+                        yield ': keep-alive\n\n'
+                    if subscriber.closed or (deadline is not None and time.monotonic() >= deadline):
+                        break
+            finally:
+                broker.unsubscribe(subscriber)
+
+        return generate()
+
+    @staticmethod
+    def stats() -> dict:
+        """Published event and open subscriber counts of the broker in this process."""
+        return broker.stats()
\ No newline at end of file
@@ -0,0 +1,205 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import case, event, extract, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.models.counters import CompanyReportCounter
+from app.models.report import Report
+from app.models.vehicle import VehicleOwnership
+from app.services.insurer_routing import router
+
+CounterKey = Tuple[str, str, date]
+
+def _day(value) -> date:
+    """Normalize a datetime, date or 'YYYY-MM-DD' string to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+def _upsert(connection, key: CounterKey, delta: int) -> None:
+    company_reg_no, status, day = key
+    table = CompanyReportCounter.__table__
+    now = datetime.utcnow()
+
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(table).values(company_reg_no=company_reg_no, status=status, day=day,
+                                    count=delta, updated_at=now)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.company_reg_no, table.c.status, table.c.day],
+            set_={'count': table.c.count + delta, 'updated_at': now}
+        ))
+        return
+
+    result = connection.execute(
+        update(table).where(
+            table.c.company_reg_no == company_reg_no, table.c.status == status, table.c.day == day
+        ).values(count=table.c.count + delta, updated_at=now)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(company_reg_no=company_reg_no, status=status, day=day,
+                                                 count=delta, updated_at=now))
+
+def _collect_deltas(session) -> Dict[Tuple[str, str, date], int]:
+    """Per-(vehicle, status, day) changes implied by the reports in this flush."""
+    deltas = defaultdict(int)
+    for obj in session.new:
+        if isinstance(obj, Report) and obj.created_at is not None:
+            deltas[(obj.vehicle_reg_no, obj.status, _day(obj.created_at))] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Report):
+            continue
+        history = get_history(obj, 'status')
+        if not history.has_changes() or not history.deleted or not history.added:
+            continue
+        day = _day(obj.created_at)
+        deltas[(obj.vehicle_reg_no, history.deleted[0], day)] -= 1
+        deltas[(obj.vehicle_reg_no, history.added[0], day)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Report) and obj.created_at is not None:
+            deltas[(obj.vehicle_reg_no, obj.status, _day(obj.created_at))] -= 1
+
+    return {key: delta for key, delta in deltas.items() if delta}
+
+def _after_flush(session, flush_context):
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+
+    connection = session.connection()
+    companies = router.companies_for(connection, {vehicle_reg_no for vehicle_reg_no, _, _ in deltas})
+
+    by_key = defaultdict(int)
+    for (vehicle_reg_no, status, day), delta in deltas.items():
+        for company_reg_no in companies.get(vehicle_reg_no, ()):
+            by_key[(company_reg_no, status, day)] += delta
+
+    for key, delta in by_key.items():
+        if delta:
+            _upsert(connection, key, delta)
+
+def init_app(app):
+    """
+    Keep company_report_counters in step with reports_info.
+
+    Counters are adjusted in the same transaction as the flush that creates,
+    re-statuses or deletes a Report. Bulk Query.update()/delete() calls and
+    changes to vehicle ownership bypass this; `flask rebuild-report-counters`
+    recomputes everything from scratch.
+    """
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+
+class ReportCounterService:
+    @staticmethod
+    def full_recount() -> Dict[CounterKey, int]:
+        """
+        Count reports per (company, status, day) straight from reports_info.
+
+        Returns:
+            Dict[CounterKey, int]: Non-zero counts keyed by (company_reg_no, status, day)
+        """
+        day = func.date(Report.created_at)
+        rows = db.session.query(
+            VehicleOwnership.company_reg_no,
+            Report.status,
+            day,
+            func.count(func.distinct(Report.incident_no))
+        ).join(
+            VehicleOwnership, VehicleOwnership.vehicle_reg_no == Report.vehicle_reg_no
+        ).filter(
+            VehicleOwnership.company_reg_no.isnot(None)
+        ).group_by(VehicleOwnership.company_reg_no, Report.status, day).all()
+
+        return {(company_reg_no, status, _day(row_day)): count for company_reg_no, status, row_day, count in rows}
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Replace every counter with a full recount.
+
+        Returns:
+            int: Number of counter rows written
+        """
+        counts = ReportCounterService.full_recount()
+        try:
+            CompanyReportCounter.query.delete()
+            now = datetime.utcnow()
+            db.session.bulk_insert_mappings(CompanyReportCounter, [
+                {'company_reg_no': company_reg_no, 'status': status, 'day': day, 'count': count, 'updated_at': now}
+                for (company_reg_no, status, day), count in counts.items()
+            ])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+        return len(counts)
+
+    @staticmethod
+    def check() -> List[Tuple[CounterKey, int, int]]:
+        """
+        Compare the counters with a full recount.
+
+        Returns:
+            List[Tuple[CounterKey, int, int]]: (key, counter value, recounted value) for every mismatch
+        """
+        expected = ReportCounterService.full_recount()
+        actual = {
+            (row.company_reg_no, row.status, _day(row.day)): row.count
+            for row in CompanyReportCounter.query.filter(CompanyReportCounter.count != 0)
+        }
+        return [
+            (key, actual.get(key, 0), expected.get(key, 0))
+            for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], k[1] or '', k[2]))
+            if actual.get(key, 0) != expected.get(key, 0)
+        ]
+
+    @staticmethod
+    def summary(company_reg_no: str, days: int = 30) -> dict:
+        """
+        Total, recent, pending and rejected report counts for a company, from the counters.
+
+        Returns:
+            dict: total, recent, pending and rejected counts
+        """
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        c = CompanyReportCounter
+        rows = db.session.query(
+            c.status,
+            func.sum(c.count),
+            func.sum(case((c.day >= since, c.count), else_=0))
+        ).filter(c.company_reg_no == company_reg_no).group_by(c.status).all()
+
+        summary = {'total': 0, 'recent': 0, 'pending': 0, 'rejected': 0}
+        for status, total, recent in rows:
+            summary['total'] += total or 0
+            summary['recent'] += recent or 0
+            if status in ('pending', 'rejected'):
+                summary[status] += total or 0
+        return summary
+
+    @staticmethod
+    def monthly_counts(company_reg_no: str, days: int = 30) -> List[dict]:
+        """
+        Reports per calendar month over the last `days` days, from the counters.
+
+        Returns:
+            List[dict]: [{'month': 'YYYY-MM', 'count': n}, ...] in month order
+        """
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        c = CompanyReportCounter
+        year = extract('year', c.day)
+        month = extract('month', c.day)
+        rows = db.session.query(year, month, func.sum(c.count)).filter(
+            c.company_reg_no == company_reg_no,
+            c.day >= since
+        ).group_by(year, month).order_by(year, month).all()
+        return [{'month': f'{int(y):04d}-{int(m):02d}', 'count': count} for y, m, count in rows if count]
\ No newline at end of file
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import case, extract, func
+from app import db
+from app.models.report import Report
+from app.models.vehicle import VehicleOwnership
+
+class StatsService:
+    @staticmethod
+    def company_reports_filter(company_reg_no: str):
+        """
+        Filter clause restricting reports to vehicles owned by a company.
+
+        Uses EXISTS rather than a join so a report is counted once even if
+        the vehicle has several ownership rows for the same company.
+        """
+        return db.session.query(VehicleOwnership.id).filter(
+            VehicleOwnership.vehicle_reg_no == Report.vehicle_reg_no,
+            VehicleOwnership.company_reg_no == company_reg_no
+        ).exists()
+
+    @staticmethod
+    def report_query(company_reg_no: Optional[str] = None):
+        """Report query scoped to a company, or all reports when company_reg_no is None."""
+        query = Report.query
+        if company_reg_no is not None:
+            query = query.filter(StatsService.company_reports_filter(company_reg_no))
+        return query
+
+    @staticmethod
+    def empty_summary() -> dict:
+        """Summary counts for a user who can see no reports."""
+        return {'total': 0, 'recent': 0, 'pending': 0, 'rejected': 0}
+
+    @staticmethod
+    def report_summary(company_reg_no: Optional[str] = None, days: int = 30) -> dict:
+        """
+        Count total, recent, pending and rejected reports in a single query.
+
+        Args:
+            company_reg_no (Optional[str]): Company to scope to, or None for all reports
+            days (int): Size of the "recent" window
+
+        Returns:
+            dict: total, recent, pending and rejected counts
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+        query = db.session.query(
+            func.count(Report.incident_no),
+            func.sum(case((Report.created_at >= since, 1), else_=0)),
+            func.sum(case((Report.status == 'pending', 1), else_=0)),
+            func.sum(case((Report.status == 'rejected', 1), else_=0))
+        )
+        if company_reg_no is not None:
+            query = query.filter(StatsService.company_reports_filter(company_reg_no))
+
+        total, recent, pending, rejected = query.one()
+        # SUM over no rows is NULL
+        return {
+            'total': total,
+            'recent': recent or 0,
+            'pending': pending or 0,
+            'rejected': rejected or 0
+        }
+
+    @staticmethod
+    def monthly_counts(company_reg_no: Optional[str] = None, days: int = 30) -> List[dict]:
+        """
+        Reports per calendar month over the last `days` days.
+
+        Groups on EXTRACT(year/month), which SQLAlchemy renders for both
+        SQLite and PostgreSQL, instead of the SQLite-only strftime().
+
+        Returns:
+            List[dict]: [{'month': 'YYYY-MM', 'count': n}, ...] in month order
+        """
+        since = datetime.utcnow() - timedelta(days=days)
+        year = extract('year', Report.created_at)
+        month = extract('month', Report.created_at)
+        query = db.session.query(year, month, func.count(Report.incident_no)).filter(
+            Report.created_at >= since
+        )
+        if company_reg_no is not None:
+            query = query.filter(StatsService.company_reports_filter(company_reg_no))
+
+        rows = query.group_by(year, month).order_by(year, month).all()
+        return [{'month': f'{int(y):04d}-{int(m):02d}', 'count': count} for y, m, count in rows]
+
+    @staticmethod
+    def recent_reports(company_reg_no: Optional[str] = None, limit: int = 5) -> list:
+        """Most recently created reports."""
+        return StatsService.report_query(company_reg_no).order_by(Report.created_at.desc()).limit(limit).all()
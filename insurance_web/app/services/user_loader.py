@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, event, inspect
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db, login_manager
+from app.models.company import CompanyInfo
+from app.models.user import User
+from app.services.cache import LRUCacheBackend, create_backend
+
+DEFAULT_TTL = 30  # seconds another worker may serve a user changed elsewhere
+
+# Never copied into the cache; loaded on access if a request needs them
+_PRIVATE_COLUMNS = {'password_hash', 'reset_token', 'reset_token_expiry'}
+
+# Replaced by init_app() with the backend selected in the configuration
+user_cache = LRUCacheBackend(max_size=10000, ttl=DEFAULT_TTL)
+
+# Cache keys touched by the current transaction, invalidated again on commit
+_PENDING_KEY = 'user_loader_invalidations'
+
+def _user_key(user_id) -> str:
+    return f'user:{user_id}'
+
+def _company_key(company_reg_no: str) -> str:
+    return f'company:{company_reg_no}'
+
+def _dump(obj) -> dict:
+    values = {}
+    for column in inspect(type(obj)).columns:
+        if column.key in _PRIVATE_COLUMNS:
+            continue
+        value = getattr(obj, column.key)
+        values[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return values
+
+def _restore(model, values: dict):
+    """Attach a cached row to the session as if it had been loaded, without a query."""
+    values = dict(values)
+    for column in inspect(model).columns:
+        if isinstance(column.type, DateTime) and values.get(column.key):
+            values[column.key] = datetime.fromisoformat(values[column.key])
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+def load_user(user_id) -> Optional[User]:
+    """
+    Flask-Login user loader.
+
+    Flask-Login calls it once per request and keeps the result as
+    current_user. The user and their company come from the cache when
+    both are there and are merged into the session without a query, so
+    current_user.company does not lazy-load either. Otherwise both are
+    fetched in one joined query and cached.
+    """
+    user_id = int(user_id)
+    values = user_cache.get(_user_key(user_id))
+    if values is not None:
+        company_values = None
+        if values.get('company_reg_no'):
+            company_values = user_cache.get(_company_key(values['company_reg_no']))
+        if company_values is not None or not values.get('company_reg_no'):
+            user = _restore(User, values)
+            company = _restore(CompanyInfo, company_values) if company_values is not None else None
+            set_committed_value(user, 'company', company)
+            return user
+
+    user = db.session.query(User).options(joinedload(User.company)).filter(User.id == user_id).first()
+    if user is not None:
+        user_cache.set(_user_key(user.id), _dump(user))
+        if user.company is not None:
+            user_cache.set(_company_key(user.company.company_reg_no), _dump(user.company))
+    return user
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a cached user, e.g. after changing it with a bulk UPDATE that skips the mapper hooks."""
+    user_cache.delete(_user_key(user_id))
+
+def _on_change(mapper, connection, target):
+    key = _user_key(target.id) if isinstance(target, User) else _company_key(target.company_reg_no)
+    user_cache.delete(key)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(key)
+
+def _after_commit(session):
+    # A request may have re-cached the old row between the flush and the commit
+    for key in session.info.pop(_PENDING_KEY, ()):
+        user_cache.delete(key)
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """
+    Install the cached user loader.
+
+    Users and companies are cached for USER_CACHE_TTL seconds and dropped
+    as soon as a change to them is flushed and again on commit, e.g. by
+    admin.toggle_user_status. With the per-process 'lru' backend another
+    worker can serve the old row until the TTL runs out.
+    """
+    global user_cache
+    user_cache = create_backend({**app.config, 'CACHE_TTL': app.config.get('USER_CACHE_TTL', DEFAULT_TTL)},
+                                prefix='raise:')
+    login_manager.user_loader(load_user)
+
+    for model in (User, CompanyInfo):
+        for name in ('after_update', 'after_delete'):
+            if not event.contains(model, name, _on_change):
+                event.listen(model, name, _on_change)
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
\ No newline at end of file
@@ -0,0 +1,197 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.models.police import JurisdictionInfo, PoliceInfo
+from app.models.report import Report
+from app.models.vehicle import VehicleAccidentHistory, VehicleInfo
+from app.services.cache import LRUCacheBackend, create_backend
+from app.utils.registration import normalize_reg_no
+
+# Replaced by init_app() with the backend selected in the configuration
+history_cache = LRUCacheBackend()
+
+# Registration numbers touched by the current transaction, invalidated again on commit
+_PENDING_KEY = 'vehicle_history_invalidations'
+
+def _cache_key(normalized_reg_no: str) -> str:
+    return f'vehicle_history:{normalized_reg_no}'
+
+def _invalidate(reg_no: str) -> None:
+    normalized = normalize_reg_no(reg_no)
+    if normalized:
+        history_cache.delete(_cache_key(normalized))
+
+def _on_change(mapper, connection, target):
+    """Drop cached history for every registration number a changed row refers to."""
+    reg_nos = {target.vehicle_reg_no}
+    reg_nos.update(get_history(target, 'vehicle_reg_no').deleted or ())
+    session = object_session(target)
+    for reg_no in reg_nos:
+        _invalidate(reg_no)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(reg_no)
+
+def _after_commit(session):
+    # A reader may have re-cached the pre-commit state between the flush and
+    # the commit, so invalidate once more now that the change is visible
+    for reg_no in session.info.pop(_PENDING_KEY, ()):
+        _invalidate(reg_no)
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def init_app(app):
+    """
+    Configure the vehicle history cache and its invalidation hooks.
+
+    Entries are keyed by normalized registration number and dropped when
+    the vehicle, or a VehicleAccidentHistory or Report row for it, is
+    inserted, updated or deleted (unknown plates are cached too). The
+    hooks only reach this process's cache, so with the per-process 'lru'
+    backend other workers serve the old entry until CACHE_TTL runs out.
+    """
+    global history_cache
+    history_cache = create_backend(app.config, prefix='raise:')
+
+    for model in (VehicleInfo, VehicleAccidentHistory, Report):
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            if not event.contains(model, name, _on_change):
+                event.listen(model, name, _on_change)
+    if not event.contains(Session, 'after_commit', _after_commit):
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+
+class VehicleHistoryService:
+    @staticmethod
+    def lookup(reg_no: str) -> Optional[dict]:
+        """
+        Accident history of a vehicle, fetched in a single query.
+
+        The vehicle is found through the normalized registration number
+        index, then outer-joined to its history entries, their reports and
+        the reporting police station, so a vehicle with no accidents still
+        yields one row.
+
+        Args:
+            reg_no (str): Registration number in any case/spacing
+
+        Returns:
+            Optional[dict]: The history document, or None if the vehicle is unknown.
+                'last_modified' is the newest vehicle/history/report change, or None.
+        """
+        normalized = normalize_reg_no(reg_no)
+        if not normalized:
+            return None
+
+        rows = db.session.query(
+            VehicleInfo.vehicle_reg_no,
+            VehicleInfo.make,
+            VehicleInfo.model,
+            VehicleInfo.year,
+            VehicleInfo.updated_at.label('vehicle_updated_at'),
+            VehicleAccidentHistory.created_at.label('history_created_at'),
+            Report.incident_no,
+            Report.incident_datetime,
+            Report.location,
+            Report.status,
+            Report.created_at.label('reported_at'),
+            Report.updated_at,
+            JurisdictionInfo.station_name
+        ).outerjoin(
+            VehicleAccidentHistory, VehicleAccidentHistory.vehicle_reg_no == VehicleInfo.vehicle_reg_no
+        ).outerjoin(
+            Report, Report.incident_no == VehicleAccidentHistory.incident_no
+        ).outerjoin(
+            PoliceInfo, PoliceInfo.badge_no == Report.badge_no
+        ).outerjoin(
+            JurisdictionInfo, JurisdictionInfo.station_id == PoliceInfo.station_id
+        ).filter(
+            VehicleInfo.normalized_reg_no == normalized
+        ).order_by(
+            Report.created_at.desc()
+        ).all()
+
+        if not rows:
+            return None
+
+        first = rows[0]
+        history = []
+        # A make/model correction changes the document too
+        last_modified = first.vehicle_updated_at
+        for row in rows:
+            if row.incident_no is None:
+                continue
+            history.append({
+                'incident_no': row.incident_no,
+                'incident_datetime': row.incident_datetime.isoformat() if row.incident_datetime else None,
+                'location': row.location,
+                'status': row.status,
+                'police_station': row.station_name,
+                'reported_at': row.reported_at.isoformat() if row.reported_at else None
+            })
+            for changed in (row.history_created_at, row.updated_at):
+                if changed and (last_modified is None or changed > last_modified):
+                    last_modified = changed
+
+        # Rows are newest first, so the first reported_at is the last accident
+        return {
+            'vehicle_reg_no': first.vehicle_reg_no,
+            'make': first.make,
+            'model': first.model,
+            'year': first.year,
+            'accident_count': len(history),
+            'last_accident_date': history[0]['reported_at'] if history else None,
+            'history': history,
+            'last_modified': last_modified
+        }
+
+    @staticmethod
+    def cached_lookup(reg_no: str) -> Optional[dict]:
+        """
+        Read-through cached version of lookup().
+
+        Misses (unknown vehicles) are cached as well, so repeated searches
+        for the same plate never reach the database until it changes.
+        """
+        normalized = normalize_reg_no(reg_no)
+        if not normalized:
+            return None
+
+        key = _cache_key(normalized)
+        cached = history_cache.get(key)
+        if cached is None:
+            document = VehicleHistoryService.lookup(normalized)
+            if document is None:
+                cached = {'found': False}
+            else:
+                last_modified = document['last_modified']
+                cached = dict(document, found=True,
+                              last_modified=last_modified.isoformat() if last_modified else None)
+            history_cache.set(key, cached)
+
+        if not cached['found']:
+            return None
+        document = {k: v for k, v in cached.items() if k != 'found'}
+        if document['last_modified']:
+            document['last_modified'] = datetime.fromisoformat(document['last_modified'])
+        return document
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Hit, miss and eviction counters of the history cache."""
+        return history_cache.stats()
+
+    @staticmethod
+    def etag(document: dict) -> str:
+        """Strong validator for a history document, changing whenever the vehicle, a history row or a report changes."""
+        last_modified = document['last_modified']
+        key = '|'.join([
+            document['vehicle_reg_no'],
+            str(document['accident_count']),
+            last_modified.isoformat() if isinstance(last_modified, datetime) else ''
+        ])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import func, tuple_
+from app import db
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+COUNT_CAP = 1000  # rows counted exactly before the total is shown as "COUNT_CAP+"
+
+Page = namedtuple('Page', ['items', 'next_cursor', 'prev_cursor', 'total', 'total_is_estimate'])
+
+def encode_cursor(sort: str, value, key, before: bool = False) -> str:
+    """Encode the (sort value, primary key) position of a row at the edge of a page."""
+    payload = {'s': sort, 'k': key, 'b': 1} if before else {'s': sort, 'k': key}
+    if isinstance(value, datetime):
+        payload['d'] = value.isoformat()
+    else:
+        payload['v'] = value
+    raw = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, object, object, bool]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Returns:
+        Tuple[str, object, object, bool]: (sort column name, sort value, primary key,
+            whether it points backwards)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value = datetime.fromisoformat(payload['d']) if 'd' in payload else payload['v']
+        return payload['s'], value, payload['k'], bool(payload.get('b'))
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def estimate_count(query, cap: int = COUNT_CAP) -> Tuple[int, bool]:
+    """
+    Cheap row count for "about N results".
+
+    PostgreSQL answers from the planner's estimate without reading rows;
+    elsewhere at most `cap` + 1 rows are counted.
+
+    Returns:
+        Tuple[int, bool]: (count, whether it is an estimate or capped)
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        compiled = query.statement.compile(db.session.get_bind())
+        plan = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params).scalar()
+        return int(plan[0]['Plan']['Plan Rows']), True
+    limited = query.order_by(None).limit(cap + 1).subquery()
+    count = db.session.query(func.count()).select_from(limited).scalar()
+    return min(count, cap), count > cap
+
+def paginate(
+    query,
+    sort_column,
+    key_column,
+    cursor: Optional[str] = None,
+    per_page: int = DEFAULT_PAGE_SIZE,
+    descending: bool = True,
+    count: bool = True
+) -> Page:
+    """
+    One page of `query` by keyset pagination.
+
+    Rows are ordered by (sort_column, key_column) and a page starts after
+    (or, for a previous-page cursor, ends before) the row a cursor points
+    at, so every page costs one range scan of an index on those two
+    columns however deep it is. Rows whose sort value is NULL are skipped.
+
+    Args:
+        query: Filtered query to page through; its own ordering is replaced
+        sort_column: Column to order by, backed by an index on (sort_column, key_column)
+        key_column: Unique column breaking ties, usually the primary key
+        cursor (Optional[str]): next_cursor or prev_cursor of another page
+        per_page (int): Page size, capped at MAX_PAGE_SIZE
+        descending (bool): Largest sort values first
+        count (bool): Whether to estimate the total number of rows
+
+    Returns:
+        Page: items, cursors of the neighbouring pages (None at either end) and the total
+
+    Raises:
+        ValueError: If the cursor is malformed or was made for another sort order
+    """
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+    total, total_is_estimate = estimate_count(query) if count else (None, False)
+    query = query.filter(sort_column.isnot(None))
+
+    before = False
+    if cursor:
+        sort, value, key, before = decode_cursor(cursor)
+        if sort != sort_column.key:
+            raise ValueError('Cursor is for another sort order')
+        position = tuple_(sort_column, key_column)
+        # Walking backwards flips the comparison and the ordering
+        if descending != before:
+            query = query.filter(position < tuple_(value, key))
+        else:
+            query = query.filter(position > tuple_(value, key))
+
+    if descending != before:
+        query = query.order_by(sort_column.desc(), key_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), key_column.asc())
+    # One extra row tells whether there is another page in this direction
+    rows = query.limit(per_page + 1).all()
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        rows.reverse()
+
+    def position_of(row):
+        return sort_column.key, getattr(row, sort_column.key), getattr(row, key_column.key)
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if more or before:
+            next_cursor = encode_cursor(*position_of(rows[-1]))
+        if cursor and (more or not before):
+            prev_cursor = encode_cursor(*position_of(rows[0]), before=True)
+    return Page(rows, next_cursor, prev_cursor, total, total_is_estimate)
+
+def listing_args(args) -> dict:
+    """
+    Paging, sorting and filter arguments of a listing page's query string.
+
+    Raises:
+        ValueError: If a date is not YYYY-MM-DD
+    """
+    def date(name, days=0):
+        value = args.get(name)
+        return datetime.strptime(value, '%Y-%m-%d') + timedelta(days=days) if value else None
+
+    return {
+        'cursor': args.get('cursor') or None,
+        'sort': args.get('sort') or None,
+        'descending': args.get('dir', 'desc') != 'asc',
+        'per_page': args.get('per_page', DEFAULT_PAGE_SIZE, type=int),
+        'status': args.get('status') or None,
+        'date_from': date('from'),
+        'date_to': date('to', days=1)  # The whole of the last day
+    }
\ No newline at end of file
@@ -1,5 +1,18 @@
 import re
+from functools import lru_cache
+from threading import BoundedSemaphore
 from typing import Tuple, List
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_HASH_METHOD = 'scrypt'  # Werkzeug's own default, scrypt:32768:8:1
+DEFAULT_QUEUE_TIMEOUT = 5.0  # seconds a login may wait for a hashing slot
+
+# Limits concurrent hashing in this process; None when PASSWORD_HASH_CONCURRENCY is unset
+_hash_slots = None
+
+class HasherBusy(Exception):
+    """Every hashing slot stayed taken for the whole queue timeout."""
 
 def validate_password(password: str) -> Tuple[bool, List[str]]:
     """
@@ -44,4 +57,47 @@ def validate_password(password: str) -> Tuple[bool, List[str]]:
             errors.append("Password contains a common pattern")
             break
     
-    return len(errors) == 0, errors 
\ No newline at end of file
+    return len(errors) == 0, errors 
+
+def init_app(app):
+    """
+    Set up the hashing slots.
+
+    At most PASSWORD_HASH_CONCURRENCY hashes are computed at once; during a
+    login burst the rest wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds
+    instead of all competing for the CPU.
+    """
+    global _hash_slots
+    concurrency = app.config.get('PASSWORD_HASH_CONCURRENCY')
+    _hash_slots = BoundedSemaphore(concurrency) if concurrency else None
+
+class _HashSlot:
+    def __enter__(self):
+        timeout = current_app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+        self.slots = _hash_slots
+        if self.slots is not None and not self.slots.acquire(timeout=timeout):
+            raise HasherBusy('Too many password checks in progress')
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.slots is not None:
+            self.slots.release()
+
+@lru_cache(maxsize=8)
+def _method_prefix(method: str) -> str:
+    """The full method string Werkzeug stores for `method`, e.g. 'pbkdf2' -> 'pbkdf2:sha256:600000'."""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+def hash_password(password: str) -> str:
+    """Hash a password with PASSWORD_HASH_METHOD (any Werkzeug method, with its cost)."""
+    with _HashSlot():
+        return generate_password_hash(password, method=current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD))
+
+def check_password(password_hash: str, password: str) -> bool:
+    """Check a password against a stored hash of any Werkzeug method."""
+    with _HashSlot():
+        return check_password_hash(password_hash, password)
+
+def needs_rehash(password_hash: str) -> bool:
+    """Whether a stored hash was made with another method or cost than PASSWORD_HASH_METHOD."""
+    method = current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+    return password_hash.split('$', 1)[0] != _method_prefix(method)
\ No newline at end of file
@@ -0,0 +1,14 @@
+import re
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]')
+
+def normalize_reg_no(reg_no: str) -> str:
+    """
+    Canonical form of a vehicle registration number for lookups.
+
+    Upper-cases and drops whitespace and punctuation, so "KCA 123A",
+    "kca123a" and "KCA-123A" all map to "KCA123A".
+    """
+    if reg_no is None:
+        return None
+    return _NON_ALNUM.sub('', reg_no.upper())
\ No newline at end of file
@@ -0,0 +1,140 @@
+import socketserver
+import threading
+from typing import Dict, List, Optional, Tuple
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough of RFC 5321 for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        with sink._lock:
+            sink.connections += 1
+        self.reply('220 raise-smtp-sink ready')
+        mail_from, rcpt_tos = None, []
+        accepted = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.reply('250-raise-smtp-sink')
+                self.reply('250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 raise-smtp-sink')
+            elif command == 'MAIL':
+                if sink.drop_after is not None and accepted >= sink.drop_after:
+                    return  # Hang up without a reply, like a server going away mid-batch
+                mail_from, rcpt_tos = _address(argument), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipient = _address(argument)
+                code = sink.reject.get(recipient.split('@')[-1].lower()) or sink.reject.get(recipient.lower())
+                if code:
+                    self.reply(f'{code} Recipient rejected by sink')
+                else:
+                    rcpt_tos.append(recipient)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                if not rcpt_tos:
+                    self.reply('503 No valid recipients')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                sink.record(mail_from, rcpt_tos, b''.join(lines))
+                accepted += 1
+                mail_from, rcpt_tos = None, []
+                self.reply('250 OK: queued')
+            elif command == 'RSET':
+                mail_from, rcpt_tos = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+def _address(argument: str) -> str:
+    """'FROM:<a@b>' / 'TO:<a@b> SIZE=..' -> 'a@b'."""
+    value = argument.partition(':')[2].strip().split(' ')[0]
+    return value.strip('<>')
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SMTPSink:
+    """
+    Local SMTP server that accepts every message and keeps it in memory.
+
+    Point MAIL_SERVER/MAIL_PORT at it (with MAIL_USE_TLS off and no
+    credentials) to exercise the outbound mail queue without a network.
+    Recipients or whole domains listed in `reject` are refused with the
+    given SMTP code, e.g. {'example.org': 451} for a temporary failure.
+    With `drop_after` set, each connection is closed without a reply when
+    a message is started after that many were accepted on it.
+
+        with SMTPSink() as sink:
+            app.config.update(MAIL_SERVER=sink.host, MAIL_PORT=sink.port)
+            ...
+            sink.messages[0]['rcpt_tos']
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, reject: Optional[Dict[str, int]] = None,
+                 drop_after: Optional[int] = None):
+        self.reject = {key.lower(): code for key, code in (reject or {}).items()}
+        self.drop_after = drop_after
+        self.messages: List[dict] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.sink = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    @property
+    def host(self) -> str:
+        return self.address[0]
+
+    @property
+    def port(self) -> int:
+        return self.address[1]
+
+    def record(self, mail_from: str, rcpt_tos: List[str], data: bytes) -> None:
+        with self._lock:
+            self.messages.append({'mail_from': mail_from, 'rcpt_tos': list(rcpt_tos), 'data': data})
+
+    def start(self) -> 'SMTPSink':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
\ No newline at end of file
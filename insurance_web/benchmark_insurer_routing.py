@@ -0,0 +1,151 @@
+"""
+Insurer routing cost for bursts of new accident reports.
+
+Registers synthetic vehicles in a throwaway SQLite database (most insured
+by one of a few companies, some by none) and, for bursts of reports on
+random plates, times resolving the plates to companies:
+
+    per-vehicle  one ownership query per report
+    IN-query     one query for the whole burst
+    router       InsurerRouter.route() with a warm plate -> company map
+
+plus committing the burst through the ORM, which runs the report counter
+and notification hooks on top of the router.
+
+    python benchmark_insurer_routing.py --vehicles 100000 --burst 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+COMPANIES = [f'INS{i:03d}' for i in range(1, 21)]
+INSERT_CHUNK = 20000
+
+def plate(number):
+    return f'K{chr(65 + number // 26000 % 26)}{chr(65 + number // 1000 % 26)} {number % 1000:03d}X'
+
+def register_vehicles(db, rng, count):
+    from app.models import VehicleInfo, VehicleOwnership
+    from app.utils.registration import normalize_reg_no
+
+    now = datetime.utcnow()
+    for start in range(0, count, INSERT_CHUNK):
+        numbers = range(start, min(start + INSERT_CHUNK, count))
+        db.session.execute(insert(VehicleInfo), [{
+            'vehicle_reg_no': plate(n), 'normalized_reg_no': normalize_reg_no(plate(n)),
+            'chassis_no': f'CH{n:09d}', 'engine_no': f'EN{n:09d}', 'make': 'Toyota', 'model': 'Axio',
+            'year': 2015, 'body_type': 'Saloon', 'color': 'White', 'transmission': 'Auto',
+            'created_at': now, 'updated_at': now
+        } for n in numbers])
+        # Nine in ten vehicles are insured by a company, the rest privately owned
+        db.session.execute(insert(VehicleOwnership), [{
+            'vehicle_reg_no': plate(n),
+            'company_reg_no': rng.choice(COMPANIES) if n % 10 else None,
+            'ownership_type': 'company' if n % 10 else 'individual',
+            'created_at': now, 'updated_at': now
+        } for n in numbers])
+        db.session.commit()
+
+def time_bursts(db, rng, vehicles, burst, rounds):
+    from app.models import Report, VehicleOwnership
+    from app.services.insurer_routing import router
+
+    def per_vehicle(connection, reports):
+        work = defaultdict(list)
+        for report in reports:
+            rows = connection.execute(select(VehicleOwnership.company_reg_no).where(
+                VehicleOwnership.vehicle_reg_no == report.vehicle_reg_no,
+                VehicleOwnership.company_reg_no.isnot(None)
+            ))
+            for (company_reg_no,) in rows:
+                work[company_reg_no].append(report)
+        return work
+
+    def in_query(connection, reports):
+        companies = defaultdict(set)
+        rows = connection.execute(select(VehicleOwnership.vehicle_reg_no, VehicleOwnership.company_reg_no).where(
+            VehicleOwnership.vehicle_reg_no.in_({report.vehicle_reg_no for report in reports}),
+            VehicleOwnership.company_reg_no.isnot(None)
+        ))
+        for vehicle_reg_no, company_reg_no in rows:
+            companies[vehicle_reg_no].add(company_reg_no)
+        work = defaultdict(list)
+        for report in reports:
+            for company_reg_no in companies[report.vehicle_reg_no]:
+                work[company_reg_no].append(report)
+        return work
+
+    connection = db.session.connection()
+    started = time.perf_counter()
+    router.warm(connection)
+    warm_ms = (time.perf_counter() - started) * 1000
+
+    timings = defaultdict(list)
+    incident = 0
+    for _ in range(rounds):
+        reports = []
+        for _ in range(burst):
+            incident += 1
+            reports.append(Report(incident_no=f'B{incident:09d}', vehicle_reg_no=plate(rng.randrange(vehicles)),
+                                  badge_no='B1', location='Thika Road', incident_datetime=datetime.utcnow(),
+                                  status='pending'))
+        routed = None
+        for name, resolve in (('per-vehicle', per_vehicle), ('IN-query', in_query), ('router', router.route)):
+            started = time.perf_counter()
+            work = resolve(connection, reports)
+            timings[name].append((time.perf_counter() - started) * 1000)
+            counts = {company: len(items) for company, items in work.items()}
+            assert routed is None or counts == routed, name
+            routed = counts
+
+        started = time.perf_counter()
+        db.session.add_all(reports)
+        db.session.commit()
+        timings['commit'].append((time.perf_counter() - started) * 1000)
+        connection = db.session.connection()
+
+    return warm_ms, {name: statistics.median(samples) for name, samples in timings.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=100000)
+    parser.add_argument('--burst', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(folder, "benchmark.db")}'
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from app import create_app, db
+        from app.models import JurisdictionInfo, PoliceInfo, CompanyInfo
+        from app.services.insurer_routing import router
+
+        app = create_app()
+        rng = random.Random(args.seed)
+        with app.app_context():
+            db.create_all()
+            db.session.add_all([CompanyInfo(company_reg_no=c, company_name=c, license_no=f'LIC-{c}') for c in COMPANIES])
+            db.session.add(JurisdictionInfo(station_id='ST1', station_name='Central', county='Nairobi'))
+            db.session.add(PoliceInfo(badge_no='B1', police_name='Bench', gender='M', rank='Cpl', station_id='ST1'))
+            db.session.commit()
+            register_vehicles(db, rng, args.vehicles)
+
+            warm_ms, medians = time_bursts(db, rng, args.vehicles, args.burst, args.rounds)
+            print(f'{args.vehicles} vehicles, bursts of {args.burst} reports (median of {args.rounds})')
+            print(f'  warm map    {warm_ms:>9.2f} ms (once)')
+            for name in ('per-vehicle', 'IN-query', 'router', 'commit'):
+                print(f'  {name:<11} {medians[name]:>9.2f} ms')
+            print(f'  {router.stats()}')
+            db.session.remove()
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
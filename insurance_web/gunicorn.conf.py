@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for the web app: gunicorn -c gunicorn.conf.py run:app
+
+Notification streams stay open for minutes, so the default sync worker
+(one request at a time) would be tied up by a single dashboard. The
+gevent worker serves each connection in a greenlet instead; without
+gevent installed, fall back to gthread, where a stream costs a thread.
+
+The default 'local' notification broker only reaches the streams of the
+process that saved a report, so it runs a single worker; set
+NOTIFICATION_BROKER=redis to run more. Asking for several workers with
+the local broker refuses to start rather than losing notifications.
+"""
+import multiprocessing
+import os
+
+try:
+    import gevent  # noqa: F401
+    _default_worker = 'gevent'
+except ImportError:
+    _default_worker = 'gthread'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', _default_worker)
+_local_broker = os.getenv('NOTIFICATION_BROKER', 'local') == 'local'
+workers = int(os.getenv('GUNICORN_WORKERS', 1 if _local_broker else multiprocessing.cpu_count() * 2 + 1))
+if workers > 1 and _local_broker:
+    raise RuntimeError(
+        f'GUNICORN_WORKERS={workers} needs NOTIFICATION_BROKER=redis; with the local broker '
+        'a report saved in one worker never reaches streams held by the others'
+    )
+# Open connections per gevent worker / threads per gthread worker
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+threads = int(os.getenv('GUNICORN_THREADS', 50))
+# Async and threaded workers report in between requests, so long streams are not killed
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+keepalive = 5
\ No newline at end of file
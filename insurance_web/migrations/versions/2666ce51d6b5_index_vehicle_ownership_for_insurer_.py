@@ -0,0 +1,28 @@
+"""index vehicle ownership for insurer routing
+
+Revision ID: 2666ce51d6b5
+Revises: d7ae6d77600a
+Create Date: 2026-10-18 17:51:51.506284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2666ce51d6b5'
+down_revision = 'd7ae6d77600a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vehicle_ownership', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicle_ownership_vehicle_reg_no'), ['vehicle_reg_no'], unique=False)
+        batch_op.create_index(batch_op.f('ix_vehicle_ownership_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicle_ownership', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicle_ownership_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_vehicle_ownership_vehicle_reg_no'))
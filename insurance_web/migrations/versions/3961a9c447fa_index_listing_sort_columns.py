@@ -0,0 +1,46 @@
+"""index listing sort columns
+
+Revision ID: 3961a9c447fa
+Revises: 38de1a2e7415
+Create Date: 2026-10-18 18:08:43.874998
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3961a9c447fa'
+down_revision = '38de1a2e7415'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reports_info', schema=None) as batch_op:
+        batch_op.create_index('ix_reports_info_created_at_incident_no', ['created_at', 'incident_no'], unique=False)
+        batch_op.create_index('ix_reports_info_incident_datetime_incident_no', ['incident_datetime', 'incident_no'], unique=False)
+        batch_op.create_index('ix_reports_info_status_created_at', ['status', 'created_at', 'incident_no'], unique=False)
+        batch_op.create_index('ix_reports_info_vehicle_reg_no_created_at', ['vehicle_reg_no', 'created_at'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('company_info', schema=None) as batch_op:
+        batch_op.create_index('ix_company_info_created_at_company_reg_no', ['created_at', 'company_reg_no'], unique=False)
+        batch_op.create_index('ix_company_info_company_name_company_reg_no', ['company_name', 'company_reg_no'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('company_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_company_info_company_name_company_reg_no')
+        batch_op.drop_index('ix_company_info_created_at_company_reg_no')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_created_at_id')
+
+    with op.batch_alter_table('reports_info', schema=None) as batch_op:
+        batch_op.drop_index('ix_reports_info_vehicle_reg_no_created_at')
+        batch_op.drop_index('ix_reports_info_status_created_at')
+        batch_op.drop_index('ix_reports_info_incident_datetime_incident_no')
+        batch_op.drop_index('ix_reports_info_created_at_incident_no')
@@ -0,0 +1,43 @@
+"""add company report counters
+
+Revision ID: 9665998e7d5f
+Revises: 
+Create Date: 2026-10-18 17:10:28.538740
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9665998e7d5f'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('company_report_counters',
+    sa.Column('company_reg_no', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['company_reg_no'], ['company_info.company_reg_no'], ),
+    sa.PrimaryKeyConstraint('company_reg_no', 'status', 'day')
+    )
+    # Same counts as `flask rebuild-report-counters`, so existing reports show up straight away
+    op.execute(
+        """
+        INSERT INTO company_report_counters (company_reg_no, status, day, count, updated_at)
+        SELECT vo.company_reg_no, r.status, date(r.created_at), COUNT(DISTINCT r.incident_no), CURRENT_TIMESTAMP
+        FROM reports_info r
+        JOIN vehicle_ownership vo ON vo.vehicle_reg_no = r.vehicle_reg_no
+        WHERE vo.company_reg_no IS NOT NULL AND r.status IS NOT NULL AND r.created_at IS NOT NULL
+        GROUP BY vo.company_reg_no, r.status, date(r.created_at)
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('company_report_counters')
@@ -0,0 +1,44 @@
+"""add normalized vehicle registration number
+
+Revision ID: d7ae6d77600a
+Revises: 9665998e7d5f
+Create Date: 2026-10-18 17:11:18.244685
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7ae6d77600a'
+down_revision = '9665998e7d5f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('vehicle_info', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('normalized_reg_no', sa.String(length=20), nullable=True))
+
+    # Backfill with the same rule as app.utils.registration.normalize_reg_no
+    vehicle_info = sa.table('vehicle_info',
+        sa.column('vehicle_reg_no', sa.String),
+        sa.column('normalized_reg_no', sa.String)
+    )
+    connection = op.get_bind()
+    for (reg_no,) in connection.execute(sa.select(vehicle_info.c.vehicle_reg_no)).fetchall():
+        connection.execute(
+            vehicle_info.update()
+            .where(vehicle_info.c.vehicle_reg_no == reg_no)
+            .values(normalized_reg_no=re.sub(r'[^A-Z0-9]', '', reg_no.upper()))
+        )
+
+    with op.batch_alter_table('vehicle_info', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vehicle_info_normalized_reg_no'), ['normalized_reg_no'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('vehicle_info', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vehicle_info_normalized_reg_no'))
+        batch_op.drop_column('normalized_reg_no')
@@ -0,0 +1,90 @@
+import fnmatch
+import os
+import queue
+import pytest
+
+# create_app() reads its settings from the environment
+os.environ.update({
+    'DATABASE_URL': 'sqlite://',
+    'MAIL_QUEUE_MODE': 'off',
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000'
+})
+
+from app import create_app, db
+
+@pytest.fixture
+def app():
+    """Application with an empty in-memory database."""
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+class FakePubSub:
+    """Pattern subscriptions of FakeRedis; listen() blocks until a message is published."""
+
+    def __init__(self):
+        self.patterns = []
+        self.messages = queue.Queue()
+
+    def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    def listen(self):
+        while True:
+            yield self.messages.get()
+
+class FakeRedis:
+    """The part of the redis-py client the caches and the notification broker use, kept in a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.pubsubs = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode('utf-8') if isinstance(value, str) else value
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+
+    def scan_iter(self, match='*'):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+    def info(self, section=None):
+        return {'evicted_keys': 0}
+
+    def publish(self, channel, message):
+        for pubsub in self.pubsubs:
+            if any(fnmatch.fnmatchcase(channel, pattern) for pattern in pubsub.patterns):
+                pubsub.messages.put({'type': 'pmessage', 'channel': channel.encode(), 'data': message.encode()})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub()
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+@pytest.fixture
+def login(client):
+    """Signs a user in on the test client without going through the login form."""
+    def login(user):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+    return login
\ No newline at end of file
@@ -0,0 +1,71 @@
+from datetime import datetime
+import pytest
+from app import db
+from app.models import (
+    CompanyInfo, JurisdictionInfo, PoliceInfo, Report, ReportAttachment, User, VehicleInfo, VehicleOwnership
+)
+
+PHOTO = bytes(range(256)) * 4
+
+@pytest.fixture
+def attachment(app, tmp_path):
+    """A photo of a report on a vehicle insured by C1, stored under ATTACHMENT_FOLDER."""
+    app.config['ATTACHMENT_FOLDER'] = str(tmp_path)
+    (tmp_path / 'reports' / 'INC0001').mkdir(parents=True)
+    (tmp_path / 'reports' / 'INC0001' / 'photo.jpg').write_bytes(PHOTO)
+    now = datetime.utcnow()
+    db.session.add_all([
+        JurisdictionInfo(station_id='ST1', station_name='Central', county='Nairobi'),
+        PoliceInfo(badge_no='B1', police_name='Kamau', gender='M', rank='Cpl', station_id='ST1'),
+        CompanyInfo(company_reg_no='C1', company_name='Insurer 1', license_no='L1'),
+        VehicleInfo(vehicle_reg_no='KCA 123A', chassis_no='C1', engine_no='E1', make='Toyota', model='Axio',
+                    year=2015, body_type='Saloon', color='White', transmission='Auto'),
+        VehicleOwnership(vehicle_reg_no='KCA 123A', company_reg_no='C1', ownership_type='company')
+    ])
+    db.session.flush()
+    db.session.add(Report(incident_no='INC0001', vehicle_reg_no='KCA 123A', badge_no='B1', location='Thika Road',
+                          incident_datetime=now, created_at=now))
+    db.session.flush()
+    attachment = ReportAttachment(incident_no='INC0001', photo_url='/reports/INC0001/photo.jpg')
+    db.session.add(attachment)
+    db.session.commit()
+    return attachment
+
+def add_user(company_reg_no):
+    user = User(email=f'agent{company_reg_no}@insurer.example', first_name='Test', last_name='Agent', role='agent',
+                company_reg_no=company_reg_no)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_report_page_links_attachments(client, login, attachment):
+    login(add_user('C1'))
+    response = client.get('/reports/INC0001')
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert '/reports/INC0001/update' in page
+    assert 'KCA 123A - Toyota Axio' in page
+    assert f'/reports/INC0001/attachments/{attachment.id}/photo?download=1' in page
+
+def test_attachment_ranges_and_revalidation(client, login, attachment):
+    login(add_user('C1'))
+    url = f'/reports/INC0001/attachments/{attachment.id}/photo'
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == PHOTO
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert 'private' in response.headers['Cache-Control']
+
+    partial = client.get(url, headers={'Range': 'bytes=100-199'})
+    assert partial.status_code == 206
+    assert partial.data == PHOTO[100:200]
+    assert partial.headers['Content-Range'] == f'bytes 100-199/{len(PHOTO)}'
+
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    download = client.get(url + '?download=1')
+    assert download.headers['Content-Disposition'].startswith('attachment')
+    assert client.get(f'/reports/INC0001/attachments/{attachment.id}/video').status_code == 404
+
+def test_other_companies_cannot_fetch_attachments(client, login, attachment):
+    login(add_user(None))
+    assert client.get(f'/reports/INC0001/attachments/{attachment.id}/photo').status_code == 403
\ No newline at end of file
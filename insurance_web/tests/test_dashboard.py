@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from app import db
+from app.models import CompanyInfo, JurisdictionInfo, PoliceInfo, Report, User, VehicleInfo, VehicleOwnership
+
+@pytest.fixture
+def reports(app):
+    """One report on a vehicle insured by each of two companies."""
+    db.session.add_all([
+        JurisdictionInfo(station_id='ST1', station_name='Central', county='Nairobi'),
+        PoliceInfo(badge_no='B1', police_name='Kamau', gender='M', rank='Cpl', station_id='ST1')
+    ])
+    now = datetime.utcnow()
+    for n, company_reg_no in enumerate(('C1', 'C2'), start=1):
+        reg_no = f'KCA {n}00A'
+        db.session.add_all([
+            CompanyInfo(company_reg_no=company_reg_no, company_name=f'Insurer {n}', license_no=f'L{n}'),
+            VehicleInfo(vehicle_reg_no=reg_no, chassis_no=f'C{n}', engine_no=f'E{n}', make='Toyota', model='Axio',
+                        year=2015, body_type='Saloon', color='White', transmission='Auto'),
+            VehicleOwnership(vehicle_reg_no=reg_no, company_reg_no=company_reg_no, ownership_type='company')
+        ])
+        db.session.flush()
+        db.session.add(Report(incident_no=f'INC000{n}', vehicle_reg_no=reg_no, badge_no='B1', location='Thika Road',
+                              incident_datetime=now, created_at=now))
+    db.session.commit()
+
+def add_user(role, company_reg_no=None):
+    user = User(email=f'{role}{company_reg_no or ""}@insurer.example', first_name='Test', last_name='User',
+                role=role, company_reg_no=company_reg_no)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_admin_sees_every_report(client, login, reports):
+    login(add_user('admin'))
+    page = client.get('/index').get_data(as_text=True)
+    assert 'INC0001' in page and 'INC0002' in page
+
+def test_company_user_sees_own_reports(client, login, reports):
+    login(add_user('agent', 'C1'))
+    page = client.get('/index').get_data(as_text=True)
+    assert 'INC0001' in page and 'INC0002' not in page
+
+def test_user_without_company_sees_no_reports(client, login, reports):
+    login(add_user('owner'))
+    response = client.get('/index')
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert 'INC0001' not in page and 'INC0002' not in page
\ No newline at end of file
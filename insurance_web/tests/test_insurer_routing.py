@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import CompanyInfo, VehicleInfo, VehicleOwnership
+from app.services.insurer_routing import NO_COMPANIES, InsurerRouter, router
+
+@pytest.fixture
+def vehicles(app):
+    """KCA 100A insured by C1, KCA 200A by C1 and C2, KCA 300A by nobody."""
+    db.session.add_all([
+        CompanyInfo(company_reg_no='C1', company_name='Insurer 1', license_no='L1'),
+        CompanyInfo(company_reg_no='C2', company_name='Insurer 2', license_no='L2')
+    ])
+    for n in (1, 2, 3, 4):
+        db.session.add(VehicleInfo(vehicle_reg_no=f'KCA {n}00A', chassis_no=f'C{n}', engine_no=f'E{n}', make='Toyota',
+                                   model='Axio', year=2015, body_type='Saloon', color='White', transmission='Auto'))
+    db.session.flush()
+    db.session.add_all([
+        VehicleOwnership(vehicle_reg_no='KCA 100A', company_reg_no='C1', ownership_type='company'),
+        VehicleOwnership(vehicle_reg_no='KCA 200A', company_reg_no='C1', ownership_type='company'),
+        VehicleOwnership(vehicle_reg_no='KCA 200A', company_reg_no='C2', ownership_type='company')
+    ])
+    db.session.commit()
+
+class Plate:
+    def __init__(self, vehicle_reg_no):
+        self.vehicle_reg_no = vehicle_reg_no
+
+def test_warm_router_answers_without_queries(vehicles):
+    """After the first lookup loads the map, known and uninsured plates are served from memory."""
+    routing = InsurerRouter(refresh_interval=None)
+    companies = routing.companies_for(db.session.connection(), ['KCA 100A', 'KCA 200A', 'KCA 300A'])
+    assert companies == {'KCA 100A': {'C1'}, 'KCA 200A': {'C1', 'C2'}, 'KCA 300A': NO_COMPANIES}
+    assert routing.stats()['queries'] == 3  # Warm-up, watermark, and the uninsured plate
+
+    assert routing.companies_for(db.session.connection(), ['KCA 300A', 'KCA 100A'])['KCA 300A'] == NO_COMPANIES
+    assert routing.stats() == {'plates': 3, 'hits': 4, 'misses': 1, 'queries': 3, 'hit_ratio': 0.8}
+
+    work = routing.route(db.session.connection(), [Plate('KCA 100A'), Plate('KCA 200A'), Plate('KCA 300A')])
+    assert {company: [r.vehicle_reg_no for r in reports] for company, reports in work.items()} == {
+        'C1': ['KCA 100A', 'KCA 200A'], 'C2': ['KCA 200A']
+    }
+
+def test_plates_sharing_insurers_share_one_set(vehicles):
+    db.session.add(VehicleOwnership(vehicle_reg_no='KCA 400A', company_reg_no='C1', ownership_type='company'))
+    db.session.commit()
+    routing = InsurerRouter(refresh_interval=None)
+    companies = routing.companies_for(db.session.connection(), ['KCA 100A', 'KCA 400A'])
+    assert companies['KCA 100A'] is companies['KCA 400A']
+
+def test_ownership_changes_in_this_process_are_followed(vehicles):
+    """Flushed ownership rows drop their plates, old and new, and are dropped again when the transaction ends."""
+    assert router.companies_for(db.session.connection(), ['KCA 300A'])['KCA 300A'] == NO_COMPANIES
+
+    ownership = VehicleOwnership.query.filter_by(vehicle_reg_no='KCA 100A').one()
+    ownership.vehicle_reg_no = 'KCA 300A'
+    db.session.flush()
+    assert router.companies_for(db.session.connection(), ['KCA 100A', 'KCA 300A']) == {
+        'KCA 100A': NO_COMPANIES, 'KCA 300A': {'C1'}
+    }
+    db.session.rollback()
+    assert router.companies_for(db.session.connection(), ['KCA 100A', 'KCA 300A']) == {
+        'KCA 100A': {'C1'}, 'KCA 300A': NO_COMPANIES
+    }
+
+def test_refresh_picks_up_changes_from_other_processes(vehicles):
+    routing = InsurerRouter(refresh_interval=0)
+    assert routing.companies_for(db.session.connection(), ['KCA 300A'])['KCA 300A'] == NO_COMPANIES
+
+    # Written by another process: this router's hooks never see it
+    db.session.execute(VehicleOwnership.__table__.insert().values(
+        vehicle_reg_no='KCA 300A', company_reg_no='C2', ownership_type='company',
+        updated_at=datetime.utcnow() + timedelta(seconds=1)
+    ))
+    assert routing.companies_for(db.session.connection(), ['KCA 300A'])['KCA 300A'] == {'C2'}
+    assert routing.refresh(db.session.connection()) == 0
\ No newline at end of file
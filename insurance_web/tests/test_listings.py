@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import CompanyInfo, User
+from app.services.listings import ListingService
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_count
+
+@pytest.fixture
+def companies(app):
+    """Five companies registered a day apart, C1 first."""
+    start = datetime(2024, 1, 1)
+    companies = [CompanyInfo(company_reg_no=f'C{n}', company_name=f'Insurer {6 - n}', license_no=f'L{n}',
+                             created_at=start + timedelta(days=n)) for n in range(1, 6)]
+    db.session.add_all(companies)
+    db.session.commit()
+    return companies
+
+def reg_nos(page):
+    return [company.company_reg_no for company in page.items]
+
+def test_cursor_round_trip():
+    created = datetime(2024, 1, 2, 3, 4, 5)
+    assert decode_cursor(encode_cursor('created_at', created, 'C1')) == ('created_at', created, 'C1', False)
+    assert decode_cursor(encode_cursor('email', 'a@b.example', 7, before=True)) == ('email', 'a@b.example', 7, True)
+    for cursor in ('bad', 'e30', ''):  # e30 is {}
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+def test_next_and_previous_pages(companies):
+    first = ListingService.companies(per_page=2)
+    assert reg_nos(first) == ['C5', 'C4'] and first.prev_cursor is None
+    second = ListingService.companies(cursor=first.next_cursor, per_page=2)
+    assert reg_nos(second) == ['C3', 'C2']
+    last = ListingService.companies(cursor=second.next_cursor, per_page=2)
+    assert reg_nos(last) == ['C1'] and last.next_cursor is None
+
+    back = ListingService.companies(cursor=last.prev_cursor, per_page=2)
+    assert reg_nos(back) == ['C3', 'C2']
+    back = ListingService.companies(cursor=back.prev_cursor, per_page=2)
+    assert reg_nos(back) == ['C5', 'C4'] and back.prev_cursor is None
+    assert reg_nos(ListingService.companies(cursor=back.next_cursor, per_page=2)) == ['C3', 'C2']
+    assert (first.total, first.total_is_estimate) == (5, False)
+
+def test_other_sort_orders(companies):
+    page = ListingService.companies(sort='company_name', descending=False, per_page=3)
+    assert reg_nos(page) == ['C5', 'C4', 'C3']
+    assert reg_nos(ListingService.companies(sort='company_name', descending=False, cursor=page.next_cursor)) == [
+        'C2', 'C1']
+    # A cursor only continues the sort order it was made for
+    with pytest.raises(ValueError):
+        ListingService.companies(cursor=page.next_cursor)
+
+def test_invalid_arguments(app):
+    with pytest.raises(ValueError):
+        ListingService.users(sort='password_hash')
+    with pytest.raises(ValueError):
+        ListingService.users(status='deleted')
+    with pytest.raises(ValueError):
+        ListingService.reports(status='closed')
+    with pytest.raises(ValueError):
+        ListingService.reports(cursor='not-a-cursor')
+
+def test_count_is_capped(companies):
+    query = CompanyInfo.query
+    assert estimate_count(query, cap=3) == (3, True)
+    assert estimate_count(query, cap=5) == (5, False)
+
+@pytest.mark.parametrize('query', ['from=bad', 'cursor=bad', 'sort=license_no'])
+def test_bad_listing_arguments_redirect(client, login, query):
+    admin = User(email='admin@insurer.example', first_name='Ada', last_name='Admin', role='admin')
+    db.session.add(admin)
+    db.session.commit()
+    login(admin)
+    for listing in ('users', 'companies', 'reports'):
+        response = client.get(f'/admin/{listing}?{query}')
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith(f'/admin/{listing}')
\ No newline at end of file
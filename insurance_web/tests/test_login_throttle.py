@@ -0,0 +1,71 @@
+import pytest
+from flask import g
+from app import create_app, db
+from app.models import User
+from app.models import user as user_model
+from app.services.login_throttle import LoginThrottled, login_throttle
+
+@pytest.fixture
+def agent(app):
+    agent = User(email='agent@insurer.example', first_name='Amina', last_name='Otieno', role='agent',
+                 password='Agent@1234')
+    db.session.add(agent)
+    db.session.commit()
+    return agent
+
+@pytest.fixture
+def hash_checks(monkeypatch):
+    """Counts password hash comparisons."""
+    calls = []
+    check = user_model.check_password
+    monkeypatch.setattr(user_model, 'check_password', lambda *args: calls.append(args) or check(*args))
+    return calls
+
+def login(app, password, email='agent@insurer.example', address='10.0.0.1', **headers):
+    # A signed-in client would skip the form; Flask-Login keeps the user on g,
+    # which lives as long as the test's app context
+    g.pop('_login_user', None)
+    return app.test_client().post('/auth/login', data={'email': email, 'password': password},
+                                  headers=headers, environ_base={'REMOTE_ADDR': address})
+
+def test_account_throttled_before_hashing(app, agent, hash_checks):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 3})
+    assert [login(app, 'Wrong@1234').status_code for _ in range(3)] == [302, 302, 302]
+    assert len(hash_checks) == 3
+
+    response = login(app, 'Agent@1234', address='10.0.0.2')
+    assert response.status_code == 429
+    assert 0 < int(response.headers['Retry-After']) <= 300
+    assert len(hash_checks) == 3
+    assert login(app, 'Agent@1234', email='other@insurer.example').status_code == 302
+
+def test_successful_logins_give_their_slot_back(app, agent):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 3})
+    for _ in range(5):
+        response = login(app, 'Agent@1234')
+        assert response.headers['Location'] == '/index'
+    assert [login(app, 'Wrong@1234').status_code for _ in range(3)] == [302, 302, 302]
+    assert login(app, 'Agent@1234').status_code == 429
+    assert login_throttle.stats()['account_rejected'] == 1
+
+def test_concurrent_guesses_cannot_exceed_account_limit(app):
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_ACCOUNT_LIMIT': 2})
+    login_throttle.check('agent@insurer.example', '10.0.0.1')
+    login_throttle.check('agent@insurer.example', '10.0.0.2')
+    with pytest.raises(LoginThrottled):
+        login_throttle.check('Agent@insurer.example', '10.0.0.3')
+    login_throttle.release('agent@insurer.example')
+    login_throttle.check('agent@insurer.example', '10.0.0.3')
+
+def test_address_forwarded_by_trusted_proxy(monkeypatch):
+    monkeypatch.setenv('TRUSTED_PROXIES', '1')
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    login_throttle.configure({**app.config, 'LOGIN_THROTTLE_IP_LIMIT': 1})
+    with app.app_context():
+        db.create_all()
+        # Clients behind the same proxy are counted apart
+        statuses = [login(app, 'Wrong@1234', **{'X-Forwarded-For': address}).status_code
+                    for address in ('41.90.0.1', '41.90.0.2', '41.90.0.1')]
+        assert statuses == [302, 302, 429]
+        db.drop_all()
\ No newline at end of file
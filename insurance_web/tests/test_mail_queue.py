@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db, mail
+from app.services.mail_queue import DomainRateLimiter, MailQueue, MailSender
+from app.utils.smtp_sink import SMTPSink
+
+@pytest.fixture
+def sink(app):
+    """Local SMTP server refusing one domain for good and greylisting another."""
+    with SMTPSink(reject={'bounce.example': 550, 'greylist.example': 451}) as sink:
+        app.config.update(MAIL_SERVER=sink.host, MAIL_PORT=sink.port, MAIL_USE_TLS=False,
+                          MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_SUPPRESS_SEND=False)
+        mail.init_app(app)
+        yield sink
+
+@pytest.fixture
+def sender(app, sink):
+    sender = MailSender()
+    sender.init_app(app)
+    return sender
+
+def queue(*recipients):
+    messages = MailQueue.enqueue('Report received', recipients, 'A new accident report was filed.')
+    db.session.commit()
+    return messages
+
+def make_due(messages):
+    for message in messages:
+        message.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+
+def test_batch_is_sent_over_one_connection(sender, sink):
+    messages = queue('a@insurer.example', 'b@insurer.example', 'c@other.example')
+    assert sender.run_once() == 3
+
+    assert [m.status for m in messages] == ['sent', 'sent', 'sent']
+    assert all(m.attempts == 1 and m.sent_at is not None for m in messages)
+    assert sorted(m['rcpt_tos'][0] for m in sink.messages) == ['a@insurer.example', 'b@insurer.example',
+                                                               'c@other.example']
+    assert sink.connections == 1
+    assert sender.run_once() == 0
+    assert MailQueue.stats()['sent'] == 3
+
+def test_refused_recipients_fail_or_back_off(sender, sink):
+    bounced, greylisted, delivered = queue('x@bounce.example', 'y@greylist.example', 'z@insurer.example')
+    before = datetime.utcnow()
+    assert sender.run_once() == 3
+
+    # 5xx is permanent, 4xx is retried after the first backoff step
+    assert (bounced.status, bounced.attempts) == ('failed', 1)
+    assert 'SMTPRecipientsRefused' in bounced.last_error
+    assert (greylisted.status, greylisted.attempts) == ('pending', 1)
+    assert greylisted.next_attempt_at >= before + timedelta(seconds=sender.retry_delay)
+    assert delivered.status == 'sent'
+
+    # Due again straight away, then retries run out
+    sender.max_attempts = 2
+    make_due([greylisted])
+    assert sender.run_once() == 1
+    assert (greylisted.status, greylisted.attempts) == ('failed', 2)
+    assert len(sink.messages) == 1
+
+def test_backoff_doubles_up_to_the_cap(sender):
+    sender.retry_delay = 60
+    assert [sender.backoff(attempts) for attempts in (1, 2, 3)] == [60, 120, 240]
+    assert sender.backoff(20) == 3600
+
+def test_connection_dropped_mid_batch(sender, sink):
+    sink.drop_after = 2
+    messages = queue(*[f'agent{i}@insurer.example' for i in range(5)])
+    assert sender.run_once() == 5
+
+    assert [m.status for m in messages] == ['sent', 'sent', 'pending', 'pending', 'pending']
+    assert all(m.attempts == 1 and 'SMTPServerDisconnected' in m.last_error for m in messages[2:])
+
+    # Each pass gets a fresh connection and sends what it can
+    sink.drop_after = None
+    make_due(messages[2:])
+    assert sender.run_once() == 3
+    assert all(m.status == 'sent' for m in messages)
+    assert [m.attempts for m in messages] == [1, 1, 2, 2, 2]
+    assert len(sink.messages) == 5 and sink.connections == 2
+
+def test_lease_of_a_crashed_sender_is_reclaimed(sender, sink):
+    message, = queue('a@insurer.example')
+
+    # Claimed by a sender that died before recording the outcome
+    assert [m.id for m in MailSender()._claim()] == [message.id]
+    db.session.refresh(message)
+    assert message.status == 'sending'
+    assert sender.run_once() == 0
+
+    message.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert sender.run_once() == 1
+    assert message.status == 'sent'
+    assert len(sink.messages) == 1
+
+def test_domain_rate_is_limited(sender, sink):
+    sender.limiter = DomainRateLimiter(rate=2)
+    messages = queue('a@insurer.example', 'b@insurer.example', 'c@insurer.example', 'd@other.example')
+    assert sender.run_once() == 4
+
+    assert [m.status for m in messages] == ['sent', 'sent', 'pending', 'sent']
+    # Deferred without counting an attempt, until the bucket has a token again
+    deferred = messages[2]
+    assert deferred.attempts == 0
+    assert deferred.next_attempt_at > datetime.utcnow() + timedelta(seconds=25)
+
+def test_token_bucket_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('app.services.mail_queue.time.monotonic', lambda: now[0])
+    limiter = DomainRateLimiter(rate=60)
+
+    assert all(limiter.acquire('insurer.example') == 0 for _ in range(60))
+    assert limiter.acquire('insurer.example') == pytest.approx(1.0)
+    assert limiter.acquire('other.example') == 0
+    now[0] += 2
+    assert limiter.acquire('insurer.example') == 0
+    assert DomainRateLimiter(rate=0).acquire('insurer.example') == 0
\ No newline at end of file
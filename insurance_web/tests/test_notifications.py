@@ -0,0 +1,123 @@
+import json
+import time
+from datetime import datetime
+import pytest
+from app import db
+from app.models import CompanyInfo, JurisdictionInfo, PoliceInfo, Report, User, VehicleInfo, VehicleOwnership
+from app.services import notifications
+from app.services.notifications import LocalBroker, NotificationService, RedisBroker, Subscriber
+
+@pytest.fixture
+def broker(monkeypatch, app):
+    broker = LocalBroker(max_queue=2)
+    monkeypatch.setattr(notifications, 'broker', broker)
+    return broker
+
+@pytest.fixture
+def vehicles(app):
+    """KCA 100A insured by C1; KCA 300A by nobody."""
+    db.session.add_all([
+        JurisdictionInfo(station_id='ST1', station_name='Central', county='Nairobi'),
+        PoliceInfo(badge_no='B1', police_name='Kamau', gender='M', rank='Cpl', station_id='ST1'),
+        CompanyInfo(company_reg_no='C1', company_name='Insurer 1', license_no='L1')
+    ])
+    for n in (1, 3):
+        db.session.add(VehicleInfo(vehicle_reg_no=f'KCA {n}00A', chassis_no=f'C{n}', engine_no=f'E{n}', make='Toyota',
+                                   model='Axio', year=2015, body_type='Saloon', color='White', transmission='Auto'))
+    db.session.flush()
+    db.session.add(VehicleOwnership(vehicle_reg_no='KCA 100A', company_reg_no='C1', ownership_type='company'))
+    db.session.commit()
+
+def add_report(incident_no, vehicle_reg_no):
+    now = datetime(2024, 5, 1, 8, 30)
+    db.session.add(Report(incident_no=incident_no, vehicle_reg_no=vehicle_reg_no, badge_no='B1', location='Thika Road',
+                          incident_datetime=now, created_at=now))
+
+def test_subscriber_drops_oldest_events():
+    subscriber = Subscriber('C1', max_queue=2)
+    for n in range(3):
+        subscriber.put({'n': n})
+    assert subscriber.get(timeout=0) == [{'n': 1}, {'n': 2}]
+    assert subscriber.take_dropped() == 1
+    assert subscriber.take_dropped() == 0
+
+def test_committed_reports_are_published_to_their_insurer(broker, vehicles):
+    subscriber = broker.subscribe('C1')
+    other = broker.subscribe('C2')
+
+    add_report('INC0001', 'KCA 100A')
+    add_report('INC0002', 'KCA 300A')
+    db.session.flush()
+    assert subscriber.get(timeout=0) == []  # Not before the commit
+    db.session.commit()
+    events = subscriber.get(timeout=0)
+    assert [(e['type'], e['incident_no'], e['created_at']) for e in events] == [
+        ('report.created', 'INC0001', '2024-05-01T08:30:00')
+    ]
+    assert other.get(timeout=0) == []
+
+    add_report('INC0003', 'KCA 100A')
+    db.session.flush()
+    db.session.rollback()
+    assert subscriber.get(timeout=0) == []
+    assert broker.stats() == {'broker': 'LocalBroker', 'published': 1, 'subscribers': 2, 'companies': 2}
+
+    broker.unsubscribe(other)
+    assert broker.stats()['companies'] == 1
+
+def test_stream_framing(broker):
+    stream = NotificationService.stream('C1', heartbeat=0.01, retry_ms=5000)
+    assert next(stream) == 'retry: 5000\n\n'
+    assert next(stream) == ': keep-alive\n\n'
+
+    event = {'type': 'report.created', 'incident_no': 'INC0001'}
+    broker.publish('C1', event)
+    assert next(stream) == f'id: INC0001\nevent: report.created\ndata: {json.dumps(event)}\n\n'
+
+    for n in range(3):
+        broker.publish('C1', {'type': 'report.created', 'incident_no': f'INC000{n}'})
+    assert next(stream) == 'event: dropped\ndata: {"dropped": 1}\n\n'
+    assert [chunk.split('\n')[0] for chunk in (next(stream), next(stream))] == ['id: INC0001', 'id: INC0002']
+
+    stream.close()
+    assert broker.stats()['subscribers'] == 0
+
+def test_stream_ends_after_timeout(broker):
+    chunks = list(NotificationService.stream('C1', heartbeat=0.01, timeout=0.05))
+    assert chunks[0].startswith('retry: ') and chunks[-1] == ': keep-alive\n\n'
+    assert broker.stats()['subscribers'] == 0
+
+def test_redis_broker_reaches_other_processes(fake_redis):
+    """Events go through a Redis channel per company and the listener hands them to local subscribers."""
+    publisher, listener = RedisBroker(fake_redis), RedisBroker(fake_redis)
+    subscriber = listener.subscribe('C1')
+    deadline = time.monotonic() + 5
+    while not (fake_redis.pubsubs and fake_redis.pubsubs[0].patterns) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    publisher.publish('C1', {'type': 'report.created', 'incident_no': 'INC0001'})
+    publisher.publish('C2', {'type': 'report.created', 'incident_no': 'INC0002'})
+    assert subscriber.get(timeout=5) == [{'type': 'report.created', 'incident_no': 'INC0001'}]
+    assert publisher.stats()['published'] == 2
+
+def add_user(role, company_reg_no=None):
+    if company_reg_no:
+        db.session.add(CompanyInfo(company_reg_no=company_reg_no, company_name='Insurer 1', license_no='L1'))
+    user = User(email=f'{role}@insurer.example', first_name='Test', last_name='User', role=role,
+                company_reg_no=company_reg_no)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_stream_endpoint(app, client, login, broker):
+    app.config.update(NOTIFICATION_HEARTBEAT=0.01, NOTIFICATION_STREAM_TIMEOUT=0.05)
+    login(add_user('agent', 'C1'))
+    response = client.get('/api/notifications/stream')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['X-Accel-Buffering'] == 'no'
+    assert response.get_data(as_text=True).startswith('retry: 3000\n\n: keep-alive\n\n')
+
+def test_stream_endpoint_needs_a_company(client, login, broker):
+    login(add_user('owner'))
+    assert client.get('/api/notifications/stream').status_code == 403
\ No newline at end of file
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import (CompanyInfo, CompanyReportCounter, JurisdictionInfo, PoliceInfo, Report, VehicleInfo,
+                        VehicleOwnership)
+from app.services.report_counters import ReportCounterService
+
+@pytest.fixture
+def vehicles(app):
+    """KCA 100A insured by C1, KCA 200A by C1 and C2, KCA 300A by nobody."""
+    db.session.add_all([
+        JurisdictionInfo(station_id='ST1', station_name='Central', county='Nairobi'),
+        PoliceInfo(badge_no='B1', police_name='Kamau', gender='M', rank='Cpl', station_id='ST1'),
+        CompanyInfo(company_reg_no='C1', company_name='Insurer 1', license_no='L1'),
+        CompanyInfo(company_reg_no='C2', company_name='Insurer 2', license_no='L2')
+    ])
+    for n in (1, 2, 3):
+        db.session.add(VehicleInfo(vehicle_reg_no=f'KCA {n}00A', chassis_no=f'C{n}', engine_no=f'E{n}', make='Toyota',
+                                   model='Axio', year=2015, body_type='Saloon', color='White', transmission='Auto'))
+    db.session.flush()
+    db.session.add_all([
+        VehicleOwnership(vehicle_reg_no='KCA 100A', company_reg_no='C1', ownership_type='company'),
+        VehicleOwnership(vehicle_reg_no='KCA 200A', company_reg_no='C1', ownership_type='company'),
+        VehicleOwnership(vehicle_reg_no='KCA 200A', company_reg_no='C2', ownership_type='company')
+    ])
+    db.session.commit()
+
+def add_report(incident_no, vehicle_reg_no, created_at=None, status='pending'):
+    created_at = created_at or datetime.utcnow()
+    report = Report(incident_no=incident_no, vehicle_reg_no=vehicle_reg_no, badge_no='B1', location='Thika Road',
+                    incident_datetime=created_at, created_at=created_at, status=status)
+    db.session.add(report)
+    return report
+
+def counters():
+    return {(row.company_reg_no, row.status): row.count
+            for row in CompanyReportCounter.query.filter(CompanyReportCounter.count != 0)}
+
+def test_counters_follow_reports(vehicles):
+    """Reports are counted for every insurer of their vehicle as they are added, re-statused and deleted."""
+    add_report('INC0001', 'KCA 100A')
+    add_report('INC0002', 'KCA 200A')
+    add_report('INC0003', 'KCA 300A')
+    db.session.commit()
+    assert counters() == {('C1', 'pending'): 2, ('C2', 'pending'): 1}
+
+    db.session.get(Report, 'INC0002').status = 'approved'
+    db.session.commit()
+    assert counters() == {('C1', 'pending'): 1, ('C1', 'approved'): 1, ('C2', 'approved'): 1}
+
+    db.session.delete(db.session.get(Report, 'INC0001'))
+    db.session.commit()
+    assert counters() == {('C1', 'approved'): 1, ('C2', 'approved'): 1}
+    assert ReportCounterService.check() == []
+
+def test_rolled_back_reports_are_not_counted(vehicles):
+    add_report('INC0001', 'KCA 100A')
+    db.session.flush()
+    assert counters() == {('C1', 'pending'): 1}
+    db.session.rollback()
+    assert counters() == {}
+
+def test_check_finds_bulk_updates_and_rebuild_fixes_them(app, vehicles):
+    """Bulk updates bypass the flush hook; check() reports the drift and rebuild() repairs it."""
+    add_report('INC0001', 'KCA 100A')
+    add_report('INC0002', 'KCA 200A')
+    db.session.commit()
+    Report.query.filter_by(incident_no='INC0001').update({'status': 'rejected'})
+    db.session.commit()
+
+    day = datetime.utcnow().date()
+    assert ReportCounterService.check() == [(('C1', 'pending', day), 2, 1), (('C1', 'rejected', day), 0, 1)]
+    result = app.test_cli_runner().invoke(args=['check-report-counters'])
+    assert result.exit_code != 0 and '2 counter(s) out of date' in result.output
+
+    assert ReportCounterService.rebuild() == 3
+    assert ReportCounterService.check() == []
+    assert app.test_cli_runner().invoke(args=['check-report-counters']).exit_code == 0
+
+def test_summary_and_monthly_counts(vehicles):
+    now = datetime.utcnow()
+    add_report('INC0001', 'KCA 100A', now)
+    add_report('INC0002', 'KCA 100A', now, status='rejected')
+    add_report('INC0003', 'KCA 200A', now - timedelta(days=60))
+    db.session.commit()
+
+    assert ReportCounterService.summary('C1') == {'total': 3, 'recent': 2, 'pending': 2, 'rejected': 1}
+    assert ReportCounterService.summary('C2') == {'total': 1, 'recent': 0, 'pending': 1, 'rejected': 0}
+    assert ReportCounterService.monthly_counts('C1') == [{'month': now.strftime('%Y-%m'), 'count': 2}]
+    assert ReportCounterService.monthly_counts('C2') == []
\ No newline at end of file
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import CompanyInfo, User
+from app.services import user_loader
+from app.services.cache import LRUCacheBackend, RedisCacheBackend
+from app.services.user_loader import invalidate_user, load_user
+
+@pytest.fixture(params=['lru', 'redis'])
+def user_cache(request, monkeypatch, app, fake_redis):
+    """The user cache on each backend; Redis is replaced by an in-memory fake."""
+    if request.param == 'lru':
+        cache = LRUCacheBackend(ttl=user_loader.DEFAULT_TTL)
+    else:
+        cache = RedisCacheBackend(fake_redis, ttl=user_loader.DEFAULT_TTL)
+    monkeypatch.setattr(user_loader, 'user_cache', cache)
+    return cache
+
+@pytest.fixture
+def agent(app):
+    db.session.add(CompanyInfo(company_reg_no='C1', company_name='Insurer 1', license_no='L1'))
+    agent = User(email='agent@insurer.example', first_name='Test', last_name='User', role='agent',
+                 company_reg_no='C1')
+    agent.password = 'Insurer@123'
+    db.session.add(agent)
+    db.session.commit()
+    agent_id = agent.id
+    db.session.remove()
+    return agent_id
+
+@pytest.fixture
+def statements(app):
+    """SQL statements run while the test is active."""
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+def next_request():
+    """Start over with an empty session, as a new request would."""
+    db.session.remove()
+
+def test_cached_user_loads_without_queries(user_cache, agent, statements):
+    user = load_user(str(agent))
+    assert len(statements) == 1  # User and company in one joined query
+    assert user.company.company_name == 'Insurer 1'
+
+    next_request()
+    del statements[:]
+    user = load_user(str(agent))
+    assert (user.email, user.company.company_name) == ('agent@insurer.example', 'Insurer 1')
+    assert user.created_at is not None and user.is_active
+    assert statements == []
+
+    # Secrets are never cached and are loaded only when asked for
+    assert 'password_hash' not in user_cache.get(f'user:{agent}')
+    assert user.verify_password('Insurer@123')
+    assert len(statements) == 1
+
+def test_changes_invalidate_the_cache(user_cache, agent):
+    load_user(str(agent))
+    next_request()
+
+    user = db.session.get(User, agent)
+    user.is_active = False
+    user.company.company_name = 'Insurer One'
+    db.session.commit()
+    assert user_cache.get(f'user:{agent}') is None and user_cache.get('company:C1') is None
+
+    next_request()
+    user = load_user(str(agent))
+    assert not user.is_active and user.company.company_name == 'Insurer One'
+
+def test_rolled_back_changes_keep_nothing_stale(user_cache, agent):
+    load_user(str(agent))
+    next_request()
+
+    db.session.get(User, agent).first_name = 'Changed'
+    db.session.flush()
+    assert user_cache.get(f'user:{agent}') is None
+    db.session.rollback()
+
+    next_request()
+    assert load_user(str(agent)).first_name == 'Test'
+
+def test_bulk_updates_need_invalidate_user(user_cache, agent):
+    load_user(str(agent))
+    User.query.filter_by(id=agent).update({'first_name': 'Bulk'})
+    db.session.commit()
+    next_request()
+    assert load_user(str(agent)).first_name == 'Test'  # Bulk updates skip the mapper hooks
+
+    invalidate_user(agent)
+    next_request()
+    assert load_user(str(agent)).first_name == 'Bulk'
+
+def test_unknown_user(user_cache, app):
+    assert load_user('42') is None
+    assert user_cache.get('user:42') is None
\ No newline at end of file
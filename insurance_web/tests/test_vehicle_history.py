@@ -0,0 +1,120 @@
+from datetime import datetime
+import pytest
+from app import db
+from app.models import JurisdictionInfo, PoliceInfo, Report, VehicleAccidentHistory, VehicleInfo
+from app.services import vehicle_history
+from app.services.cache import DEFAULT_TTL, LRUCacheBackend, RedisCacheBackend, create_backend
+from app.services.vehicle_history import VehicleHistoryService
+
+@pytest.fixture(params=['lru', 'redis'])
+def history_cache(request, monkeypatch, app, fake_redis):
+    """The history cache on each backend; Redis is replaced by an in-memory fake."""
+    if request.param == 'lru':
+        cache = LRUCacheBackend(ttl=DEFAULT_TTL)
+    else:
+        cache = RedisCacheBackend(fake_redis, ttl=DEFAULT_TTL)
+    monkeypatch.setattr(vehicle_history, 'history_cache', cache)
+    return cache
+
+@pytest.fixture
+def vehicle(app):
+    station = JurisdictionInfo(station_id='ST1', station_name='Central', county='Nairobi')
+    officer = PoliceInfo(badge_no='B1', police_name='Kamau', gender='M', rank='Cpl', station_id='ST1')
+    vehicle = VehicleInfo(vehicle_reg_no='KCA 123A', chassis_no='C1', engine_no='E1', make='Toyota', model='Axio',
+                          year=2015, body_type='Saloon', color='White', transmission='Auto')
+    db.session.add_all([station, officer, vehicle])
+    db.session.commit()
+    return vehicle
+
+def add_report(incident_no, vehicle_reg_no='KCA 123A'):
+    now = datetime.utcnow()
+    db.session.add(Report(incident_no=incident_no, vehicle_reg_no=vehicle_reg_no, badge_no='B1', location='Thika Road',
+                          incident_datetime=now, created_at=now))
+    db.session.flush()
+    db.session.add(VehicleAccidentHistory(vehicle_reg_no=vehicle_reg_no, incident_no=incident_no, created_at=now))
+    db.session.commit()
+
+def test_lru_backend_evicts_and_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('app.services.cache.time.monotonic', lambda: now[0])
+    cache = LRUCacheBackend(max_size=2, ttl=10)
+
+    for key in ('a', 'b', 'c'):
+        cache.set(key, {'key': key})
+    assert cache.get('a') is None
+    assert cache.get('c') == {'key': 'c'}
+
+    now[0] += 11
+    assert cache.get('c') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (1, 2, 1, 1)
+
+def test_redis_backend_round_trip(fake_redis):
+    cache = RedisCacheBackend(fake_redis, prefix='raise:', ttl=30)
+    cache.set('vehicle_history:KCA123A', {'found': False})
+    assert fake_redis.expiry['raise:vehicle_history:KCA123A'] == 30
+    assert cache.get('vehicle_history:KCA123A') == {'found': False}
+
+    fake_redis.set('other:key', '1')
+    cache.clear()
+    assert cache.get('vehicle_history:KCA123A') is None
+    assert fake_redis.get('other:key') == b'1'
+    assert cache.stats()['hit_ratio'] == 0.5
+
+def test_backends_expire_by_default():
+    assert create_backend({}, prefix='raise:').ttl == DEFAULT_TTL
+    assert create_backend({'CACHE_TTL': 5}, prefix='raise:').ttl == 5
+    assert create_backend({'CACHE_TTL': 0}, prefix='raise:').ttl is None
+    with pytest.raises(ValueError):
+        create_backend({'CACHE_BACKEND': 'memcached'}, prefix='raise:')
+
+def test_new_report_invalidates_history(history_cache, vehicle):
+    assert VehicleHistoryService.cached_lookup('kca 123a')['accident_count'] == 0
+    assert VehicleHistoryService.cached_lookup('KCA123A')['accident_count'] == 0
+    assert history_cache.hits == 1
+
+    add_report('INC0001')
+    document = VehicleHistoryService.cached_lookup('KCA 123A')
+    assert document['accident_count'] == 1
+    assert document['history'][0]['police_station'] == 'Central'
+
+    report = db.session.get(Report, 'INC0001')
+    report.status = 'approved'
+    db.session.commit()
+    assert VehicleHistoryService.cached_lookup('KCA 123A')['history'][0]['status'] == 'approved'
+
+def test_vehicle_changes_invalidate_history(history_cache, vehicle):
+    assert VehicleHistoryService.cached_lookup('KBZ 999Z') is None
+    db.session.add(VehicleInfo(vehicle_reg_no='KBZ 999Z', chassis_no='C2', engine_no='E2', make='Mazda',
+                               model='Demio', year=2012, body_type='Hatchback', color='Red', transmission='Auto'))
+    db.session.commit()
+    assert VehicleHistoryService.cached_lookup('KBZ 999Z')['make'] == 'Mazda'
+
+    assert VehicleHistoryService.cached_lookup('KCA 123A')['model'] == 'Axio'
+    vehicle.model = 'Fielder'
+    db.session.commit()
+    assert VehicleHistoryService.cached_lookup('KCA 123A')['model'] == 'Fielder'
+
+    db.session.delete(db.session.get(VehicleInfo, 'KBZ 999Z'))
+    db.session.commit()
+    assert VehicleHistoryService.cached_lookup('KBZ 999Z') is None
+
+def test_rolled_back_change_keeps_nothing_pending(history_cache, vehicle):
+    vehicle.make = 'Nissan'
+    db.session.flush()
+    db.session.rollback()
+    assert not db.session.info.get('vehicle_history_invalidations')
+    assert VehicleHistoryService.cached_lookup('KCA 123A')['make'] == 'Toyota'
+
+def test_history_etag_changes_with_vehicle(client, vehicle):
+    response = client.get('/api/vehicles/kca123a/history')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert client.get('/api/vehicles/kca123a/history', headers={'If-None-Match': etag}).status_code == 304
+
+    vehicle.make = 'Nissan'
+    db.session.commit()
+    response = client.get('/api/vehicles/kca123a/history', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['make'] == 'Nissan'
+    assert response.headers['ETag'] != etag
\ No newline at end of file